@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+結算預測回測
+
+以陣列運算重播 SettlementPredictor 在所有歷史週三/週五結算的預測區間，
+輸出方向命中率、區間覆蓋率與誤差分布（src/settlement_backtest.py）
+
+使用方式:
+    python backtest_settlement.py              # 回測摘要
+    python backtest_settlement.py -v           # 列出每個結算案例
+    python backtest_settlement.py --verify     # 逐案例與 predict_settlement 的結果比對
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# 加入專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.settlement_backtest import (
+    METRICS_CACHE_FILE,
+    TREND_NAMES,
+    load_metrics_table,
+    load_settlement_cases,
+    run_backtest,
+)
+
+
+def print_summary(summary: dict):
+    print("=" * 60)
+    print("📊 結算預測回測")
+    print("=" * 60)
+    print(f"  結算案例: {summary['count']} 筆（無分析日報告: {summary['no_data']} 筆，不計入統計）")
+
+    for key, label in (('overall', '整體'), ('wednesday', '週三結算'), ('friday', '週五結算')):
+        stats = summary[key]
+        print(f"\n【{label}】共 {stats['count']} 筆")
+        if not stats['count']:
+            print("  (無資料)")
+            continue
+        err = stats['error_stats']
+        print(f"  方向命中率：{stats['direction_hit_rate']}%")
+        print(f"  區間覆蓋率：{stats['interval_coverage']}%（平均寬度 {stats['avg_width']:.0f} 點）")
+        print(f"  誤差統計：平均 {err['mean']:.0f}點 | 中位數 {err['median']:.0f}點 | "
+              f"P75={err['p75']:.0f}點 | P90={err['p90']:.0f}點 | 最大={err['max']:.0f}點 | 偏差 {stats['bias']:+.0f}點")
+
+
+def print_cases(result):
+    cases = result.cases
+    print(f"\n{'結算日':<12}{'週別':<11}{'分析日':<24}{'趨勢':<9}{'預測區間':<16}{'實際':>7}  命中")
+    for i in range(len(cases)):
+        analysis = ','.join(
+            str(day).replace('-', '') if present else '-'
+            for day, present in zip(cases.analysis_dates[i], cases.present[i])
+        )
+        span = f"{result.lower[i]:.0f}-{result.upper[i]:.0f}"
+        hit = '✅' if result.has_data[i] and result.in_range[i] else ('⊘' if not result.has_data[i] else '❌')
+        print(f"{str(cases.dates[i]):<12}{cases.weekdays[i]:<11}{analysis:<24}"
+              f"{TREND_NAMES[int(result.trend[i])]:<9}{span:<16}{cases.actual[i]:>7.0f}  {hit}")
+
+
+def verify(result) -> int:
+    """逐案例呼叫 predict_settlement，比對預測區間；回傳不一致的案例數"""
+    from src.settlement_predictor import SettlementPredictor
+
+    predictor = SettlementPredictor(result.params)
+    cases = result.cases
+    mismatches = 0
+    for i in range(len(cases)):
+        dates = [str(day).replace('-', '') for day in cases.analysis_dates[i]]
+        settlement_date = str(cases.dates[i]).replace('-', '/')
+        prediction = predictor.predict_settlement(dates, settlement_date, cases.weekdays[i])
+        expected = tuple(int(v) for v in prediction.predicted_range)
+        actual = (int(result.lower[i]), int(result.upper[i]))
+        if expected != actual:
+            mismatches += 1
+            print(f"  ❌ {settlement_date}: predict_settlement={expected} 回測={actual}")
+    print(f"\n🔍 比對 {len(cases)} 筆：{'全部一致' if not mismatches else f'{mismatches} 筆不一致'}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='結算預測回測',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  # 回測摘要
+  python backtest_settlement.py
+
+  # 列出每個結算案例
+  python backtest_settlement.py -v
+
+  # 逐案例與 predict_settlement 比對（確認陣列版規則與預測器一致）
+  python backtest_settlement.py --verify
+
+  # 輸出 JSON 摘要
+  python backtest_settlement.py --json
+        """
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='列出每個結算案例')
+    parser.add_argument('--verify', action='store_true', help='逐案例與 predict_settlement 比對預測區間')
+    parser.add_argument('--json', action='store_true', help='以 JSON 輸出摘要')
+    parser.add_argument('--no-cache', action='store_true', help=f'不使用指標快取（{METRICS_CACHE_FILE}）')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = load_metrics_table(cache_file=None if args.no_cache else METRICS_CACHE_FILE)
+    cases = load_settlement_cases(table)
+    loaded = time.perf_counter()
+    result = run_backtest(cases)
+    summary = result.summary()
+    finished = time.perf_counter()
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+        if args.verbose:
+            print_cases(result)
+        print(f"\n⏱️  載入 {len(table.dates)} 日指標與 {len(cases)} 筆案例 {(loaded - start) * 1000:.1f}ms，"
+              f"回測 {(finished - loaded) * 1000:.2f}ms")
+
+    if args.verify and verify(result):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+增量網站建置
+
+依建置清單（data/build_manifest.json）比對每個頁面的輸入雜湊，只重建過期的頁面：
+每日報告 -> 結算報告 -> 同步 docs/ -> 首頁 -> 預先壓縮檔（.gz/.br）與頁面大小報告
+
+使用方式:
+    python build_site.py              # 只重建過期頁面
+    python build_site.py --dry-run    # 列出需要重建的頁面與原因
+    python build_site.py --force      # 全部重建
+    python build_site.py --adopt      # 首次導入：為既有頁面建立記錄，不重建
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# 加入專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.site_build import PROJECT_ROOT, SiteBuilder, relative_key
+from src.site_compress import SIZE_REPORT_FILE, brotli
+
+
+PHASE_NAMES = {
+    'daily': '每日報告',
+    'settlement': '結算報告',
+    'docs': '同步 docs/',
+    'index': '首頁',
+    'compress': '壓縮檔',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='增量網站建置（只重建過期頁面）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+範例:
+  python build_site.py              只重建過期頁面
+  python build_site.py --dry-run    列出需要重建的頁面與原因
+  python build_site.py --force      全部重建
+  python build_site.py --adopt      首次導入：為既有頁面建立記錄，不重建
+
+判斷依據:
+  每日報告: templates/report.html 與共用 CSS/JS、OptionsData 快照、當日預測/檢討 JSON
+  結算報告: templates/settlement_report.html 與共用 CSS/JS、calibration.json、分析日的每日報告、
+            AI 結算預測/檢討與盤前預測 JSON
+  首頁:     generate_index_with_weekday.py 與 docs/ 內的報告檔名
+  壓縮檔:   docs/ 內 HTML/CSS/JS/JSON 的 .gz（安裝 brotli 時另有 .br），內容與原始檔不同才重新壓縮
+        '''
+    )
+    parser.add_argument('--dry-run', '-n', action='store_true',
+                        help='只列出需要重建的頁面，不實際建置')
+    parser.add_argument('--force', '-f', action='store_true',
+                        help='忽略建置清單，全部重建')
+    parser.add_argument('--adopt', action='store_true',
+                        help='沒有建置記錄的既有頁面直接建立記錄，不重建')
+    args = parser.parse_args()
+
+    # 報告產生器使用相對於專案根目錄的路徑
+    os.chdir(PROJECT_ROOT)
+
+    print("=" * 60)
+    print(f"🏗️  增量網站建置{'（預覽）' if args.dry_run else ''}")
+    print("=" * 60)
+
+    failures = []
+    seen_phases = []
+
+    def on_task(task, error):
+        if not seen_phases or seen_phases[-1] != task.kind:
+            seen_phases.append(task.kind)
+            print(f"\n📂 {PHASE_NAMES[task.kind]}")
+        icon = '🔍' if args.dry_run else ('❌' if error else '✅')
+        print(f"  {icon} {relative_key(task.output)}  ← {task.reason}")
+        if error:
+            print(f"      {error}")
+            failures.append(task)
+
+    builder = SiteBuilder(force=args.force, dry_run=args.dry_run, adopt=args.adopt)
+    start = time.perf_counter()
+    phases = builder.build(on_task=on_task)
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    for kind, tasks in phases.items():
+        print(f"  {PHASE_NAMES[kind]:10s} {len(tasks):4d} 個")
+    if builder.unbuildable:
+        print(f"  ⚠️  {len(builder.unbuildable)} 份每日報告沒有 OptionsData 快照，需重新解析 PDF 才能重建")
+    if not any(phases.values()):
+        print("✅ 所有頁面皆為最新")
+    if builder.size_totals:
+        totals = builder.size_totals
+        line = f"  📦 docs/ {totals['files']} 個檔案: 原始 {totals['raw'] / 1024:,.0f} KB, gzip {totals['gzip'] / 1024:,.0f} KB"
+        if brotli is not None:
+            line += f", brotli {totals['brotli'] / 1024:,.0f} KB"
+        print(line)
+        if brotli is None:
+            print("  ⚠️  未安裝 brotli，略過 .br 壓縮檔（pip install brotli）")
+        print(f"     大小報告: {relative_key(SIZE_REPORT_FILE)}")
+    print(f"⏱️  耗時 {elapsed:.1f}s")
+
+    if failures:
+        print(f"❌ {len(failures)} 個頁面建置失敗")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
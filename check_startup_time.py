@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+CLI 啟動時間檢查
+
+對每個命令列腳本執行 --help，檢查：
+1. 啟動耗時（取多次中最快的一次）不超過預算
+2. 未載入 pandas / numpy / pdfplumber / bs4 / requests / jinja2 等重量級套件
+
+另外逐一單獨匯入分析模組，確認每個模組本身都延遲載入重量級套件，
+不會因為其他模組先以 lazy_import 註冊而碰巧通過
+
+使用方式:
+    python check_startup_time.py                 # 使用預設預算 0.5 秒
+    python check_startup_time.py --budget 0.3    # 自訂預算
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+# 輕量指令（--help）的腳本
+CLI_SCRIPTS = [
+    'main.py',
+    'daily_workflow.py',
+    'sync_to_docs.py',
+    'generate_settlement_report.py',
+    'generate_settlement_review.py',
+    'generate_settlement_review_wearn.py',
+    'generate_premarket_prediction.py',
+]
+
+# 腳本會間接匯入的分析模組（單獨匯入時也不得載入重量級套件）
+LIBRARY_MODULES = [
+    'src.calibration_store',
+    'src.contract_features',
+    'src.gamma_exposure',
+    'src.indicator_store',
+    'src.oi_delta',
+    'src.settlement_backtest',
+    'src.settlement_distribution',
+    'src.settlement_predictor',
+    'src.settlement_price',
+    'src.settlement_sweep',
+    'src.walk_forward',
+]
+
+# 只有實際分析、下載或渲染時才應載入的套件
+HEAVY_MODULES = {'pandas', 'numpy', 'pdfplumber', 'bs4', 'requests', 'jinja2', 'plotly'}
+
+
+def measure(command: list, repeat: int) -> tuple:
+    """
+    量測指令（腳本 --help 或單獨匯入模組）的啟動時間與載入的重量級套件
+
+    Returns:
+        tuple: (最快耗時秒數, 載入的重量級套件集合, 結束代碼)
+    """
+    timings = []
+    loaded = set()
+    returncode = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', *command],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        timings.append(time.perf_counter() - start)
+        returncode = returncode or result.returncode
+
+        # -X importtime 輸出格式: "import time: self | cumulative | module"
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                module = line.rsplit('|', 1)[1].strip()
+                if module in HEAVY_MODULES:
+                    loaded.add(module)
+
+    return min(timings), loaded, returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='CLI 啟動時間檢查',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+範例:
+  python check_startup_time.py                 使用預設預算 0.5 秒
+  python check_startup_time.py --budget 0.3    自訂預算
+  python check_startup_time.py --repeat 5      每個腳本量測 5 次
+        '''
+    )
+    parser.add_argument('--budget', '-b', type=float, default=0.5,
+                        help='每個腳本的啟動時間預算（秒，預設 0.5）')
+    parser.add_argument('--repeat', '-n', type=int, default=3,
+                        help='每個腳本量測次數（預設 3）')
+    args = parser.parse_args()
+
+    print(f"⏱️  CLI 啟動時間檢查（預算 {args.budget:.2f} 秒）")
+    print("=" * 60)
+
+    failures = 0
+    checks = [(script, [script, '--help']) for script in CLI_SCRIPTS]
+    checks += [(module, ['-c', f'import {module}']) for module in LIBRARY_MODULES]
+    for name, command in checks:
+        seconds, loaded, returncode = measure(command, args.repeat)
+        problems = []
+        if returncode != 0:
+            problems.append(f"結束代碼 {returncode}")
+        if seconds > args.budget:
+            problems.append('超出預算')
+        if loaded:
+            problems.append(f"載入 {', '.join(sorted(loaded))}")
+
+        icon = '❌' if problems else '✅'
+        detail = f"  ({'；'.join(problems)})" if problems else ''
+        print(f"{icon} {name:40s} {seconds:6.3f}s{detail}")
+        failures += bool(problems)
+
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 個腳本或模組未通過檢查")
+        sys.exit(1)
+    print("✅ 全部通過")
+
+
+if __name__ == '__main__':
+    main()
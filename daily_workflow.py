@@ -13,45 +13,26 @@ import sys
 import time
 import subprocess
 import argparse
+import hashlib
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 
+sys.path.insert(0, str(Path(__file__).parent))
 
-# 台灣股市國定假日（需每年更新）
-# 格式: 'MMDD': '假日名稱'
-TAIWAN_HOLIDAYS_2026 = {
-    '0101': '元旦',
-    '0102': '元旦補假',
-    '0126': '農曆除夕前一日',
-    '0127': '農曆除夕',
-    '0128': '春節',
-    '0129': '春節',
-    '0130': '春節',
-    '0202': '補假',
-    '0228': '和平紀念日',
-    '0403': '兒童節補假',
-    '0404': '兒童節/清明節',
-    '0405': '清明節',
-    '0406': '清明節補假',
-    '0501': '勞動節',
-    '0531': '端午節',
-    '0601': '端午節補假',
-    '1009': '國慶日補假',
-    '1010': '國慶日',
-    '1025': '重陽節',
-    '1026': '重陽節補假',
-}
-
-# 可擴展其他年份
-TAIWAN_HOLIDAYS = {
-    '2026': TAIWAN_HOLIDAYS_2026,
-}
+from src.workflow_dag import WorkflowDAG, WorkflowStep
+from src.workflow_spans import span, span_env, iter_spans, percentile
+from src.trading_calendar import get_calendar
+from src.site_build import DOCS_DIR, MANIFEST_FILE, SNAPSHOT_DIR
+from src.site_compress import SIZE_REPORT_FILE, brotli, compress_site, write_size_report
+from src.report_catalog import CATALOG_FILE
+from src.settlement_price import INTRADAY_DIR
 
 
 def is_trading_day(date_obj: datetime) -> tuple[bool, str]:
     """
-    判斷是否為台灣股市交易日
+    判斷是否為台灣股市交易日（休市日維護於 data/calendar/taiwan_holidays.json）
 
     Args:
         date_obj: datetime 物件
@@ -59,37 +40,17 @@ def is_trading_day(date_obj: datetime) -> tuple[bool, str]:
     Returns:
         tuple: (是否為交易日, 原因說明)
     """
-    # 檢查是否為週末
-    if date_obj.weekday() >= 5:  # 5=週六, 6=週日
-        weekday_name = '週六' if date_obj.weekday() == 5 else '週日'
-        return False, f'{weekday_name}休市'
-
-    # 檢查是否為國定假日
-    year = date_obj.strftime('%Y')
-    mmdd = date_obj.strftime('%m%d')
-
-    if year in TAIWAN_HOLIDAYS:
-        holidays = TAIWAN_HOLIDAYS[year]
-        if mmdd in holidays:
-            return False, f'{holidays[mmdd]}休市'
-
-    return True, '交易日'
+    return get_calendar().is_trading_day(date_obj)
 
 
 def get_next_trading_day(date_obj: datetime) -> datetime:
     """取得下一個交易日"""
-    next_day = date_obj + timedelta(days=1)
-    while not is_trading_day(next_day)[0]:
-        next_day += timedelta(days=1)
-    return next_day
+    return datetime.combine(get_calendar().next_trading_day(date_obj), datetime.min.time())
 
 
 def get_previous_trading_day(date_obj: datetime) -> datetime:
     """取得上一個交易日"""
-    prev_day = date_obj - timedelta(days=1)
-    while not is_trading_day(prev_day)[0]:
-        prev_day -= timedelta(days=1)
-    return prev_day
+    return datetime.combine(get_calendar().previous_trading_day(date_obj), datetime.min.time())
 
 
 class WorkflowLogger:
@@ -104,27 +65,43 @@ class WorkflowLogger:
             'start_time': datetime.now().isoformat(),
             'date': datetime.now().strftime('%Y%m%d'),
             'steps': [],
+            'checkpoints': {},
+            'spans': [],
             'status': 'running'
         }
+        # 並行步驟共用同一個 logger
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def bind_step(self, step_name: str = None):
+        """標記目前執行緒所屬的工作流步驟（None 表示解除）"""
+        self._local.step = step_name
 
     def log(self, message: str, level: str = 'INFO'):
         """記錄日誌"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"[{timestamp}] [{level}] {message}"
-
-        # 輸出到終端
-        print(log_entry)
+        step_name = getattr(self._local, 'step', None)
+        prefix = f"[{step_name}] " if step_name else ''
+        log_entry = f"[{timestamp}] [{level}] {prefix}{message}"
 
-        # 寫入日誌檔
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry + '\n')
-
-        # 記錄步驟
-        self.current_run['steps'].append({
+        record = {
             'time': timestamp,
             'level': level,
             'message': message
-        })
+        }
+        if step_name:
+            record['step'] = step_name
+
+        with self._lock:
+            # 輸出到終端
+            print(log_entry)
+
+            # 寫入日誌檔
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(log_entry + '\n')
+
+            # 記錄步驟
+            self.current_run['steps'].append(record)
 
     def info(self, message: str):
         self.log(message, 'INFO')
@@ -138,19 +115,49 @@ class WorkflowLogger:
     def error(self, message: str):
         self.log(message, 'ERROR')
 
+    def span(self, name: str, **attrs):
+        """
+        追蹤步驟的耗時與資源用量（情境管理器）
+
+        最外層 span 寫入本次執行記錄的 spans；步驟內再開的 span
+        與子行程回報的 span 會成為其子節點
+        """
+        return span(name, sink=self._add_span, **attrs)
+
+    def _add_span(self, record: dict):
+        with self._lock:
+            self.current_run['spans'].append(record)
+
+    def record_checkpoint(self, step_name: str, checkpoint: dict):
+        """記錄步驟檢查點（隨 save_run 寫入執行歷史）"""
+        with self._lock:
+            self.current_run['checkpoints'][step_name] = checkpoint
+
+    def load_checkpoints(self, target_date: str) -> dict:
+        """取得歷史中同一目標日期各步驟最近一次的檢查點"""
+        checkpoints = {}
+        for run in self._load_history():
+            if run.get('target_date') == target_date:
+                checkpoints.update(run.get('checkpoints', {}))
+        return checkpoints
+
+    def _load_history(self) -> list:
+        """讀取歷史記錄"""
+        if self.history_file.exists():
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                pass
+        return []
+
     def save_run(self, status: str = 'completed'):
         """保存本次執行記錄"""
         self.current_run['end_time'] = datetime.now().isoformat()
         self.current_run['status'] = status
 
         # 讀取歷史記錄
-        history = []
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except:
-                history = []
+        history = self._load_history()
 
         # 添加本次記錄
         history.append(self.current_run)
@@ -163,10 +170,93 @@ class WorkflowLogger:
             json.dump(history, f, ensure_ascii=False, indent=2)
 
 
+class StepCheckpoints:
+    """
+    步驟檢查點
+    - begin: 計算輸入雜湊；續跑模式下輸入未變且輸出仍在則沿用上次結果
+    - finish: 記錄輸入雜湊、輸出檔案與狀態，由 WorkflowLogger.save_run 寫入執行歷史
+    """
+
+    def __init__(self, logger: WorkflowLogger, project_dir: Path, resolve_files,
+                 target_date: str, resume: bool = False, always_run=()):
+        """
+        Args:
+            logger: 工作流日誌記錄器
+            project_dir: 專案目錄（輸出路徑以相對路徑記錄）
+            resolve_files: 資源名稱 -> 實際檔案列表
+            target_date: 目標日期 (YYYYMMDD)
+            resume: 是否沿用歷史檢查點
+            always_run: 一律重新執行的步驟名稱
+        """
+        self.logger = logger
+        self.project_dir = project_dir
+        self.resolve_files = resolve_files
+        self.target_date = target_date
+        self.resume = resume
+        self.always_run = set(always_run)
+        self.previous = logger.load_checkpoints(target_date) if resume else {}
+        self._inputs_hash = {}
+
+    def begin(self, step: WorkflowStep) -> bool:
+        """步驟開始前呼叫，回傳 True 表示可沿用檢查點"""
+        inputs_hash = self._hash_inputs(step)
+        self._inputs_hash[step.name] = inputs_hash
+
+        if not self.resume or step.name in self.always_run:
+            return False
+
+        previous = self.previous.get(step.name)
+        if not previous or previous.get('status') not in ('success', 'cached'):
+            return False
+        if previous.get('inputs_hash') != inputs_hash:
+            return False
+
+        # 沒有檔案輸出的步驟（例如 Git 推送）一律重新執行
+        outputs = previous.get('outputs') or []
+        return bool(outputs) and all((self.project_dir / output).exists() for output in outputs)
+
+    def finish(self, step: WorkflowStep, result):
+        """步驟結束後記錄檢查點"""
+        if result.status == 'cached':
+            outputs = self.previous[step.name].get('outputs', [])
+        else:
+            outputs = [
+                path.relative_to(self.project_dir).as_posix()
+                for resource in step.outputs
+                for path in self.resolve_files(resource)
+                if path.exists()
+            ]
+
+        self.logger.record_checkpoint(step.name, {
+            'inputs_hash': self._inputs_hash.get(step.name, ''),
+            'outputs': outputs,
+            'status': result.status,
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    def _hash_inputs(self, step: WorkflowStep) -> str:
+        """步驟設定與所有輸入檔案內容的雜湊值"""
+        digest = hashlib.sha256()
+        digest.update(f"{self.target_date}|{step.name}|{step.description}".encode('utf-8'))
+
+        for resource in sorted(step.inputs):
+            for path in self.resolve_files(resource):
+                digest.update(f"|{resource}:{path.name}:".encode('utf-8'))
+                if not path.exists():
+                    digest.update(b'missing')
+                    continue
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+
+        return digest.hexdigest()
+
+
 class DailyWorkflow:
     """每日工作流"""
 
-    def __init__(self, date: str = None, max_retries: int = 5, retry_interval: int = 1800):
+    def __init__(self, date: str = None, max_retries: int = 5, retry_interval: int = 1800,
+                 max_workers: int = 3):
         """
         初始化工作流
 
@@ -174,11 +264,14 @@ class DailyWorkflow:
             date: 目標日期 (YYYYMMDD)，預設為今天
             max_retries: 最大重試次數
             retry_interval: 重試間隔（秒），預設 1800 = 30 分鐘
+            max_workers: 互不相依步驟的最大並行數
         """
         self.date = date or datetime.now().strftime('%Y%m%d')
         self.max_retries = max_retries
         self.retry_interval = retry_interval
+        self.max_workers = max_workers
         self.logger = WorkflowLogger()
+        self.logger.current_run['target_date'] = self.date
 
         # 路徑設定
         self.project_dir = Path(__file__).parent
@@ -194,10 +287,17 @@ class DailyWorkflow:
         # 交易日判斷
         self.is_trading, self.trading_reason = is_trading_day(self.date_obj)
 
-    def run(self, skip_git: bool = False, force: bool = False):
-        """執行完整工作流"""
+    def run(self, skip_git: bool = False, force: bool = False, resume: bool = False):
+        """
+        執行完整工作流
+
+        Args:
+            skip_git: 跳過 Git 推送
+            force: 強制重新下載 PDF
+            resume: 續跑模式，略過輸入未變且輸出仍存在的步驟
+        """
         self.logger.info("=" * 60)
-        self.logger.info(f"開始執行每日工作流")
+        self.logger.info(f"開始執行每日工作流{'（續跑模式）' if resume else ''}")
         self.logger.info(f"目標日期: {self.date} (週{self.weekday_names[self.weekday]})")
         self.logger.info(f"交易日狀態: {self.trading_reason}")
         self.logger.info("=" * 60)
@@ -208,19 +308,20 @@ class DailyWorkflow:
                 self.logger.warning(f"今天 ({self.date}) 非交易日: {self.trading_reason}")
                 self.logger.info("跳過新報告生成，僅執行結算檢討")
 
-                # 執行結算檢討（如果有需要）
-                self._check_and_review_settlement()
-
-                # 同步和更新首頁（保持網站最新狀態）
-                if not self._sync_to_docs():
-                    self.logger.warning("同步到 docs 失敗，繼續執行")
-                if not self._update_index():
-                    self.logger.warning("更新首頁失敗，繼續執行")
-
-                # Git 推送
+                # 結算檢討與同步互不相依，可並行；首頁需等同步完成（保持網站最新狀態）
+                steps = [
+                    WorkflowStep('settlement_check', self._check_and_review_settlement,
+                                 description='結算檢討檢查'),
+                    WorkflowStep('sync_docs', self._sync_to_docs,
+                                 outputs=('docs_reports',), description='同步到 docs'),
+                    WorkflowStep('update_index', self._update_index,
+                                 inputs=('docs_reports',), outputs=('index',), description='更新首頁'),
+                    self._compress_step(),
+                ]
                 if not skip_git:
-                    if not self._git_push():
-                        self.logger.warning("Git 推送失敗")
+                    steps.append(self._git_step(steps, self._git_push))
+
+                self._run_dag(steps, resume=resume)
 
                 self.logger.success("=" * 60)
                 self.logger.success("非交易日工作流執行完成！")
@@ -229,36 +330,50 @@ class DailyWorkflow:
                 return True
 
             # 交易日正常處理流程
-            # 步驟 1: 確認/下載 PDF
-            if not self._ensure_pdf(force):
-                self.logger.error("無法取得 PDF，工作流終止")
-                self.logger.save_run('failed')
-                return False
-
-            # 步驟 2: 產生每日報告
-            if not self._generate_daily_report():
-                self.logger.error("產生每日報告失敗")
-                self.logger.save_run('failed')
-                return False
+            # 步驟 1: 確認/下載 PDF；步驟 2: 產生每日報告（兩者失敗即終止）
+            steps = [
+                WorkflowStep('ensure_pdf', lambda: self._ensure_pdf(force),
+                             outputs=('pdf',), description='確認 PDF 檔案', required=True),
+                # 每日報告會寫入 data/ai_learning，與結算預報/檢討互斥
+                WorkflowStep('daily_report', self._generate_daily_report,
+                             inputs=('pdf',), outputs=('daily_reports', 'ai_learning'),
+                             description='產生每日報告', required=True),
+            ]
 
             # 步驟 3: 檢查是否需要產生結算預報
-            self._check_and_generate_settlement_report()
+            settlement_step = self._build_settlement_step()
+            if settlement_step:
+                steps.append(settlement_step)
 
-            # 步驟 4: 同步到 docs
-            if not self._sync_to_docs():
-                self.logger.warning("同步到 docs 失敗，繼續執行")
+            # 步驟 4: 同步每日報告到 docs（結算報告由產生器直接寫入 docs，可與結算步驟並行）
+            steps.append(WorkflowStep('sync_docs', lambda: self._sync_to_docs('report_*.html'),
+                                      inputs=('daily_reports',), outputs=('docs_reports',),
+                                      description='同步到 docs'))
 
             # 步驟 5: 更新首頁
-            if not self._update_index():
-                self.logger.warning("更新首頁失敗，繼續執行")
+            steps.append(WorkflowStep('update_index', self._update_index,
+                                      inputs=('docs_reports', 'settlement_reports'), outputs=('index',),
+                                      description='更新首頁'))
+            steps.append(self._compress_step())
 
             # 步驟 6: Git 推送
             if not skip_git:
-                if not self._git_push():
-                    self.logger.warning("Git 推送失敗")
+                steps.append(self._git_step(steps, self._git_push))
             else:
                 self.logger.info("跳過 Git 推送")
 
+            results = self._run_dag(steps, resume=resume, always_run=('ensure_pdf',) if force else ())
+
+            if not results['ensure_pdf'].ok:
+                self.logger.error("無法取得 PDF，工作流終止")
+                self.logger.save_run('failed')
+                return False
+
+            if not results['daily_report'].ok:
+                self.logger.error("產生每日報告失敗")
+                self.logger.save_run('failed')
+                return False
+
             self.logger.success("=" * 60)
             self.logger.success("每日工作流執行完成！")
             self.logger.success("=" * 60)
@@ -270,6 +385,101 @@ class DailyWorkflow:
             self.logger.save_run('failed')
             return False
 
+    def _run_dag(self, steps: list, resume: bool = False, always_run=()) -> dict:
+        """以依賴圖執行步驟，記錄各步驟檢查點，並將關鍵路徑摘要寫入本次執行記錄"""
+        dag = WorkflowDAG(steps)
+        checkpoints = StepCheckpoints(
+            self.logger, self.project_dir, self._resource_files,
+            target_date=self.date, resume=resume, always_run=always_run
+        )
+        start = time.perf_counter()
+        results = dag.run(self.logger, max_workers=self.max_workers, checkpoints=checkpoints)
+        summary = dag.summary(results, self.max_workers, time.perf_counter() - start)
+        self.logger.current_run['dag'] = summary
+
+        self.logger.info(
+            f"關鍵路徑: {' → '.join(summary['critical_path'])} "
+            f"({summary['critical_path_seconds']:.1f}s / 總耗時 {summary['wall_seconds']:.1f}s)"
+        )
+        return results
+
+    def _resource_files(self, resource: str) -> list:
+        """工作流資源對應的實際檔案（供檢查點計算輸入雜湊與確認輸出）"""
+        reports_dir = self.project_dir / 'reports'
+        docs_dir = self.project_dir / 'docs'
+
+        if resource == 'pdf':
+            return [self.pdf_path]
+        if resource == 'daily_reports':
+            return sorted(reports_dir.glob(f'report_{self.date}_*.html'))
+        if resource == 'docs_reports':
+            return sorted(docs_dir.glob(f'report_{self.date}_*.html'))
+        if resource == 'settlement_reports':
+            # 週二/四預報下一個交易日結算，週三/五為當天結算
+            if self.weekday in (1, 3):
+                settlement_date = get_next_trading_day(self.date_obj).strftime('%Y%m%d')
+            else:
+                settlement_date = self.date
+            return sorted(reports_dir.glob(f'settlement_{settlement_date}_*.html'))
+        if resource == 'index':
+            return [docs_dir / 'index.html']
+
+        # ai_learning 等共用狀態不列入檢查點
+        return []
+
+    def _compress_step(self) -> WorkflowStep:
+        """docs/ 預先壓縮檔，等首頁（docs/ 最後一個寫入者）完成後執行"""
+        return WorkflowStep('compress_docs', self._compress_docs, inputs=('index',),
+                            outputs=('docs_compressed',), description='更新預先壓縮檔')
+
+    def _git_step(self, steps: list, push_func) -> WorkflowStep:
+        """Git 推送步驟，等待所有產出完成"""
+        produced = sorted({output for step in steps for output in step.outputs})
+        return WorkflowStep('git_push', push_func, inputs=tuple(produced), description='Git 推送')
+
+    def _build_settlement_step(self):
+        """依星期決定結算預報/檢討步驟（步驟標題在步驟實際執行時才輸出）"""
+        current_weekday_name = self.weekday_names[self.weekday]
+
+        def announced(message, action):
+            def run():
+                self.logger.info("-" * 40)
+                self.logger.info("步驟 3: 結算預報/檢討")
+                self.logger.info(f"今天是週{current_weekday_name} (weekday={self.weekday})")
+                self.logger.info(message)
+                return action()
+            return run
+
+        # 週二 (1) -> 產生週三結算預報（需要今日報告）
+        # 週三 (2) -> 執行週三結算檢討（只需要今日 PDF 與前兩日報告）
+        # 週四 (3) -> 產生週五結算預報
+        # 週五 (4) -> 執行週五結算檢討
+
+        if self.weekday in (1, 3):
+            weekday = 'wednesday' if self.weekday == 1 else 'friday'
+            label = '週三' if weekday == 'wednesday' else '週五'
+            return WorkflowStep(
+                'settlement_report',
+                announced(f"週{current_weekday_name}：產生{label}結算預報",
+                          lambda: self._generate_settlement_report(weekday)),
+                inputs=('daily_reports',), outputs=('settlement_reports', 'ai_learning'),
+                description=f'產生{label}結算預報'
+            )
+
+        if self.weekday in (2, 4):
+            weekday = 'wednesday' if self.weekday == 2 else 'friday'
+            label = '週三' if weekday == 'wednesday' else '週五'
+            return WorkflowStep(
+                'settlement_review',
+                announced(f"週{current_weekday_name}：執行{label}結算檢討",
+                          lambda: self._run_settlement_review(weekday)),
+                inputs=('pdf',), outputs=('settlement_reports', 'ai_learning'),
+                description=f'執行{label}結算檢討'
+            )
+
+        self.logger.info(f"週{current_weekday_name}不需要產生結算預報或檢討")
+        return None
+
     def _ensure_pdf(self, force: bool = False) -> bool:
         """確保 PDF 存在，不存在則下載"""
         self.logger.info("-" * 40)
@@ -284,7 +494,12 @@ class DailyWorkflow:
         for attempt in range(1, self.max_retries + 1):
             self.logger.info(f"嘗試下載 PDF (第 {attempt}/{self.max_retries} 次)...")
 
-            if self._download_pdf():
+            with span('download_attempt', attempt=attempt) as attempt_span:
+                downloaded = self._download_pdf()
+                if downloaded:
+                    attempt_span.set(bytes=self.pdf_path.stat().st_size)
+
+            if downloaded:
                 self.logger.success(f"PDF 下載成功: {self.pdf_filename}")
                 return True
 
@@ -305,7 +520,8 @@ class DailyWorkflow:
                 ['python3', 'main.py', '--date', self.date, '--download-only'],
                 capture_output=True,
                 text=True,
-                cwd=self.project_dir
+                cwd=self.project_dir,
+                env=span_env()
             )
 
             # 檢查 PDF 是否存在
@@ -318,6 +534,7 @@ class DailyWorkflow:
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir,
+                env=span_env(),
                 timeout=120
             )
 
@@ -341,6 +558,7 @@ class DailyWorkflow:
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir,
+                env=span_env(),
                 timeout=180
             )
 
@@ -358,34 +576,6 @@ class DailyWorkflow:
             self.logger.error(f"產生報告失敗: {str(e)}")
             return False
 
-    def _check_and_generate_settlement_report(self):
-        """檢查並產生結算預報或執行結算檢討"""
-        self.logger.info("-" * 40)
-        self.logger.info("步驟 3: 檢查結算預報/檢討需求")
-
-        current_weekday_name = self.weekday_names[self.weekday]
-        self.logger.info(f"今天是週{current_weekday_name} (weekday={self.weekday})")
-
-        # 週二 (1) -> 產生週三結算預報
-        # 週三 (2) -> 執行週三結算檢討
-        # 週四 (3) -> 產生週五結算預報
-        # 週五 (4) -> 執行週五結算檢討
-
-        if self.weekday == 1:  # 週二
-            self.logger.info(f"週{current_weekday_name}：產生週三結算預報")
-            self._generate_settlement_report('wednesday')
-        elif self.weekday == 2:  # 週三
-            self.logger.info(f"週{current_weekday_name}：執行週三結算檢討")
-            self._run_settlement_review('wednesday')
-        elif self.weekday == 3:  # 週四
-            self.logger.info(f"週{current_weekday_name}：產生週五結算預報")
-            self._generate_settlement_report('friday')
-        elif self.weekday == 4:  # 週五
-            self.logger.info(f"週{current_weekday_name}：執行週五結算檢討")
-            self._run_settlement_review('friday')
-        else:
-            self.logger.info(f"週{current_weekday_name}不需要產生結算預報或檢討")
-
     def _check_and_review_settlement(self):
         """非交易日執行結算檢討"""
         self.logger.info("-" * 40)
@@ -398,20 +588,15 @@ class DailyWorkflow:
         # 這裡可以加入結算檢討的邏輯
         # 例如：檢查上一個結算日的預報準確度
         self.logger.info("結算檢討功能（待實作）")
+        return True
 
-    def _generate_settlement_report(self, weekday: str):
+    def _generate_settlement_report(self, weekday: str) -> bool:
         """產生結算預報"""
         try:
-            # 計算結算日
-            if weekday == 'wednesday':
-                days_ahead = 1  # 週二到週三
-                settlement_date = self.date_obj + timedelta(days=days_ahead)
-                # 分析日期：前兩個交易日
-                analysis_dates = self._get_previous_trading_days(2)
-            else:  # friday
-                days_ahead = 1  # 週四到週五
-                settlement_date = self.date_obj + timedelta(days=days_ahead)
-                analysis_dates = self._get_previous_trading_days(2)
+            # 計算結算日：週二 -> 週三、週四 -> 週五（遇休市順延至下一個交易日）
+            settlement_date = get_next_trading_day(self.date_obj)
+            # 分析日期：前兩個交易日
+            analysis_dates = self._get_previous_trading_days(2)
 
             settlement_str = settlement_date.strftime('%Y/%m/%d')
             dates_str = ','.join(analysis_dates)
@@ -429,18 +614,22 @@ class DailyWorkflow:
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir,
+                env=span_env(),
                 timeout=180
             )
 
             if result.returncode == 0:
                 self.logger.success(f"{weekday} 結算預報產生成功")
+                return True
             else:
                 self.logger.warning(f"結算預報產生可能有問題: {result.stderr}")
+                return False
 
         except Exception as e:
             self.logger.warning(f"產生結算預報失敗: {str(e)}")
+            return False
 
-    def _run_settlement_review(self, weekday: str):
+    def _run_settlement_review(self, weekday: str) -> bool:
         """執行結算日檢討並更新報告"""
         try:
             # 結算日就是今天
@@ -462,6 +651,7 @@ class DailyWorkflow:
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir,
+                env=span_env(),
                 timeout=180
             )
 
@@ -483,6 +673,7 @@ class DailyWorkflow:
                         capture_output=True,
                         text=True,
                         cwd=self.project_dir,
+                        env=span_env(),
                         timeout=180
                     )
                     if result.returncode == 0:
@@ -490,12 +681,13 @@ class DailyWorkflow:
 
             # 步驟 2: 重新生成結算報告（讓檢討內容更新到 HTML）
             self.logger.info("更新結算報告...")
-            self._regenerate_settlement_report_with_prediction(weekday)
+            return self._regenerate_settlement_report_with_prediction(weekday)
 
         except Exception as e:
             self.logger.warning(f"執行結算檢討失敗: {str(e)}")
+            return False
 
-    def _regenerate_settlement_report_with_prediction(self, weekday: str):
+    def _regenerate_settlement_report_with_prediction(self, weekday: str) -> bool:
         """重新生成結算報告（包含 AI 預測記錄）"""
         try:
             settlement_str = self.date_obj.strftime('%Y/%m/%d')
@@ -515,19 +707,26 @@ class DailyWorkflow:
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir,
+                env=span_env(),
                 timeout=180
             )
 
             if result.returncode == 0:
                 self.logger.success(f"結算報告更新成功")
+                return True
             else:
                 self.logger.warning(f"結算報告更新可能有問題: {result.stderr}")
+                return False
 
         except Exception as e:
             self.logger.warning(f"重新生成結算報告失敗: {str(e)}")
+            return False
 
-    def _generate_premarket_prediction(self, weekday: str):
+    def _generate_premarket_prediction(self, weekday: str) -> bool:
         """結算日早上生成盤前預測"""
+        self.logger.info("-" * 40)
+        self.logger.info("步驟 1: 生成盤前預測")
+
         try:
             settlement_date = self.date
 
@@ -543,6 +742,7 @@ class DailyWorkflow:
                 capture_output=True,
                 text=True,
                 cwd=self.project_dir,
+                env=span_env(),
                 timeout=180
             )
 
@@ -553,13 +753,16 @@ class DailyWorkflow:
                     for line in result.stdout.split('\n')[-10:]:
                         if line.strip():
                             self.logger.info(f"  {line}")
+                return True
             else:
                 self.logger.warning(f"盤前預測生成可能有問題: {result.stderr}")
+                return False
 
         except Exception as e:
             self.logger.warning(f"生成盤前預測失敗: {str(e)}")
+            return False
 
-    def run_premarket(self, skip_git: bool = False):
+    def run_premarket(self, skip_git: bool = False, resume: bool = False):
         """執行盤前預測工作流（結算日早上 08:00）"""
         self.logger.info("=" * 60)
         self.logger.info(f"開始執行盤前預測工作流")
@@ -585,26 +788,28 @@ class DailyWorkflow:
                 self.logger.save_run('skipped')
                 return True
 
-            # 步驟 1: 生成盤前預測
-            self.logger.info("-" * 40)
-            self.logger.info("步驟 1: 生成盤前預測")
-            self._generate_premarket_prediction(weekday)
-
-            # 步驟 2: 同步到 docs
-            if not self._sync_to_docs():
-                self.logger.warning("同步到 docs 失敗，繼續執行")
-
+            # 步驟 1: 生成盤前預測（結算報告由產生器直接寫入 docs）
+            # 步驟 2: 同步每日報告到 docs，與盤前預測互不相依
             # 步驟 3: 更新首頁
-            if not self._update_index():
-                self.logger.warning("更新首頁失敗，繼續執行")
+            steps = [
+                WorkflowStep('premarket_prediction', lambda: self._generate_premarket_prediction(weekday),
+                             outputs=('settlement_reports', 'ai_learning'), description='生成盤前預測'),
+                WorkflowStep('sync_docs', lambda: self._sync_to_docs('report_*.html'),
+                             outputs=('docs_reports',), description='同步到 docs'),
+                WorkflowStep('update_index', self._update_index,
+                             inputs=('docs_reports', 'settlement_reports'), outputs=('index',),
+                             description='更新首頁'),
+                self._compress_step(),
+            ]
 
             # 步驟 4: Git 推送
             if not skip_git:
-                if not self._git_push_premarket():
-                    self.logger.warning("Git 推送失敗")
+                steps.append(self._git_step(steps, self._git_push_premarket))
             else:
                 self.logger.info("跳過 Git 推送")
 
+            self._run_dag(steps, resume=resume)
+
             self.logger.success("=" * 60)
             self.logger.success("盤前預測工作流執行完成！")
             self.logger.success("=" * 60)
@@ -616,6 +821,20 @@ class DailyWorkflow:
             self.logger.save_run('failed')
             return False
 
+    def _build_state_paths(self) -> list:
+        """
+        需要保存的狀態檔（建置清單、OptionsData 快照、頁面大小報告、報告目錄、
+        結算價重建用的 5 秒加權指數），存在時才加入 git
+
+        CI 以 --skip-git 執行，.github/workflows/daily-report.yml 的提交步驟需列出相同路徑
+        """
+        return [
+            str(path.resolve().relative_to(self.project_dir.resolve()))
+            for path in (MANIFEST_FILE, SNAPSHOT_DIR, SIZE_REPORT_FILE, CATALOG_FILE,
+                         self.project_dir / INTRADAY_DIR)
+            if path.exists()
+        ]
+
     def _git_push_premarket(self) -> bool:
         """Git 推送（盤前預測專用）"""
         self.logger.info("-" * 40)
@@ -624,8 +843,9 @@ class DailyWorkflow:
         try:
             # Git add
             subprocess.run(
-                ['git', 'add', 'docs/', 'data/ai_learning/'],
+                ['git', 'add', 'docs/', 'data/ai_learning/', *self._build_state_paths()],
                 cwd=self.project_dir,
+                env=span_env(),
                 capture_output=True
             )
 
@@ -634,6 +854,7 @@ class DailyWorkflow:
             result = subprocess.run(
                 ['git', 'commit', '-m', commit_msg],
                 cwd=self.project_dir,
+                env=span_env(),
                 capture_output=True,
                 text=True
             )
@@ -646,6 +867,7 @@ class DailyWorkflow:
             result = subprocess.run(
                 ['git', 'push'],
                 cwd=self.project_dir,
+                env=span_env(),
                 capture_output=True,
                 text=True
             )
@@ -662,43 +884,35 @@ class DailyWorkflow:
             return False
 
     def _get_previous_trading_days_before_today(self, count: int) -> list:
-        """取得今天之前的 N 個交易日"""
-        trading_days = []
-        current = self.date_obj - timedelta(days=1)  # 從昨天開始
-
-        while len(trading_days) < count:
-            if is_trading_day(current)[0]:
-                trading_days.append(current.strftime('%Y%m%d'))
-            current -= timedelta(days=1)
-
-        # 反轉順序（從舊到新）
-        return list(reversed(trading_days))
+        """取得今天之前的 N 個交易日（從舊到新）"""
+        return [
+            day.strftime('%Y%m%d')
+            for day in get_calendar().previous_trading_days(self.date_obj, count)
+        ]
 
     def _get_previous_trading_days(self, count: int) -> list:
-        """取得前 N 個交易日（包含今天，如果今天是交易日）"""
-        trading_days = []
-        current = self.date_obj
-
-        while len(trading_days) < count:
-            # 使用 is_trading_day 函數判斷（包含國定假日）
-            if is_trading_day(current)[0]:
-                trading_days.append(current.strftime('%Y%m%d'))
-            current -= timedelta(days=1)
-
-        # 反轉順序（從舊到新）
-        return list(reversed(trading_days))
-
-    def _sync_to_docs(self) -> bool:
-        """同步到 docs 目錄"""
+        """取得前 N 個交易日（包含今天，如果今天是交易日；從舊到新）"""
+        return [
+            day.strftime('%Y%m%d')
+            for day in get_calendar().previous_trading_days(self.date_obj, count, include=True)
+        ]
+
+    def _sync_to_docs(self, pattern: str = None) -> bool:
+        """同步到 docs 目錄（pattern 限定同步的檔名）"""
         self.logger.info("-" * 40)
         self.logger.info("步驟 4: 同步到 docs")
 
+        command = ['python3', 'sync_to_docs.py']
+        if pattern:
+            command += ['--pattern', pattern]
+
         try:
             result = subprocess.run(
-                ['python3', 'sync_to_docs.py'],
+                command,
                 capture_output=True,
                 text=True,
-                cwd=self.project_dir
+                cwd=self.project_dir,
+                env=span_env()
             )
 
             if result.returncode == 0:
@@ -722,7 +936,8 @@ class DailyWorkflow:
                 ['python3', 'generate_index_with_weekday.py'],
                 capture_output=True,
                 text=True,
-                cwd=self.project_dir
+                cwd=self.project_dir,
+                env=span_env()
             )
 
             if result.returncode == 0:
@@ -736,6 +951,26 @@ class DailyWorkflow:
             self.logger.error(f"首頁更新失敗: {str(e)}")
             return False
 
+    def _compress_docs(self) -> bool:
+        """更新 docs/ 的 .gz/.br 並寫入頁面大小報告"""
+        self.logger.info("-" * 40)
+        self.logger.info("更新預先壓縮檔")
+
+        try:
+            compressed = compress_site(DOCS_DIR)
+            totals = write_size_report(DOCS_DIR)
+            self.logger.success(
+                f"壓縮 {len(compressed)} 個檔案，docs/ 共 {totals['raw'] / 1024:,.0f} KB"
+                f"（gzip {totals['gzip'] / 1024:,.0f} KB）"
+            )
+            if brotli is None:
+                self.logger.warning("未安裝 brotli，略過 .br 壓縮檔（pip install brotli）")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"壓縮失敗: {str(e)}")
+            return False
+
     def _git_push(self) -> bool:
         """Git 推送"""
         self.logger.info("-" * 40)
@@ -744,8 +979,9 @@ class DailyWorkflow:
         try:
             # Git add
             subprocess.run(
-                ['git', 'add', 'docs/', 'reports/', 'logs/'],
+                ['git', 'add', 'docs/', 'reports/', 'logs/', *self._build_state_paths()],
                 cwd=self.project_dir,
+                env=span_env(),
                 capture_output=True
             )
 
@@ -754,6 +990,7 @@ class DailyWorkflow:
             result = subprocess.run(
                 ['git', 'commit', '-m', commit_msg],
                 cwd=self.project_dir,
+                env=span_env(),
                 capture_output=True,
                 text=True
             )
@@ -766,6 +1003,7 @@ class DailyWorkflow:
             result = subprocess.run(
                 ['git', 'push'],
                 cwd=self.project_dir,
+                env=span_env(),
                 capture_output=True,
                 text=True
             )
@@ -824,6 +1062,38 @@ def view_history(count: int = 10):
 
         print(f"{status_icon} [{start_time}] 日期: {date} | 步驟數: {step_count} | 狀態: {run['status']}")
 
+    print_span_statistics(history)
+
+
+def print_span_statistics(history: list):
+    """各步驟（含子步驟）跨執行的耗時與資源 p50/p95"""
+    samples = {}
+    for run in history:
+        for path, record in iter_spans(run.get('spans', [])):
+            samples.setdefault(path, []).append(record)
+
+    if not samples:
+        return
+
+    print()
+    print("=" * 60)
+    print(f"步驟耗時統計（共 {len(history)} 次執行）")
+    print("=" * 60)
+    print(f"{'步驟':<36} {'次數':>4} {'牆鐘 p50/p95 (s)':>18} {'CPU p50/p95 (s)':>17} "
+          f"{'RSS+ p95 (MB)':>13} {'I/O p50 (MB)':>12}")
+
+    for path, records in samples.items():
+        wall = [r.get('wall_seconds', 0) for r in records]
+        cpu = [r.get('cpu_seconds', 0) for r in records]
+        rss = [r.get('rss_delta_kb', 0) / 1024 for r in records]
+        io_bytes = [(r.get('io_read_bytes', 0) + r.get('io_write_bytes', 0)) / 1024 / 1024 for r in records]
+        depth = path.count('/')
+        label = '  ' * depth + path.rsplit('/', 1)[-1]
+        print(f"{label:<36} {len(records):>4} "
+              f"{percentile(wall, 0.5):>8.2f}/{percentile(wall, 0.95):<8.2f} "
+              f"{percentile(cpu, 0.5):>8.2f}/{percentile(cpu, 0.95):<8.2f} "
+              f"{percentile(rss, 0.95):>13.1f} {percentile(io_bytes, 0.5):>12.2f}")
+
 
 def view_history_detail(index: int = -1):
     """查看特定執行的詳細記錄"""
@@ -861,7 +1131,24 @@ def view_history_detail(index: int = -1):
     for step in run.get('steps', []):
         level = step.get('level', 'INFO')
         level_icon = {'INFO': 'ℹ️', 'SUCCESS': '✅', 'WARNING': '⚠️', 'ERROR': '❌'}.get(level, '•')
-        print(f"  {level_icon} [{step.get('time', '')}] {step.get('message', '')}")
+        step_name = f"[{step['step']}] " if step.get('step') else ''
+        print(f"  {level_icon} [{step.get('time', '')}] {step_name}{step.get('message', '')}")
+
+    dag = run.get('dag')
+    if dag:
+        critical = set(dag.get('critical_path', []))
+        print("-" * 60)
+        print("關鍵路徑摘要:")
+        print(f"  並行數: {dag.get('max_workers')} | 總耗時: {dag.get('wall_seconds', 0):.1f}s"
+              f" | 步驟耗時加總: {dag.get('serial_seconds', 0):.1f}s")
+        print(f"  關鍵路徑 ({dag.get('critical_path_seconds', 0):.1f}s): {' → '.join(dag.get('critical_path', []))}")
+        for step in dag.get('steps', []):
+            status_icon = {'success': '✅', 'cached': '♻️', 'failed': '❌', 'skipped': '⏭️'}.get(step.get('status'), '•')
+            marker = '★' if step['name'] in critical else ' '
+            depends_on = ', '.join(step.get('depends_on', [])) or '-'
+            print(f"  {status_icon} {marker} {step['name']:<22} "
+                  f"{step.get('start', 0):>7.1f}s → {step.get('end', 0):>7.1f}s "
+                  f"({step.get('duration', 0):.1f}s) 依賴: {depends_on}")
 
 
 def main():
@@ -874,6 +1161,8 @@ def main():
   python3 daily_workflow.py --date 20260115    # 執行指定日期
   python3 daily_workflow.py --skip-git         # 跳過 Git 推送
   python3 daily_workflow.py --premarket        # 執行盤前預測（結算日早上）
+  python3 daily_workflow.py --workers 1        # 依序執行所有步驟
+  python3 daily_workflow.py --resume           # 修正失敗後續跑，沿用已完成的步驟
   python3 daily_workflow.py --logs             # 查看日誌
   python3 daily_workflow.py --history          # 查看執行歷史
   python3 daily_workflow.py --detail           # 查看最近一次執行詳情
@@ -887,6 +1176,8 @@ def main():
     parser.add_argument('--max-retries', type=int, default=5, help='最大重試次數 (預設: 5)')
     parser.add_argument('--retry-interval', type=int, default=1800, help='重試間隔秒數 (預設: 1800)')
     parser.add_argument('--premarket', '-p', action='store_true', help='執行盤前預測（結算日早上 08:00）')
+    parser.add_argument('--workers', type=int, default=3, help='互不相依步驟的最大並行數 (預設: 3)')
+    parser.add_argument('--resume', '-r', action='store_true', help='續跑模式：略過輸入未變且輸出仍存在的步驟')
 
     # 日誌相關
     parser.add_argument('--logs', '-l', action='store_true', help='查看最近日誌')
@@ -916,16 +1207,18 @@ def main():
     workflow = DailyWorkflow(
         date=args.date,
         max_retries=args.max_retries,
-        retry_interval=args.retry_interval
+        retry_interval=args.retry_interval,
+        max_workers=args.workers
     )
 
     # 盤前預測模式
     if args.premarket:
-        success = workflow.run_premarket(skip_git=args.skip_git)
+        success = workflow.run_premarket(skip_git=args.skip_git, resume=args.resume)
     else:
         success = workflow.run(
             skip_git=args.skip_git,
-            force=args.force
+            force=args.force,
+            resume=args.resume
         )
 
     sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+預測器前推評估
+
+逐日重播歷史（決策點只能看到當時已存在的資料），在行程池中執行 AIPredictionGenerator、
+AISettlementPrediction、SettlementPredictor 與 AIPremarketPrediction，以共用指標輸出比較表
+（src/walk_forward.py）
+
+使用方式:
+    python evaluate_predictors.py                                   # 評估全部預測器
+    python evaluate_predictors.py -p SettlementPredictor -v         # 只評估一個預測器並列出每筆預測
+    python evaluate_predictors.py --start 20260301 --json out.json  # 指定目標日範圍並輸出 JSON
+"""
+
+import argparse
+import json
+import sys
+import time
+import unicodedata
+from dataclasses import asdict
+from pathlib import Path
+
+# 加入專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.settlement_backtest import METRICS_CACHE_FILE
+from src.walk_forward import PREDICTORS, TARGET_LABELS, load_history, run_evaluation
+
+
+def _cell(text, width: int) -> str:
+    """靠右對齊到指定顯示寬度（全形字佔 2 格）"""
+    text = str(text)
+    return ' ' * (width - sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text)) + text
+
+
+COLUMNS = (('筆數', 6), ('方向命中', 10), ('區間覆蓋', 10), ('平均寬度', 10), ('MAE', 8),
+           ('偏差', 8), ('P75', 8), ('MAE/隨機漫步', 14))
+
+
+def print_table(summary: dict, skipped: dict):
+    print("=" * 98)
+    print("📊 預測器前推評估（共用指標）")
+    print("=" * 98)
+    print(f"{'預測器':<22}{_cell('目標', 10)}" + ''.join(_cell(label, width) for label, width in COLUMNS))
+    for name, stats in summary.items():
+        target = _cell(TARGET_LABELS[PREDICTORS[name].target], 10)
+        if not stats['count']:
+            print(f"{name:<25}{target}{_cell(0, 6)}  （無可評估的預測）")
+            continue
+        values = (
+            stats['count'],
+            f"{stats['direction_hit_rate']:.1f}%",
+            f"{stats['interval_coverage']:.1f}%",
+            f"{stats['avg_width']:.0f}",
+            f"{stats['mae']:.0f}",
+            f"{stats['bias']:+.0f}",
+            f"{stats['p75']:.0f}",
+            f"{stats['mae_vs_naive']:.2f}" if stats['mae_vs_naive'] is not None else '-',
+        )
+        print(f"{name:<25}{target}" + ''.join(_cell(value, width) for value, (_, width) in zip(values, COLUMNS)))
+
+    skipped = {name: count for name, count in skipped.items() if count}
+    if skipped:
+        print("\n⚠️  數據不足而未預測的決策點：" + "，".join(f"{name} {count} 筆" for name, count in skipped.items()))
+    print("\n方向命中：相對決策時收盤價的漲跌（±0.5% 內視為盤整）；MAE/隨機漫步 < 1 表示勝過「維持收盤價」")
+
+
+def print_forecasts(forecasts: list):
+    print(f"\n{'預測器':<22}{'決策日':>9}{'目標日':>10}{'收盤':>8}{'中心':>8}{'區間':>15}{'實際':>8}{'方向':>4}")
+    for f in forecasts:
+        hit = '✓' if f.lower <= f.actual <= f.upper else '✗'
+        direction = {1: '多', 0: '盤', -1: '空'}[f.direction]
+        print(f"{f.predictor:<25}{f.as_of:>10}{f.target_date:>10}{f.base_price:>9.0f}{f.center:>9.0f}"
+              f"{f.lower:>9.0f}~{f.upper:<6.0f}{f.actual:>8.0f} {hit} {direction}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='預測器前推評估',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  # 評估全部預測器
+  python evaluate_predictors.py
+
+  # 只比較兩個結算預測器，並列出每筆預測
+  python evaluate_predictors.py -p SettlementPredictor AISettlementPrediction -v
+
+  # 指定目標日範圍，結果輸出成 JSON
+  python evaluate_predictors.py --start 20260301 --end 20260430 --json evaluation.json
+        """
+    )
+    parser.add_argument('-p', '--predictors', nargs='+', choices=list(PREDICTORS), help='要評估的預測器（預設全部）')
+    parser.add_argument('--start', help='目標日起 (YYYYMMDD)')
+    parser.add_argument('--end', help='目標日迄 (YYYYMMDD)')
+    parser.add_argument('--workers', type=int, help='平行處理的行程數（預設依 CPU 核心數）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='列出每筆預測')
+    parser.add_argument('--json', type=Path, help='把逐筆預測與指標輸出成 JSON')
+    parser.add_argument('--no-cache', action='store_true', help='不使用報告指標快取，重新解析所有報告')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    history = load_history(cache_file=None if args.no_cache else METRICS_CACHE_FILE)
+    if not history.reports:
+        print("❌ 沒有可重播的報告")
+        sys.exit(1)
+    loaded = time.perf_counter()
+
+    result = run_evaluation(history, args.predictors, args.workers, args.start, args.end)
+    elapsed = time.perf_counter() - loaded
+
+    print_table(result.summary, result.skipped)
+    if args.verbose:
+        print_forecasts(result.forecasts)
+    print(f"\n⏱️  載入 {len(history.reports)} 日報告與 {len(history.reviews)} 份結算檢討 "
+          f"{(loaded - start) * 1000:.0f}ms，重播 {len(result.forecasts)} 筆預測 {elapsed:.2f}s")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            'summary': result.summary,
+            'skipped': result.skipped,
+            'forecasts': [asdict(f) for f in result.forecasts],
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"✅ 評估結果已寫入：{args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,96 +2,240 @@
 """
 批量生成報告腳本
 處理指定日期的 PDF 並生成對應的 HTML 報告
+
+- 日期分散到多個行程平行處理，每個工作行程重複使用同一個 ReportGenerator
+- 工作行程只讀取 AI 學習資料的唯讀快照，新增的分析記錄回傳主行程後一次合併，
+  避免多個行程同時寫入 analysis_records.json
+
+使用方式:
+    python generate_batch_reports.py                       # 處理預設日期
+    python generate_batch_reports.py 20260105 20260106     # 處理指定日期
+    python generate_batch_reports.py --all --workers 8     # 重新產生 data/pdf 內所有日期
 """
 
-from pathlib import Path
-from src.parser import PDFParser
-from src.analyzer import OptionsAnalyzer
-from src.reporter import ReportGenerator
+import argparse
+import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+PDF_DIR = Path('data/pdf')
+DEFAULT_DATES = ['20260105', '20260106', '20260107', '20260108']
+
+# 工作行程內共用的報告產生器（由 _init_worker 建立）
+_worker_reporter = None
+
+
+def find_pdf_dates(pdf_dir: Path = PDF_DIR) -> list:
+    """列出 PDF 目錄中所有日期（YYYYMMDD，由舊到新）"""
+    dates = set()
+    for pdf_file in pdf_dir.glob('*.pdf'):
+        match = re.search(r'(20\d{6})', pdf_file.name)
+        if match:
+            dates.add(match.group(1))
+    return sorted(dates)
+
+
+def _init_worker(learning_snapshot):
+    """工作行程初始化：建立一次報告產生器，並掛上唯讀的學習資料快照"""
+    global _worker_reporter
+    from src.reporter import ReportGenerator
+    _worker_reporter = ReportGenerator(learning_system=learning_snapshot)
+
 
-def generate_report_for_date(date: str):
+def generate_report_for_date(date: str, reporter=None) -> dict:
     """
     為指定日期生成報告
-    
+
     Args:
         date: 日期字串，格式 YYYYMMDD
+        reporter: 重複使用的 ReportGenerator（未提供則使用工作行程共用的產生器）
+
+    Returns:
+        dict: 處理結果（date, success, seconds, reports, summaries, records, error）
     """
-    print(f"\n{'='*50}")
-    print(f"處理日期: {date}")
-    print('='*50)
-    
-    # 尋找 PDF 檔案
-    pdf_dir = Path('data/pdf')
-    pdf_files = list(pdf_dir.glob(f'*{date}*.pdf'))
-    
-    if not pdf_files:
-        print(f"❌ 找不到 {date} 的 PDF 檔案")
-        return False
-    
-    pdf_path = pdf_files[0]
-    print(f"📄 PDF: {pdf_path.name}")
-    
-    # 解析 PDF
-    print("正在解析 PDF...")
-    parser = PDFParser()
-    options_list = parser.parse(str(pdf_path))
-    
-    if not options_list:
-        print(f"❌ 無法解析 PDF")
-        return False
-    
-    print(f"✅ 找到 {len(options_list)} 組資料")
-    
-    # 分析資料
-    for options_data in options_list:
-        print(f"\n--- {options_data.contract_month} 月份 ---")
-        
+    from src.parser import PDFParser
+    from src.analyzer import OptionsAnalyzer
+
+    reporter = reporter or _worker_reporter
+    start = time.perf_counter()
+    result = {
+        'date': date,
+        'success': False,
+        'seconds': 0.0,
+        'reports': [],
+        'summaries': [],
+        'records': [],
+        'error': '',
+    }
+
+    try:
+        # 尋找 PDF 檔案
+        pdf_files = list(PDF_DIR.glob(f'*{date}*.pdf'))
+        if not pdf_files:
+            result['error'] = f"找不到 {date} 的 PDF 檔案"
+            return result
+
+        # 解析 PDF
+        options_list = PDFParser().parse(str(pdf_files[0]))
+        if not options_list:
+            result['error'] = f"無法解析 PDF: {pdf_files[0].name}"
+            return result
+
+        # 分析資料並生成報告
         analyzer = OptionsAnalyzer()
-        analysis = analyzer.analyze(options_data)
-        
-        print(f"  Max Pain: {analysis.max_pain:,}")
-        print(f"  P/C Ratio (OI): {analysis.pc_ratio_oi:.4f}")
-        print(f"  買權 OI 壓力: {analysis.max_call_oi_strike:,} ({analysis.max_call_oi:,} 口)")
-        print(f"  賣權 OI 支撐: {analysis.max_put_oi_strike:,} ({analysis.max_put_oi:,} 口)")
-        
-        # 生成報告
-        reporter = ReportGenerator()
-        output_path = reporter.generate(analysis, options_data)
-        
-        print(f"📊 報告已產生: {output_path}")
-    
-    return True
+        for options_data in options_list:
+            analysis = analyzer.analyze(options_data)
+            result['summaries'].append(
+                f"{options_data.contract_month} 月份 | Max Pain: {analysis.max_pain:,} | "
+                f"P/C Ratio (OI): {analysis.pc_ratio_oi:.4f}"
+            )
+            result['reports'].append(str(reporter.generate(analysis, options_data)))
+
+        result['success'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        # 唯讀快照暫存的分析記錄交回主行程合併
+        learning_system = reporter.ai_learning_system
+        if learning_system.read_only:
+            result['records'] = [asdict(record) for record in learning_system.pending_records]
+            learning_system.pending_records.clear()
+        result['seconds'] = round(time.perf_counter() - start, 3)
+
+    return result
+
+
+def merge_learning_records(results: list) -> int:
+    """將各日期的分析記錄依日期順序合併寫入學習資料"""
+    from src.ai_learning_system import AILearningSystem, AnalysisRecord
+
+    records = [
+        AnalysisRecord(**record)
+        for result in sorted(results, key=lambda r: r['date'])
+        for record in result['records']
+    ]
+    if records:
+        AILearningSystem().add_records(records)
+    return len(records)
+
+
+def print_result(result: dict, index: int, total: int):
+    """輸出單一日期的處理結果"""
+    icon = '✅' if result['success'] else '❌'
+    print(f"{icon} [{index}/{total}] {result['date']}  {result['seconds']:.2f}s")
+    for summary in result['summaries']:
+        print(f"     {summary}")
+    for report in result['reports']:
+        print(f"     📊 {report}")
+    if result['error']:
+        print(f"     {result['error']}")
+
+
+def run_batch(dates: list, workers: int) -> list:
+    """
+    平行產生多個日期的報告
+
+    Args:
+        dates: 日期清單
+        workers: 工作行程數（1 表示在主行程依序處理）
+
+    Returns:
+        list: 各日期的處理結果
+    """
+    from src.ai_learning_system import AILearningSystem
+    from src.reporter import ReportGenerator
+
+    # 所有工作行程共用同一份唯讀快照，批次期間不寫回檔案
+    snapshot = AILearningSystem(read_only=True)
+    results = []
+
+    if workers <= 1:
+        reporter = ReportGenerator(learning_system=snapshot)
+        for index, date in enumerate(dates, 1):
+            result = generate_report_for_date(date, reporter)
+            print_result(result, index, len(dates))
+            results.append(result)
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(snapshot,)
+    ) as pool:
+        futures = [pool.submit(generate_report_for_date, date) for date in dates]
+        for index, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            print_result(result, index, len(dates))
+            results.append(result)
+
+    return results
+
 
 def main():
     """主函數"""
-    # 要處理的日期列表
-    dates = ['20260105', '20260106', '20260107', '20260108']
-    
-    # 如果命令列有參數，使用命令列參數
-    if len(sys.argv) > 1:
-        dates = sys.argv[1:]
-    
+    parser = argparse.ArgumentParser(
+        description='台指選擇權批量報告生成器',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+範例:
+  python generate_batch_reports.py                       處理預設日期
+  python generate_batch_reports.py 20260105 20260106     處理指定日期
+  python generate_batch_reports.py --all                 重新產生 data/pdf 內所有日期
+  python generate_batch_reports.py --all --workers 1     依序處理（不開行程池）
+        '''
+    )
+    parser.add_argument('dates', nargs='*', help='日期 (格式: YYYYMMDD)')
+    parser.add_argument('--all', '-a', action='store_true',
+                        help='處理 data/pdf 內所有日期')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='平行工作行程數（預設為 CPU 核心數）')
+    args = parser.parse_args()
+
+    if args.all:
+        dates = find_pdf_dates()
+    else:
+        dates = args.dates or DEFAULT_DATES
+    workers = max(1, min(args.workers, len(dates)))
+
     print("="*50)
     print("台指選擇權批量報告生成器")
     print("="*50)
-    print(f"將處理以下日期: {', '.join(dates)}")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for date in dates:
-        if generate_report_for_date(date):
-            success_count += 1
-        else:
-            fail_count += 1
-    
+    print(f"將處理 {len(dates)} 個日期（{workers} 個工作行程）: {', '.join(dates)}")
+
+    if not dates:
+        print("❌ 沒有可處理的日期")
+        return
+
+    start = time.perf_counter()
+    results = run_batch(dates, workers)
+    elapsed = time.perf_counter() - start
+
+    merged = merge_learning_records(results)
+
+    results.sort(key=lambda r: r['date'])
+    succeeded = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+
     print("\n" + "="*50)
     print("批量處理完成")
     print("="*50)
-    print(f"✅ 成功: {success_count}")
-    print(f"❌ 失敗: {fail_count}")
+    print(f"✅ 成功: {len(succeeded)}")
+    print(f"❌ 失敗: {len(failed)}")
+    for result in failed:
+        print(f"   - {result['date']}: {result['error']}")
+    print(f"🧠 合併分析記錄: {merged} 筆")
+    print(f"⏱️  總耗時 {elapsed:.1f}s（各日期合計 {sum(r['seconds'] for r in results):.1f}s）")
+    if results:
+        slowest = max(results, key=lambda r: r['seconds'])
+        print(f"   最慢: {slowest['date']} {slowest['seconds']:.2f}s")
     print(f"📁 報告位置: reports/")
 
+
 if __name__ == "__main__":
     main()
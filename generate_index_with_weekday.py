@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 """
 生成首頁 index.html
-動態掃描 docs/ 目錄中的所有報告檔案
+- 報告清單來自報告目錄（data/report_catalog.json），報告產生時即寫入；
+  docs/ 中尚未收錄的報告（例如手動放入的歷史報告）於產生首頁時補登
+- 依月份分頁：index.html 顯示最新月份與月份導覽，各月份另有 index_YYYY-MM.html，
+  月份頁面只有內容雜湊變動時才重寫
+- docs/catalog.json 為精簡的報告清單，首頁搜尋與篩選在瀏覽器內完成
 """
 
+import argparse
+import hashlib
+import json
+import os
 from datetime import datetime
 from pathlib import Path
-import re
+
+from src.assets import asset_url, publish_assets
+from src.file_lock import file_lock
+from src.report_catalog import CATALOG_LOCK, PUBLIC_CATALOG_NAME, ReportCatalog, public_catalog
+from src.settlement_predictor import parse_report_html
+from src.site_build import INDEX_FILE, TEMPLATE_DIR, file_hash, index_inputs, record_build
+from src.template_renderer import render
+
+
+DOCS_DIR = Path('docs')
+INDEX_TEMPLATE = 'index.html'
 
 
 def get_weekday_chinese(date_str: str) -> str:
@@ -29,371 +47,248 @@ def format_date_display(date_str: str) -> str:
         return date_str
 
 
-def scan_daily_reports() -> list:
-    """掃描每日報告檔案"""
-    docs_dir = Path('docs')
-    daily_reports = []
+def month_page_name(month: str) -> str:
+    """2026-05 -> index_2026-05.html"""
+    return f"index_{month}.html"
+
+
+def month_label(month: str) -> str:
+    """2026-05 -> 2026年05月"""
+    return f"{month[:4]}年{month[5:7]}月"
 
-    # 查找 report_*.html 檔案（排除 _old）
-    for html_file in docs_dir.glob('report_*.html'):
-        # 跳過 old 檔案
-        if '_old' in html_file.name:
-            continue
 
-        # 解析檔名:
-        # - report_20260109_202601.html (月選)
-        # - report_20260109_202601W2.html (週選 W 格式)
-        # - report_20260113_202601F3.html (週選 F 格式)
-        match = re.match(r'report_(\d{8})_(\d{6})([WF]\d)?\.html', html_file.name)
-        if match:
-            date_str = match.group(1)
-            contract = match.group(2)
-            week_contract = match.group(3)  # 可能是 None 或 W1, W2, F3 等
-
-            # 優先顯示月契約，週契約作為次要
-            is_weekly = week_contract is not None
-
-            daily_reports.append({
-                'filename': html_file.name,
-                'date': date_str,
-                'contract': contract + (week_contract or ''),
-                'is_weekly': is_weekly,
-                'display_date': format_date_display(date_str),
-            })
-
-    # 按日期排序（最新的在前），月契約優先於週契約
-    daily_reports.sort(key=lambda x: (x['date'], not x['is_weekly']), reverse=True)
-
-    # 移除重複日期（保留月契約優先）
+def format_metrics(entry) -> str:
+    """卡片上的關鍵指標"""
+    parts = []
+    if entry.max_pain:
+        parts.append(f"Max Pain {entry.max_pain:,}")
+    if entry.pc_ratio is not None:
+        parts.append(f"P/C {entry.pc_ratio:.2f}")
+    return ' · '.join(parts)
+
+
+def daily_cards(entries) -> list:
+    """每日報告卡片（同一日期只保留一份，月契約優先於週契約）"""
+    daily = sorted(
+        (entry for entry in entries if entry.kind == 'daily'),
+        key=lambda entry: (entry.date, not entry.is_weekly),
+        reverse=True
+    )
+
     seen_dates = set()
-    unique_reports = []
-    for report in daily_reports:
-        if report['date'] not in seen_dates:
-            seen_dates.add(report['date'])
-            unique_reports.append(report)
-
-    return unique_reports
-
-
-def scan_settlement_reports() -> list:
-    """掃描結算日報告檔案"""
-    docs_dir = Path('docs')
-    settlement_reports = []
-
-    # 查找 settlement_*.html 檔案
-    for html_file in docs_dir.glob('settlement_*.html'):
-        # 解析檔名: settlement_20260108_wed.html
-        match = re.match(r'settlement_(\d{8})_(wed|fri)\.html', html_file.name)
-        if match:
-            date_str = match.group(1)
-            weekday_abbr = match.group(2)
-            weekday_text = '週三' if weekday_abbr == 'wed' else '週五'
-
-            # 格式化日期
-            try:
-                date_obj = datetime.strptime(date_str, '%Y%m%d')
-                formatted_date = date_obj.strftime('%Y/%m/%d')
-            except:
-                formatted_date = date_str
-
-            settlement_reports.append({
-                'filename': html_file.name,
-                'date': date_str,
-                'formatted_date': formatted_date,
-                'weekday_text': weekday_text,
-                'weekday_abbr': weekday_abbr,
-            })
-
-    # 按日期排序（最新的在前）
-    settlement_reports.sort(key=lambda x: x['date'], reverse=True)
-
-    return settlement_reports
-
-
-def generate_index_html():
-    """生成首頁 HTML"""
-    # 掃描報告
-    daily_reports = scan_daily_reports()
-    settlement_reports = scan_settlement_reports()
-
-    # 當前時間
-    now = datetime.now().strftime('%Y年%m月%d日 %H:%M')
-
-    # 生成 HTML
-    html_content = f'''<!DOCTYPE html>
-<html lang="zh-TW">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>台指選擇權分析報告 - 總覽</title>
-    <style>
-        :root {{
-            --primary-color: #2563eb;
-            --bg-color: #f8fafc;
-            --card-bg: #ffffff;
-            --text-color: #1e293b;
-            --border-color: #e2e8f0;
-        }}
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background-color: var(--bg-color);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-        }}
-        header {{
-            background: linear-gradient(135deg, var(--primary-color), #1d4ed8);
-            color: white;
-            border-radius: 2px;
-            padding: 40px;
-            margin-bottom: 30px;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-            text-align: center;
-        }}
-        h1 {{
-            font-size: 2.5rem;
-            margin-bottom: 10px;
-        }}
-        .subtitle {{
-            opacity: 0.9;
-            font-size: 1.1rem;
-        }}
-
-        /* 報告類型區塊 */
-        .report-section {{
-            background: white;
-            border-radius: 2px;
-            padding: 30px;
-            margin-bottom: 30px;
-            box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-            border: 1px solid var(--border-color);
-        }}
-
-        .section-header {{
-            display: flex;
-            align-items: center;
-            margin-bottom: 20px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid var(--border-color);
-        }}
-
-        .section-icon {{
-            font-size: 1.8rem;
-            margin-right: 12px;
-        }}
-
-        .section-title {{
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: #1e293b;
-            margin: 0;
-        }}
-
-        .section-count {{
-            margin-left: auto;
-            background: #f1f5f9;
-            color: #64748b;
-            padding: 4px 12px;
-            border-radius: 12px;
-            font-size: 0.9rem;
-            font-weight: 600;
-        }}
-
-        .section-description {{
-            color: #64748b;
-            margin-bottom: 20px;
-            font-size: 0.95rem;
-        }}
-
-        .reports-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
-            gap: 16px;
-        }}
-
-        .report-card {{
-            background: var(--bg-color);
-            border-radius: 2px;
-            padding: 20px;
-            border: 1px solid var(--border-color);
-            transition: all 0.3s ease;
-            text-decoration: none;
-            color: var(--text-color);
-            display: block;
-        }}
-        .report-card:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-            border-color: var(--primary-color);
-        }}
-        .report-date {{
-            font-size: 1.3rem;
-            font-weight: 700;
-            margin-bottom: 8px;
-            color: var(--primary-color);
-        }}
-        .report-month {{
-            font-size: 0.9rem;
-            color: #64748b;
-            margin-bottom: 8px;
-        }}
-        .report-badge {{
-            display: inline-block;
-            background: var(--primary-color);
-            color: white;
-            padding: 3px 10px;
-            border-radius: 2px;
-            font-size: 0.8rem;
-        }}
-        .latest-badge {{
-            background: #ef4444;
-        }}
-
-        /* 空狀態 */
-        .empty-state {{
-            text-align: center;
-            padding: 40px 20px;
-            color: #94a3b8;
-        }}
-        .empty-state-icon {{
-            font-size: 3rem;
-            margin-bottom: 12px;
-            opacity: 0.5;
-        }}
-
-        footer {{
-            text-align: center;
-            color: #64748b;
-            margin-top: 40px;
-            padding: 20px;
-            font-size: 0.9rem;
-        }}
-        footer a {{
-            color: var(--primary-color);
-            text-decoration: none;
-        }}
-        footer a:hover {{
-            text-decoration: underline;
-        }}
-
-        @media (max-width: 768px) {{
-            h1 {{
-                font-size: 1.8rem;
-            }}
-            .reports-grid {{
-                grid-template-columns: 1fr;
-            }}
-            header {{
-                padding: 24px 16px;
-            }}
-            .report-section {{
-                padding: 20px 16px;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>台指選擇權分析報告</h1>
-            <p class="subtitle">Taiwan Stock Index Options Analysis</p>
-        </header>
-
-        <!-- 結算日報告區塊 -->
-        <div class="report-section">
-            <div class="section-header">
-                <span class="section-icon">🎯</span>
-                <h2 class="section-title">結算日報告</h2>
-                <span class="section-count">''' + (f'{len(settlement_reports)} 份報告' if settlement_reports else '即將推出') + '''</span>
-            </div>
-            <p class="section-description">結算日專題分析，包含趨勢分析、結算劇本預測、AI 交易員視角等</p>
-'''
-
-    if settlement_reports:
-        html_content += '''            <div class="reports-grid">
-'''
-        for i, report in enumerate(settlement_reports):
-            badge_class = 'latest-badge' if i == 0 else ''
-            badge_text = '最新' if i == 0 else '歷史'
-
-            html_content += f'''                <a href="{report['filename']}" class="report-card">
-                    <div class="report-date">{report['formatted_date']} ({report['weekday_text']})</div>
-                    <div class="report-month">結算日預測分析</div>
-                    <span class="report-badge {badge_class}">{badge_text}</span>
-                </a>
-'''
-        html_content += '''            </div>
-'''
-    else:
-        html_content += '''            <div class="empty-state">
-                <div class="empty-state-icon">📦</div>
-                <div>尚無結算日報告</div>
-            </div>
-'''
-
-    html_content += '''        </div>
-
-        <!-- 每日報告區塊 -->
-        <div class="report-section">
-            <div class="section-header">
-                <span class="section-icon">📊</span>
-                <h2 class="section-title">每日報告</h2>
-                <span class="section-count">''' + f'{len(daily_reports)} 份報告' + '''</span>
-            </div>
-            <p class="section-description">每日選擇權市場分析，包含 OI 分佈、Max Pain、結算情境預測等</p>
-            <div class="reports-grid">
-'''
-
-    # 每日報告卡片
-    for i, report in enumerate(daily_reports):
-        badge_class = 'latest-badge' if i == 0 else ''
-        badge_text = '最新' if i == 0 else '歷史'
-        contract_display = report['contract'][:6] + ' 月份'
-        if 'W' in report['contract']:
-            contract_display = report['contract'] + ' 週選'
-
-        html_content += f'''                <a href="{report['filename']}" class="report-card">
-                    <div class="report-date">{report['display_date']}</div>
-                    <div class="report-month">{contract_display}</div>
-                    <span class="report-badge {badge_class}">{badge_text}</span>
-                </a>
-'''
-
-    html_content += '''            </div>
-        </div>
-
-        <footer>
-            <p>自動生成於 {now}</p>
-            <p><a href="https://github.com/ShoppingLiao/taiex-options-analyzer" target="_blank">GitHub 專案原始碼</a></p>
-        </footer>
-    </div>
-</body>
-</html>
-'''
-
-    # 寫入檔案
-    output_path = Path('docs/index.html')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    cards = []
+    for entry in daily:
+        if entry.date in seen_dates:
+            continue
+        seen_dates.add(entry.date)
+
+        contract_display = entry.contract[:6] + ' 月份'
+        if 'W' in entry.contract:
+            contract_display = entry.contract + ' 週選'
+
+        cards.append({
+            'href': entry.href,
+            'filename': entry.href,
+            'date': entry.date,
+            'month': entry.month,
+            'contract': entry.contract,
+            'is_weekly': entry.is_weekly,
+            'display_date': format_date_display(entry.date),
+            'contract_display': contract_display,
+            'metrics': format_metrics(entry),
+            'latest': False,
+        })
+    return cards
+
+
+def settlement_cards(entries) -> list:
+    """結算日報告卡片（最新的在前）"""
+    cards = []
+    for entry in sorted((e for e in entries if e.kind == 'settlement'), key=lambda e: e.date, reverse=True):
+        try:
+            formatted_date = datetime.strptime(entry.date, '%Y%m%d').strftime('%Y/%m/%d')
+        except ValueError:
+            formatted_date = entry.date
+
+        cards.append({
+            'href': entry.href,
+            'filename': entry.href,
+            'date': entry.date,
+            'month': entry.month,
+            'formatted_date': formatted_date,
+            'weekday_text': '週三' if entry.contract == 'wed' else '週五',
+            'weekday_abbr': entry.contract,
+            'metrics': format_metrics(entry),
+            'latest': False,
+        })
+    return cards
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """內容不同時才寫入（暫存檔 + 置換），保留未變更檔案的 mtime"""
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding='utf-8')
+    os.replace(tmp_path, path)
+    return True
+
+
+def page_digest(context: dict) -> str:
+    """月份頁面的內容雜湊：頁面資料、模板與 CSS/JS 指紋"""
+    material = json.dumps(context, ensure_ascii=False, sort_keys=True)
+    material += file_hash(TEMPLATE_DIR / INDEX_TEMPLATE) or ''
+    material += asset_url('index.css') + asset_url('index.js')
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def load_catalog(docs_dir: Path, rebuild: bool = False) -> ReportCatalog:
+    """
+    讀取報告目錄並補登 docs/ 中尚未收錄的報告（呼叫端需持有 CATALOG_LOCK）
+
+    Args:
+        docs_dir: 報告目錄
+        rebuild: 移除 docs/ 已不存在的報告，並重寫所有月份頁面
+    """
+    catalog = ReportCatalog()
+    if rebuild:
+        catalog.entries = {
+            href: entry for href, entry in catalog.entries.items()
+            if (docs_dir / href).exists()
+        }
+        catalog.pages = {}
+    added = catalog.backfill(docs_dir, parse_metrics=parse_report_html)
+    if added:
+        print(f"📇 報告目錄補登 {added} 份報告")
+    return catalog
+
+
+def write_month_pages(catalog: ReportCatalog, months: list, daily: list, settlement: list,
+                      docs_dir: Path) -> list:
+    """
+    寫入各月份頁面（內容雜湊未變且檔案存在時略過），並刪除已無報告的月份頁面
+
+    Returns:
+        list: 本次重寫的頁面
+    """
+    written = []
+    for i, month in enumerate(months):
+        newer = months[i - 1] if i > 0 else None
+        older = months[i + 1] if i + 1 < len(months) else None
+        context = {
+            'is_home': False,
+            'current_month': month,
+            'month_label': month_label(month),
+            'settlement_reports': [card for card in settlement if card['month'] == month],
+            'daily_reports': [card for card in daily if card['month'] == month],
+            'newer_month': {'href': month_page_name(newer), 'label': month_label(newer)} if newer else None,
+            'older_month': {'href': month_page_name(older), 'label': month_label(older)} if older else None,
+            'catalog_url': PUBLIC_CATALOG_NAME,
+        }
+        context['total_reports'] = len(context['settlement_reports']) + len(context['daily_reports'])
+
+        path = docs_dir / month_page_name(month)
+        digest = page_digest(context)
+        if catalog.pages.get(month) == digest and path.exists():
+            continue
+        if write_if_changed(path, render(INDEX_TEMPLATE, **context)):
+            written.append(path)
+        catalog.pages[month] = digest
+
+    for path in docs_dir.glob('index_*.html'):
+        month = path.stem[len('index_'):]
+        if month not in months:
+            path.unlink()
+            catalog.pages.pop(month, None)
+    return written
+
+
+def generate_index_html(rebuild_catalog: bool = False):
+    """
+    生成首頁、月份頁面與搜尋用的 catalog.json
+
+    Args:
+        rebuild_catalog: 重新整理報告目錄（移除 docs/ 已不存在的報告）
+
+    Returns:
+        tuple: (每日報告卡片, 結算日報告卡片)，最新的在前
+    """
+    docs_dir = DOCS_DIR
+    with file_lock(CATALOG_LOCK):
+        catalog = load_catalog(docs_dir, rebuild=rebuild_catalog)
+        entries = catalog.published(docs_dir)
+
+        daily_reports = daily_cards(entries)
+        settlement_reports = settlement_cards(entries)
+        for cards in (daily_reports, settlement_reports):
+            if cards:
+                cards[0]['latest'] = True
+
+        months = sorted({card['month'] for card in daily_reports + settlement_reports}, reverse=True)
+        publish_assets(docs_dir)
+        written = write_month_pages(catalog, months, daily_reports, settlement_reports, docs_dir)
+
+        write_if_changed(
+            docs_dir / PUBLIC_CATALOG_NAME,
+            json.dumps(public_catalog(entries), ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+        )
+
+        current_month = months[0] if months else None
+        context = {
+            'is_home': True,
+            'current_month': current_month,
+            'month_label': month_label(current_month) if current_month else '報告總覽',
+            'months': [
+                {
+                    'key': month,
+                    'href': month_page_name(month),
+                    'label': month_label(month),
+                    'count': sum(1 for card in daily_reports + settlement_reports if card['month'] == month),
+                }
+                for month in months
+            ],
+            'settlement_reports': [card for card in settlement_reports if card['month'] == current_month],
+            'daily_reports': [card for card in daily_reports if card['month'] == current_month],
+            'total_reports': len(daily_reports) + len(settlement_reports),
+            'catalog_url': PUBLIC_CATALOG_NAME,
+            'generated_at': datetime.now().strftime('%Y年%m月%d日 %H:%M'),
+        }
+        output_path = docs_dir / 'index.html'
+        write_if_changed(output_path, render(INDEX_TEMPLATE, **context))
+        catalog.save()
+
+    if written:
+        print(f"🗓️  更新月份頁面: {', '.join(path.name for path in written)}")
+
+    if output_path.resolve() == INDEX_FILE.resolve():
+        record_build(INDEX_FILE, 'index', inputs=index_inputs())
 
     return daily_reports, settlement_reports
 
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(
+        description='生成首頁 index.html',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  # 依報告目錄更新首頁（只重寫有變動的月份頁面）
+  python generate_index_with_weekday.py
+
+  # 重新整理報告目錄（移除 docs/ 已刪除的報告並重寫所有月份頁面）
+  python generate_index_with_weekday.py --rebuild-catalog
+        """
+    )
+    parser.add_argument('--rebuild-catalog', action='store_true',
+                        help='重新整理報告目錄並重寫所有月份頁面')
+    args = parser.parse_args()
+
     print("=" * 50)
     print("首頁生成工具")
     print("=" * 50)
 
-    daily_reports, settlement_reports = generate_index_html()
+    daily_reports, settlement_reports = generate_index_html(rebuild_catalog=args.rebuild_catalog)
 
     print(f"\n✅ 首頁已更新: docs/index.html")
     print(f"\n📊 每日報告 ({len(daily_reports)} 份):")
@@ -403,8 +298,10 @@ def main():
         print(f"  ... 還有 {len(daily_reports) - 5} 份")
 
     print(f"\n🎯 結算日報告 ({len(settlement_reports)} 份):")
-    for i, report in enumerate(settlement_reports):
+    for i, report in enumerate(settlement_reports[:5]):
         print(f"  {'⭐' if i == 0 else '  '} {report['formatted_date']} ({report['weekday_text']})")
+    if len(settlement_reports) > 5:
+        print(f"  ... 還有 {len(settlement_reports) - 5} 份")
 
 
 if __name__ == '__main__':
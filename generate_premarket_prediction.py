@@ -17,7 +17,7 @@ import argparse
 import sys
 import json
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # 加入 src 到路徑
 sys.path.insert(0, str(Path(__file__).parent))
@@ -26,16 +26,12 @@ from src.night_session_fetcher import NightSessionFetcher
 from src.ai_premarket_prediction import AIPremarketPrediction
 from src.settlement_report_generator import SettlementReportGenerator
 from src.settlement_predictor import SettlementPredictor
+from src.trading_calendar import get_calendar
 
 
 def get_previous_trading_day(date_obj: datetime) -> datetime:
     """取得前一個交易日"""
-    from daily_workflow import is_trading_day
-
-    prev_day = date_obj - timedelta(days=1)
-    while not is_trading_day(prev_day)[0]:
-        prev_day -= timedelta(days=1)
-    return prev_day
+    return datetime.combine(get_calendar().previous_trading_day(date_obj), datetime.min.time())
 
 
 def load_settlement_prediction(settlement_date: str, weekday: str) -> dict:
@@ -174,14 +170,10 @@ def main():
         predictor = SettlementPredictor()
 
         # 取得分析日期（前兩個交易日）
-        from daily_workflow import is_trading_day
-        analysis_dates = []
-        current = settlement_date_obj - timedelta(days=1)
-        while len(analysis_dates) < 2:
-            if is_trading_day(current)[0]:
-                analysis_dates.append(current.strftime('%Y%m%d'))
-            current -= timedelta(days=1)
-        analysis_dates = list(reversed(analysis_dates))
+        analysis_dates = [
+            day.strftime('%Y%m%d')
+            for day in get_calendar().previous_trading_days(settlement_date_obj, 2)
+        ]
 
         # 生成預測
         settlement_date_formatted = settlement_date_obj.strftime('%Y/%m/%d')
@@ -10,6 +10,7 @@ from src.parser import PDFParser
 from src.ai_settlement_review import AISettlementReview
 from src.ai_settlement_prediction import AISettlementPrediction
 from src.ai_learning_system import AILearningSystem
+from src.settlement_price import SOURCE_CLOSE, SOURCE_OFFICIAL, SOURCE_RECONSTRUCTED, reconstruct_settlement
 
 
 def main():
@@ -37,7 +38,18 @@ def main():
             return 1
         
         data = data_list[0]
-        actual_settlement_price = int(data.tx_settlement) if data.tx_settlement else int(data.tx_close)
+        # 沒有官方結算價時，先以存檔的 5 秒加權指數重建（收盤前 30 分鐘平均），仍沒有才用收盤價
+        reconstructed = reconstruct_settlement(settlement_date)
+        if data.tx_settlement:
+            actual_settlement_price = int(data.tx_settlement)
+            settlement_source = SOURCE_OFFICIAL
+        elif reconstructed is not None:
+            actual_settlement_price = reconstructed
+            settlement_source = SOURCE_RECONSTRUCTED
+            print("📐 由 5 秒加權指數重建結算價（收盤前 30 分鐘平均）")
+        else:
+            actual_settlement_price = int(data.tx_close)
+            settlement_source = SOURCE_CLOSE
         
         print(f"✅ 實際結算價: {actual_settlement_price:,}")
         
@@ -56,6 +68,7 @@ def main():
     actual_data = {
         'tx_close': int(data.tx_close) if data.tx_close else None,
         'tx_settlement': actual_settlement_price,
+        'settlement_source': settlement_source,
         'tx_high': int(data.tx_high) if data.tx_high else None,
         'tx_low': int(data.tx_low) if data.tx_low else None,
         'call_oi': sum(data.call_oi) if data.call_oi else 0,
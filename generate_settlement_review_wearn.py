@@ -23,6 +23,8 @@ from src.twse_fetcher import TWSEDataFetcher
 from src.ai_settlement_review import AISettlementReview
 from src.ai_settlement_prediction import AISettlementPrediction
 from src.ai_learning_system import AILearningSystem
+from src.settlement_price import (SOURCE_CLOSE, SOURCE_DEFAULT, SOURCE_OFFICIAL, SOURCE_RECONSTRUCTED,
+                                  load_intraday, reconstruct_settlement)
 
 
 def fetch_settlement_data(settlement_date: str, weekday: str):
@@ -42,14 +44,28 @@ def fetch_settlement_data(settlement_date: str, weekday: str):
     twse_fetcher = TWSEDataFetcher()
     tx_data = twse_fetcher.fetch_ohlc(settlement_date)
     
+    if not tx_data:
+        # 連不上證交所時改用先前存檔的 5 秒加權指數
+        intraday = load_intraday(settlement_date)
+        tx_data = intraday.ohlc() if intraday else None
+    
     if not tx_data:
         print("  ⚠️  無法取得台指期貨數據，使用預設值")
-        tx_data = {'close': 30800, 'open': 30800, 'high': 30850, 'low': 30750, 'settlement': 30800}
+        tx_data = {'close': 30800, 'open': 30800, 'high': 30850, 'low': 30750, 'settlement': 30800,
+                   'settlement_source': SOURCE_DEFAULT}
     else:
         print(f"  ✓ 台指期貨收盤: {tx_data.get('close', 'N/A')}")
-        # 如果沒有結算價，使用收盤價
-        if 'settlement' not in tx_data:
-            tx_data['settlement'] = tx_data.get('close')
+        # 如果沒有結算價，以 5 秒加權指數重建（收盤前 30 分鐘平均），仍沒有才使用收盤價
+        if 'settlement' in tx_data:
+            tx_data['settlement_source'] = SOURCE_OFFICIAL
+        else:
+            settlement = reconstruct_settlement(settlement_date)
+            if settlement is not None:
+                print(f"  ✓ 重建結算價（收盤前 30 分鐘平均）: {settlement:,.2f}")
+                tx_data['settlement_source'] = SOURCE_RECONSTRUCTED
+            else:
+                tx_data['settlement_source'] = SOURCE_CLOSE
+            tx_data['settlement'] = settlement if settlement is not None else tx_data.get('close')
     
     # 2. 抓取聚財網選擇權數據
     wearn_fetcher = WearnFetcher()
@@ -140,7 +156,10 @@ def main():
         print("\n❌ 無法取得數據，退出")
         return 1
     
-    actual_settlement_price = int(tx_data.get('settlement', tx_data.get('close')))
+    # 重建的結算價保留兩位小數，其餘沿用整數
+    settlement = tx_data.get('settlement', tx_data.get('close'))
+    settlement_source = tx_data['settlement_source']
+    actual_settlement_price = settlement if settlement_source == SOURCE_RECONSTRUCTED else int(settlement)
     print(f"\n✅ 實際結算價: {actual_settlement_price:,}")
     
     # 2. 初始化 AI 系統
@@ -155,6 +174,7 @@ def main():
     actual_data = {
         'tx_close': int(tx_data.get('close')) if tx_data.get('close') else None,
         'tx_settlement': actual_settlement_price,
+        'settlement_source': settlement_source,
         'tx_high': int(tx_data.get('high')) if tx_data.get('high') else None,
         'tx_low': int(tx_data.get('low')) if tx_data.get('low') else None,
         'call_oi': sum(options_data.call_oi) if options_data.call_oi else 0,
@@ -22,6 +22,7 @@ from src.parser import PDFParser
 from src.analyzer import OptionsAnalyzer
 from src.reporter import ReportGenerator
 from src.wearn_fetcher import WearnFetcher
+from src.workflow_spans import span
 
 
 def main():
@@ -190,12 +191,15 @@ def run_analysis(args):
         print("台指選擇權分析工具")
         print("=" * 50)
 
-        if args.date:
-            print(f"\n正在下載 {args.date} 的報告...")
-            pdf_path = fetcher.download_report(args.date)
-        else:
-            print("\n正在下載最新報告...")
-            pdf_path = fetcher.download_latest()
+        with span('download_pdf') as download_span:
+            if args.date:
+                print(f"\n正在下載 {args.date} 的報告...")
+                pdf_path = fetcher.download_report(args.date)
+            else:
+                print("\n正在下載最新報告...")
+                pdf_path = fetcher.download_latest()
+            if pdf_path:
+                download_span.set(bytes=Path(pdf_path).stat().st_size)
 
         if not pdf_path:
             print("\n無法下載 PDF 檔案")
@@ -214,8 +218,10 @@ def run_analysis(args):
     if not args.wearn:
         # 解析 PDF
         print(f"\n正在解析 PDF...")
-        pdf_parser = PDFParser()
-        options_list = pdf_parser.parse(str(pdf_path))
+        with span('parse_pdf') as parse_span:
+            pdf_parser = PDFParser()
+            options_list = pdf_parser.parse(str(pdf_path))
+            parse_span.set(contracts=len(options_list))
 
         if not options_list:
             print("\n無法從 PDF 中解析出選擇權資料")
@@ -229,9 +235,10 @@ def run_analysis(args):
     # 分析資料
     print("\n正在分析資料...")
     analyzer = OptionsAnalyzer()
-    reporter = ReportGenerator(
-        output_dir=args.output if args.output else project_root / "reports"
-    )
+    with span('init_reporter'):
+        reporter = ReportGenerator(
+            output_dir=args.output if args.output else project_root / "reports"
+        )
 
     reports = []
     
@@ -252,7 +259,8 @@ def run_analysis(args):
         print(f"  P/C Ratio (OI): {main_result.pc_ratio_oi:.4f}")
         
         # 產生包含所有契約的綜合報告
-        report_path = reporter.generate_multi_contract_report(options_list, analyzer)
+        with span('generate_report', contracts=len(options_list)):
+            report_path = reporter.generate_multi_contract_report(options_list, analyzer)
         reports.append(report_path)
         
     else:
@@ -268,7 +276,8 @@ def run_analysis(args):
             print(f"  賣權 OI 支撐: {result.max_put_oi_strike:,} ({result.max_put_oi:,} 口)")
 
             # 產生報告
-            report_path = reporter.generate(result, options_data)
+            with span('generate_report', contracts=1):
+                report_path = reporter.generate(result, options_data)
             reports.append(report_path)
 
     print("\n" + "=" * 50)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+歷史報告遷移工具
+一次讀寫套用所有尚未套用的 HTML 遷移（註冊於 src/report_migrations.py），
+取代依序執行多個一次性腳本、每個腳本都重寫整個報告庫的做法
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.report_migrations import LEGACY_VERSION, MIGRATIONS, latest_version, run_migrations, summarize
+
+
+def print_migrations(target: int):
+    print("已註冊的遷移:")
+    for version in sorted(MIGRATIONS):
+        migration = MIGRATIONS[version]
+        flag = ' ' if version <= target else '×'
+        print(f"  {flag} v{version} {migration.name:<24} {migration.description}")
+
+
+def migrate(target: int = None, dry_run: bool = False, stamp: bool = False,
+            workers: int = None, dirs=None, verbose: bool = False) -> bool:
+    """
+    執行遷移並列出摘要
+
+    Args:
+        target: 目標版本（預設為最新版本）
+        dry_run: 只列出差異摘要
+        stamp: 只寫入版本標記
+        workers: 行程數
+        dirs: 報告目錄（預設 reports/ 與 docs/）
+        verbose: 列出每個檔案
+
+    Returns:
+        bool: 沒有錯誤時為 True
+    """
+    target = latest_version() if target is None else target
+    dirs = [Path(d) for d in dirs] if dirs else [PROJECT_ROOT / 'reports', PROJECT_ROOT / 'docs']
+
+    print("=" * 60)
+    print(f"🔄 報告遷移{'（預覽模式）' if dry_run else ''}{'（只標記版本）' if stamp else ''}")
+    print("=" * 60)
+    print_migrations(target)
+    print()
+
+    start = time.time()
+    results = run_migrations(dirs, target=target, dry_run=dry_run, workers=workers, stamp=stamp)
+    elapsed = time.time() - start
+
+    if not results:
+        print(f"✅ 所有報告都已是 v{target}（沒有版本標記的報告視為 v{LEGACY_VERSION}）")
+        return True
+
+    errors = [r for r in results if r.error]
+    changed = [r for r in results if r.changed]
+
+    if verbose or dry_run:
+        for result in results:
+            if result.error:
+                print(f"  ❌ {result.path.name} - {result.error}")
+            elif result.changed:
+                print(f"  ✏️  {result.path.parent.name}/{result.path.name} v{result.from_version} → v{result.to_version} "
+                      f"+{result.added} -{result.removed} ({', '.join(result.applied)})")
+            elif verbose:
+                print(f"  ⊘  {result.path.parent.name}/{result.path.name} v{result.from_version} → v{result.to_version} 只更新標記")
+        print()
+
+    print("=" * 60)
+    print("📊 遷移摘要")
+    print("=" * 60)
+    action = '將' if dry_run else '已'
+    print(f"  檢查: {len(results)} 份報告（硬連結共用的檔案只計一次）")
+    print(f"  {action}改變內容: {len(changed)} 份")
+    print(f"  {action}只更新版本標記: {len(results) - len(changed) - len(errors)} 份")
+    for name, entry in summarize(results).items():
+        print(f"    • {name}: {entry['files']} 份 (+{entry['added']} -{entry['removed']} 行)")
+    if errors:
+        print(f"  ❌ 失敗: {len(errors)} 份")
+    print(f"\n⏱️  耗時 {elapsed:.2f}s")
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='歷史報告遷移工具',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  # 預覽待套用的遷移與差異摘要（不寫入）
+  python maintenance/scripts/migrate_reports.py --dry-run
+
+  # 套用所有尚未套用的遷移
+  python maintenance/scripts/migrate_reports.py
+
+  # 只遷移到指定版本
+  python maintenance/scripts/migrate_reports.py --target 3
+
+  # 只標記為最新版本，不執行轉換（沒有標記的報告視為舊版腳本已套用的 v5）
+  python maintenance/scripts/migrate_reports.py --stamp
+        """
+    )
+    parser.add_argument('--dry-run', action='store_true', help='只列出差異摘要，不寫入')
+    parser.add_argument('--target', type=int, help='目標版本（預設為最新版本）')
+    parser.add_argument('--stamp', action='store_true', help='只寫入版本標記，不執行轉換')
+    parser.add_argument('--workers', type=int, help='平行處理的行程數（預設依 CPU 核心數）')
+    parser.add_argument('--dir', action='append', dest='dirs', help='報告目錄（可重複，預設 reports/ 與 docs/）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='列出每個檔案')
+    args = parser.parse_args()
+
+    ok = migrate(args.target, args.dry_run, args.stamp, args.workers, args.dirs, args.verbose)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
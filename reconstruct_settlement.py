@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+結算價重建
+
+以存檔的 5 秒加權指數（data/intraday/）重建結算價（收盤前 30 分鐘簡單算術平均，src/settlement_price.py），
+與結算檢討記錄的實際結算價比對，並可直接以重建值重新評分檢討，不需連網；
+期交所公布的官方結算價不會被重建值取代（檢討的 actual_result.settlement_source）
+
+使用方式:
+    python reconstruct_settlement.py                  # 列出所有存檔日的重建結算價與檢討記錄
+    python reconstruct_settlement.py 20260429         # 只看指定日期
+    python reconstruct_settlement.py --rescore        # 以重建值重新評分非官方結算價且結算價不同的檢討
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 加入專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.ai_learning_system import AILearningSystem
+from src.ai_settlement_prediction import AISettlementPrediction
+from src.ai_settlement_review import AISettlementReview
+from src.settlement_price import INTRADAY_DIR, SOURCE_OFFICIAL, load_intraday, settlement_source, stored_dates
+
+
+def _price(value) -> str:
+    return f"{value:,.2f}" if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='以存檔的 5 秒加權指數重建結算價',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  # 列出所有存檔日的重建結算價，並與檢討記錄比對
+  python reconstruct_settlement.py
+
+  # 指定日期
+  python reconstruct_settlement.py 20260429 20260501
+
+  # 以重建值重新評分非官方結算價的檢討（收盤價或預設值代替的；只更新結算價與評分欄位）
+  python reconstruct_settlement.py --rescore
+        """
+    )
+    parser.add_argument('dates', nargs='*', help='日期 YYYYMMDD（預設為所有存檔日）')
+    parser.add_argument('--intraday-dir', type=Path, default=INTRADAY_DIR, help='5 秒加權指數存檔目錄')
+    parser.add_argument('--rescore', action='store_true', help='以重建的結算價重新評分非官方結算價的檢討')
+    args = parser.parse_args()
+
+    dates = args.dates or stored_dates(args.intraday_dir)
+    if not dates:
+        print(f"❌ {args.intraday_dir} 沒有 5 秒加權指數存檔（TWSEDataFetcher 抓取時會自動存檔）")
+        sys.exit(1)
+
+    learning_system = AILearningSystem()
+    review_generator = AISettlementReview(learning_system, AISettlementPrediction(learning_system))
+
+    print(f"{'日期':<10}{'重建結算':>12}{'收盤':>12}{'檢討記錄':>12}{'差異':>10}  來源")
+    rescored = 0
+    for date in dates:
+        intraday = load_intraday(date, args.intraday_dir)
+        if intraday is None:
+            print(f"{date:<12}⚠️  沒有存檔")
+            continue
+
+        settlement = intraday.settlement_price()
+        ohlc = intraday.ohlc() or {}
+        review = review_generator.load_review(date)
+        actual_result = (review or {}).get('actual_result') or {}
+        recorded = actual_result.get('settlement_price')
+        source = settlement_source(actual_result) if review else None
+
+        line = f"{date:<12}{_price(settlement):>12}{_price(ohlc.get('close')):>12}{_price(recorded):>12}"
+        if settlement is not None and recorded is not None:
+            line += f"{settlement - recorded:>+10.2f}  {source}"
+        print(line)
+
+        if (args.rescore and source != SOURCE_OFFICIAL and settlement is not None and recorded is not None
+                and round(settlement - recorded, 2) and 'prediction' in review):
+            result = review_generator.rescore_review(review, settlement)
+            rescored += 1
+            print(f"   ✅ 已重新評分：{result['score']}（準確度 {result['accuracy']['overall_accuracy']}）")
+
+    if args.rescore:
+        print(f"\n📝 重新評分 {rescored} 份檢討")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,19 @@
 from typing import Dict, List
 from .parser import OptionsData
 from .analyzer import AnalysisResult
+from .contract_features import contract_features
 from .ai_learning_system import AILearningSystem, AnalysisRecord
 
 
 class AIDailyAnalyzer:
     """每日報告的 AI 交易員分析器"""
     
-    def __init__(self):
-        self.learning_system = AILearningSystem()
+    def __init__(self, learning_system: AILearningSystem = None):
+        """
+        Args:
+            learning_system: 共用的 AI 學習系統（未提供則自行建立）
+        """
+        self.learning_system = learning_system if learning_system is not None else AILearningSystem()
         self.experience_level, self.level_icon = self.learning_system.get_experience_level()
     
     def analyze(
@@ -35,6 +40,7 @@ class AIDailyAnalyzer:
         """
         pc_ratio = analysis_result.pc_ratio_oi
         close_price = options_data.tx_close or 0  # 使用台指期貨收盤價
+        features = contract_features(options_data)
         
         # 獲取歷史背景
         historical_context = self.learning_system.get_historical_context(pc_ratio, sentiment)
@@ -79,8 +85,8 @@ class AIDailyAnalyzer:
                 'pc_ratio': round(pc_ratio, 3),
                 'sentiment': sentiment,
                 'trend_signal': trend_signal,
-                'max_call_oi': max(options_data.call_oi),
-                'max_put_oi': max(options_data.put_oi),
+                'max_call_oi': features.max_call_oi,
+                'max_put_oi': features.max_put_oi,
             }
         }
         
@@ -102,8 +108,9 @@ class AIDailyAnalyzer:
             return 'bearish'
         else:
             # 看 OI 變化
-            total_call_change = sum(options_data.call_oi_change)
-            total_put_change = sum(options_data.put_oi_change)
+            features = contract_features(options_data)
+            total_call_change = features.call_oi_change
+            total_put_change = features.put_oi_change
             
             if total_call_change > total_put_change * 1.5:
                 return 'bullish'
@@ -146,8 +153,9 @@ class AIDailyAnalyzer:
             )
         
         # 大量 OI 集中點
-        max_call_strike = options_data.strike_prices[options_data.call_oi.index(max(options_data.call_oi))]
-        max_put_strike = options_data.strike_prices[options_data.put_oi.index(max(options_data.put_oi))]
+        features = contract_features(options_data)
+        max_call_strike = features.max_call_oi_strike
+        max_put_strike = features.max_put_oi_strike
         
         observations.append(
             f"我注意到最大的 Call OI 在 {max_call_strike:,} 點，"
@@ -249,8 +257,9 @@ class AIDailyAnalyzer:
                 risks.append(f"• {warning}")
         
         # OI 風險
-        max_call_oi = max(options_data.call_oi)
-        max_put_oi = max(options_data.put_oi)
+        features = contract_features(options_data)
+        max_call_oi = features.max_call_oi
+        max_put_oi = features.max_put_oi
         
         if max_call_oi > max_put_oi * 1.5:
             risks.append("• Call OI 過度集中，價格接近時可能引發劇烈調整")
@@ -258,8 +267,8 @@ class AIDailyAnalyzer:
             risks.append("• Put OI 過度集中，跌破支撐可能加速下殺")
         
         # 流動性風險
-        total_volume = sum(options_data.call_volume) + sum(options_data.put_volume)
-        total_oi = sum(options_data.call_oi) + sum(options_data.put_oi)
+        total_volume = features.total_call_volume + features.total_put_volume
+        total_oi = features.total_call_oi + features.total_put_oi
         
         if total_volume < total_oi * 0.1:
             risks.append("• 今天成交量偏低，流動性不佳可能導致價格跳動")
@@ -34,8 +34,15 @@ class AnalysisRecord:
 class AILearningSystem:
     """AI 學習系統 - 從歷史分析中學習並改進"""
 
-    def __init__(self, data_dir: str = 'data/ai_learning'):
+    def __init__(self, data_dir: str = 'data/ai_learning', read_only: bool = False):
+        """
+        Args:
+            data_dir: 學習資料目錄
+            read_only: 唯讀快照模式，不寫回檔案；新增的記錄暫存於 pending_records，
+                由呼叫端收集後以 add_records 合併（批次平行產生報告時使用）
+        """
         self.data_dir = Path(data_dir)
+        self.read_only = read_only
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
         self.records_file = self.data_dir / 'analysis_records.json'
@@ -48,6 +55,7 @@ class AILearningSystem:
         self.insights: Dict = {}
         self.reference_analyses: List[Dict] = []
         self.settlement_reviews: List[Dict] = []
+        self.pending_records: List[AnalysisRecord] = []
 
         self._load_data()
         self._load_reference_analyses()
@@ -230,6 +238,9 @@ class AILearningSystem:
 
     def _save_data(self):
         """儲存資料"""
+        if self.read_only:
+            return
+
         # 儲存分析記錄
         with open(self.records_file, 'w', encoding='utf-8') as f:
             json.dump([asdict(r) for r in self.records], f, ensure_ascii=False, indent=2)
@@ -240,9 +251,25 @@ class AILearningSystem:
     
     def add_record(self, record: AnalysisRecord):
         """新增分析記錄"""
+        if self.read_only:
+            self.pending_records.append(record)
+            return
+
         self.records.append(record)
         self._save_data()
         self._update_insights()
+
+    def add_records(self, records: List[AnalysisRecord]):
+        """批次新增分析記錄（只寫檔與更新洞察一次）"""
+        if not records:
+            return
+        if self.read_only:
+            self.pending_records.extend(records)
+            return
+
+        self.records.extend(records)
+        self._save_data()
+        self._update_insights()
     
     def _update_insights(self):
         """更新學習洞察"""
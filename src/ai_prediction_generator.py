@@ -3,11 +3,13 @@ AI 交易員預測生成器
 負責生成第一人稱的下個交易日預測
 """
 
-from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import json
 from pathlib import Path
 
+from .contract_features import contract_features
+from .trading_calendar import get_calendar
+
 class AIPredictionGenerator:
     """生成下個交易日的預測"""
     
@@ -31,8 +33,9 @@ class AIPredictionGenerator:
         tx_close = options_data.tx_close or 0
         
         # 計算 PC Ratio (Put OI / Call OI)
-        total_call_oi = sum(options_data.call_oi) if options_data.call_oi else 1
-        total_put_oi = sum(options_data.put_oi) if options_data.put_oi else 1
+        features = contract_features(options_data)
+        total_call_oi = features.total_call_oi if options_data.call_oi else 1
+        total_put_oi = features.total_put_oi if options_data.put_oi else 1
         pc_ratio = total_put_oi / total_call_oi if total_call_oi > 0 else 1.0
         
         # 判斷市場情緒
@@ -73,15 +76,8 @@ class AIPredictionGenerator:
         return prediction
     
     def _get_next_trading_day(self, date_str: str) -> str:
-        """計算下個交易日"""
-        current = datetime.strptime(date_str, "%Y%m%d")
-        next_day = current + timedelta(days=1)
-        
-        # 如果是週五，跳到下週一
-        while next_day.weekday() >= 5:  # 5=Saturday, 6=Sunday
-            next_day += timedelta(days=1)
-        
-        return next_day.strftime("%Y%m%d")
+        """計算下個交易日（排除週末與國定假日）"""
+        return get_calendar().next_trading_day(date_str).strftime("%Y%m%d")
     
     def _generate_market_outlook(self, tx_close: float, pc_ratio: float, insights: Dict) -> str:
         """生成市場展望（第一人稱）"""
@@ -8,7 +8,8 @@ from typing import Dict, Any, List, Optional
 import json
 from pathlib import Path
 
-CALIBRATION_FILE = Path("data/ai_learning/calibration.json")
+from .calibration_store import PARAMS_FILE as CALIBRATION_FILE, load_params
+from .indicator_store import IndicatorSeries
 
 # 預設值（calibration 不存在時使用）
 DEFAULT_HALF_RANGE = {"wednesday": 1000, "friday": 150}
@@ -19,13 +20,8 @@ DEFAULT_SCENARIO_PROBS = {
 
 
 def _load_calibration() -> dict:
-    """載入校準參數"""
-    if CALIBRATION_FILE.exists():
-        try:
-            return json.loads(CALIBRATION_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    return {}
+    """載入精簡的校準參數（與 SettlementPredictor 共用快取）"""
+    return load_params(CALIBRATION_FILE)
 
 
 class AISettlementPrediction:
@@ -102,14 +98,18 @@ class AISettlementPrediction:
         if len(historical_data) < 2:
             return {"trend": "insufficient_data"}
         
-        day1, day2 = historical_data[0], historical_data[1]
+        # 前兩天依列序放進指標序列，首末變化直接查詢
+        series = IndicatorSeries()
+        for index, day in enumerate(historical_data[:2]):
+            series.ingest(str(index), {"close_price": day["tx_close"], "pc_ratio": day["pc_ratio"]})
+        close, pc = series.stats("close_price"), series.stats("pc_ratio")
         
         # 價格趨勢
-        price_change = day2["tx_close"] - day1["tx_close"]
-        price_change_pct = (price_change / day1["tx_close"] * 100) if day1["tx_close"] > 0 else 0
+        price_change = close.change
+        price_change_pct = (price_change / close.first * 100) if close.count >= 2 and close.first > 0 else 0
         
         # PC Ratio 趨勢
-        pc_change = day2["pc_ratio"] - day1["pc_ratio"]
+        pc_change = pc.change
         
         # 判斷趨勢方向
         if abs(price_change_pct) < 0.5:
@@ -8,6 +8,8 @@ from datetime import datetime
 import json
 from pathlib import Path
 
+from .settlement_price import SOURCE_OFFICIAL, SOURCE_RECONSTRUCTED
+
 class AISettlementReview:
     """AI 結算日檢討分析器"""
     
@@ -29,7 +31,7 @@ class AISettlementReview:
         Args:
             settlement_date: 結算日期
             actual_settlement_price: 實際結算價
-            actual_data: 結算日實際數據
+            actual_data: 結算日實際數據（settlement_source 為結算價來源，預設為官方結算價）
             
         Returns:
             檢討報告字典
@@ -44,13 +46,6 @@ class AISettlementReview:
                 "settlement_date": settlement_date
             }
         
-        # 計算準確度
-        accuracy = self._calculate_settlement_accuracy(
-            prediction,
-            actual_settlement_price,
-            actual_data
-        )
-        
         # 生成檢討內容
         review = {
             "settlement_date": settlement_date,
@@ -58,35 +53,74 @@ class AISettlementReview:
             "prediction": prediction,
             "actual_result": {
                 "settlement_price": actual_settlement_price,
+                "settlement_source": actual_data.get("settlement_source", SOURCE_OFFICIAL),
                 "tx_close": actual_data.get("tx_close", actual_settlement_price),
                 "pc_ratio": actual_data.get("pc_ratio", 0),
                 "call_oi": actual_data.get("call_oi", 0),
                 "put_oi": actual_data.get("put_oi", 0),
             },
+            **self._score_review(prediction, actual_settlement_price, actual_data),
+        }
+        
+        # 儲存檢討
+        self._save_review(review)
+        
+        # 更新學習系統
+        self._update_learning_system(review)
+        
+        return review
+    
+    def rescore_review(self, review: Dict, actual_settlement_price: float) -> Dict[str, Any]:
+        """
+        以新的結算價重新評分既有檢討（例如由 5 秒加權指數重建的結算價）
+
+        直接使用檢討內保存的預測，不需連網或重新載入預測檔；
+        只更新結算價（來源記為 reconstructed）與依它計算的欄位，不重複寫入學習記錄
+        
+        Args:
+            review: 既有的檢討報告字典
+            actual_settlement_price: 新的實際結算價
+            
+        Returns:
+            更新後的檢討報告字典
+        """
+        actual_result = {
+            **(review.get("actual_result") or {}),
+            "settlement_price": actual_settlement_price,
+            "settlement_source": SOURCE_RECONSTRUCTED,
+        }
+        rescored = {
+            **review,
+            "actual_result": actual_result,
+            **self._score_review(review["prediction"], actual_settlement_price, actual_result),
+        }
+        self._save_review(rescored)
+        return rescored
+    
+    def _score_review(self, prediction: Dict, actual_price: float, actual_data: Dict) -> Dict[str, Any]:
+        """依實際結算價計算準確度、反思、教訓、改進方向與評分"""
+        accuracy = self._calculate_settlement_accuracy(
+            prediction,
+            actual_price,
+            actual_data
+        )
+        return {
             "accuracy": accuracy,
             "self_reflection": self._generate_settlement_reflection(
                 prediction, 
-                actual_settlement_price, 
+                actual_price, 
                 actual_data,
                 accuracy
             ),
             "lessons_learned": self._extract_settlement_lessons(
                 prediction,
-                actual_settlement_price,
+                actual_price,
                 accuracy
             ),
             "improvement_areas": self._identify_settlement_improvements(accuracy),
             "score": self._calculate_settlement_score(accuracy),
             "review_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-        
-        # 儲存檢討
-        self._save_review(review)
-        
-        # 更新學習系統
-        self._update_learning_system(review)
-        
-        return review
     
     def _calculate_settlement_accuracy(
         self,
@@ -333,6 +367,13 @@ class AISettlementReview:
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(review, f, ensure_ascii=False, indent=2)
+
+        # 增量更新校準參數（只處理這一份檢討，不重新掃描全部歷史）
+        try:
+            from .calibration_store import update_calibration
+            update_calibration([filepath], reviews_dir=self.reviews_dir)
+        except Exception as e:
+            print(f"⚠️  校準參數更新失敗（可執行 analyze_settlement_history.py 補上）: {e}")
     
     def _update_learning_system(self, review: Dict):
         """更新學習系統"""
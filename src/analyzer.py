@@ -3,11 +3,13 @@
 計算 OI 分析、Put/Call Ratio、Max Pain 等指標
 """
 
-import pandas as pd
-import numpy as np
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from typing import Optional, List
+from .lazy_import import lazy_import
 from .parser import OptionsData
+from .contract_features import contract_features
+
+pd = lazy_import('pandas')
 
 
 @dataclass
@@ -41,7 +43,7 @@ class AnalysisResult:
     put_support: List[int]  # 賣權支撐區 (高 OI 價位)
 
     # 原始資料
-    df: pd.DataFrame = None
+    df: 'pd.DataFrame' = None
 
 
 class OptionsAnalyzer:
@@ -60,123 +62,39 @@ class OptionsAnalyzer:
         Returns:
             分析結果
         """
-        df = options_data.to_dataframe()
-
-        # 計算 Put/Call Ratio
-        pc_ratio_volume = self._calculate_pc_ratio(
-            sum(options_data.put_volume),
-            sum(options_data.call_volume)
-        )
-        pc_ratio_oi = self._calculate_pc_ratio(
-            sum(options_data.put_oi),
-            sum(options_data.call_oi)
-        )
-
-        # 計算 Max Pain
-        max_pain, max_pain_value = self._calculate_max_pain(options_data)
-
-        # OI 統計
-        total_call_oi = sum(options_data.call_oi)
-        total_put_oi = sum(options_data.put_oi)
-        call_oi_change = sum(options_data.call_oi_change)
-        put_oi_change = sum(options_data.put_oi_change)
-
-        # 找出關鍵價位
-        call_oi_dict = dict(zip(options_data.strike_prices, options_data.call_oi))
-        put_oi_dict = dict(zip(options_data.strike_prices, options_data.put_oi))
-
-        max_call_oi_strike = max(call_oi_dict, key=call_oi_dict.get) if call_oi_dict else 0
-        max_put_oi_strike = max(put_oi_dict, key=put_oi_dict.get) if put_oi_dict else 0
-
-        # 壓力支撐區 (取 OI 前 3 高的價位)
-        call_resistance = self._get_top_strikes(call_oi_dict, 3)
-        put_support = self._get_top_strikes(put_oi_dict, 3)
+        # 總量、P/C Ratio、Max Pain、關鍵價位與 DataFrame 都由契約特徵向量一次算出（同一份資料只算一次）
+        features = contract_features(options_data)
 
         return AnalysisResult(
             date=options_data.date,
             contract_month=options_data.contract_month,
-            pc_ratio_volume=pc_ratio_volume,
-            pc_ratio_oi=pc_ratio_oi,
-            max_pain=max_pain,
-            max_pain_value=max_pain_value,
-            total_call_oi=total_call_oi,
-            total_put_oi=total_put_oi,
-            call_oi_change=call_oi_change,
-            put_oi_change=put_oi_change,
-            max_call_oi_strike=max_call_oi_strike,
-            max_put_oi_strike=max_put_oi_strike,
-            max_call_oi=call_oi_dict.get(max_call_oi_strike, 0),
-            max_put_oi=put_oi_dict.get(max_put_oi_strike, 0),
-            call_resistance=call_resistance,
-            put_support=put_support,
-            df=df,
+            pc_ratio_volume=features.pc_ratio_volume,
+            pc_ratio_oi=features.pc_ratio_oi,
+            max_pain=features.max_pain,
+            max_pain_value=features.max_pain_value,
+            total_call_oi=features.total_call_oi,
+            total_put_oi=features.total_put_oi,
+            call_oi_change=features.call_oi_change,
+            put_oi_change=features.put_oi_change,
+            max_call_oi_strike=features.max_call_oi_strike,
+            max_put_oi_strike=features.max_put_oi_strike,
+            max_call_oi=features.max_call_oi,
+            max_put_oi=features.max_put_oi,
+            call_resistance=list(features.call_resistance),
+            put_support=list(features.put_support),
+            df=features.dataframe,
         )
 
-    def _calculate_pc_ratio(self, put_value: float, call_value: float) -> float:
-        """
-        計算 Put/Call Ratio
-        """
-        if call_value == 0:
-            return float('inf') if put_value > 0 else 0
-        return round(put_value / call_value, 4)
-
-    def _calculate_max_pain(self, options_data: OptionsData) -> Tuple[int, float]:
-        """
-        計算 Max Pain (最大痛點)
-
-        Max Pain 是讓選擇權買方總損失最大的價位，
-        也就是讓選擇權賣方獲利最大的價位。
-
-        計算方法:
-        對每個可能的結算價，計算所有選擇權的內含價值總和，
-        最小值對應的履約價就是 Max Pain。
-
-        Returns:
-            (max_pain_price, total_pain_value)
-        """
-        strikes = options_data.strike_prices
-        call_oi = options_data.call_oi
-        put_oi = options_data.put_oi
-
-        if not strikes:
-            return 0, 0.0
-
-        pain_values = {}
-
-        for settlement_price in strikes:
-            total_pain = 0
-
-            for i, strike in enumerate(strikes):
-                # Call 的損失 (結算價高於履約價時有價值)
-                call_value = max(0, settlement_price - strike) * call_oi[i]
-
-                # Put 的損失 (結算價低於履約價時有價值)
-                put_value = max(0, strike - settlement_price) * put_oi[i]
-
-                total_pain += (call_value + put_value) * self.multiplier
-
-            pain_values[settlement_price] = total_pain
-
-        # 找出最小痛點 (最小值)
-        max_pain = min(pain_values, key=pain_values.get)
-        max_pain_value = pain_values[max_pain]
-
-        return max_pain, max_pain_value
-
-    def _get_top_strikes(self, oi_dict: dict, n: int = 3) -> List[int]:
-        """
-        取得 OI 最高的前 N 個履約價
-        """
-        sorted_strikes = sorted(oi_dict.items(), key=lambda x: x[1], reverse=True)
-        return [strike for strike, oi in sorted_strikes[:n]]
-
-    def analyze_trend(self, current: AnalysisResult, previous: AnalysisResult = None) -> dict:
+    def analyze_trend(self, current: AnalysisResult, previous: AnalysisResult = None,
+                      options_data: OptionsData = None) -> dict:
         """
         分析趨勢變化
 
         Args:
             current: 當前分析結果
             previous: 前一日分析結果 (可選)
+            options_data: 當日選擇權資料（可選）；提供時由 OI 變化引擎找出同契約前一個資料日，
+                補上逐履約價的 OI 增減與牆位位移，未提供 previous 時也以前一日 OI 推算 P/C Ratio 變化
 
         Returns:
             趨勢分析字典
@@ -201,8 +119,37 @@ class OptionsAnalyzer:
             trend['call_oi_trend'] = 'increasing' if current.call_oi_change > 0 else 'decreasing'
             trend['put_oi_trend'] = 'increasing' if current.put_oi_change > 0 else 'decreasing'
 
+        if options_data is not None:
+            trend.update(self._oi_migration(options_data, include_ratio=previous is None))
+
         return trend
 
+    def _oi_migration(self, options_data: OptionsData, include_ratio: bool) -> dict:
+        """以 OI 變化引擎比較同契約前一個資料日的逐履約價 OI"""
+        from .oi_delta import get_oi_engine
+
+        engine = get_oi_engine()
+        engine.ingest([options_data])
+        code = options_data.contract_code or options_data.contract_month
+        delta = engine.delta(code, options_data.date)
+        if delta is None:
+            return {}
+
+        migration = {
+            'previous_date': delta.previous_date,
+            'call_builds': delta.top_builds('call'),
+            'put_builds': delta.top_builds('put'),
+            'wall_shifts': [shift.description for shift in engine.wall_shifts(code, options_data.date)],
+        }
+        if include_ratio:
+            call_before, put_before = engine.panel(code).oi_on(delta.previous_date)
+            if call_before.sum():
+                previous_ratio = float(put_before.sum() / call_before.sum())
+                migration['pc_ratio_change'] = round(contract_features(options_data).pc_ratio_oi - previous_ratio, 4)
+            migration['call_oi_trend'] = 'increasing' if delta.call_delta.sum() > 0 else 'decreasing'
+            migration['put_oi_trend'] = 'increasing' if delta.put_delta.sum() > 0 else 'decreasing'
+        return migration
+
     def _interpret_pc_ratio(self, pc_ratio: float) -> str:
         """
         解讀 P/C Ratio 的市場意義
@@ -239,7 +186,7 @@ class OptionsAnalyzer:
         }
 
 
-def analyze_from_dataframe(df: pd.DataFrame, date: str = "unknown", contract_month: str = "unknown") -> AnalysisResult:
+def analyze_from_dataframe(df: 'pd.DataFrame', date: str = "unknown", contract_month: str = "unknown") -> AnalysisResult:
     """
     從 DataFrame 進行分析的輔助函數
 
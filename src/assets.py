@@ -0,0 +1,78 @@
+"""
+報告共用靜態資源（CSS / JS）
+- 原始檔放在 templates/assets/，輸出時以內容雜湊命名（report.3f2a1b9c0d.css）
+- 頁面以相對路徑 assets/<指紋檔名> 引用，瀏覽器可跨報告長期快取
+- 指紋檔案內容不會變動，發布時只補上缺少的檔案，舊頁面引用的舊版本保留
+"""
+
+import hashlib
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+
+ASSET_SOURCE_DIR = Path(__file__).parent.parent / "templates" / "assets"
+ASSET_DIRNAME = "assets"
+ASSET_SUFFIXES = ('.css', '.js')
+
+
+@lru_cache(maxsize=None)
+def _fingerprint(name: str, mtime_ns: int, size: int) -> str:
+    """依內容雜湊產生檔名（原始檔變更時 mtime/size 改變，重新計算）"""
+    source = ASSET_SOURCE_DIR / name
+    digest = hashlib.sha256(source.read_bytes()).hexdigest()[:10]
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{digest}{suffix}"
+
+
+def fingerprinted_name(name: str) -> str:
+    """
+    取得資源的指紋檔名
+
+    Args:
+        name: 原始檔名，例如 'report.css'
+
+    Returns:
+        str: 例如 'report.3f2a1b9c0d.css'
+    """
+    stat = (ASSET_SOURCE_DIR / name).stat()
+    return _fingerprint(name, stat.st_mtime_ns, stat.st_size)
+
+
+def asset_url(name: str) -> str:
+    """模板中引用資源的相對網址（頁面與 assets/ 位於同一目錄）"""
+    return f"{ASSET_DIRNAME}/{fingerprinted_name(name)}"
+
+
+def asset_sources() -> List[Path]:
+    """所有資源原始檔"""
+    return sorted(
+        path for path in ASSET_SOURCE_DIR.glob('*')
+        if path.suffix in ASSET_SUFFIXES
+    )
+
+
+def publish_assets(target_dir) -> List[Path]:
+    """
+    將指紋資源發布到輸出目錄的 assets/（已存在者略過）
+
+    Args:
+        target_dir: 報告輸出目錄（reports/ 或 docs/）
+
+    Returns:
+        list: 本次新寫入的檔案
+    """
+    asset_dir = Path(target_dir) / ASSET_DIRNAME
+    written = []
+    for source in asset_sources():
+        target = asset_dir / fingerprinted_name(source.name)
+        if target.exists():
+            continue
+        asset_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
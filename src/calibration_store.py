@@ -0,0 +1,456 @@
+"""
+增量校準
+每份結算檢討只處理一次，校準參數由累加器直接導出，不再每次重新載入所有檢討：
+- 誤差分位數使用可合併的分位數草圖（DDSketch：對數分桶，相對誤差 1%，可加入、移除與合併）
+- 平均、標準差、命中率等以累加的總和與次數計算
+- 輸出拆成三份：
+  calibration.json            精簡的校準參數（預測器只載入這份，大小不隨歷史筆數成長）
+  calibration_state.json      累加器與已處理的檢討清單（增量更新時載入）
+  calibration_archive.jsonl   每份檢討抽出的明細（只附加，供後續分析與重建）
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .file_lock import file_lock
+
+AI_LEARNING_DIR = Path(__file__).parent.parent / "data" / "ai_learning"
+PARAMS_FILE = AI_LEARNING_DIR / "calibration.json"
+STATE_FILE = AI_LEARNING_DIR / "calibration_state.json"
+ARCHIVE_FILE = AI_LEARNING_DIR / "calibration_archive.jsonl"
+LOCK_FILE = AI_LEARNING_DIR / "calibration.lock"
+REVIEWS_DIR = AI_LEARNING_DIR / "settlement_reviews"
+
+STATE_VERSION = 1
+SKETCH_ALPHA = 0.01
+
+# 建議區間半徑：P75 誤差取整到 50 點，限制在 100～150 點
+# 上限 150 點：台股單日振幅通常在 100-300 點，±150 已是合理上限
+# 下限 100 點：避免區間過窄導致命中率太低
+MAX_HALF_RANGE = 150
+MIN_HALF_RANGE = 100
+
+# PC Ratio 分組（使用適合台指選擇權的區間，台指週選的 PC Ratio 範圍通常較廣 0.5 ~ 3.0+）
+PC_BINS = (
+    ("pc_lt_0.8", "極度看多 (<0.8)", 0.8),
+    ("pc_0.8_1.2", "中性 (0.8-1.2)", 1.2),
+    ("pc_1.2_1.8", "偏空 (1.2-1.8)", 1.8),
+    ("pc_gt_1.8", "極度看空 (>1.8)", math.inf),
+)
+
+SCENARIO_PRIORS = {"in_range": 60.0, "breakout_up": 20.0, "breakout_down": 20.0}
+
+
+class QuantileSketch:
+    """可合併的分位數草圖（DDSketch），適用非負數值"""
+
+    def __init__(self, alpha: float = SKETCH_ALPHA, bins: Optional[Dict[int, int]] = None, zero: int = 0):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = dict(bins or {})
+        self.zero = zero  # 0（以及極小值）的次數
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.bins.values())
+
+    def add(self, value: float, weight: int = 1):
+        """加入數值（weight 為負數時移除先前加入的數值）"""
+        if value <= 0:
+            self.zero += weight
+            return
+        self.add_bucket(math.ceil(math.log(value) / self._log_gamma), weight)
+
+    def merge(self, other: 'QuantileSketch'):
+        """合併另一份相同 alpha 的草圖"""
+        if other.alpha != self.alpha:
+            raise ValueError("只能合併相同精度的分位數草圖")
+        self.zero += other.zero
+        for key, count in other.bins.items():
+            self.add_bucket(key, count)
+
+    def add_bucket(self, key: int, count: int):
+        """第 key 個對數分桶加上 count（歸零時移除）"""
+        total = self.bins.get(key, 0) + count
+        if total:
+            self.bins[key] = total
+        else:
+            self.bins.pop(key, None)
+
+    def _value_at(self, rank: int) -> float:
+        """排序後第 rank 個數值（0 起算）的近似值"""
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """第 q 分位數（0～1），與 np.percentile 相同在相鄰兩個數值間線性內插，相對誤差不超過 alpha"""
+        total = self.count
+        if total <= 0:
+            return None
+        position = q * (total - 1)
+        lower = math.floor(position)
+        low_value = self._value_at(lower)
+        if position == lower:
+            return low_value
+        return low_value + (self._value_at(lower + 1) - low_value) * (position - lower)
+
+    def to_dict(self) -> Dict:
+        return {"alpha": self.alpha, "zero": self.zero, "bins": {str(k): v for k, v in sorted(self.bins.items())}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        return cls(data.get("alpha", SKETCH_ALPHA), {int(k): v for k, v in data.get("bins", {}).items()},
+                   data.get("zero", 0))
+
+
+@dataclass
+class WeekdayAccumulator:
+    """單一週別的誤差與命中累加器"""
+    count: int = 0
+    error_sum: float = 0.0
+    error_sq_sum: float = 0.0
+    direction_hits: int = 0
+    range_hits: int = 0
+    accuracy_sum: float = 0.0
+    errors: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, record: Dict, sign: int = 1):
+        error = record["price_error"]
+        self.count += sign
+        self.error_sum += sign * error
+        self.error_sq_sum += sign * error * error
+        self.direction_hits += sign * bool(record.get("direction_correct"))
+        self.range_hits += sign * bool(record.get("in_range"))
+        self.accuracy_sum += sign * (record.get("overall_accuracy") or 0)
+        self.errors.add(error, sign)
+
+    def stats(self) -> Dict:
+        if self.count <= 0:
+            return {"count": 0}
+        mean = self.error_sum / self.count
+        std = math.sqrt(max(self.error_sq_sum / self.count - mean * mean, 0.0))
+        p75 = self.errors.quantile(0.75)
+        raw_range = int(math.ceil(p75 / 50) * 50)
+        return {
+            "count": self.count,
+            "error_stats": {
+                "mean": round(mean, 1),
+                "median": round(self.errors.quantile(0.5), 1),
+                "std": round(std, 1),
+                "p75": round(p75, 1),
+                "p90": round(self.errors.quantile(0.9), 1),
+                "max": round(self.errors.quantile(1.0), 1),
+            },
+            "direction_accuracy": round(self.direction_hits / self.count * 100, 1),
+            "interval_hit_rate": round(self.range_hits / self.count * 100, 1),
+            "avg_accuracy": round(self.accuracy_sum / self.count, 1),
+            "recommended_half_range": max(MIN_HALF_RANGE, min(MAX_HALF_RANGE, raw_range)),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count, "error_sum": self.error_sum, "error_sq_sum": self.error_sq_sum,
+            "direction_hits": self.direction_hits, "range_hits": self.range_hits,
+            "accuracy_sum": self.accuracy_sum, "errors": self.errors.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WeekdayAccumulator':
+        return cls(**{**data, "errors": QuantileSketch.from_dict(data.get("errors", {}))})
+
+
+@dataclass
+class PCBucketAccumulator:
+    """單一 PC Ratio 區間的結算方向累加器"""
+    count: int = 0
+    up: int = 0
+    down: int = 0
+    change_sum: float = 0.0
+
+    def add(self, record: Dict, sign: int = 1):
+        self.count += sign
+        self.up += sign * (record["actual_direction"] == "up")
+        self.down += sign * (record["actual_direction"] == "down")
+        self.change_sum += sign * record["price_change"]
+
+    def stats(self, label: str) -> Dict:
+        if self.count <= 0:
+            return {"label": label, "count": 0}
+        return {
+            "label": label,
+            "count": self.count,
+            "up_rate": round(self.up / self.count * 100, 1),
+            "down_rate": round(self.down / self.count * 100, 1),
+            "avg_price_change": round(self.change_sum / self.count, 0),
+        }
+
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "up": self.up, "down": self.down, "change_sum": self.change_sum}
+
+
+def pc_bin(pc_ratio: float) -> str:
+    for key, _, upper in PC_BINS:
+        if pc_ratio < upper:
+            return key
+    return PC_BINS[-1][0]
+
+
+def review_records(review: Dict) -> Dict:
+    """
+    從一份結算檢討抽出校準需要的明細
+
+    Returns:
+        {'date', 'weekday': 誤差明細或 None, 'pc': PC Ratio 方向明細或 None}
+    """
+    wday = str(review.get("weekday", "")).lower()
+    acc = review.get("accuracy", {}) or {}
+    pred = review.get("prediction", {}) or {}
+    actual = review.get("actual_result", {}) or {}
+    hist = pred.get("historical_data", []) or []
+
+    weekday_record = None
+    price_error = acc.get("price_error")
+    actual_price = acc.get("actual_price") or actual.get("settlement_price")
+    if wday in ("wednesday", "friday") and price_error is not None and actual_price is not None:
+        weekday_record = {
+            "weekday": wday,
+            "price_error": abs(price_error),
+            "direction_correct": acc.get("direction_correct"),
+            "in_range": acc.get("in_predicted_range"),
+            # 取預測當下的 PC Ratio（歷史數據第2天）
+            "pc_ratio": hist[-1].get("pc_ratio") if hist else None,
+            "predicted_price": acc.get("predicted_price") or pred.get("settlement_price_prediction", {}).get("predicted_price"),
+            "actual_price": actual_price,
+            "overall_accuracy": acc.get("overall_accuracy", 0),
+        }
+
+    pc_record = None
+    if hist:
+        pc_ratio = hist[-1].get("pc_ratio")
+        prev_close = hist[-1].get("tx_close")
+        settle = actual.get("settlement_price") or acc.get("actual_price")
+        if pc_ratio is not None and prev_close is not None and settle is not None:
+            # 結算相對前一收盤的方向
+            direction = "up" if settle > prev_close else "down" if settle < prev_close else "flat"
+            pc_record = {
+                "bin": pc_bin(pc_ratio),
+                "pc_ratio": pc_ratio,
+                "prev_close": prev_close,
+                "actual_price": settle,
+                "actual_direction": direction,
+                "price_change": settle - prev_close,
+                "price_change_pct": round((settle - prev_close) / prev_close * 100, 2),
+            }
+
+    return {"date": review.get("settlement_date"), "weekday": weekday_record, "pc": pc_record}
+
+
+@dataclass
+class CalibrationState:
+    """增量校準的累加器與已處理的檢討（檔名 -> 內容雜湊）"""
+    reviews: Dict[str, str] = field(default_factory=dict)
+    weekday: Dict[str, WeekdayAccumulator] = field(
+        default_factory=lambda: {"wednesday": WeekdayAccumulator(), "friday": WeekdayAccumulator()})
+    pc: Dict[str, PCBucketAccumulator] = field(
+        default_factory=lambda: {key: PCBucketAccumulator() for key, _, _ in PC_BINS})
+
+    def add(self, records: Dict, sign: int = 1):
+        if records.get("weekday"):
+            self.weekday[records["weekday"]["weekday"]].add(records["weekday"], sign)
+        if records.get("pc"):
+            self.pc[records["pc"]["bin"]].add(records["pc"], sign)
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": STATE_VERSION,
+            "reviews": dict(sorted(self.reviews.items())),
+            "weekday": {key: acc.to_dict() for key, acc in self.weekday.items()},
+            "pc": {key: acc.to_dict() for key, acc in self.pc.items()},
+        }
+
+    @classmethod
+    def load(cls, path: Path = STATE_FILE) -> 'CalibrationState':
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != STATE_VERSION:
+            return cls()
+        state = cls(reviews=data.get("reviews", {}))
+        for key, value in data.get("weekday", {}).items():
+            state.weekday[key] = WeekdayAccumulator.from_dict(value)
+        for key, value in data.get("pc", {}).items():
+            state.pc[key] = PCBucketAccumulator(**value)
+        return state
+
+    def params(self) -> Dict:
+        """精簡的校準參數（不含逐筆明細）"""
+        weekday_stats = {key: acc.stats() for key, acc in self.weekday.items()}
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "source_count": len(self.reviews),
+            "weekday": weekday_stats,
+            "pc_ratio_direction": {key: self.pc[key].stats(label) for key, label, _ in PC_BINS},
+            "scenario_probabilities": compute_scenario_probabilities(weekday_stats),
+        }
+
+
+def compute_scenario_probabilities(weekday_stats: Dict) -> Dict:
+    """
+    根據歷史數據計算情境機率（取代固定的 60/20/20）
+    目前樣本小，保守地混合歷史觀察與先驗機率
+    """
+    result = {}
+    for wday, stats in weekday_stats.items():
+        if stats.get("count", 0) < 3:
+            result[wday] = SCENARIO_PRIORS.copy()
+            continue
+
+        # 混合：歷史數據 40% + 先驗 60%（樣本太小，保守混合）
+        blended_in_range = stats["interval_hit_rate"] * 0.4 + SCENARIO_PRIORS["in_range"] * 0.6
+        remaining = 100 - blended_in_range
+
+        result[wday] = {
+            "in_range": round(blended_in_range, 1),
+            "breakout_up": round(remaining / 2, 1),
+            "breakout_down": round(remaining / 2, 1),
+            "note": f"基於 {stats['count']} 筆歷史記錄（混合先驗）",
+        }
+    return result
+
+
+_params_cache: Dict[str, tuple] = {}
+
+
+def load_params(path: Path = PARAMS_FILE) -> Dict:
+    """
+    載入精簡的校準參數（依修改時間快取，同一行程內多個預測器共用）
+
+    Returns:
+        dict: 校準參數，檔案不存在或格式錯誤時為空字典（呼叫端不應修改）
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _params_cache.get(str(path))
+    if cached and cached[0] == key:
+        return cached[1]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    _params_cache[str(path)] = (key, data)
+    return data
+
+
+def _write_json(path: Path, data: Dict, indent: Optional[int] = 2):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def update_params(sections: Dict, path: Path = PARAMS_FILE):
+    """更新校準參數中的部分區塊（例如參數掃描的 settlement_params），其餘保留"""
+    with file_lock(LOCK_FILE):
+        params = dict(load_params(path))
+        params.update(sections)
+        _write_json(Path(path), params)
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha1(content).hexdigest()[:16]
+
+
+@dataclass
+class CalibrationUpdate:
+    """一次增量更新的結果"""
+    added: List[str] = field(default_factory=list)
+    rebuilt: bool = False
+    params: Dict = field(default_factory=dict)
+
+
+def update_calibration(paths: Optional[Iterable[Path]] = None, rebuild: bool = False,
+                       reviews_dir: Path = REVIEWS_DIR) -> CalibrationUpdate:
+    """
+    增量更新校準參數
+
+    Args:
+        paths: 新增或重新產生的檢討檔（預設掃描 settlement_reviews 中尚未處理的檔名）
+        rebuild: 清除累加器並重新處理所有檢討
+        reviews_dir: 檢討目錄
+
+    Returns:
+        CalibrationUpdate: 新處理的檢討與最新參數
+
+    指定的檢討若已處理過但內容改變，無法只扣除舊的明細（分位數草圖可移除，但舊明細需從封存檔找回），
+    此時自動改為重建
+    """
+    with file_lock(LOCK_FILE):
+        state = CalibrationState() if rebuild else CalibrationState.load()
+
+        if paths is None:
+            candidates = sorted(Path(reviews_dir).glob("settlement_review_*.json"))
+            pending = [path for path in candidates if path.name not in state.reviews]
+        else:
+            pending = []
+            for path in map(Path, paths):
+                digest = state.reviews.get(path.name)
+                if digest is None:
+                    pending.append(path)
+                elif digest != _digest(path.read_bytes()):
+                    rebuild = True
+            if rebuild:
+                state = CalibrationState()
+        if rebuild:
+            pending = sorted(Path(reviews_dir).glob("settlement_review_*.json"))
+
+        added, archive_lines = [], []
+        for path in pending:
+            try:
+                content = path.read_bytes()
+                review = json.loads(content)
+            except (OSError, ValueError) as e:
+                print(f"  跳過 {path.name}: {e}")
+                continue
+            records = review_records(review)
+            state.add(records)
+            state.reviews[path.name] = _digest(content)
+            added.append(path.name)
+            archive_lines.append(json.dumps({"file": path.name, **records}, ensure_ascii=False))
+
+        result = CalibrationUpdate(added=added, rebuilt=rebuild)
+        previous = load_params()
+        if not archive_lines and not rebuild and previous:
+            result.params = previous
+            return result
+
+        ARCHIVE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(ARCHIVE_FILE, "w" if rebuild else "a", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in archive_lines)
+        _write_json(STATE_FILE, state.to_dict(), indent=None)
+
+        params = state.params()
+        # 保留其他工具寫入的區塊（例如參數掃描的 settlement_params）
+        for key, value in previous.items():
+            params.setdefault(key, value)
+        _write_json(PARAMS_FILE, params)
+        result.params = params
+        return result
+
@@ -0,0 +1,103 @@
+"""
+報告表格資料（sidecar JSON）
+- 每個契約的履約價 / OI / OI 變化輸出成一個獨立 JSON，不再展開成頁面中的 HTML 表格
+- 整數陣列以差分編碼（第一個值為原值，其後為與前一個值的差），履約價間距固定時幾乎都是重複的小數字
+- 頁面切換到包含表格的 Tab 時才由 report.js 下載並產生表格
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .parser import OptionsData
+
+
+CHART_DATA_DIRNAME = "chart_data"
+CHART_DATA_VERSION = 1
+
+# 差分編碼的欄位
+ENCODED_FIELDS = ('strikes', 'call_oi', 'call_oi_change', 'put_oi', 'put_oi_change')
+
+
+def delta_encode(values: List[int]) -> List[int]:
+    """[a, b, c] -> [a, b-a, c-b]"""
+    encoded = []
+    previous = 0
+    for value in values:
+        value = int(value)
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def build_chart_data(
+    options_data: OptionsData,
+    contract_code: str,
+    max_pain: int,
+    max_call_oi_strike: int,
+    max_put_oi_strike: int,
+    closest_strike: Optional[int] = None,
+    close: Optional[float] = None
+) -> Dict:
+    """
+    組成單一契約的表格資料
+
+    Args:
+        options_data: 契約資料
+        contract_code: 契約代號
+        max_pain / max_call_oi_strike / max_put_oi_strike: 表格標示的關鍵履約價
+        closest_strike: 最接近收盤價的履約價（多契約表格以 ▼ 標示）
+        close: 收盤價（單一契約表格標示與收盤價相同的履約價）
+
+    Returns:
+        dict: 可直接寫成 JSON 的資料
+    """
+    columns = {
+        'strikes': options_data.strike_prices,
+        'call_oi': options_data.call_oi,
+        'call_oi_change': options_data.call_oi_change,
+        'put_oi': options_data.put_oi,
+        'put_oi_change': options_data.put_oi_change,
+    }
+    return {
+        'v': CHART_DATA_VERSION,
+        'contract_code': contract_code,
+        'marks': {
+            'max_pain': max_pain,
+            'max_call': max_call_oi_strike,
+            'max_put': max_put_oi_strike,
+            'closest': closest_strike,
+            'close': close,
+        },
+        **{field: delta_encode(columns[field]) for field in ENCODED_FIELDS},
+    }
+
+
+def chart_data_path(page_path: Path, contract_code: str) -> Path:
+    """頁面對應的資料檔：<頁面目錄>/chart_data/<頁面檔名>.<契約代號>.json"""
+    page_path = Path(page_path)
+    return page_path.parent / CHART_DATA_DIRNAME / f"{page_path.stem}.{contract_code}.json"
+
+
+def write_chart_data(page_path: Path, data: Dict) -> str:
+    """
+    寫入契約表格資料（內容未變時不覆寫，保留 mtime 供同步判斷）
+
+    Args:
+        page_path: 報告頁面路徑
+        data: build_chart_data 的結果
+
+    Returns:
+        str: 頁面引用資料檔的相對網址
+    """
+    path = chart_data_path(page_path, data['contract_code'])
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+    if not path.exists() or path.read_text(encoding='utf-8') != content:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    return f"{CHART_DATA_DIRNAME}/{path.name}"
@@ -0,0 +1,224 @@
+"""
+契約特徵向量
+同一份 OptionsData 在報告流程中會被 OptionsAnalyzer、SettlementAnalyzer、AIDailyAnalyzer、
+AIPredictionGenerator 與 ReportGenerator 重複加總、找最大值、排序與建立履約價對照表；
+這裡以 numpy 一次算出所有衍生指標並記在 OptionsData 上，各分析器共用同一份結果：
+- 總量：Call / Put 未平倉、成交量、OI 變化與 P/C Ratio
+- 牆位：最大 Call / Put / 總 OI 履約價、OI 變化最大的履約價、前 3 大壓力與支撐
+- 痛點曲線：每個履約價做為結算價時的買方內含價值，Max Pain 為其最小值
+- 集中度：前 3 大履約價佔總 OI 的比例
+- 偏斜：OI 加權平均履約價，以及價外 Put / Call OI 的相對差
+- 與現價距離：最接近收盤價的履約價、收盤價到 Max Pain 與兩道牆的距離
+
+OptionsData 的欄位被整個換掉（例如 parser 事後補上 tx_close）時會自動重算
+"""
+
+from dataclasses import dataclass, field, fields
+from functools import cached_property
+from typing import Dict, List, Optional
+
+from .lazy_import import lazy_import
+from .parser import OptionsData
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+MULTIPLIER = 50  # 台指選擇權每點 50 元
+TOP_N = 3
+
+_ARRAY_FIELDS = ('strike_prices', 'call_volume', 'call_oi', 'call_oi_change',
+                 'put_volume', 'put_oi', 'put_oi_change')
+
+
+def _pc_ratio(put_value: float, call_value: float) -> float:
+    """P/C Ratio（與 OptionsAnalyzer 原本的算法相同：Call 為 0 時回傳 inf 或 0）"""
+    if call_value == 0:
+        return float('inf') if put_value > 0 else 0
+    return round(put_value / call_value, 4)
+
+
+def _top_strikes(strikes: 'np.ndarray', values: 'np.ndarray', n: int = TOP_N) -> List[int]:
+    """數值最大的前 N 個履約價（同值時保留履約價順序，與 sorted(..., reverse=True) 相同）"""
+    order = np.argsort(-values, kind='stable')[:n]
+    return [int(strikes[i]) for i in order]
+
+
+def _concentration(oi: 'np.ndarray', n: int = TOP_N) -> float:
+    """前 N 大履約價佔總 OI 的比例"""
+    total = int(oi.sum())
+    return round(int(np.sort(oi)[-n:].sum()) / total, 4) if total else 0.0
+
+
+@dataclass
+class ContractFeatures:
+    """單一契約的衍生指標（陣列欄位為唯讀的 numpy 陣列）"""
+    strikes: 'np.ndarray'
+    call_oi: 'np.ndarray'
+    put_oi: 'np.ndarray'
+
+    # 總量
+    total_call_oi: int
+    total_put_oi: int
+    total_call_volume: int
+    total_put_volume: int
+    call_oi_change: int
+    put_oi_change: int
+    pc_ratio_oi: float
+    pc_ratio_volume: float
+
+    # 牆位
+    max_call_oi_strike: int
+    max_put_oi_strike: int
+    max_call_oi: int
+    max_put_oi: int
+    max_total_oi_strike: int
+    max_oi_change_strike: int
+    call_resistance: List[int]
+    put_support: List[int]
+
+    # 痛點曲線（每個履約價做為結算價時的買方內含價值，元）
+    pain_curve: 'np.ndarray'
+    max_pain: int
+    max_pain_value: float
+
+    # 集中度與偏斜
+    call_concentration: float      # 前 3 大 Call OI 佔總 Call OI 比例
+    put_concentration: float       # 前 3 大 Put OI 佔總 Put OI 比例
+    call_centroid: Optional[float]  # Call OI 加權平均履約價
+    put_centroid: Optional[float]   # Put OI 加權平均履約價
+
+    # 與現價距離（沒有收盤價時為 None）
+    spot: Optional[float] = None
+    closest_strike: Optional[int] = None
+    max_pain_distance: Optional[float] = None   # 收盤價 - Max Pain
+    call_wall_distance: Optional[float] = None  # 最大 Call OI 履約價 - 收盤價
+    put_wall_distance: Optional[float] = None   # 收盤價 - 最大 Put OI 履約價
+    otm_skew: Optional[float] = None            # (價外 Put OI - 價外 Call OI) / 兩者合計，正值代表下檔避險較重
+
+    source: Optional[OptionsData] = field(default=None, repr=False, compare=False)
+
+    @cached_property
+    def dataframe(self) -> 'pd.DataFrame':
+        """原始資料的 DataFrame（AnalysisResult.df 共用同一份，不要就地修改）"""
+        return self.source.to_dataframe()
+
+    @property
+    def critical_strikes(self) -> List[int]:
+        """關鍵履約價：最大 Call / Put / 總 OI 與 OI 變化最大的履約價（去重排序）"""
+        if not len(self.strikes):
+            return []
+        return sorted({self.max_call_oi_strike, self.max_put_oi_strike,
+                       self.max_total_oi_strike, self.max_oi_change_strike})
+
+    def to_dict(self) -> Dict:
+        """純量指標（不含陣列），供記錄或 JSON 輸出"""
+        return {f.name: getattr(self, f.name) for f in fields(self)
+                if f.name != 'source' and not isinstance(getattr(self, f.name), np.ndarray)}
+
+
+def _is_current(options: OptionsData, sources: tuple) -> bool:
+    """快取是否仍有效：欄位物件（以 is 比較）與收盤價都沒換過"""
+    return (options.tx_close == sources[-1]
+            and all(getattr(options, name) is source for name, source in zip(_ARRAY_FIELDS, sources)))
+
+
+def compute_features(options: OptionsData) -> ContractFeatures:
+    """以 numpy 一次算出契約的所有衍生指標（不使用快取）"""
+    call_oi_all = np.asarray(options.call_oi, dtype=np.int64)
+    put_oi_all = np.asarray(options.put_oi, dtype=np.int64)
+    call_change = np.asarray(options.call_oi_change, dtype=np.int64)
+    put_change = np.asarray(options.put_oi_change, dtype=np.int64)
+
+    # 以履約價對應的指標只取各欄等長的部分（與原本 dict(zip(...)) 的行為相同）
+    size = min(len(options.strike_prices), len(call_oi_all), len(put_oi_all))
+    strikes = np.asarray(options.strike_prices[:size], dtype=np.int64)
+    call_oi, put_oi = call_oi_all[:size], put_oi_all[:size]
+    for array in (strikes, call_oi, put_oi):
+        array.flags.writeable = False
+
+    total_call_oi = int(call_oi_all.sum())
+    total_put_oi = int(put_oi_all.sum())
+    total_call_volume = int(sum(options.call_volume))
+    total_put_volume = int(sum(options.put_volume))
+
+    if size:
+        # 痛點曲線：(結算價, 履約價) 的內含價值矩陣沿履約價加總
+        diff = strikes[:, None] - strikes[None, :]
+        pain_curve = (np.maximum(diff, 0) @ call_oi + np.maximum(-diff, 0) @ put_oi) * MULTIPLIER
+        pain_curve.flags.writeable = False
+        pain_index = int(np.argmin(pain_curve))
+        max_pain, max_pain_value = int(strikes[pain_index]), int(pain_curve[pain_index])
+
+        call_index, put_index = int(np.argmax(call_oi)), int(np.argmax(put_oi))
+        max_call_oi_strike, max_put_oi_strike = int(strikes[call_index]), int(strikes[put_index])
+        max_call_oi, max_put_oi = int(call_oi[call_index]), int(put_oi[put_index])
+        max_total_oi_strike = int(strikes[np.argmax(call_oi + put_oi)])
+        changed = min(size, len(call_change), len(put_change))
+        change = np.abs(call_change[:changed]) + np.abs(put_change[:changed])
+        max_oi_change_strike = int(strikes[np.argmax(change)]) if changed else max_total_oi_strike
+    else:
+        pain_curve = np.zeros(0, dtype=np.int64)
+        max_pain, max_pain_value = 0, 0.0
+        max_call_oi_strike = max_put_oi_strike = max_call_oi = max_put_oi = 0
+        max_total_oi_strike = max_oi_change_strike = 0
+
+    call_resistance = _top_strikes(strikes, call_oi)
+    put_support = _top_strikes(strikes, put_oi)
+
+    features = ContractFeatures(
+        strikes=strikes,
+        call_oi=call_oi,
+        put_oi=put_oi,
+        total_call_oi=total_call_oi,
+        total_put_oi=total_put_oi,
+        total_call_volume=total_call_volume,
+        total_put_volume=total_put_volume,
+        call_oi_change=int(call_change.sum()),
+        put_oi_change=int(put_change.sum()),
+        pc_ratio_oi=_pc_ratio(total_put_oi, total_call_oi),
+        pc_ratio_volume=_pc_ratio(total_put_volume, total_call_volume),
+        max_call_oi_strike=max_call_oi_strike,
+        max_put_oi_strike=max_put_oi_strike,
+        max_call_oi=max_call_oi,
+        max_put_oi=max_put_oi,
+        max_total_oi_strike=max_total_oi_strike,
+        max_oi_change_strike=max_oi_change_strike,
+        call_resistance=call_resistance,
+        put_support=put_support,
+        pain_curve=pain_curve,
+        max_pain=max_pain,
+        max_pain_value=max_pain_value,
+        call_concentration=_concentration(call_oi),
+        put_concentration=_concentration(put_oi),
+        call_centroid=float(strikes @ call_oi / call_oi.sum()) if call_oi.sum() else None,
+        put_centroid=float(strikes @ put_oi / put_oi.sum()) if put_oi.sum() else None,
+        source=options,
+    )
+
+    spot = options.tx_close
+    if spot and size:
+        features.spot = float(spot)
+        features.closest_strike = int(strikes[np.argmin(np.abs(strikes - spot))])
+        features.max_pain_distance = float(spot - max_pain)
+        features.call_wall_distance = float(max_call_oi_strike - spot)
+        features.put_wall_distance = float(spot - max_put_oi_strike)
+        otm_put = int(put_oi[strikes < spot].sum())
+        otm_call = int(call_oi[strikes > spot].sum())
+        if otm_put + otm_call:
+            features.otm_skew = round((otm_put - otm_call) / (otm_put + otm_call), 4)
+    return features
+
+
+def contract_features(options: OptionsData) -> ContractFeatures:
+    """
+    取得契約的衍生指標（同一份 OptionsData 只計算一次）
+
+    結果記在 OptionsData 實例上（非 dataclass 欄位，不影響 asdict / 比較 / 快照）
+    """
+    cached = options.__dict__.get('_features')
+    if cached is not None and _is_current(options, cached[0]):
+        return cached[1]
+    features = compute_features(options)
+    sources = tuple(getattr(options, name) for name in _ARRAY_FIELDS) + (options.tx_close,)
+    options.__dict__['_features'] = (sources, features)
+    return features
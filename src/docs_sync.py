@@ -0,0 +1,218 @@
+"""
+reports/ -> docs/ 同步引擎
+- 快取每個檔案的 (大小, mtime_ns, SHA-256)，大小與 mtime 都沒變時直接沿用快取的雜湊
+- 需要重新計算的雜湊以執行緒池平行處理（hashlib 計算時會釋放 GIL）
+- 以硬連結取代複製：docs/ 與 reports/ 共用同一份檔案內容；跨檔案系統等無法連結時才複製
+- 來源與目標已是同一個檔案（同一 inode）時不需比對
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .assets import ASSET_DIRNAME
+from .chart_data import CHART_DATA_DIRNAME
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REPORTS_DIR = PROJECT_ROOT / "reports"
+DOCS_DIR = PROJECT_ROOT / "docs"
+# 雜湊快取只對本機的 mtime 有意義，不納入版本控制
+SYNC_CACHE_FILE = PROJECT_ROOT / ".cache" / "docs_sync.json"
+
+# 需要重新計算的檔案少於此數量時不開執行緒池
+PARALLEL_HASH_MIN_FILES = 4
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_file(source: Path, target: Path, link: bool = True) -> str:
+    """
+    讓 target 指向與 source 相同的內容：優先建立硬連結，無法連結時複製
+
+    先在目標目錄建立暫存檔再置換，讀取中的網頁伺服器不會看到寫到一半的檔案。
+
+    Args:
+        source: 來源檔案
+        target: 目標路徑
+        link: False 時一律複製
+
+    Returns:
+        str: 'link' 或 'copy'
+    """
+    source, target = Path(source), Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    method = 'copy'
+    if link:
+        try:
+            os.link(source, tmp_path)
+            method = 'link'
+        except OSError:
+            pass
+    if method == 'copy':
+        shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+    return method
+
+
+@dataclass
+class SyncItem:
+    """一個需要同步的檔案"""
+    source: Path
+    target: Path
+    reason: str
+
+
+class DocsSync:
+    """以雜湊快取比對 reports/ 與 docs/ 的同步引擎"""
+
+    def __init__(self, reports_dir: Path = REPORTS_DIR, docs_dir: Path = DOCS_DIR,
+                 cache_file: Path = SYNC_CACHE_FILE, link: bool = True, workers: int = None):
+        """
+        Args:
+            reports_dir: 來源目錄
+            docs_dir: 目標目錄
+            cache_file: 雜湊快取檔
+            link: 是否以硬連結同步（False 時一律複製）
+            workers: 平行計算雜湊的執行緒數（預設依 CPU 核心數）
+        """
+        self.reports_dir = Path(reports_dir)
+        self.docs_dir = Path(docs_dir)
+        self.cache_file = Path(cache_file)
+        self.link = link
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.cache: Dict[str, List] = self._load_cache()
+        self.hashed = 0  # 本次實際計算雜湊的檔案數
+
+    def _load_cache(self) -> Dict[str, List]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """寫回雜湊快取（只保留仍存在的檔案）"""
+        self.cache = {key: entry for key, entry in self.cache.items() if Path(key).exists()}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_file.with_name(f".{self.cache_file.name}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"⚠️  無法寫入同步快取 {self.cache_file}: {e}")
+
+    def sources(self, patterns: Iterable[str] = ('*.html',)) -> List[Path]:
+        """
+        需要同步的來源檔案：符合樣式的報告、報告的表格資料，以及共用 CSS/JS
+
+        Args:
+            patterns: reports/ 內報告的檔名樣式
+        """
+        pages = sorted({path for pattern in patterns for path in self.reports_dir.glob(pattern)})
+        data_files = sorted(
+            data_file
+            for page in pages
+            for data_file in (self.reports_dir / CHART_DATA_DIRNAME).glob(f"{page.stem}.*.json")
+        )
+        asset_files = sorted((self.reports_dir / ASSET_DIRNAME).glob('*'))
+        return pages + data_files + asset_files
+
+    def target_for(self, source: Path) -> Path:
+        return self.docs_dir / Path(source).relative_to(self.reports_dir)
+
+    def _cached_hash(self, path: Path, stat: os.stat_result) -> Optional[str]:
+        entry = self.cache.get(str(path))
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def _hash_all(self, paths: List[Tuple[Path, os.stat_result]]) -> Dict[Path, str]:
+        """計算快取失效的檔案雜湊（數量多時平行計算）"""
+        hashes = {}
+        missing = []
+        for path, stat in paths:
+            cached = self._cached_hash(path, stat)
+            if cached:
+                hashes[path] = cached
+            else:
+                missing.append((path, stat))
+
+        if len(missing) >= PARALLEL_HASH_MIN_FILES and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                digests = list(pool.map(_sha256, [path for path, _ in missing]))
+        else:
+            digests = [_sha256(path) for path, _ in missing]
+
+        for (path, stat), digest in zip(missing, digests):
+            self.cache[str(path)] = [stat.st_size, stat.st_mtime_ns, digest]
+            hashes[path] = digest
+        self.hashed += len(missing)
+        return hashes
+
+    def plan(self, sources: Iterable[Path], force: bool = False) -> List[SyncItem]:
+        """
+        比對來源與目標，列出需要同步的檔案
+
+        大小不同即判定不同；同一 inode 即判定相同；其餘才比較雜湊（優先使用快取）。
+        """
+        items = []
+        to_compare = []
+        for source in sources:
+            target = self.target_for(source)
+            if force:
+                items.append(SyncItem(source, target, '強制同步'))
+                continue
+            try:
+                target_stat = target.stat()
+            except FileNotFoundError:
+                items.append(SyncItem(source, target, '目標檔案不存在'))
+                continue
+            source_stat = source.stat()
+            if (source_stat.st_ino, source_stat.st_dev) == (target_stat.st_ino, target_stat.st_dev):
+                continue
+            if source_stat.st_size != target_stat.st_size:
+                items.append(SyncItem(source, target, '檔案大小不同'))
+                continue
+            to_compare.append((source, source_stat, target, target_stat))
+
+        hashes = self._hash_all(
+            [(source, source_stat) for source, source_stat, _, _ in to_compare]
+            + [(target, target_stat) for _, _, target, target_stat in to_compare]
+        )
+        for source, _, target, _ in to_compare:
+            if hashes[source] != hashes[target]:
+                items.append(SyncItem(source, target, '檔案內容不同'))
+
+        return sorted(items, key=lambda item: item.source)
+
+    def apply(self, item: SyncItem) -> str:
+        """
+        同步單一檔案並更新快取
+
+        Returns:
+            str: 'link' 或 'copy'
+        """
+        method = link_file(item.source, item.target, link=self.link)
+
+        # 目標內容與來源相同，來源的快取雜湊仍有效時直接沿用
+        source_hash = self._cached_hash(item.source, item.source.stat())
+        if source_hash:
+            target_stat = item.target.stat()
+            self.cache[str(item.target)] = [target_stat.st_size, target_stat.st_mtime_ns, source_hash]
+        return method
@@ -5,12 +5,15 @@ PDF 下載模組
 
 import os
 import re
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict
 
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
+
 
 class PDFFetcher:
     """期貨選擇權盤後日報 PDF 下載器"""
@@ -56,7 +59,7 @@ class PDFFetcher:
             print(f"無法取得報告清單: {e}")
             return []
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = bs4.BeautifulSoup(response.text, 'html.parser')
         reports = []
 
         # 從 data-pdf 屬性中提取 PDF 連結
@@ -74,7 +77,7 @@ class PDFFetcher:
 
         return reports
 
-    def _parse_table_reports(self, soup: BeautifulSoup) -> List[Dict]:
+    def _parse_table_reports(self, soup: 'bs4.BeautifulSoup') -> List[Dict]:
         """
         從表格中解析報告清單
         """
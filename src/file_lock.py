@@ -0,0 +1,33 @@
+"""
+跨行程檔案鎖
+批次平行產生報告時，多個行程會同時更新建置清單、報告目錄等共用 JSON
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows 無 fcntl 模組
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    以 flock 取得獨佔鎖（無 fcntl 的平台不鎖定）
+
+    Args:
+        lock_path: 鎖定檔路徑（不存在時自動建立）
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,352 @@
+"""
+Gamma / Delta 曝險曲面
+以 Black-Scholes（標的為台指期收盤價，即 Black-76）計算每個履約價與整體的造市商 Gamma / Delta 曝險：
+- 假設結算價落在現價 ±6% 的價格網格上，一次算出每個價格下的曝險曲線與 Gamma 翻轉點
+- 到期時間由契約的 settlement_date 推得，波動率可指定，預設以報告收盤價的歷史波動率估計
+- 所有契約的履約價串成一列，以 (網格數, 履約價總數) 陣列批次計算，再依契約分段加總
+- 結果依 (日期, 契約) 快取於記憶體與 .cache/exposure/，報告與結算預測器共用
+
+符號慣例（與常見 GEX 相同）：造市商持有客戶賣出的 Call（+1）、賣給客戶 Put（-1），可用 call_sign / put_sign 調整
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .lazy_import import lazy_import
+from .parser import OptionsData
+
+np = lazy_import('numpy')
+
+MULTIPLIER = 50  # 台指選擇權每點 50 元
+RISK_FREE_RATE = 0.015
+
+# 沒有足夠收盤價估計歷史波動率時使用的年化波動率
+DEFAULT_VOLATILITY = 0.18
+VOLATILITY_WINDOW = 20
+MIN_VOLATILITY_RETURNS = 5
+TRADING_DAYS_PER_YEAR = 252
+
+# 價格網格：現價 ±6%，含現價共 61 點
+GRID_RANGE_PCT = 0.06
+GRID_POINTS = 61
+
+# 收盤（13:45）到結算（隔日起 13:30）以日曆日計；結算當天收盤後仍保留 1/4 天，避免 T=0
+MIN_EXPIRY_DAYS = 0.25
+
+EXPOSURE_CACHE_DIR = Path(".cache/exposure")
+EXPOSURE_VERSION = 1
+
+_memory_cache: Dict[tuple, 'ExposureSurface'] = {}
+
+
+@dataclass
+class ExposureSurface:
+    """單一契約的曝險曲面（金額單位：新台幣）"""
+    date: str                      # 資料日期 (YYYYMMDD)
+    contract_code: str
+    settlement_date: str           # YYYY/MM/DD
+    spot: float
+    volatility: float
+    days_to_expiry: float
+    strikes: 'np.ndarray'
+    gamma_by_strike: 'np.ndarray'    # 現價下每個履約價的 Gamma 曝險（指數漲 1% 時的 Delta 變化金額）
+    delta_by_strike: 'np.ndarray'    # 現價下每個履約價的 Delta 曝險（名目金額）
+    grid: 'np.ndarray'               # 假設的結算價
+    gamma_curve: 'np.ndarray'        # 每個網格價格的整體 Gamma 曝險
+    delta_curve: 'np.ndarray'        # 每個網格價格的整體 Delta 曝險
+    key: str = ''                  # 輸入內容雜湊（快取驗證用）
+
+    @property
+    def net_gamma(self) -> float:
+        return float(self.gamma_by_strike.sum())
+
+    @property
+    def net_delta(self) -> float:
+        return float(self.delta_by_strike.sum())
+
+    @property
+    def zero_gamma(self) -> Optional[float]:
+        """整體 Gamma 曝險由負轉正（或由正轉負）的價格，取最接近現價的一個"""
+        sign = np.sign(self.gamma_curve)
+        crossings = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+        if not len(crossings):
+            return None
+        i = crossings[np.argmin(np.abs(self.grid[crossings] - self.spot))]
+        g0, g1 = self.gamma_curve[i], self.gamma_curve[i + 1]
+        return float(self.grid[i] + (self.grid[i + 1] - self.grid[i]) * g0 / (g0 - g1))
+
+    def top_strikes(self, n: int = 5) -> List[Dict]:
+        """Gamma 曝險絕對值最大的履約價"""
+        order = np.argsort(-np.abs(self.gamma_by_strike))[:n]
+        return [
+            {'strike': int(self.strikes[i]), 'gamma': float(self.gamma_by_strike[i]),
+             'delta': float(self.delta_by_strike[i])}
+            for i in sorted(order, key=lambda i: self.strikes[i])
+        ]
+
+    def to_dict(self) -> Dict:
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__}
+        data.update({name: value.round(2).tolist() for name, value in data.items() if isinstance(value, np.ndarray)})
+        return {'v': EXPOSURE_VERSION, **data}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ExposureSurface':
+        values = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        for name in ('strikes', 'gamma_by_strike', 'delta_by_strike', 'grid', 'gamma_curve', 'delta_curve'):
+            values[name] = np.asarray(values[name], dtype=float)
+        return cls(**values)
+
+
+def _norm_cdf(x: 'np.ndarray') -> 'np.ndarray':
+    """標準常態累積分布（Abramowitz-Stegun 7.1.26 近似 erf，誤差 < 1.5e-7）"""
+    z = np.abs(x) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def days_to_expiry(date: str, settlement_date: str) -> Optional[float]:
+    """
+    資料日收盤到結算的日曆日數
+
+    Args:
+        date: 資料日期 (YYYYMMDD)
+        settlement_date: 結算日 (YYYY/MM/DD 或 YYYYMMDD)
+    """
+    try:
+        start = datetime.strptime(str(date), '%Y%m%d')
+        end = datetime.strptime(str(settlement_date).replace('/', '').replace('-', ''), '%Y%m%d')
+    except ValueError:
+        return None
+    return max((end - start).days, MIN_EXPIRY_DAYS)
+
+
+def historical_volatility(date: str, window: int = VOLATILITY_WINDOW) -> float:
+    """
+    以 date（含）以前的報告收盤價估計年化歷史波動率
+
+    報告日期有缺漏時，跨多日的報酬依間隔的工作日數攤平（變異數與天數成正比）；
+    收盤價不足時回傳 DEFAULT_VOLATILITY
+    """
+    # 延遲匯入：settlement_backtest 依賴 settlement_predictor，而預測器會使用本模組
+    from .settlement_backtest import load_metrics_table
+
+    table = load_metrics_table()
+    if not len(table.dates):
+        return DEFAULT_VOLATILITY
+    day = np.datetime64(f"{date[:4]}-{date[4:6]}-{date[6:]}", 'D')
+    closes = table.columns['close_price']
+    mask = (table.dates <= day) & ~np.isnan(closes)
+    closes, dates = closes[mask][-(window + 1):], table.dates[mask][-(window + 1):]
+    returns = np.diff(np.log(closes))
+    if len(returns) < MIN_VOLATILITY_RETURNS:
+        return DEFAULT_VOLATILITY
+    gaps = np.maximum(np.busday_count(dates[:-1], dates[1:]), 1)
+    daily_variance = np.sum(returns ** 2) / np.sum(gaps)
+    return float(math.sqrt(daily_variance * TRADING_DAYS_PER_YEAR))
+
+
+def _input_key(options: OptionsData, spot: float, days: float, volatility: float,
+               call_sign: int, put_sign: int) -> str:
+    payload = json.dumps([EXPOSURE_VERSION, options.strike_prices, options.call_oi, options.put_oi,
+                          spot, days, round(volatility, 6), call_sign, put_sign])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _cache_path(cache_dir: Path, date: str, contract_code: str) -> Path:
+    return Path(cache_dir) / f"{date}.{contract_code}.json"
+
+
+def _read_cache(path: Path) -> Optional[ExposureSurface]:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if data.get('v') != EXPOSURE_VERSION:
+        return None
+    return ExposureSurface.from_dict(data)
+
+
+def _write_cache(path: Path, surface: ExposureSurface):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(surface.to_dict(), ensure_ascii=False, separators=(',', ':')),
+                            encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  無法寫入曝險快取 {path}: {e}")
+
+
+def _batch_surfaces(contracts: List[OptionsData], codes: List[str], days: List[float], volatility: float,
+                    call_sign: int, put_sign: int) -> List[ExposureSurface]:
+    """所有契約的履約價串成一列，一次計算整個價格網格"""
+    sizes = [len(options.strike_prices) for options in contracts]
+    column = np.repeat(np.arange(len(contracts)), sizes)
+    strikes = np.concatenate([np.asarray(o.strike_prices, dtype=float) for o in contracts])
+    call_oi = np.concatenate([np.asarray(o.call_oi, dtype=float) for o in contracts])
+    put_oi = np.concatenate([np.asarray(o.put_oi, dtype=float) for o in contracts])
+    spots = np.array([float(o.tx_close) for o in contracts])
+    years = np.array(days) / 365
+
+    moves = np.linspace(-GRID_RANGE_PCT, GRID_RANGE_PCT, GRID_POINTS)
+    prices = spots[column] * (1 + moves[:, None])                 # (網格數, 履約價總數)
+    t = years[column]
+    sqrt_t = np.sqrt(t)
+    discount = np.exp(-RISK_FREE_RATE * t)
+
+    d1 = (np.log(prices / strikes) + 0.5 * volatility ** 2 * t) / (volatility * sqrt_t)
+    pdf = np.exp(-0.5 * d1 ** 2) / math.sqrt(2 * math.pi)
+    gamma = discount * pdf / (prices * volatility * sqrt_t)
+    call_delta = discount * _norm_cdf(d1)
+    put_delta = call_delta - discount
+
+    # 指數漲 1% 時的 Delta 變化金額；Delta 名目金額
+    position_gamma = (call_sign * call_oi + put_sign * put_oi) * gamma
+    gamma_exposure = position_gamma * MULTIPLIER * prices ** 2 * 0.01
+    delta_exposure = (call_sign * call_oi * call_delta + put_sign * put_oi * put_delta) * MULTIPLIER * prices
+
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    gamma_curves = np.add.reduceat(gamma_exposure, starts, axis=1)
+    delta_curves = np.add.reduceat(delta_exposure, starts, axis=1)
+    center = GRID_POINTS // 2
+
+    surfaces = []
+    for i, options in enumerate(contracts):
+        segment = slice(starts[i], starts[i] + sizes[i])
+        surfaces.append(ExposureSurface(
+            date=options.date,
+            contract_code=codes[i],
+            settlement_date=options.settlement_date or '',
+            spot=float(spots[i]),
+            volatility=volatility,
+            days_to_expiry=float(days[i]),
+            strikes=strikes[segment],
+            gamma_by_strike=gamma_exposure[center, segment],
+            delta_by_strike=delta_exposure[center, segment],
+            grid=spots[i] * (1 + moves),
+            gamma_curve=gamma_curves[:, i],
+            delta_curve=delta_curves[:, i],
+        ))
+    return surfaces
+
+
+def compute_exposures(options_list: List[OptionsData], volatility: Optional[float] = None,
+                      call_sign: int = 1, put_sign: int = -1,
+                      cache_dir: Optional[Path] = EXPOSURE_CACHE_DIR) -> Dict[str, ExposureSurface]:
+    """
+    批次計算多個契約的曝險曲面
+
+    Args:
+        options_list: 同一天的各契約資料（需有 tx_close 與 settlement_date）
+        volatility: 年化波動率（預設以歷史波動率估計）
+        call_sign / put_sign: 造市商對 Call / Put 未平倉的持有方向
+        cache_dir: 快取目錄，None 表示只使用記憶體快取
+
+    Returns:
+        契約代號 -> ExposureSurface（缺收盤價或到期日的契約略過）
+    """
+    result: Dict[str, ExposureSurface] = {}
+    pending, codes, days, keys = [], [], [], []
+    vol_cache: Dict[str, float] = {}
+
+    for options in options_list:
+        expiry = days_to_expiry(options.date, options.settlement_date or '')
+        if not options.tx_close or expiry is None or not options.strike_prices:
+            continue
+        code = options.contract_code or options.contract_month
+        if volatility is not None:
+            sigma = volatility
+        else:
+            if options.date not in vol_cache:
+                vol_cache[options.date] = historical_volatility(options.date)
+            sigma = vol_cache[options.date]
+        key = _input_key(options, float(options.tx_close), expiry, sigma, call_sign, put_sign)
+
+        cached = _memory_cache.get((options.date, code))
+        if cached is None and cache_dir is not None:
+            cached = _read_cache(_cache_path(cache_dir, options.date, code))
+        if cached is not None and cached.key == key:
+            _memory_cache[(options.date, code)] = result[code] = cached
+            continue
+        pending.append(options)
+        codes.append(code)
+        days.append(expiry)
+        keys.append(key)
+
+    # 同一次呼叫的契約通常同一天，共用同一個波動率
+    by_volatility: Dict[float, List[int]] = {}
+    for i, options in enumerate(pending):
+        sigma = volatility if volatility is not None else vol_cache[options.date]
+        by_volatility.setdefault(sigma, []).append(i)
+
+    for sigma, indexes in by_volatility.items():
+        surfaces = _batch_surfaces([pending[i] for i in indexes], [codes[i] for i in indexes],
+                                   [days[i] for i in indexes], sigma, call_sign, put_sign)
+        for i, surface in zip(indexes, surfaces):
+            surface.key = keys[i]
+            _memory_cache[(surface.date, surface.contract_code)] = result[surface.contract_code] = surface
+            if cache_dir is not None:
+                _write_cache(_cache_path(cache_dir, surface.date, surface.contract_code), surface)
+    return result
+
+
+def contract_exposure(options: OptionsData, **kwargs) -> Optional[ExposureSurface]:
+    """單一契約的曝險曲面（同一天已批次計算過時直接取用快取）"""
+    return compute_exposures([options], **kwargs).get(options.contract_code or options.contract_month)
+
+
+def exposure_for_settlement(date: str, settlement_date: str,
+                            cache_dir: Path = EXPOSURE_CACHE_DIR) -> Optional[ExposureSurface]:
+    """
+    結算預測使用：取得資料日當天、於指定結算日到期的契約曝險
+
+    先找快取；沒有時讀取該日報告的 OptionsData 快照重新計算
+
+    Args:
+        date: 資料日期 (YYYYMMDD)
+        settlement_date: 結算日 (YYYY/MM/DD)
+    """
+    for path in sorted(Path(cache_dir).glob(f"{date}.*.json")):
+        surface = _read_cache(path)
+        if surface is not None and surface.settlement_date == settlement_date:
+            return surface
+
+    from .site_build import SNAPSHOT_DIR, load_options_snapshot
+
+    for snapshot in sorted(SNAPSHOT_DIR.glob(f"report_{date}_*.json")):
+        try:
+            options_list = load_options_snapshot(snapshot)
+        except (OSError, ValueError, TypeError):
+            continue
+        for surface in compute_exposures(options_list, cache_dir=cache_dir).values():
+            if surface.settlement_date == settlement_date:
+                return surface
+    return None
+
+
+def format_exposure(surface: Optional[ExposureSurface]) -> Optional[Dict]:
+    """報告模板使用的曝險摘要（金額換算為億元）"""
+    if surface is None:
+        return None
+    zero_gamma = surface.zero_gamma
+    return {
+        'contract_code': surface.contract_code,
+        'volatility': round(surface.volatility * 100, 1),
+        'days_to_expiry': round(surface.days_to_expiry, 2),
+        'net_gamma': round(surface.net_gamma / 1e8, 2),
+        'net_delta': round(surface.net_delta / 1e8, 1),
+        'zero_gamma': round(zero_gamma) if zero_gamma is not None else None,
+        'positive_gamma': surface.net_gamma > 0,
+        'top_strikes': [
+            {**item, 'gamma': round(item['gamma'] / 1e8, 2), 'delta': round(item['delta'] / 1e8, 1)}
+            for item in surface.top_strikes()
+        ],
+    }
@@ -0,0 +1,301 @@
+"""
+滾動指標庫
+結算預測在同一組回看視窗上反覆計算 P/C Ratio、Max Pain、收盤價與 OI 變化的平均、首末變化與極值；
+這裡依契約類型各維護一條逐日序列，每天 ingest 時更新前綴累計與極值表，之後任意長度的視窗都是 O(1) 查詢：
+- 平均：前綴和（以 Fraction 精確累加，視窗相減不產生捨入誤差）
+- 首末值與變化：有值列的前綴計數，直接定位視窗內第一筆與最後一筆
+- 最小 / 最大：可附加的稀疏表（每次 ingest O(log n)）
+- 斜率：以列序（交易日）為 x 的最小平方法斜率，由 Σt、Σt²、Σx、Σtx 的前綴和求得
+
+缺值（報告沒有該欄位）不計入統計；OI 變化只在買賣權都有數據時記錄，與 OI 訊號的取樣方式相同
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+INDICATOR_FIELDS = ('close_price', 'pc_ratio', 'max_pain', 'call_oi_change', 'put_oi_change')
+PAIRED_FIELDS = ('call_oi_change', 'put_oi_change')
+
+ALL_CONTRACTS = 'all'
+CONTRACT_MARKERS = {'W': 'weekly_wed', 'F': 'weekly_fri'}
+
+
+def contract_type_of(code: str) -> str:
+    """報告檔名的契約代碼 → 契約類型（202601W1 → weekly_wed、202604F4 → weekly_fri、202601 → monthly）"""
+    for marker, contract_type in CONTRACT_MARKERS.items():
+        if marker in code:
+            return contract_type
+    return 'monthly'
+
+
+def _select(values: Dict) -> Dict:
+    """只保留指標欄位（NaN 與 None 視為缺值）；OI 變化需買賣權成對"""
+    row = {}
+    for name in INDICATOR_FIELDS:
+        value = values.get(name)
+        if value is not None and value == value:
+            row[name] = value
+    if not all(name in row for name in PAIRED_FIELDS):
+        for name in PAIRED_FIELDS:
+            row.pop(name, None)
+    return row
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """單一欄位在視窗內的統計（沒有任何值時除 count 外皆為 None）"""
+    count: int = 0
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    first: Optional[float] = None
+    last: Optional[float] = None
+    slope: Optional[float] = None  # 每個交易日的變化量，至少兩筆才有
+
+    @property
+    def change(self):
+        """首末變化（少於兩筆時為 0）"""
+        return self.last - self.first if self.count >= 2 else 0
+
+
+@dataclass
+class IndicatorWindow:
+    """一段回看視窗的全部欄位統計"""
+    dates: List[str]
+    stats: Dict[str, WindowStats] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> WindowStats:
+        return self.stats[name]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+class _Column:
+    """單一欄位的前綴累計與極值稀疏表"""
+
+    def __init__(self):
+        self.present = [0]           # present[i]：前 i 列中有值的筆數
+        self.values = []             # 有值的原始數值（依列序）
+        self.sum_x = [Fraction(0)]   # 以「第幾筆有值」為索引的前綴和
+        self.sum_t = [0]
+        self.sum_tt = [0]
+        self.sum_tx = [Fraction(0)]
+        self.low = [[]]              # low[k][i]：列 i 起 2^k 列的最小值（缺值為 +inf）
+        self.high = [[]]
+
+    def append(self, value):
+        row = len(self.present) - 1
+        if value is None:
+            self.present.append(self.present[-1])
+            low, high = float('inf'), float('-inf')
+        else:
+            x = Fraction(value)
+            self.present.append(self.present[-1] + 1)
+            self.values.append(value)
+            self.sum_x.append(self.sum_x[-1] + x)
+            self.sum_t.append(self.sum_t[-1] + row)
+            self.sum_tt.append(self.sum_tt[-1] + row * row)
+            self.sum_tx.append(self.sum_tx[-1] + row * x)
+            low = high = value
+
+        self.low[0].append(low)
+        self.high[0].append(high)
+        level = 1
+        while (1 << level) <= row + 1:
+            if level == len(self.low):
+                self.low.append([])
+                self.high.append([])
+            start, half = row + 1 - (1 << level), 1 << (level - 1)
+            self.low[level].append(min(self.low[level - 1][start], self.low[level - 1][start + half]))
+            self.high[level].append(max(self.high[level - 1][start], self.high[level - 1][start + half]))
+            level += 1
+
+    def stats(self, lo: int, hi: int) -> WindowStats:
+        """列 [lo, hi) 的統計"""
+        a, b = self.present[lo], self.present[hi]
+        n = b - a
+        if n == 0:
+            return WindowStats()
+
+        sum_x = self.sum_x[b] - self.sum_x[a]
+        slope = None
+        if n >= 2:
+            sum_t = self.sum_t[b] - self.sum_t[a]
+            denominator = n * (self.sum_tt[b] - self.sum_tt[a]) - sum_t * sum_t
+            slope = float((n * (self.sum_tx[b] - self.sum_tx[a]) - sum_t * sum_x) / denominator)
+
+        level = (hi - lo).bit_length() - 1
+        other = hi - (1 << level)
+        return WindowStats(
+            count=n,
+            mean=float(sum_x / n),
+            min=min(self.low[level][lo], self.low[level][other]),
+            max=max(self.high[level][lo], self.high[level][other]),
+            first=self.values[a],
+            last=self.values[b - 1],
+            slope=slope,
+        )
+
+
+class IndicatorSeries:
+    """單一契約類型的逐日指標序列（同一天重複 ingest 會覆蓋，較早的日期會插入並重建）"""
+
+    def __init__(self):
+        self.dates: List[str] = []
+        self._rows: List[Dict] = []
+        self._index: Dict[str, int] = {}
+        self._columns = {name: _Column() for name in INDICATOR_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _append(self, date: str, row: Dict):
+        self._index[date] = len(self.dates)
+        self.dates.append(date)
+        self._rows.append(row)
+        for name, column in self._columns.items():
+            column.append(row.get(name))
+
+    def _rebuild(self):
+        dates, rows = self.dates, self._rows
+        self.__init__()
+        for date, row in zip(dates, rows):
+            self._append(date, row)
+
+    def ingest(self, date: str, values: Dict):
+        """
+        加入一天的指標
+
+        Args:
+            date: 日期 (YYYYMMDD)
+            values: 指標字典（報告解析結果即可，多餘的欄位會被忽略）
+        """
+        row = _select(values)
+        existing = self._index.get(date)
+        if existing is not None:
+            if self._rows[existing] != row:
+                self._rows[existing] = row
+                self._rebuild()
+        elif not self.dates or date > self.dates[-1]:
+            self._append(date, row)
+        else:
+            position = bisect_left(self.dates, date)
+            self.dates.insert(position, date)
+            self._rows.insert(position, row)
+            self._rebuild()
+
+    def row(self, date: str) -> Optional[Dict]:
+        """某天的指標（沒有時回傳 None）"""
+        index = self._index.get(date)
+        return dict(self._rows[index]) if index is not None else None
+
+    def stats(self, name: str, lo: int = 0, hi: Optional[int] = None) -> WindowStats:
+        """單一欄位在列 [lo, hi) 的統計"""
+        return self._columns[name].stats(lo, len(self.dates) if hi is None else hi)
+
+    def window_rows(self, lo: int, hi: int) -> IndicatorWindow:
+        """列 [lo, hi) 的全部欄位統計"""
+        return IndicatorWindow(
+            dates=self.dates[lo:hi],
+            stats={name: column.stats(lo, hi) for name, column in self._columns.items()},
+        )
+
+    def window(self, dates: Iterable[str]) -> IndicatorWindow:
+        """
+        指定日期的視窗（沒有資料的日期略過）
+
+        日期在序列中連續時直接以前綴累計查詢；中間夾了未指定的日期時，改以這幾天另建序列計算
+        """
+        rows = sorted(self._index[date] for date in set(dates) if date in self._index)
+        if not rows:
+            return IndicatorWindow(dates=[], stats={name: WindowStats() for name in INDICATOR_FIELDS})
+        if rows[-1] - rows[0] + 1 == len(rows):
+            return self.window_rows(rows[0], rows[-1] + 1)
+
+        subset = IndicatorSeries()
+        for index in rows:
+            subset._append(self.dates[index], self._rows[index])
+        return subset.window_rows(0, len(rows))
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> IndicatorWindow:
+        """日期區間 [start, end] 的視窗（YYYYMMDD，省略表示不設限）"""
+        lo = bisect_left(self.dates, start) if start else 0
+        hi = bisect_right(self.dates, end) if end else len(self.dates)
+        return self.window_rows(lo, max(lo, hi))
+
+    def last(self, days: int, as_of: Optional[str] = None) -> IndicatorWindow:
+        """截至 as_of（含）的最後 days 個有報告的交易日"""
+        hi = bisect_right(self.dates, as_of) if as_of else len(self.dates)
+        return self.window_rows(max(0, hi - days), hi)
+
+
+class IndicatorStore:
+    """依契約類型分開的滾動指標序列；ALL_CONTRACTS 序列收錄每天的第一份報告（與結算預測器相同）"""
+
+    def __init__(self):
+        self.series: Dict[str, IndicatorSeries] = {}
+
+    def ingest(self, date: str, values: Dict, contract_type: Optional[str] = None):
+        """加入一天的指標（同時更新全部契約與該契約類型的序列）"""
+        for key in (ALL_CONTRACTS, contract_type):
+            if key:
+                self.series.setdefault(key, IndicatorSeries()).ingest(date, values)
+
+    def get(self, contract_type: str = ALL_CONTRACTS) -> IndicatorSeries:
+        """某契約類型的序列（尚無資料時回傳空序列）"""
+        return self.series.get(contract_type) or IndicatorSeries()
+
+    def window(self, dates: Iterable[str], contract_type: str = ALL_CONTRACTS) -> IndicatorWindow:
+        return self.get(contract_type).window(dates)
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None,
+                contract_type: str = ALL_CONTRACTS) -> IndicatorWindow:
+        return self.get(contract_type).between(start, end)
+
+    def last(self, days: int, as_of: Optional[str] = None,
+             contract_type: str = ALL_CONTRACTS) -> IndicatorWindow:
+        return self.get(contract_type).last(days, as_of)
+
+    def get_or_create(self, contract_type: str) -> IndicatorSeries:
+        return self.series.setdefault(contract_type, IndicatorSeries())
+
+    @classmethod
+    def from_reports(cls, reports_dir: Optional[Path] = None, cache_file: Optional[Path] = None) -> 'IndicatorStore':
+        """
+        從每日報告建立指標庫（沿用回測的報告指標快取，不會改寫快取檔）
+
+        ALL_CONTRACTS 取每天檔名排序第一份報告（與 load_metrics_table 相同）；
+        各契約類型序列收錄該類型當天的第一份報告
+        """
+        from .settlement_backtest import (DAILY_REPORT_PATTERN, METRICS_CACHE_FILE, REPORTS_DIR,
+                                          _load_metrics_cache)
+        from .settlement_predictor import parse_report_html
+
+        cache = _load_metrics_cache(cache_file or METRICS_CACHE_FILE)
+        store = cls()
+        seen = set()
+        for path in sorted(Path(reports_dir or REPORTS_DIR).glob('report_*.html')):
+            match = DAILY_REPORT_PATTERN.match(path.name)
+            if not match:
+                continue
+            date = match.group(1)
+            keys = [key for key in (ALL_CONTRACTS, contract_type_of(path.stem.split('_', 2)[2]))
+                    if (date, key) not in seen]
+            if not keys:
+                continue
+            seen.update((date, key) for key in keys)
+
+            stat = path.stat()
+            entry = cache.get(path.name)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                data = entry[2]
+            else:
+                data = parse_report_html(path)
+            if data:
+                for key in keys:
+                    store.get_or_create(key).ingest(date, data)
+        return store
@@ -0,0 +1,36 @@
+"""
+延遲載入重量級第三方套件
+- 模組層級以 lazy_import('pandas') 取得模組物件，第一次存取屬性時才真正執行 import
+- 讓 --help 等輕量指令不必載入 pandas / numpy / pdfplumber / bs4 / requests
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    延遲載入模組
+
+    Args:
+        name: 模組名稱，例如 'pandas'
+
+    Returns:
+        模組物件（已載入則直接回傳）
+
+    Raises:
+        ModuleNotFoundError: 套件未安裝（與一般 import 相同，於載入模組時即回報）
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
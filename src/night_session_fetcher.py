@@ -10,11 +10,14 @@
 3. 估算方式（備用）
 """
 
-import requests
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 import logging
 
+from src.lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
 logger = logging.getLogger(__name__)
 
 
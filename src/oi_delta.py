@@ -0,0 +1,428 @@
+"""
+逐日 OI 變化引擎
+把同一契約代號的各日 OptionsData 快照依履約價合併成 (日期, 履約價) 矩陣：
+- 各日履約價以排序合併（聯集 + searchsorted）對齊，當天未掛牌的履約價 OI 記為 0
+- 每個履約價的逐日 OI 變化、每日最大 Call / Put OI 牆位都以整個矩陣一次算出
+- 多日查詢（例如結算預測使用的 2~3 個分析日）直接切片，不必重新合併
+- 偵測支撐 / 壓力牆位移，以及同一結算星期的週選之間的轉倉（近週減倉、次週增倉）
+
+資料來源為 data/options_snapshots/ 的 OptionsData 快照（每份報告產生時寫入），
+合併結果依快照檔名、大小與修改時間快取於 .cache/oi_panels/；產生報告時以 ingest() 加入當天資料。
+前一交易日沒有快照時牆位位移與轉倉都是空的，ingest() 會提示（CI 需提交 data/options_snapshots/）
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .lazy_import import lazy_import
+from .parser import OptionsData
+from .site_build import SNAPSHOT_DIR, load_options_snapshot
+from .trading_calendar import get_calendar
+
+np = lazy_import('numpy')
+
+OI_PANEL_CACHE_DIR = Path(".cache/oi_panels")
+OI_PANEL_VERSION = 1
+CACHE_INDEX = "index.json"
+
+# 牆位位移至少要有這麼多口 OI 才算數（避免極小量的履約價互換第一名）
+MIN_WALL_OI = 1000
+
+
+@dataclass
+class WallShift:
+    """支撐 / 壓力牆位移（最大 OI 履約價換位）"""
+    date: str
+    previous_date: str
+    contract_code: str
+    side: str          # 'call'（壓力）或 'put'（支撐）
+    from_strike: int
+    to_strike: int
+    from_oi: int
+    to_oi: int
+
+    @property
+    def shift(self) -> int:
+        return self.to_strike - self.from_strike
+
+    @property
+    def description(self) -> str:
+        label = "Call 壓力牆" if self.side == 'call' else "Put 支撐牆"
+        direction = "上移" if self.shift > 0 else "下移"
+        return (f"{label} {self.from_strike:,} → {self.to_strike:,}"
+                f"（{direction} {abs(self.shift):,} 點，{self.from_oi:,} → {self.to_oi:,} 口）")
+
+
+@dataclass
+class RolloverFlow:
+    """同一結算星期的週選轉倉：近週契約減倉、次週契約增倉"""
+    date: str
+    previous_date: str
+    from_code: str
+    to_code: str
+    call_closed: int   # 近週 Call 減少的 OI
+    put_closed: int
+    call_opened: int   # 次週 Call 增加的 OI
+    put_opened: int
+
+    @property
+    def call_rolled(self) -> int:
+        return min(self.call_closed, self.call_opened)
+
+    @property
+    def put_rolled(self) -> int:
+        return min(self.put_closed, self.put_opened)
+
+    @property
+    def description(self) -> str:
+        return (f"{self.from_code} → {self.to_code} 轉倉：Call 約 {self.call_rolled:,} 口、"
+                f"Put 約 {self.put_rolled:,} 口")
+
+
+@dataclass
+class OIDelta:
+    """單一契約相鄰兩個交易日、逐履約價的 OI 變化"""
+    date: str
+    previous_date: str
+    contract_code: str
+    strikes: 'np.ndarray'
+    call_delta: 'np.ndarray'
+    put_delta: 'np.ndarray'
+
+    def top_builds(self, side: str, n: int = 3) -> List[Tuple[int, int]]:
+        """OI 增加最多的履約價 [(履約價, 增加口數)]"""
+        delta = self.call_delta if side == 'call' else self.put_delta
+        order = np.argsort(-delta, kind='stable')[:n]
+        return [(int(self.strikes[i]), int(delta[i])) for i in order if delta[i] > 0]
+
+
+@dataclass
+class ContractPanel:
+    """單一契約的逐日 OI 矩陣（列：日期，欄：所有日期履約價的聯集）"""
+    contract_code: str
+    contract_type: Optional[str]
+    settlement_date: Optional[str]
+    dates: List[str]
+    strikes: 'np.ndarray'    # 排序的履約價聯集
+    call_oi: 'np.ndarray'    # (日數, 履約價數)
+    put_oi: 'np.ndarray'
+    _walls: 'Optional[Tuple[np.ndarray, ...]]' = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def build(cls, days: List[OptionsData]) -> 'ContractPanel':
+        """把同一契約的各日資料依日期排序後，以履約價排序合併成矩陣"""
+        days = sorted(days, key=lambda options: options.date)
+        strikes = np.unique(np.concatenate([np.asarray(o.strike_prices, dtype=np.int64) for o in days]))
+        call_oi = np.zeros((len(days), len(strikes)), dtype=np.int64)
+        put_oi = np.zeros_like(call_oi)
+        for row, options in enumerate(days):
+            columns = np.searchsorted(strikes, options.strike_prices)
+            call_oi[row, columns] = options.call_oi
+            put_oi[row, columns] = options.put_oi
+        latest = days[-1]
+        return cls(
+            contract_code=latest.contract_code or latest.contract_month,
+            contract_type=latest.contract_type,
+            settlement_date=latest.settlement_date,
+            dates=[o.date for o in days],
+            strikes=strikes,
+            call_oi=call_oi,
+            put_oi=put_oi,
+        )
+
+    def with_day(self, options: OptionsData) -> 'ContractPanel':
+        """加入（或取代）一天的資料：新履約價以排序合併插入欄位，不必重建整個矩陣"""
+        strikes = np.union1d(self.strikes, np.asarray(options.strike_prices, dtype=np.int64))
+        old_columns = np.searchsorted(strikes, self.strikes)
+        dates = sorted(set(self.dates) | {options.date})
+        rows = np.searchsorted(dates, self.dates)
+
+        call_oi = np.zeros((len(dates), len(strikes)), dtype=np.int64)
+        put_oi = np.zeros_like(call_oi)
+        call_oi[np.ix_(rows, old_columns)] = self.call_oi
+        put_oi[np.ix_(rows, old_columns)] = self.put_oi
+
+        row = dates.index(options.date)
+        new_columns = np.searchsorted(strikes, options.strike_prices)
+        call_oi[row] = 0
+        put_oi[row] = 0
+        call_oi[row, new_columns] = options.call_oi
+        put_oi[row, new_columns] = options.put_oi
+
+        latest = row == len(dates) - 1
+        return ContractPanel(
+            contract_code=self.contract_code,
+            contract_type=options.contract_type if latest else self.contract_type,
+            settlement_date=options.settlement_date if latest else self.settlement_date,
+            dates=dates,
+            strikes=strikes,
+            call_oi=call_oi,
+            put_oi=put_oi,
+        )
+
+    def window(self, dates: Optional[Iterable[str]] = None, start: Optional[str] = None,
+               end: Optional[str] = None) -> 'ContractPanel':
+        """
+        取出部分日期（切片，不重新合併）
+
+        Args:
+            dates: 指定日期清單（沒有資料的日期略過）
+            start / end: 日期範圍（含），與 dates 二擇一
+        """
+        if dates is not None:
+            wanted = set(dates)
+            rows = [i for i, date in enumerate(self.dates) if date in wanted]
+            if rows and rows[-1] - rows[0] + 1 == len(rows):
+                rows = slice(rows[0], rows[-1] + 1)  # 連續日期直接取 view
+        else:
+            lo = np.searchsorted(self.dates, start, 'left') if start else 0
+            hi = np.searchsorted(self.dates, end, 'right') if end else len(self.dates)
+            rows = slice(int(lo), int(hi))
+        selected = self.dates[rows] if isinstance(rows, slice) else [self.dates[i] for i in rows]
+        return ContractPanel(
+            contract_code=self.contract_code,
+            contract_type=self.contract_type,
+            settlement_date=self.settlement_date,
+            dates=selected,
+            strikes=self.strikes,
+            call_oi=self.call_oi[rows],
+            put_oi=self.put_oi[rows],
+        )
+
+    def previous_date(self, date: str) -> Optional[str]:
+        """此契約在 date 之前最近一個有資料的日期"""
+        index = int(np.searchsorted(self.dates, date, 'left'))
+        return self.dates[index - 1] if index > 0 else None
+
+    def oi_on(self, date: Optional[str]) -> 'Tuple[np.ndarray, np.ndarray]':
+        """某日各履約價的 (Call, Put) OI；沒有資料（尚未掛牌）時為 0"""
+        if date in self.dates:
+            row = self.dates.index(date)
+            return self.call_oi[row], self.put_oi[row]
+        zeros = np.zeros(len(self.strikes), dtype=np.int64)
+        return zeros, zeros
+
+    def delta(self, date: str) -> Optional[OIDelta]:
+        """date 與前一個資料日之間逐履約價的 OI 變化"""
+        previous = self.previous_date(date)
+        if previous is None or date not in self.dates:
+            return None
+        call_now, put_now = self.oi_on(date)
+        call_before, put_before = self.oi_on(previous)
+        return OIDelta(date, previous, self.contract_code, self.strikes,
+                       call_now - call_before, put_now - put_before)
+
+    def deltas(self) -> 'Tuple[np.ndarray, np.ndarray]':
+        """逐日 OI 變化矩陣 (日數-1, 履約價數)，第 i 列為 dates[i+1] 相對 dates[i]"""
+        return np.diff(self.call_oi, axis=0), np.diff(self.put_oi, axis=0)
+
+    def walls(self) -> 'Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]':
+        """每日最大 Call / Put OI 的履約價與口數：(call_strikes, call_oi, put_strikes, put_oi)"""
+        if self._walls is None:
+            rows = np.arange(len(self.dates))
+            call_index = self.call_oi.argmax(axis=1)
+            put_index = self.put_oi.argmax(axis=1)
+            self._walls = (self.strikes[call_index], self.call_oi[rows, call_index],
+                           self.strikes[put_index], self.put_oi[rows, put_index])
+        return self._walls
+
+    def wall_shifts(self, min_oi: int = MIN_WALL_OI) -> List[WallShift]:
+        """相鄰資料日之間的牆位位移（依日期排序）"""
+        call_strikes, call_oi, put_strikes, put_oi = self.walls()
+        shifts = []
+        for side, strikes, oi in (('call', call_strikes, call_oi), ('put', put_strikes, put_oi)):
+            moved = np.flatnonzero((strikes[1:] != strikes[:-1]) & (oi[1:] >= min_oi))
+            shifts.extend(
+                WallShift(self.dates[i + 1], self.dates[i], self.contract_code, side,
+                          int(strikes[i]), int(strikes[i + 1]), int(oi[i]), int(oi[i + 1]))
+                for i in moved
+            )
+        return sorted(shifts, key=lambda s: (s.date, s.side))
+
+
+def _settlement_weekday(panel: ContractPanel) -> Optional[int]:
+    try:
+        return datetime.strptime(panel.settlement_date or '', '%Y/%m/%d').weekday()
+    except ValueError:
+        return None
+
+
+def _snapshot_signature(snapshot_dir: Path) -> List[list]:
+    return [[path.name, path.stat().st_size, path.stat().st_mtime_ns]
+            for path in sorted(Path(snapshot_dir).glob('report_*.json'))]
+
+
+class OIDeltaEngine:
+    """逐日 OI 變化引擎：依契約代號維護合併後的 OI 矩陣"""
+
+    def __init__(self, snapshot_dir: Path = SNAPSHOT_DIR, cache_dir: Optional[Path] = OI_PANEL_CACHE_DIR):
+        """
+        Args:
+            snapshot_dir: OptionsData 快照目錄
+            cache_dir: 合併結果快取目錄，None 表示不使用快取
+        """
+        self.snapshot_dir = Path(snapshot_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._panels: Optional[Dict[str, ContractPanel]] = None
+
+    # ------------------------------------------------------------------
+    # 載入與快取
+    # ------------------------------------------------------------------
+
+    @property
+    def panels(self) -> Dict[str, ContractPanel]:
+        if self._panels is None:
+            signature = _snapshot_signature(self.snapshot_dir)
+            self._panels = self._read_cache(signature)
+            if self._panels is None:
+                self._panels = self._build_from_snapshots()
+                self._write_cache(signature)
+        return self._panels
+
+    def _build_from_snapshots(self) -> Dict[str, ContractPanel]:
+        days: Dict[str, Dict[str, OptionsData]] = {}
+        for path in sorted(self.snapshot_dir.glob('report_*.json')):
+            try:
+                options_list = load_options_snapshot(path)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"⚠️  無法讀取快照 {path.name}: {e}")
+                continue
+            for options in options_list:
+                if options.strike_prices:
+                    # 同一天有多份報告（快照）時以第一份為準
+                    days.setdefault(options.contract_code or options.contract_month, {}).setdefault(options.date, options)
+        return {code: ContractPanel.build(list(by_date.values())) for code, by_date in days.items()}
+
+    def _read_cache(self, signature: List[list]) -> Optional[Dict[str, ContractPanel]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            index = json.loads((self.cache_dir / CACHE_INDEX).read_text(encoding='utf-8'))
+            if index.get('v') != OI_PANEL_VERSION or index.get('signature') != signature:
+                return None
+            panels = {}
+            for code, meta in index['panels'].items():
+                with np.load(self.cache_dir / f"{code}.npz") as arrays:
+                    panels[code] = ContractPanel(
+                        contract_code=code, contract_type=meta['contract_type'],
+                        settlement_date=meta['settlement_date'], dates=meta['dates'],
+                        strikes=arrays['strikes'], call_oi=arrays['call_oi'], put_oi=arrays['put_oi'],
+                    )
+            return panels
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, signature: List[list]):
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for code, panel in self._panels.items():
+                np.savez(self.cache_dir / f"{code}.npz", strikes=panel.strikes,
+                         call_oi=panel.call_oi, put_oi=panel.put_oi)
+            index = {
+                'v': OI_PANEL_VERSION,
+                'signature': signature,
+                'panels': {code: {'contract_type': p.contract_type, 'settlement_date': p.settlement_date,
+                                  'dates': p.dates} for code, p in self._panels.items()},
+            }
+            tmp = self.cache_dir / f"{CACHE_INDEX}.tmp"
+            tmp.write_text(json.dumps(index, ensure_ascii=False), encoding='utf-8')
+            tmp.replace(self.cache_dir / CACHE_INDEX)
+        except OSError as e:
+            print(f"⚠️  無法寫入 OI 合併快取: {e}")
+
+    def ingest(self, options_list: Iterable[OptionsData]):
+        """加入當天（尚未寫成快照）的契約資料，只更新記憶體中的矩陣"""
+        panels = self.panels
+        dates = set()
+        for options in options_list:
+            if not options.strike_prices:
+                continue
+            code = options.contract_code or options.contract_month
+            panel = panels.get(code)
+            panels[code] = panel.with_day(options) if panel else ContractPanel.build([options])
+            dates.add(options.date)
+
+        for date in sorted(dates):
+            previous = self.missing_previous_day(date)
+            if previous:
+                print(f"⚠️  {self.snapshot_dir} 沒有前一交易日 {previous} 的快照，"
+                      f"{date} 的牆位位移與週選轉倉將為空")
+
+    def missing_previous_day(self, date: str) -> Optional[str]:
+        """date 的前一個交易日 (YYYYMMDD) 沒有任何契約資料時回傳該日期，否則回傳 None"""
+        try:
+            previous = get_calendar().previous_trading_day(date).strftime('%Y%m%d')
+        except ValueError:
+            return None
+        return None if any(previous in panel.dates for panel in self.panels.values()) else previous
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def panel(self, contract_code: str) -> Optional[ContractPanel]:
+        return self.panels.get(contract_code)
+
+    def panel_for_settlement(self, settlement_date: str) -> Optional[ContractPanel]:
+        """於指定結算日 (YYYY/MM/DD) 到期的契約；週選與月選同日結算時取資料日最多者"""
+        candidates = [p for p in self.panels.values() if p.settlement_date == settlement_date]
+        return max(candidates, key=lambda p: len(p.dates)) if candidates else None
+
+    def delta(self, contract_code: str, date: str) -> Optional[OIDelta]:
+        panel = self.panel(contract_code)
+        return panel.delta(date) if panel else None
+
+    def wall_shifts(self, contract_code: str, date: str) -> List[WallShift]:
+        """指定契約在 date 當天（相對前一資料日）的牆位位移"""
+        panel = self.panel(contract_code)
+        if panel is None or date not in panel.dates:
+            return []
+        return panel.window(dates=[panel.previous_date(date), date]).wall_shifts()
+
+    def rollovers(self, date: str) -> List[RolloverFlow]:
+        """
+        date 當天同一結算星期的週選轉倉
+
+        依結算星期分組、按結算日排序，近週契約（當天有資料）與下一個契約配對；
+        以近週的前一個資料日為基準，次週當時尚未掛牌的履約價視為 0
+        """
+        chains: Dict[int, List[ContractPanel]] = {}
+        for panel in self.panels.values():
+            weekday = _settlement_weekday(panel)
+            if weekday is not None and date in panel.dates:
+                chains.setdefault(weekday, []).append(panel)
+
+        flows = []
+        for chain in chains.values():
+            chain.sort(key=lambda p: datetime.strptime(p.settlement_date, '%Y/%m/%d'))
+            for near, following in zip(chain, chain[1:]):
+                previous = near.previous_date(date)
+                if previous is None:
+                    continue
+                near_call, near_put = near.oi_on(date)
+                near_call_before, near_put_before = near.oi_on(previous)
+                next_call, next_put = following.oi_on(date)
+                next_call_before, next_put_before = following.oi_on(previous)
+                flows.append(RolloverFlow(
+                    date=date,
+                    previous_date=previous,
+                    from_code=near.contract_code,
+                    to_code=following.contract_code,
+                    call_closed=int(np.clip(near_call_before - near_call, 0, None).sum()),
+                    put_closed=int(np.clip(near_put_before - near_put, 0, None).sum()),
+                    call_opened=int(np.clip(next_call - next_call_before, 0, None).sum()),
+                    put_opened=int(np.clip(next_put - next_put_before, 0, None).sum()),
+                ))
+        return flows
+
+
+@lru_cache(maxsize=None)
+def get_oi_engine() -> OIDeltaEngine:
+    """共用的 OI 變化引擎（每個行程只載入一次快照）"""
+    return OIDeltaEngine()
@@ -4,12 +4,15 @@ PDF 解析模組
 """
 
 import re
-import pdfplumber
-import pandas as pd
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional, List, Dict
+from src.lazy_import import lazy_import
 from src.twse_fetcher import TWSEDataFetcher
+from src.workflow_spans import traced
+
+pdfplumber = lazy_import('pdfplumber')
+pd = lazy_import('pandas')
 
 
 @dataclass
@@ -41,7 +44,7 @@ class OptionsData:
     settlement_date: Optional[str] = None  # 結算日期: '2026/01/14'
     page_title: Optional[str] = None  # 頁面標題: '週三選擇權OI變化'
 
-    def to_dataframe(self) -> pd.DataFrame:
+    def to_dataframe(self) -> 'pd.DataFrame':
         """轉換為 DataFrame"""
         return pd.DataFrame({
             '履約價': self.strike_prices,
@@ -132,6 +135,7 @@ class PDFParser:
 
         return all_options_data
     
+    @traced('fetch_twse_ohlc')
     def _fetch_twse_ohlc_data(self, trade_date: str) -> Optional[Dict]:
         """
         從台灣證券交易所 API 獲取加權指數 OHLC 資料
@@ -532,7 +536,7 @@ class PDFParser:
             print(f"解析選擇權頁面時發生錯誤: {e}")
             return None
 
-    def parse_to_dataframe(self, pdf_path: str) -> pd.DataFrame:
+    def parse_to_dataframe(self, pdf_path: str) -> 'pd.DataFrame':
         """
         解析 PDF 並返回整合的 DataFrame
 
@@ -0,0 +1,194 @@
+"""
+報告目錄（首頁的資料來源）
+- data/report_catalog.json 保存每份已產生報告的日期、契約、Max Pain、P/C Ratio 與連結
+- 報告產生器寫出報告時追加記錄，首頁不再每次掃描 docs/ 的檔名
+- 同時記錄各月份分頁的內容雜湊，首頁產生時只重寫內容有變動的月份
+- docs/catalog.json 為公開的精簡版本（欄位 + 資料列），供首頁搜尋與篩選
+"""
+
+import json
+import math
+import os
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file_lock import file_lock
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CATALOG_FILE = PROJECT_ROOT / "data" / "report_catalog.json"
+CATALOG_LOCK = PROJECT_ROOT / "data" / "report_catalog.lock"
+PUBLIC_CATALOG_NAME = "catalog.json"
+
+# report_20260109_202601.html / report_20260109_202601W2.html / report_20260113_202601F3.html
+DAILY_FILE_PATTERN = re.compile(r'report_(\d{8})_(\d{6})([WF]\d)?\.html$')
+# settlement_20260108_wed.html
+SETTLEMENT_FILE_PATTERN = re.compile(r'settlement_(\d{8})_(wed|fri)\.html$')
+
+PUBLIC_FIELDS = ['date', 'kind', 'contract', 'max_pain', 'pc_ratio', 'href']
+
+
+def _finite(value) -> bool:
+    return value is not None and math.isfinite(value)
+
+
+@dataclass
+class CatalogEntry:
+    """一份報告"""
+    href: str                  # docs/ 內的檔名
+    kind: str                  # 'daily' 或 'settlement'
+    date: str                  # YYYYMMDD（結算報告為結算日）
+    contract: str              # 契約代號（結算報告為 'wed' / 'fri'）
+    max_pain: Optional[int] = None
+    pc_ratio: Optional[float] = None
+
+    def __post_init__(self):
+        # numpy 數值轉為內建型別；inf / NaN（買權 OI 為 0 時的 P/C Ratio）寫不進 JSON，視為缺值
+        self.max_pain = int(self.max_pain) if _finite(self.max_pain) else None
+        self.pc_ratio = float(self.pc_ratio) if _finite(self.pc_ratio) else None
+
+    @property
+    def month(self) -> str:
+        """YYYY-MM"""
+        return f"{self.date[:4]}-{self.date[4:6]}"
+
+    @property
+    def is_weekly(self) -> bool:
+        return self.kind == 'daily' and len(self.contract) > 6
+
+
+def entry_from_filename(filename: str, max_pain: int = None, pc_ratio: float = None) -> Optional[CatalogEntry]:
+    """
+    由報告檔名建立記錄
+
+    Args:
+        filename: 報告檔名（例如 report_20260109_202601W2.html）
+        max_pain / pc_ratio: 報告的關鍵指標
+
+    Returns:
+        CatalogEntry: 檔名不是報告格式時回傳 None
+    """
+    name = Path(filename).name
+    if '_old' in name:
+        return None
+    match = DAILY_FILE_PATTERN.match(name)
+    if match:
+        contract = match.group(2) + (match.group(3) or '')
+        return CatalogEntry(name, 'daily', match.group(1), contract, max_pain, pc_ratio)
+    match = SETTLEMENT_FILE_PATTERN.match(name)
+    if match:
+        return CatalogEntry(name, 'settlement', match.group(1), match.group(2), max_pain, pc_ratio)
+    return None
+
+
+class ReportCatalog:
+    """報告目錄：href -> CatalogEntry，以及月份分頁的內容雜湊"""
+
+    def __init__(self, path: Path = CATALOG_FILE):
+        self.path = Path(path)
+        self.entries: Dict[str, CatalogEntry] = {}
+        self.pages: Dict[str, str] = {}
+        self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            print(f"⚠️  報告目錄損毀，將重新建立: {e}")
+            return
+        self.entries = {item['href']: CatalogEntry(**item) for item in data.get('reports', [])}
+        self.pages = data.get('pages', {})
+
+    def save(self):
+        """寫入目錄（暫存檔 + 置換）"""
+        data = {
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'reports': [asdict(entry) for entry in self.sorted_entries()],
+            'pages': dict(sorted(self.pages.items())),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, allow_nan=False)
+        os.replace(tmp_path, self.path)
+
+    def add(self, entry: CatalogEntry):
+        self.entries[entry.href] = entry
+
+    def sorted_entries(self) -> List[CatalogEntry]:
+        """最新的在前"""
+        return sorted(self.entries.values(), key=lambda e: (e.date, e.kind, e.href), reverse=True)
+
+    def published(self, docs_dir: Path) -> List[CatalogEntry]:
+        """已同步到 docs/ 的報告（尚未同步的不列入首頁）"""
+        return [entry for entry in self.sorted_entries() if (Path(docs_dir) / entry.href).exists()]
+
+    def backfill(self, docs_dir: Path, parse_metrics=None) -> int:
+        """
+        將 docs/ 中尚未收錄的報告加入目錄（首次建立目錄或 --rebuild-catalog 時使用）
+
+        Args:
+            docs_dir: 報告目錄
+            parse_metrics: 從報告 HTML 取得 {'max_pain', 'pc_ratio'} 的函式（僅用於每日報告）
+
+        Returns:
+            int: 新增的報告數
+        """
+        added = 0
+        for path in sorted(Path(docs_dir).glob('*.html')):
+            if path.name in self.entries:
+                continue
+            entry = entry_from_filename(path.name)
+            if entry is None:
+                continue
+            if parse_metrics and entry.kind == 'daily':
+                metrics = parse_metrics(path) or {}
+                entry = entry_from_filename(path.name, metrics.get('max_pain'), metrics.get('pc_ratio'))
+            self.add(entry)
+            added += 1
+        return added
+
+
+def record_report(filename: str, max_pain: int = None, pc_ratio: float = None):
+    """
+    報告產生後加入目錄（跨行程鎖定，批次平行產生時安全）
+
+    Args:
+        filename: 報告檔名
+        max_pain / pc_ratio: 報告的關鍵指標
+    """
+    entry = entry_from_filename(filename, max_pain, pc_ratio)
+    if entry is None:
+        return
+    try:
+        with file_lock(CATALOG_LOCK):
+            catalog = ReportCatalog()
+            catalog.add(entry)
+            catalog.save()
+    except OSError as e:
+        print(f"⚠️  無法更新報告目錄: {e}")
+
+
+def public_catalog(entries: List[CatalogEntry]) -> Dict:
+    """docs/catalog.json 的內容：欄位名稱只出現一次，每份報告一列"""
+    return {
+        'v': 1,
+        'fields': PUBLIC_FIELDS,
+        'rows': [
+            [
+                entry.date,
+                'd' if entry.kind == 'daily' else 's',
+                entry.contract,
+                entry.max_pain,
+                round(entry.pc_ratio, 4) if entry.pc_ratio is not None else None,
+                entry.href,
+            ]
+            for entry in entries
+        ],
+    }
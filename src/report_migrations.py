@@ -0,0 +1,513 @@
+"""
+歷史報告 HTML 遷移引擎
+- 每個遷移是一個已註冊的轉換函式（HTML 字串 -> HTML 字串），依版本號排序
+- 每個檔案只讀寫一次：一次套用所有尚未套用的遷移，再寫回（暫存檔 + 置換）
+- 檔案開頭的標記 <!-- report-migrations: vN --> 記錄已套用到的版本，已是最新版本的檔案只讀取開頭即略過；
+  沒有標記的報告都已由舊版 maintenance/scripts/ 處理過，視為 LEGACY_VERSION
+- reports/ 與 docs/ 以硬連結共用同一份檔案時只處理一次，寫回後重新連結
+- 以行程池平行處理；dry-run 只計算差異摘要，不寫入
+"""
+
+import difflib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DIRS = (PROJECT_ROOT / "reports", PROJECT_ROOT / "docs")
+REPORT_PATTERNS = ('report_*.html', 'settlement_*.html')
+
+MARKER_PATTERN = re.compile(r'<!-- report-migrations: v(\d+) -->\n?')
+# 標記位於檔案開頭（DOCTYPE 之後），只需讀取這麼多位元組即可判斷版本
+MARKER_SCAN_BYTES = 256
+# 沒有版本標記的報告視為此版本：舊版 maintenance/scripts/ 已對整個報告庫套用 v1 ~ v5，
+# 遷移不一定可重複套用（例如 border-radius 減半），之後新增的遷移才需要套用到這些報告
+LEGACY_VERSION = 5
+
+
+@dataclass
+class Migration:
+    """一個已註冊的遷移"""
+    version: int
+    name: str
+    description: str
+    transform: Callable[[str], str]
+    patterns: Tuple[str, ...] = REPORT_PATTERNS
+
+    def applies_to(self, path: Path) -> bool:
+        return any(fnmatch(Path(path).name, pattern) for pattern in self.patterns)
+
+
+MIGRATIONS: Dict[int, Migration] = {}
+
+
+def register(version: int, name: str, description: str, patterns: Tuple[str, ...] = REPORT_PATTERNS):
+    """
+    註冊遷移的裝飾器（版本號不可重複，新遷移使用下一個版本號）
+
+    Args:
+        version: 版本號
+        name: 遷移名稱
+        description: 說明
+        patterns: 適用的檔名樣式
+    """
+    def decorator(transform: Callable[[str], str]):
+        if version in MIGRATIONS:
+            raise ValueError(f"遷移版本重複: v{version}（{MIGRATIONS[version].name} / {name}）")
+        MIGRATIONS[version] = Migration(version, name, description, transform, tuple(patterns))
+        return transform
+    return decorator
+
+
+def latest_version() -> int:
+    return max(MIGRATIONS, default=0)
+
+
+def migrations_between(current: int, target: int) -> List[Migration]:
+    """版本介於 (current, target] 的遷移（依版本排序）"""
+    return [MIGRATIONS[v] for v in sorted(MIGRATIONS) if current < v <= target]
+
+
+# ---------------------------------------------------------------------------
+# 版本標記
+# ---------------------------------------------------------------------------
+
+def read_version(content: str) -> int:
+    """已套用的版本（沒有標記時為 LEGACY_VERSION）"""
+    match = MARKER_PATTERN.search(content[:MARKER_SCAN_BYTES])
+    return int(match.group(1)) if match else LEGACY_VERSION
+
+
+def read_file_version(path: Path) -> int:
+    """只讀取檔案開頭判斷已套用的版本"""
+    with open(path, 'rb') as f:
+        head = f.read(MARKER_SCAN_BYTES)
+    return read_version(head.decode('utf-8', errors='ignore'))
+
+
+def write_version(content: str, version: int) -> str:
+    """寫入（或更新）版本標記：放在 <!DOCTYPE html> 之後，沒有 DOCTYPE 時放在最前面"""
+    marker = f'<!-- report-migrations: v{version} -->\n'
+    if MARKER_PATTERN.search(content[:MARKER_SCAN_BYTES]):
+        return MARKER_PATTERN.sub(marker, content, count=1)
+    doctype = re.match(r'\s*<!DOCTYPE[^>]*>\n?', content, re.IGNORECASE)
+    if doctype:
+        end = doctype.end()
+        if not content[end - 1:end] == '\n':
+            marker = '\n' + marker
+        return content[:end] + marker + content[end:]
+    return marker + content
+
+
+# ---------------------------------------------------------------------------
+# 引擎
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MigrationResult:
+    """單一檔案的遷移結果"""
+    path: Path
+    from_version: int
+    to_version: int
+    applied: List[str] = field(default_factory=list)   # 實際改變內容的遷移
+    changed: bool = False                              # 內容（不含版本標記）是否改變
+    added: int = 0                                     # 新增行數
+    removed: int = 0                                   # 刪除行數
+    error: Optional[str] = None
+
+
+def migrate_content(content: str, path: Path, target: int, stamp: bool = False) -> Tuple[str, int, List[str]]:
+    """
+    對一份 HTML 套用所有待處理的遷移
+
+    Args:
+        content: HTML 內容
+        path: 報告路徑（判斷遷移是否適用）
+        target: 目標版本
+        stamp: 只寫入版本標記，不執行轉換（舊腳本已處理過的報告）
+
+    Returns:
+        tuple: (新內容, 原版本, 實際改變內容的遷移名稱)
+    """
+    current = read_version(content)
+    applied = []
+    for migration in migrations_between(current, target):
+        if stamp or not migration.applies_to(path):
+            continue
+        updated = migration.transform(content)
+        if updated != content:
+            applied.append(migration.name)
+            content = updated
+    return write_version(content, max(current, target)), current, applied
+
+
+def migrate_file(path: Path, target: int, dry_run: bool = False, stamp: bool = False) -> MigrationResult:
+    """
+    讀取一次、套用所有待處理遷移、寫回一次
+
+    Args:
+        path: 報告路徑
+        target: 目標版本
+        dry_run: 只計算差異，不寫入
+        stamp: 只寫入版本標記
+    """
+    path = Path(path)
+    try:
+        original = path.read_text(encoding='utf-8')
+        updated, current, applied = migrate_content(original, path, target, stamp)
+        result = MigrationResult(path, current, max(current, target), applied, bool(applied))
+        if result.changed:
+            before = MARKER_PATTERN.sub('', original, count=1).splitlines()
+            after = MARKER_PATTERN.sub('', updated, count=1).splitlines()
+            for line in difflib.unified_diff(before, after, lineterm='', n=0):
+                if line.startswith('+') and not line.startswith('+++'):
+                    result.added += 1
+                elif line.startswith('-') and not line.startswith('---'):
+                    result.removed += 1
+        if not dry_run and updated != original:
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_text(updated, encoding='utf-8')
+            os.replace(tmp_path, path)
+        return result
+    except Exception as e:
+        return MigrationResult(path, 0, 0, error=str(e))
+
+
+def _migrate_file_task(args) -> MigrationResult:
+    return migrate_file(*args)
+
+
+def report_files(dirs: Iterable[Path] = DEFAULT_DIRS, patterns: Iterable[str] = REPORT_PATTERNS) -> List[List[Path]]:
+    """
+    需要檢查的報告，硬連結到同一份內容的路徑歸為一組（每組只處理第一個路徑）
+
+    Returns:
+        list: [[主要路徑, 其他連結路徑...], ...]
+    """
+    groups: Dict[Tuple[int, int], List[Path]] = {}
+    for directory in dirs:
+        directory = Path(directory)
+        if not directory.exists():
+            continue
+        for pattern in patterns:
+            for path in sorted(directory.glob(pattern)):
+                stat = path.stat()
+                groups.setdefault((stat.st_dev, stat.st_ino), []).append(path)
+    return sorted(groups.values(), key=lambda paths: paths[0])
+
+
+def run_migrations(dirs: Iterable[Path] = DEFAULT_DIRS, target: int = None, dry_run: bool = False,
+                   workers: int = None, stamp: bool = False) -> List[MigrationResult]:
+    """
+    對報告目錄套用所有待處理的遷移
+
+    沒有版本標記的報告視為 LEGACY_VERSION（舊版 maintenance/scripts/ 已處理過），
+    只套用之後的遷移，不會重複套用 border-radius 減半等轉換。
+
+    Args:
+        dirs: 報告目錄
+        target: 目標版本（預設為最新版本）
+        dry_run: 只計算差異摘要，不寫入
+        workers: 行程數（預設依 CPU 核心數）
+        stamp: 只寫入版本標記，不執行轉換
+
+    Returns:
+        list: 有待處理遷移的檔案結果（已是目標版本的檔案不列出）
+    """
+    target = latest_version() if target is None else target
+    groups = [paths for paths in report_files(dirs) if read_file_version(paths[0]) < target]
+    if not groups:
+        return []
+
+    tasks = [(paths[0], target, dry_run, stamp) for paths in groups]
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_migrate_file_task, tasks, chunksize=8))
+    else:
+        results = [_migrate_file_task(task) for task in tasks]
+
+    # 寫回以置換完成，原本共用同一份內容的其他路徑重新連結
+    if not dry_run:
+        from .docs_sync import link_file
+
+        for paths, result in zip(groups, results):
+            if result.error is None:
+                for other in paths[1:]:
+                    link_file(paths[0], other)
+    return results
+
+
+def summarize(results: List[MigrationResult]) -> Dict[str, Dict[str, int]]:
+    """依遷移彙總：改變的檔案數與增刪行數（同一檔案多個遷移時行數計入每個遷移）"""
+    summary = {}
+    for result in results:
+        for name in result.applied:
+            entry = summary.setdefault(name, {'files': 0, 'added': 0, 'removed': 0})
+            entry['files'] += 1
+            entry['added'] += result.added
+            entry['removed'] += result.removed
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# 已註冊的遷移（原 maintenance/scripts/ 的一次性腳本）
+# ---------------------------------------------------------------------------
+
+# v1：內聯樣式 -> section-content 類別（原 update_section_content.py）
+SECTION_CONTENT_RULES = [
+    # 市場觀察 / 我的看法（藍色邊框）
+    (
+        r'<div style="background:\s*white;\s*padding:\s*(?:25|30)px;\s*border-radius:\s*\d+px;\s*border-left:\s*4px\s+solid\s+var\(--primary-color\);\s*box-shadow:\s*[^;]+;\s*line-height:\s*[\d.]+;\s*white-space:\s*pre-wrap;(?:\s*font-size:\s*[\d.]+rem;)?(?:\s*color:\s*#[0-9a-f]{6};)?">',
+        '<div class="section-content">',
+    ),
+    # 部位策略 / 結算策略（綠色邊框）
+    (
+        r'<div style="background:\s*white;\s*padding:\s*(?:25|30)px;\s*border-radius:\s*\d+px;\s*border-left:\s*4px\s+solid\s+#10b981;\s*box-shadow:\s*[^;]+;\s*line-height:\s*[\d.]+;\s*white-space:\s*pre-wrap;(?:\s*font-size:\s*[\d.]+rem;)?">',
+        '<div class="section-content success">',
+    ),
+    # 風險評估 / 最擔心的風險（紅色邊框 + 背景）
+    (
+        r'<div style="background:\s*#fef2f2;\s*padding:\s*(?:25|30)px;\s*border-radius:\s*\d+px;\s*border-left:\s*4px\s+solid\s+#ef4444;\s*box-shadow:\s*[^;]+;\s*line-height:\s*[\d.]+;\s*white-space:\s*pre-wrap;(?:\s*font-size:\s*[\d.]+rem;)?">',
+        '<div class="section-content danger">',
+    ),
+    # 交易計劃 / 執行計劃（橙色邊框）
+    (
+        r'<div style="background:\s*white;\s*padding:\s*(?:25|30)px;\s*border-radius:\s*\d+px;\s*border-left:\s*4px\s+solid\s+#f59e0b;\s*box-shadow:\s*[^;]+;\s*line-height:\s*[\d.]+;\s*white-space:\s*pre-wrap;(?:\s*font-size:\s*[\d.]+rem;)?">',
+        '<div class="section-content warning">',
+    ),
+    # 市場展望（黃色邊框）
+    (
+        r'<div style="background:\s*white;\s*padding:\s*(?:25|30)px;\s*border-radius:\s*\d+px;\s*border-left:\s*4px\s+solid\s+#fbbf24;\s*box-shadow:\s*[^;]+;\s*line-height:\s*[\d.]+;\s*white-space:\s*pre-wrap;">',
+        '<div class="section-content warning">',
+    ),
+    # 自我反思（紫色邊框）
+    (
+        r'<div style="background:\s*white;\s*padding:\s*(?:25|30)px;\s*border-radius:\s*\d+px;\s*border-left:\s*4px\s+solid\s+#8b5cf6;\s*box-shadow:\s*[^;]+;\s*line-height:\s*[\d.]+;\s*white-space:\s*pre-wrap;">',
+        '<div class="section-content purple">',
+    ),
+]
+SECTION_CONTENT_RULES = [(re.compile(pattern, re.IGNORECASE), repl) for pattern, repl in SECTION_CONTENT_RULES]
+
+
+@register(1, 'section_content_class', '內聯樣式替換為 section-content 類別')
+def section_content_class(content: str) -> str:
+    for pattern, replacement in SECTION_CONTENT_RULES:
+        content = pattern.sub(replacement, content)
+    return content
+
+
+# v2：補上 section-content 的 CSS 定義（原 add_section_content_css.py）
+SECTION_CONTENT_CSS = """
+        /* Section Content */
+        .section-content {
+            background: var(--card-bg);
+            padding: 24px;
+            border-radius: 2px;
+            border-left: 4px solid var(--primary-color);
+            box-shadow: 0 4px 12px rgba(0,0,0,0.08);
+            line-height: 1.9;
+            white-space: pre-wrap;
+            font-size: 0.95rem;
+            color: #3c3c3c;
+        }
+
+        .section-content.success {
+            border-left-color: var(--success-color);
+        }
+
+        .section-content.danger {
+            border-left-color: var(--danger-color);
+            background: #fef2f2;
+        }
+
+        .section-content.warning {
+            border-left-color: var(--warning-color);
+        }
+
+        .section-content.purple {
+            border-left-color: var(--purple-color);
+        }
+
+        @media (max-width: 768px) {
+            .section-content {
+                padding: 16px;
+                font-size: 0.85rem;
+            }
+        }
+"""
+SECTION_RULE_PATTERN = re.compile(r'(\.section\s*\{[^}]+\})', re.MULTILINE | re.DOTALL)
+
+
+@register(2, 'section_content_css', '補上 section-content 的 CSS 定義')
+def section_content_css(content: str) -> str:
+    if '.section-content' in content:
+        return content
+    # 沒有 CSS 定義時插入在 .section 規則之後
+    match = SECTION_RULE_PATTERN.search(content)
+    if not match:
+        return content
+    return content[:match.end()] + '\n' + SECTION_CONTENT_CSS + content[match.end():]
+
+
+# v3：border-radius 縮小為 50%（原 update_border_radius.py）
+BORDER_RADIUS_MAP = {
+    '20px': '10px',
+    '16px': '8px',
+    '12px': '6px',
+    '10px': '5px',
+    '8px': '4px',
+    '6px': '3px',
+    '4px': '2px',
+    '3px': '2px',  # 已經很小，保持 2px
+}
+SINGLE_RADIUS_PATTERNS = [
+    (re.compile(rf'border-radius:\s*{re.escape(old)}(?![0-9])'), f'border-radius: {new}')
+    for old, new in BORDER_RADIUS_MAP.items()
+]
+MULTI_RADIUS_PATTERN = re.compile(r'border-radius:\s*[\d\s]+(px\s*)+')
+
+
+def _replace_multi_radius(match) -> str:
+    value = match.group(0)
+    for old, new in BORDER_RADIUS_MAP.items():
+        value = value.replace(old, new)
+    return value
+
+
+@register(3, 'border_radius', 'border-radius 縮小為 50%')
+def border_radius(content: str) -> str:
+    # 單一值，例如 border-radius: 12px
+    for pattern, replacement in SINGLE_RADIUS_PATTERNS:
+        content = pattern.sub(replacement, content)
+    # 組合值，例如 border-radius: 8px 8px 0 0
+    return MULTI_RADIUS_PATTERN.sub(_replace_multi_radius, content)
+
+
+# v4：AI 預測績效總覽改為橫排單行布局（原 update_ai_performance_layout.py）
+AI_PERFORMANCE_PATTERN = re.compile(
+    r'(<div class="section" style="background: linear-gradient\(135deg, #dbeafe 0%, #3b82f6 100%\);">.*?'
+    r'<h2 class="section-title" style="color: #1e40af;">AI 預測績效總覽</h2>.*?)</div>\s*</div>\s*<!-- AI Settlement Prediction -->',
+    re.DOTALL
+)
+
+
+def _stat_value(block: str, color: str, suffix: str = '') -> Optional[str]:
+    """舊版方塊中的數值（依顏色區分欄位）"""
+    match = re.search(
+        rf'<div style="font-size: 2rem; font-weight: 700; color: {color};">([0-9.]+){suffix}</div>', block
+    )
+    return match.group(1) if match else None
+
+
+def _best_value(block: str, color: str, value_pattern: str) -> Optional[str]:
+    match = re.search(
+        rf'<div style="font-size: 1\.1rem; font-weight: 600; color: {color};">{value_pattern}</div>', block
+    )
+    return match.group(1) if match else None
+
+
+def _stat_row(border: str, label_color: str, label: str, value_color: str, value: str,
+              hint_color: str, hint: str) -> str:
+    return f'''
+                    <div style="background: rgba(255, 255, 255, 0.95); padding: 12px 15px; border-radius: 2px; border-left: 4px solid {border}; display: flex; justify-content: space-between; align-items: center;">
+                        <div>
+                            <span style="font-size: 0.85rem; color: {label_color}; font-weight: 600;">{label}</span>
+                            <span style="font-size: 1.2rem; font-weight: 700; color: {value_color}; margin-left: 8px;">{value}</span>
+                        </div>
+                        <div style="font-size: 0.75rem; color: {hint_color};">{hint}</div>
+                    </div>
+                    '''
+
+
+def _best_cell(label: str, color: str, value: str) -> str:
+    return f'''
+                        <div style="flex: 1; min-width: 100px;">
+                            <span style="font-size: 0.75rem; color: #78716c;">{label}</span>
+                            <span style="font-size: 0.95rem; font-weight: 600; color: {color}; margin-left: 5px;">{value}</span>
+                        </div>'''
+
+
+@register(4, 'ai_performance_layout', 'AI 預測績效總覽改為橫排單行布局', patterns=('settlement_*.html',))
+def ai_performance_layout(content: str) -> str:
+    match = AI_PERFORMANCE_PATTERN.search(content)
+    if not match:
+        return content
+    block = match.group(0)
+
+    total_predictions = _stat_value(block, '#2563eb')
+    avg_accuracy = _stat_value(block, '#059669', '%')
+    avg_error = _stat_value(block, '#d97706')
+    range_success = _stat_value(block, '#7c3aed', '%')
+    if not all([total_predictions, avg_accuracy, avg_error, range_success]):
+        return content
+
+    rows = ''.join([
+        _stat_row('#3b82f6', '#1e40af', '📊 總預測次數：', '#2563eb', total_predictions, '#60a5fa', '累積經驗'),
+        _stat_row('#10b981', '#065f46', '✅ 平均準確度：', '#059669', f'{avg_accuracy}%', '#34d399', '整體表現'),
+        _stat_row('#f59e0b', '#92400e', '📏 平均誤差：', '#d97706', avg_error, '#fbbf24', '點數'),
+        _stat_row('#8b5cf6', '#5b21b6', '🎯 區間命中率：', '#7c3aed', f'{range_success}%', '#a78bfa', '預測精準度'),
+    ]).rstrip() + '\n'
+    new_html = f'''<div class="section" style="background: linear-gradient(135deg, #dbeafe 0%, #3b82f6 100%);">
+                <div class="section-header" style="border-bottom-color: rgba(30, 64, 175, 0.2);">
+                    <span class="section-icon">📈</span>
+                    <h2 class="section-title" style="color: #1e40af;">AI 預測績效總覽</h2>
+                </div>
+
+                <!-- 統計數據 - 橫排格式 -->
+                <div style="display: grid; gap: 12px; margin-bottom: 20px;">{rows}                </div>'''
+
+    best_date = _best_value(block, '#1c1917', r'(\d+)')
+    best_error = _best_value(block, '#059669', r'(\d+) 點')
+    best_accuracy = _best_value(block, '#2563eb', r'(\d+)%')
+    best_score = _best_value(block, '#7c3aed', r'(.*?)')
+    if best_date and best_error and best_accuracy and best_score:
+        cells = ''.join([
+            _best_cell('日期：', '#1c1917', best_date),
+            _best_cell('誤差：', '#059669', f'{best_error} 點'),
+            _best_cell('準確度：', '#2563eb', f'{best_accuracy}%'),
+            _best_cell('評分：', '#7c3aed', best_score),
+        ])
+        new_html += f'''
+
+                <!-- Best Prediction - 橫排格式 -->
+                <div style="background: rgba(255, 255, 255, 0.95); padding: 15px; border-radius: 2px; border-left: 4px solid #fbbf24;">
+                    <div style="font-size: 0.9rem; color: #92400e; margin-bottom: 10px; font-weight: 600;">⭐ 最佳預測記錄</div>
+                    <div style="display: flex; flex-wrap: wrap; gap: 15px; align-items: center;">{cells}
+                    </div>
+                </div>'''
+
+    new_html += '\n            </div>'
+    replacement = new_html + '\n            \n            <!-- AI Settlement Prediction -->'
+    return content[:match.start()] + replacement + content[match.end():]
+
+
+# v5：結算日報告 Tab 結構與 CSS 變數名稱（原 update_report_styles.py 的 HTML 結構部分）
+@register(5, 'settlement_tabs', '結算日報告 Tab 結構與 CSS 變數名稱', patterns=('settlement_*.html',))
+def settlement_tabs(content: str) -> str:
+    # <div class="tabs-container"><div class="tabs-header"> -> <div class="tabs">
+    content = re.sub(
+        r'<div class="tabs-container">\s*<div class="tabs-header">',
+        '<div class="tabs">',
+        content
+    )
+    # 移除 tabs-header 閉合後多出的一層 </div>
+    content = re.sub(
+        r'</div>\s*</div>(\s*<!--\s*Technical Analysis Tab\s*-->)',
+        r'</div>\1',
+        content
+    )
+    # <span class="tab-icon">...</span> 改為直接放在按鈕文字中
+    content = re.sub(
+        r'<span class="tab-icon">([^<]+)</span>',
+        r'\1 ',
+        content
+    )
+    # 殘留的舊 CSS 變數名稱
+    content = content.replace('var(--success-color)', 'var(--put-color)')
+    return content.replace('var(--danger-color)', 'var(--call-color)')
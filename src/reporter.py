@@ -3,11 +3,10 @@
 產生 HTML 格式的選擇權分析報告
 """
 
-import json
 from datetime import datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Optional, List, Tuple, Dict
 
 from .analyzer import AnalysisResult
@@ -18,6 +17,16 @@ from .ai_daily_analyzer import AIDailyAnalyzer
 from .ai_prediction_generator import AIPredictionGenerator
 from .ai_review_analyzer import AIReviewAnalyzer
 from .ai_learning_system import AILearningSystem
+from .assets import publish_assets
+from .chart_data import build_chart_data, chart_data_path, write_chart_data
+from .contract_features import contract_features
+from .docs_sync import link_file
+from .gamma_exposure import compute_exposures, format_exposure
+from .oi_delta import get_oi_engine
+from .report_catalog import record_report
+from .site_build import REPORTS_DIR, daily_report_inputs, record_build, save_options_snapshot
+from .template_renderer import get_environment, render_to_file
+from .workflow_spans import span
 
 
 def get_weekday_chinese(date_str: str) -> str:
@@ -59,13 +68,15 @@ def format_date_with_weekday(date_str: str) -> str:
 class ReportGenerator:
     """HTML 報告產生器"""
 
-    def __init__(self, template_dir: str = None, output_dir: str = None):
+    def __init__(self, template_dir: str = None, output_dir: str = None,
+                 learning_system: AILearningSystem = None):
         """
         初始化報告產生器
 
         Args:
             template_dir: 模板目錄
             output_dir: 報告輸出目錄
+            learning_system: 指定使用的 AI 學習系統（例如唯讀快照），未提供則第一次使用時載入
         """
         project_root = Path(__file__).parent.parent
 
@@ -78,25 +89,43 @@ class ReportGenerator:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 設定 Jinja2 環境
-        self.env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=True
-        )
-        
-        # 初始化結算情境分析器
-        self.settlement_analyzer = SettlementAnalyzer()
-        
-        # 初始化 AI 分析器
-        self.ai_analyzer = AISettlementAnalyzer()
-        
-        # 初始化每日 AI 交易員分析器
-        self.daily_ai_analyzer = AIDailyAnalyzer()
-        
-        # 初始化 AI 學習系統
-        self.ai_learning_system = AILearningSystem()
-        self.prediction_generator = AIPredictionGenerator(self.ai_learning_system)
-        self.review_analyzer = AIReviewAnalyzer(self.ai_learning_system, self.prediction_generator)
+        # 共用的 Jinja2 環境（模板只編譯一次）
+        self.env = get_environment(self.template_dir)
+
+        if learning_system is not None:
+            self.ai_learning_system = learning_system
+
+    # 分析器在第一次使用時才建立（AILearningSystem 會載入全部歷史 JSON）
+
+    @cached_property
+    def settlement_analyzer(self) -> SettlementAnalyzer:
+        """結算情境分析器"""
+        return SettlementAnalyzer()
+
+    @cached_property
+    def ai_analyzer(self) -> AISettlementAnalyzer:
+        """AI 分析器"""
+        return AISettlementAnalyzer()
+
+    @cached_property
+    def ai_learning_system(self) -> AILearningSystem:
+        """AI 學習系統（每日分析、預測與檢討共用同一份）"""
+        return AILearningSystem()
+
+    @cached_property
+    def daily_ai_analyzer(self) -> AIDailyAnalyzer:
+        """每日 AI 交易員分析器"""
+        return AIDailyAnalyzer(self.ai_learning_system)
+
+    @cached_property
+    def prediction_generator(self) -> AIPredictionGenerator:
+        """AI 預測產生器"""
+        return AIPredictionGenerator(self.ai_learning_system)
+
+    @cached_property
+    def review_analyzer(self) -> AIReviewAnalyzer:
+        """AI 檢討分析器"""
+        return AIReviewAnalyzer(self.ai_learning_system, self.prediction_generator)
 
     def generate(
         self,
@@ -141,18 +170,36 @@ class ReportGenerator:
             daily_ai_analysis, prediction, review
         )
 
-        # 載入並渲染模板
-        template = self.env.get_template("report.html")
-        html_content = template.render(**template_data)
-
-        # 寫入檔案
+        # 表格資料另存 JSON，頁面切換到標準分析 Tab 時才載入
         output_path = self.output_dir / f"{filename}.html"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        template_data['chart_data'] = write_chart_data(output_path, build_chart_data(
+            options_data,
+            options_data.contract_code or analysis_result.contract_month,
+            analysis_result.max_pain,
+            analysis_result.max_call_oi_strike,
+            analysis_result.max_put_oi_strike,
+            close=options_data.tx_close or 0,
+        ))
+
+        # 串流渲染到暫存檔後置換
+        with span('render_template', template='report.html'):
+            render_to_file("report.html", output_path, self.template_dir, **template_data)
+        publish_assets(self.output_dir)
+
+        self._record_build(output_path, [options_data], current_date, analysis_result)
 
         print(f"報告已產生: {output_path}")
         return str(output_path)
 
+    def _record_build(self, output_path: Path, options_list: List[OptionsData], date: str,
+                      result: AnalysisResult):
+        """保存 OptionsData 快照、寫入建置記錄（供 build_site.py 增量重建），並加入首頁的報告目錄"""
+        if self.output_dir.resolve() != REPORTS_DIR.resolve():
+            return
+        save_options_snapshot(output_path, options_list)
+        record_build(output_path, 'daily', daily_report_inputs(output_path, date), params={'date': date})
+        record_report(output_path.name, max_pain=result.max_pain, pc_ratio=result.pc_ratio_oi)
+
     def _prepare_template_data(
         self,
         result: AnalysisResult,
@@ -178,30 +225,16 @@ class ReportGenerator:
         pc_ratio = result.pc_ratio_oi
         sentiment = self._calculate_sentiment(pc_ratio)
 
-        # 準備圖表資料
-        oi_chart_data = {
-            'strikes': options_data.strike_prices,
-            'call_oi': options_data.call_oi,
-            'put_oi': options_data.put_oi,
-            'call_oi_change': options_data.call_oi_change,
-            'put_oi_change': options_data.put_oi_change,
-        }
-
-        # 準備表格資料
-        data_rows = []
-        for i, strike in enumerate(options_data.strike_prices):
-            data_rows.append({
-                'strike': strike,
-                'call_volume': options_data.call_volume[i],
-                'call_oi': options_data.call_oi[i],
-                'call_oi_change': options_data.call_oi_change[i],
-                'put_volume': options_data.put_volume[i],
-                'put_oi': options_data.put_oi[i],
-                'put_oi_change': options_data.put_oi_change[i],
-            })
-
         # 產生市場解讀分析項目
         analysis_items = self._generate_analysis_items(result, sentiment)
+
+        # 相對同契約前一個資料日的牆位位移，以及當天週選之間的轉倉
+        oi_engine = get_oi_engine()
+        oi_engine.ingest([options_data])
+        contract_code = options_data.contract_code or options_data.contract_month
+        wall_shifts = [shift.description for shift in oi_engine.wall_shifts(contract_code, result.date)]
+        rollovers = [flow.description for flow in oi_engine.rollovers(result.date)
+                     if flow.call_rolled or flow.put_rolled]
         
         # 準備結算情境資料
         settlement_scenarios = []
@@ -249,12 +282,6 @@ class ReportGenerator:
             'call_resistance': result.call_resistance,
             'put_support': result.put_support,
 
-            # 圖表資料
-            'oi_chart_data': json.dumps(oi_chart_data),
-
-            # 表格資料
-            'data_rows': data_rows,
-
             # 市場解讀
             'analysis_items': analysis_items,
             
@@ -262,6 +289,9 @@ class ReportGenerator:
             'settlement_scenarios': settlement_scenarios,
             'dealer_position': settlement_analysis.dealer_position if settlement_analysis else '',
             'market_bias': settlement_analysis.market_bias if settlement_analysis else '',
+            'gamma_exposure': format_exposure(settlement_analysis.exposure if settlement_analysis else None),
+            'wall_shifts': wall_shifts,
+            'rollovers': rollovers,
             
             # AI 深度分析
             'ai_analysis': ai_analysis if ai_analysis else {},
@@ -392,44 +422,56 @@ class ReportGenerator:
         main_options = options_list[0]
         main_result = analyzer.analyze(main_options)
         
+        # 檔案名使用主契約的日期
+        filename = f"report_{main_result.date}_{main_options.contract_code}"
+        output_path = self.output_dir / f"{filename}.html"
+        docs_path = self.output_dir.parent / "docs" / f"{filename}.html"
+
+        # 所有契約的 Gamma / Delta 曝險一次批次計算（結算情境分析會直接取用快取）
+        exposures = compute_exposures(options_list)
+
+        # 當天所有契約加入 OI 變化引擎，牆位位移與週選轉倉才看得到彼此
+        oi_engine = get_oi_engine()
+        oi_engine.ingest(options_list)
+
         # 準備所有契約的資料
         all_contracts_data = []
         for options_data in options_list:
-            result = analyzer.analyze(options_data)
-            
-            # 準備每個契約的表格數據
-            data_rows = []
-            for i in range(len(options_data.strike_prices)):
-                data_rows.append({
-                    'strike': options_data.strike_prices[i],
-                    'call_oi': options_data.call_oi[i],
-                    'call_oi_change': options_data.call_oi_change[i],
-                    'put_oi': options_data.put_oi[i],
-                    'put_oi_change': options_data.put_oi_change[i],
-                })
+            result = main_result if options_data is main_options else analyzer.analyze(options_data)
+            features = contract_features(options_data)
+            contract_code = options_data.contract_code or options_data.contract_month
+            exposure = exposures.get(contract_code)
             
             # 找到最接近收盤價的履約價（用於反黃標示）
             close_price = options_data.tx_close
-            closest_strike = min(options_data.strike_prices, 
-                               key=lambda x: abs(x - close_price))
+            closest_strike = features.closest_strike
+
+            # 每個契約的表格資料另存 JSON（docs/ 以硬連結共用 reports/ 的檔案）
+            chart_data_url = write_chart_data(output_path, build_chart_data(
+                options_data, contract_code, result.max_pain,
+                result.max_call_oi_strike, result.max_put_oi_strike,
+                closest_strike=closest_strike,
+            ))
+            link_file(chart_data_path(output_path, contract_code), chart_data_path(docs_path, contract_code))
             
             all_contracts_data.append({
-                'contract_code': options_data.contract_code or options_data.contract_month,
+                'contract_code': contract_code,
                 'contract_type': options_data.contract_type or 'unknown',
                 'page_title': options_data.page_title or '選擇權OI變化',
                 'settlement_date': options_data.settlement_date or '',
-                'data_rows': data_rows,
+                'chart_data': chart_data_url,
+                'total_call_oi': features.total_call_oi,
+                'total_put_oi': features.total_put_oi,
                 'max_pain': result.max_pain,
                 'pc_ratio_oi': result.pc_ratio_oi,
                 'max_call_oi_strike': result.max_call_oi_strike,
                 'max_put_oi_strike': result.max_put_oi_strike,
                 'close_price': close_price,
                 'closest_strike': closest_strike,
+                'gamma_flip': round(exposure.zero_gamma) if exposure and exposure.zero_gamma is not None else None,
+                'wall_shifts': [shift.description for shift in oi_engine.wall_shifts(contract_code, main_result.date)],
             })
         
-        # 檔案名使用主契約的日期
-        filename = f"report_{main_result.date}_{main_options.contract_code}"
-        
         # 進行結算情境分析（使用主契約）
         settlement_analysis = self.settlement_analyzer.analyze_settlement_scenarios(main_options)
         
@@ -457,20 +499,19 @@ class ReportGenerator:
         template_data['all_contracts'] = all_contracts_data
         template_data['is_multi_contract'] = True
         
-        # 載入並渲染模板
-        template = self.env.get_template("report.html")
-        html_content = template.render(**template_data)
-        
-        # 寫入檔案
-        output_path = self.output_dir / f"{filename}.html"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        # 複製到 docs 目錄
-        docs_path = self.output_dir.parent / "docs" / f"{filename}.html"
-        with open(docs_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
+        # 串流渲染到暫存檔後置換
+        with span('render_template', template='report.html', contracts=len(all_contracts_data)):
+            render_to_file("report.html", output_path, self.template_dir, **template_data)
+
+        # docs 目錄以硬連結共用同一份檔案（無法連結時複製）
+        link_file(output_path, docs_path)
+
+        # 頁面引用的共用 CSS/JS
+        publish_assets(self.output_dir)
+        publish_assets(docs_path.parent)
+
+        self._record_build(output_path, options_list, current_date, main_result)
+
         print(f"綜合報告已產生: {output_path}")
         return str(output_path)
 
@@ -3,12 +3,12 @@
 基於 OI 分布和價格行為，分析可能的結算情境
 """
 
-import pandas as pd
-import numpy as np
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
 from .parser import OptionsData
 from .analyzer import OptionsAnalyzer
+from .contract_features import contract_features
+from .gamma_exposure import ExposureSurface, contract_exposure
 
 
 @dataclass
@@ -33,6 +33,7 @@ class SettlementAnalysis:
     critical_strikes: List[int]  # 關鍵履約價
     dealer_position: str  # 莊家位置判斷
     market_bias: str  # 市場偏向
+    exposure: Optional[ExposureSurface] = None  # Gamma / Delta 曝險（缺收盤價或到期日時為 None）
 
 
 class SettlementAnalyzer:
@@ -58,8 +59,9 @@ class SettlementAnalyzer:
         # 找出關鍵價位
         critical_strikes = self._identify_critical_strikes(options_data)
 
-        # 判斷莊家位置和市場偏向
-        dealer_position = self._analyze_dealer_position(options_data, base_result)
+        # 判斷莊家位置和市場偏向（同日報告已批次計算過曝險時直接取用快取）
+        exposure = contract_exposure(options_data)
+        dealer_position = self._analyze_dealer_position(options_data, base_result, exposure)
         market_bias = self._analyze_market_bias(options_data, base_result)
 
         # 生成可能的結算情境
@@ -78,7 +80,8 @@ class SettlementAnalyzer:
             scenarios=scenarios,
             critical_strikes=critical_strikes,
             dealer_position=dealer_position,
-            market_bias=market_bias
+            market_bias=market_bias,
+            exposure=exposure
         )
 
     def _identify_critical_strikes(self, options_data: OptionsData) -> List[int]:
@@ -90,57 +93,36 @@ class SettlementAnalyzer:
         3. 總 OI 最大的價位
         4. OI 變化最大的價位
         """
-        critical = []
-
-        # Call OI 最大
-        call_oi_dict = dict(zip(options_data.strike_prices, options_data.call_oi))
-        if call_oi_dict:
-            max_call_strike = max(call_oi_dict, key=call_oi_dict.get)
-            critical.append(max_call_strike)
-
-        # Put OI 最大
-        put_oi_dict = dict(zip(options_data.strike_prices, options_data.put_oi))
-        if put_oi_dict:
-            max_put_strike = max(put_oi_dict, key=put_oi_dict.get)
-            critical.append(max_put_strike)
-
-        # 總 OI 最大
-        total_oi_dict = {
-            strike: call_oi_dict.get(strike, 0) + put_oi_dict.get(strike, 0)
-            for strike in options_data.strike_prices
-        }
-        if total_oi_dict:
-            max_total_strike = max(total_oi_dict, key=total_oi_dict.get)
-            critical.append(max_total_strike)
-
-        # OI 變化最大（絕對值）
-        oi_change_dict = {
-            strike: abs(options_data.call_oi_change[i]) + abs(options_data.put_oi_change[i])
-            for i, strike in enumerate(options_data.strike_prices)
-        }
-        if oi_change_dict:
-            max_change_strike = max(oi_change_dict, key=oi_change_dict.get)
-            critical.append(max_change_strike)
-
-        # 去重並排序
-        return sorted(list(set(critical)))
-
-    def _analyze_dealer_position(self, options_data: OptionsData, base_result) -> str:
+        return contract_features(options_data).critical_strikes
+
+    def _analyze_dealer_position(self, options_data: OptionsData, base_result,
+                                 exposure: Optional[ExposureSurface] = None) -> str:
         """
         分析莊家位置
-        基於 OI 變化判斷莊家的建倉方向
+        基於 OI 變化判斷莊家的建倉方向，有曝險曲面時補充 Gamma 狀態與翻轉點
         """
         call_oi_change = base_result.call_oi_change
         put_oi_change = base_result.put_oi_change
 
         if put_oi_change > call_oi_change * 1.5:
-            return "莊家大量賣出 Put（看多或護盤）"
+            position = "莊家大量賣出 Put（看多或護盤）"
         elif call_oi_change > put_oi_change * 1.5:
-            return "莊家大量賣出 Call（看空或壓盤）"
+            position = "莊家大量賣出 Call（看空或壓盤）"
         elif put_oi_change > 0 and call_oi_change > 0:
-            return "莊家雙邊賣出（區間整理）"
+            position = "莊家雙邊賣出（區間整理）"
+        else:
+            position = "莊家持倉減少（觀望或平倉）"
+
+        if exposure is None:
+            return position
+        if exposure.net_gamma > 0:
+            gamma_text = "正 Gamma，避險買低賣高、抑制波動"
         else:
-            return "莊家持倉減少（觀望或平倉）"
+            gamma_text = "負 Gamma，避險追漲殺跌、放大波動"
+        zero_gamma = exposure.zero_gamma
+        if zero_gamma is not None:
+            gamma_text += f"；Gamma 翻轉點約 {zero_gamma:,.0f}"
+        return f"{position}｜{gamma_text}"
 
     def _analyze_market_bias(self, options_data: OptionsData, base_result) -> str:
         """
@@ -179,11 +161,8 @@ class SettlementAnalyzer:
         scenarios = []
 
         # 找出最大 Put OI 和 Call OI 價位
-        put_oi_dict = dict(zip(options_data.strike_prices, options_data.put_oi))
-        call_oi_dict = dict(zip(options_data.strike_prices, options_data.call_oi))
-
-        max_put_strike = max(put_oi_dict, key=put_oi_dict.get) if put_oi_dict else 0
-        max_call_strike = max(call_oi_dict, key=call_oi_dict.get) if call_oi_dict else 0
+        max_put_strike = base_result.max_put_oi_strike
+        max_call_strike = base_result.max_call_oi_strike
         max_pain = base_result.max_pain
 
         # 情境 A: 弱勢結算（跌破 Max Pain，往最大 Put OI 靠攏）
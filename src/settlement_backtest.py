@@ -0,0 +1,455 @@
+"""
+結算預測回測引擎
+把 SettlementPredictor 的訊號規則改寫成陣列運算，一次重播所有歷史週三/週五結算：
+- 報告指標（收盤價、P/C Ratio、Max Pain、OI 變化）整理成欄式指標表，解析結果依檔案大小與修改時間快取
+- 結算案例來自 settlement_reviews 的實際結算價，分析日為結算日前 2 個交易日（與產生結算報告時相同）
+- 四種訊號、整體趨勢、結算中心與區間皆以 (案例數, 分析日數) 陣列計算，輸出命中率、區間覆蓋率與誤差分布
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .lazy_import import lazy_import
+from .settlement_predictor import (
+    DEFAULT_HALF_RANGE,
+    SignalParams,
+    _load_calibration,
+    calibrated_half_range,
+    parse_report_html,
+)
+from .trading_calendar import get_calendar
+
+np = lazy_import('numpy')
+
+REPORTS_DIR = Path("reports")
+REVIEWS_DIR = Path("data/ai_learning/settlement_reviews")
+METRICS_CACHE_FILE = Path(".cache/report_metrics.json")
+# parse_report_html 的解析規則改變時遞增，舊快取整個捨棄
+METRICS_CACHE_VERSION = 2
+
+# 結算報告使用結算日前 2 個交易日的數據
+ANALYSIS_DAYS = 2
+
+METRIC_FIELDS = ('close_price', 'pc_ratio', 'max_pain', 'call_oi_change', 'put_oi_change')
+DAILY_REPORT_PATTERN = re.compile(r'^report_(\d{8})_.+\.html$')
+
+# 沒有價格也沒有 Max Pain 時，預測器使用的預設區間
+FALLBACK_RANGE = (23000, 24000)
+
+BULLISH, NEUTRAL, BEARISH = 1, 0, -1
+TREND_NAMES = {BULLISH: 'bullish', NEUTRAL: 'neutral', BEARISH: 'bearish'}
+
+
+@dataclass
+class MetricsTable:
+    """欄式報告指標表：每個交易日一列（同日多份報告取檔名排序第一份，與預測器相同）"""
+    dates: 'np.ndarray'                                              # datetime64[D]，已排序
+    columns: 'Dict[str, np.ndarray]' = field(default_factory=dict)   # 欄位 -> float 陣列，缺值為 NaN
+
+    def lookup(self, days: 'np.ndarray'):
+        """
+        查詢多個日期的指標
+
+        Args:
+            days: datetime64[D] 陣列（任意形狀）
+
+        Returns:
+            (present, columns): 是否有報告的布林陣列，以及同形狀的欄位陣列（缺值為 NaN）
+        """
+        if not len(self.dates):
+            return np.zeros(days.shape, dtype=bool), {name: np.full(days.shape, np.nan) for name in METRIC_FIELDS}
+
+        index = np.minimum(np.searchsorted(self.dates, days), len(self.dates) - 1)
+        present = self.dates[index] == days
+        columns = {name: np.where(present, self.columns[name][index], np.nan) for name in METRIC_FIELDS}
+        return present, columns
+
+
+@dataclass
+class SettlementCases:
+    """歷史結算案例（每個案例一列，分析日由舊到新）"""
+    dates: 'np.ndarray'                # datetime64[D] 結算日
+    weekdays: 'np.ndarray'             # 'wednesday' / 'friday'
+    actual: 'np.ndarray'               # 實際結算價
+    analysis_dates: 'np.ndarray'       # (N, W) datetime64[D]
+    present: 'np.ndarray'              # (N, W) 該分析日是否有報告
+    columns: 'Dict[str, np.ndarray]'   # 欄位 -> (N, W) float，缺值為 NaN
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def subset(self, mask) -> 'SettlementCases':
+        """依布林遮罩或索引取出部分案例"""
+        return SettlementCases(
+            dates=self.dates[mask],
+            weekdays=self.weekdays[mask],
+            actual=self.actual[mask],
+            analysis_dates=self.analysis_dates[mask],
+            present=self.present[mask],
+            columns={name: values[mask] for name, values in self.columns.items()},
+        )
+
+
+@dataclass
+class BacktestResult:
+    """回測結果（每個陣列一個案例）"""
+    cases: SettlementCases
+    params: SignalParams
+    trend: 'np.ndarray'          # 1 多 / 0 中性 / -1 空
+    current_price: 'np.ndarray'  # 預測時的基準價（缺價格時以 Max Pain 代替）
+    center: 'np.ndarray'         # 結算中心
+    lower: 'np.ndarray'
+    upper: 'np.ndarray'
+    has_data: 'np.ndarray'       # 至少有一份分析日報告（否則預測器回傳 (0, 0)）
+    fallback: 'np.ndarray'       # 沒有價格也沒有 Max Pain（使用預設區間）
+
+    def with_half_ranges(self, half_ranges: Dict[str, int]) -> 'BacktestResult':
+        """換用其他區間半徑（訊號與中心不變，參數掃描時免重算）"""
+        lower, upper = _predicted_range(self.cases, self.center, self.fallback, self.has_data, half_ranges)
+        return replace(self, lower=lower, upper=upper)
+
+    @property
+    def in_range(self) -> 'np.ndarray':
+        return (self.cases.actual >= self.lower) & (self.cases.actual <= self.upper)
+
+    @property
+    def direction_hit(self) -> 'np.ndarray':
+        """預測方向（中心相對基準價）與實際方向（結算價相對基準價）一致"""
+        return np.sign(self.center - self.current_price) == np.sign(self.cases.actual - self.current_price)
+
+    @property
+    def error(self) -> 'np.ndarray':
+        """實際結算價 - 結算中心"""
+        return self.cases.actual - self.center
+
+    @property
+    def width(self) -> 'np.ndarray':
+        return self.upper - self.lower
+
+    def summary(self) -> Dict:
+        """整體與各週別的命中率、覆蓋率與誤差分布（只計入有數據的案例）"""
+        result = {
+            'count': int(len(self.cases)),
+            'no_data': int((~self.has_data).sum()),
+            'overall': _summarize(self, self.has_data),
+        }
+        for weekday in ('wednesday', 'friday'):
+            result[weekday] = _summarize(self, self.has_data & (self.cases.weekdays == weekday))
+        return result
+
+
+def _summarize(result: BacktestResult, mask: 'np.ndarray') -> Dict:
+    count = int(mask.sum())
+    if not count:
+        return {'count': 0}
+    errors = np.abs(result.error[mask])
+    return {
+        'count': count,
+        'direction_hit_rate': round(float(result.direction_hit[mask].mean()) * 100, 1),
+        'interval_coverage': round(float(result.in_range[mask].mean()) * 100, 1),
+        'avg_width': round(float(result.width[mask].mean()), 1),
+        'bias': round(float(result.error[mask].mean()), 1),
+        'error_stats': {
+            'mean': round(float(errors.mean()), 1),
+            'median': round(float(np.median(errors)), 1),
+            'p75': round(float(np.percentile(errors, 75)), 1),
+            'p90': round(float(np.percentile(errors, 90)), 1),
+            'max': round(float(errors.max()), 1),
+        },
+    }
+
+
+def _load_metrics_cache(cache_file: Path) -> Dict[str, List]:
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.pop('version', None) != METRICS_CACHE_VERSION:
+        return {}
+    return cache
+
+
+def _save_metrics_cache(cache_file: Path, cache: Dict[str, List]):
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_file.with_name(f".{cache_file.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': METRICS_CACHE_VERSION, **cache}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        print(f"⚠️  無法寫入指標快取 {cache_file}: {e}")
+
+
+def load_metrics_table(reports_dir: Path = REPORTS_DIR,
+                       cache_file: Optional[Path] = METRICS_CACHE_FILE) -> MetricsTable:
+    """
+    解析每日報告的關鍵指標並整理成欄式表格
+
+    Args:
+        reports_dir: 報告目錄
+        cache_file: 解析結果快取（依檔名、大小與修改時間判斷是否需要重新解析），None 表示不使用快取
+
+    Returns:
+        MetricsTable: 欄式指標表
+    """
+    first_report: Dict[str, Path] = {}
+    for path in sorted(Path(reports_dir).glob('report_*.html')):
+        match = DAILY_REPORT_PATTERN.match(path.name)
+        if match:
+            first_report.setdefault(match.group(1), path)
+
+    cache = _load_metrics_cache(cache_file) if cache_file else {}
+    fresh: Dict[str, List] = {}
+    rows = []
+    for date_str, path in first_report.items():
+        stat = path.stat()
+        entry = cache.get(path.name)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            data = entry[2]
+        else:
+            data = parse_report_html(path)
+        fresh[path.name] = [stat.st_size, stat.st_mtime_ns, data]
+        if data:
+            rows.append((date_str, data))
+
+    if cache_file and fresh != cache:
+        _save_metrics_cache(cache_file, fresh)
+
+    dates = np.array([f"{d[:4]}-{d[4:6]}-{d[6:]}" for d, _ in rows], dtype='datetime64[D]')
+    columns = {
+        name: np.array([data.get(name, np.nan) for _, data in rows], dtype=float)
+        for name in METRIC_FIELDS
+    }
+    return MetricsTable(dates=dates, columns=columns)
+
+
+def load_settlement_cases(table: MetricsTable, reviews_dir: Path = REVIEWS_DIR,
+                          analysis_days: int = ANALYSIS_DAYS) -> SettlementCases:
+    """
+    從結算審核記錄建立案例，並以交易日曆找出各案例的分析日
+
+    Args:
+        table: 欄式指標表
+        reviews_dir: settlement_reviews 目錄
+        analysis_days: 結算日前的分析交易日數
+
+    Returns:
+        SettlementCases: 依結算日排序的案例
+    """
+    records = {}
+    for path in sorted(Path(reviews_dir).glob('settlement_review_*.json')):
+        try:
+            review = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"  跳過 {path.name}: {e}")
+            continue
+        date_str = str(review.get('settlement_date', '')).replace('/', '').replace('-', '')
+        weekday = str(review.get('weekday', '')).lower()
+        actual = (review.get('actual_result') or {}).get('settlement_price')
+        if len(date_str) != 8 or weekday not in DEFAULT_HALF_RANGE or not actual:
+            continue
+        records[date_str] = (weekday, float(actual))
+
+    ordered = sorted(records)
+    dates = np.array([f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in ordered], dtype='datetime64[D]')
+    calendar = get_calendar()
+    analysis_dates = np.stack(
+        [calendar.trading_days_before(dates, n) for n in range(analysis_days, 0, -1)], axis=1
+    ) if len(dates) else np.empty((0, analysis_days), dtype='datetime64[D]')
+    present, columns = table.lookup(analysis_dates)
+
+    return SettlementCases(
+        dates=dates,
+        weekdays=np.array([records[d][0] for d in ordered], dtype=object),
+        actual=np.array([records[d][1] for d in ordered], dtype=float),
+        analysis_dates=analysis_dates,
+        present=present,
+        columns=columns,
+    )
+
+
+def _first_last_valid(values: 'np.ndarray'):
+    """每列第一個與最後一個非 NaN 值，以及非 NaN 的個數"""
+    valid = ~np.isnan(values)
+    rows = np.arange(values.shape[0])
+    width = values.shape[1]
+    first = values[rows, np.argmax(valid, axis=1)]
+    last = values[rows, width - 1 - np.argmax(valid[:, ::-1], axis=1)]
+    return first, last, valid.sum(axis=1)
+
+
+def _nanmean(values: 'np.ndarray', mask: 'np.ndarray') -> 'np.ndarray':
+    count = mask.sum(axis=1)
+    total = np.where(mask, values, 0.0).sum(axis=1)
+    return np.divide(total, count, out=np.zeros(len(count)), where=count > 0)
+
+
+def _strength(values: 'np.ndarray', divisor: float, low: int, high: int = 5) -> 'np.ndarray':
+    """對應 min(high, max(low, int(x / divisor) + 2))"""
+    return np.clip(np.trunc(values / divisor) + 2, low, high)
+
+
+def _oi_signal(columns: 'Dict[str, np.ndarray]'):
+    """_analyze_oi_trend：買賣權 OI 平均變化"""
+    call, put = columns['call_oi_change'], columns['put_oi_change']
+    both = ~np.isnan(call) & ~np.isnan(put)
+    avg_call, avg_put = _nanmean(call, both), _nanmean(put, both)
+
+    bullish = avg_call > np.abs(avg_put) * 1.3
+    bearish = ~bullish & (np.abs(avg_put) > avg_call * 1.3)
+    direction = np.select([bullish, bearish], [BULLISH, BEARISH], NEUTRAL)
+    strength = np.select(
+        [bullish, bearish],
+        [_strength(avg_call, 3000, 2), _strength(np.abs(avg_put), 3000, 2)],
+        2,
+    )
+    return both.any(axis=1), direction, strength
+
+
+def _pc_signal(columns: 'Dict[str, np.ndarray]', params: SignalParams):
+    """_analyze_pc_ratio_trend：P/C Ratio 平均與首末變化"""
+    pc = columns['pc_ratio']
+    first, last, count = _first_last_valid(pc)
+    avg = _nanmean(pc, ~np.isnan(pc))
+    trend = np.where(count >= 2, last - first, 0.0)
+
+    bullish = (avg < params.pc_low) | (
+        ~(avg > params.pc_extreme) & ~(avg > params.pc_high) & (trend < -0.15)
+    )
+    direction = np.where(bullish, BULLISH, NEUTRAL)
+    strength = np.where(bullish, 3, 2)
+    return count > 0, direction, strength
+
+
+def _momentum_signal(columns: 'Dict[str, np.ndarray]', latest_max_pain: 'np.ndarray', params: SignalParams):
+    """_analyze_price_momentum：多日看收盤價變化，單日看與最新 Max Pain 的距離"""
+    first, last, count = _first_last_valid(columns['close_price'])
+    threshold = params.momentum_threshold
+
+    # 多日：價格變化
+    change = last - first
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.abs(change / first * 100)
+    multi_strength = _strength(pct, 0.5, 3)
+    multi_direction = np.select([change > threshold, change < -threshold], [BULLISH, BEARISH], NEUTRAL)
+
+    # 單日：價格相對 Max Pain（未超過門檻時沒有訊號）
+    diff = first - latest_max_pain
+    single_direction = np.select([diff > threshold, diff < -threshold], [BULLISH, BEARISH], NEUTRAL)
+    single_valid = (count == 1) & ~np.isnan(latest_max_pain) & (single_direction != NEUTRAL)
+
+    multi = count >= 2
+    direction = np.where(multi, multi_direction, single_direction)
+    strength = np.where(multi, np.where(multi_direction == NEUTRAL, 2, multi_strength), 3)
+    return multi | single_valid, direction, strength
+
+
+def _max_pain_signal(latest_close: 'np.ndarray', latest_max_pain: 'np.ndarray', params: SignalParams):
+    """_analyze_max_pain_distance：最新報告的價格與 Max Pain 距離"""
+    distance = latest_close - latest_max_pain
+    far, near = distance > params.max_pain_far, distance < -params.max_pain_far
+    close_by = np.abs(distance) < params.max_pain_near
+    direction = np.select([far, near], [BEARISH, BULLISH], NEUTRAL)
+    strength = np.select([far | near, close_by], [4, 3], 2)
+    return ~np.isnan(distance), direction, strength
+
+
+def _overall_trend(signals) -> 'np.ndarray':
+    """_calculate_overall_trend：依各方向強度總和判斷主趨勢"""
+    scores = {}
+    for side in (BULLISH, BEARISH, NEUTRAL):
+        scores[side] = sum(np.where(valid & (direction == side), strength, 0)
+                           for valid, direction, strength in signals)
+    bull, bear, neutral = scores[BULLISH], scores[BEARISH], scores[NEUTRAL]
+    return np.select(
+        [(bull > bear * 1.3) & (bull > neutral), (bear > bull * 1.3) & (bear > neutral)],
+        [BULLISH, BEARISH],
+        NEUTRAL,
+    )
+
+
+def _predicted_range(cases: SettlementCases, center: 'np.ndarray', fallback: 'np.ndarray',
+                     has_data: 'np.ndarray', half_ranges: Dict[str, int]):
+    """結算中心 ± 週別半徑，取整到 50 點"""
+    half_range = np.array([half_ranges.get(w, 300) for w in cases.weekdays], dtype=float)
+    lower = np.floor_divide(center - half_range, 50) * 50
+    upper = np.floor_divide(center + half_range, 50) * 50
+
+    lower = np.where(fallback, FALLBACK_RANGE[0], lower)
+    upper = np.where(fallback, FALLBACK_RANGE[1], upper)
+
+    # 沒有任何報告：預測器回傳預設預測 (0, 0)
+    return np.where(has_data, lower, 0), np.where(has_data, upper, 0)
+
+
+def run_backtest(cases: SettlementCases, params: Optional[SignalParams] = None,
+                 half_ranges: Optional[Dict[str, int]] = None) -> BacktestResult:
+    """
+    以陣列運算重播所有案例的 predict_settlement 預測區間
+
+    Args:
+        cases: 歷史結算案例
+        params: 訊號門檻與權重（預設讀取 calibration.json，與預測器相同）
+        half_ranges: 各週別的區間半徑（預設讀取 calibration.json，與預測器相同）
+
+    Returns:
+        BacktestResult: 每個案例的趨勢、中心與區間
+    """
+    if params is None or half_ranges is None:
+        calibration = _load_calibration()
+        params = params or SignalParams.from_dict(calibration.get('settlement_params', {}).get('recommended', {}))
+        if half_ranges is None:
+            half_ranges = {weekday: calibrated_half_range(calibration, weekday) for weekday in DEFAULT_HALF_RANGE}
+
+    columns = cases.columns
+    rows = np.arange(len(cases))
+    width = cases.present.shape[1]
+    has_data = cases.present.any(axis=1)
+    latest = width - 1 - np.argmax(cases.present[:, ::-1], axis=1)
+    latest_close = columns['close_price'][rows, latest]
+    latest_max_pain = columns['max_pain'][rows, latest]
+
+    signals = [
+        _oi_signal(columns),
+        _pc_signal(columns, params),
+        _momentum_signal(columns, latest_max_pain, params),
+        _max_pain_signal(latest_close, latest_max_pain, params),
+    ]
+    trend = np.where(has_data, _overall_trend(signals), NEUTRAL)
+
+    # _predict_settlement_range：缺一邊時以另一邊代替
+    current_price = np.nan_to_num(latest_close, nan=0.0)
+    max_pain = np.nan_to_num(latest_max_pain, nan=0.0)
+    no_price = (current_price == 0) & (max_pain == 0)
+    current_price = np.where(current_price == 0, max_pain, current_price)
+    max_pain = np.where(max_pain == 0, current_price, max_pain)
+
+    blend = params.center_blend
+    toward_price = np.trunc(current_price * blend + max_pain * (1 - blend))
+    toward_pain = np.trunc(current_price * (1 - blend) + max_pain * blend)
+    center = np.select(
+        [trend == BULLISH, trend == BEARISH],
+        [np.where(current_price > max_pain, toward_price, toward_pain),
+         np.where(current_price < max_pain, toward_price, toward_pain)],
+        max_pain,
+    )
+
+    center = np.where(no_price, sum(FALLBACK_RANGE) / 2, center)
+    lower, upper = _predicted_range(cases, center, no_price, has_data, half_ranges)
+
+    return BacktestResult(
+        cases=cases,
+        params=params,
+        trend=trend,
+        current_price=current_price,
+        center=center,
+        lower=lower,
+        upper=upper,
+        has_data=has_data,
+        fallback=no_price,
+    )
@@ -0,0 +1,262 @@
+"""
+結算價格分布（蒙地卡羅模擬）
+取代單一的 ±半徑區間：以回測重播的歷史結算誤差做自助抽樣，產生完整的結算價格分布
+- 誤差以「(實際結算價 - 結算中心) / 結算中心」的比例保存，價格水準改變後仍可沿用
+- 依週別、P/C Ratio 區間與 Max Pain 距離分組，樣本不足時逐層放寬條件
+- 每條路徑加上平滑核（Silverman 帶寬）的常態擾動，避免分布只落在少數歷史誤差上
+- 10 萬條路徑一次以 NumPy 批次抽樣，輸出分位數、各履約價的 P(結算 > 履約價) 與最可能的 Pin 履約價
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .chart_data import CHART_DATA_DIRNAME
+from .lazy_import import lazy_import
+from .settlement_backtest import (
+    BacktestResult,
+    SettlementCases,
+    load_metrics_table,
+    load_settlement_cases,
+    run_backtest,
+)
+from .settlement_predictor import SettlementPrediction, SignalParams
+
+np = lazy_import('numpy')
+
+DEFAULT_PATHS = 100_000
+QUANTILES = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95)
+
+# 每個條件分組至少需要的歷史樣本數，不足時放寬條件
+MIN_BUCKET_SAMPLES = 5
+
+# 沒有履約價清單時，以 50 點間距涵蓋模擬分布的 1%～99%
+STRIKE_STEP = 50
+
+# 報告直方圖的區間數
+HISTOGRAM_BINS = 24
+
+PC_BUCKET_LABELS = ('PC 偏低', 'PC 中性', 'PC 偏高', 'PC 極高')
+DISTANCE_BUCKET_LABELS = ('貼近 Max Pain', '距離 Max Pain 中等', '遠離 Max Pain')
+
+
+def pc_bucket(pc_ratio: 'np.ndarray', params: SignalParams) -> 'np.ndarray':
+    """P/C Ratio 區間：0 偏低 / 1 中性 / 2 偏高 / 3 極高（缺值為 -1）"""
+    bucket = np.select(
+        [pc_ratio < params.pc_low, pc_ratio > params.pc_extreme, pc_ratio > params.pc_high], [0, 3, 2], 1
+    )
+    return np.where(np.isnan(pc_ratio), -1, bucket)
+
+
+def distance_bucket(distance: 'np.ndarray', params: SignalParams) -> 'np.ndarray':
+    """Max Pain 距離區間：0 貼近 / 1 中等 / 2 遠離（缺值為 -1）"""
+    magnitude = np.abs(distance)
+    bucket = np.select([magnitude < params.max_pain_near, magnitude > params.max_pain_far], [0, 2], 1)
+    return np.where(np.isnan(distance), -1, bucket)
+
+
+@dataclass
+class ResidualPool:
+    """歷史結算誤差（比例）與分組條件"""
+    residuals: 'np.ndarray'
+    weekdays: 'np.ndarray'
+    pc_buckets: 'np.ndarray'
+    distance_buckets: 'np.ndarray'
+
+    @classmethod
+    def from_backtest(cls, result: BacktestResult) -> 'ResidualPool':
+        cases = result.cases
+        valid = result.has_data & ~result.fallback & (result.center > 0)
+        pc = cases.columns['pc_ratio']
+        pc_count = (~np.isnan(pc)).sum(axis=1)
+        avg_pc = np.divide(np.nansum(pc, axis=1), pc_count,
+                           out=np.full(len(cases), np.nan), where=pc_count > 0)
+        distance = _latest_distance(cases)
+        return cls(
+            residuals=(result.error / np.where(result.center > 0, result.center, 1))[valid],
+            weekdays=cases.weekdays[valid],
+            pc_buckets=pc_bucket(avg_pc, result.params)[valid],
+            distance_buckets=distance_bucket(distance, result.params)[valid],
+        )
+
+    def __len__(self) -> int:
+        return len(self.residuals)
+
+    def select(self, weekday: str, pc: int, distance: int,
+               min_samples: int = MIN_BUCKET_SAMPLES) -> 'Tuple[np.ndarray, str]':
+        """
+        依條件取出誤差樣本，樣本不足時依序放寬：
+        週別+PC+距離 → 週別+PC → 週別+距離 → 週別 → 全部
+
+        Returns:
+            (樣本, 使用的條件說明)
+        """
+        same_day = self.weekdays == weekday
+        same_pc = self.pc_buckets == pc
+        same_distance = self.distance_buckets == distance
+        weekday_text = '週三' if weekday == 'wednesday' else '週五'
+        pc_text = PC_BUCKET_LABELS[pc] if pc >= 0 else ''
+        distance_text = DISTANCE_BUCKET_LABELS[distance] if distance >= 0 else ''
+
+        levels = [
+            (same_day & same_pc & same_distance, f'{weekday_text}・{pc_text}・{distance_text}'),
+            (same_day & same_pc, f'{weekday_text}・{pc_text}'),
+            (same_day & same_distance, f'{weekday_text}・{distance_text}'),
+            (same_day, f'{weekday_text}'),
+        ]
+        for mask, label in levels:
+            if mask.sum() >= min_samples:
+                return self.residuals[mask], label
+        return self.residuals, '全部結算'
+
+
+def _latest_distance(cases: SettlementCases) -> 'np.ndarray':
+    """最新一份分析日報告的收盤價 - Max Pain"""
+    rows = np.arange(len(cases))
+    latest = cases.present.shape[1] - 1 - np.argmax(cases.present[:, ::-1], axis=1)
+    return cases.columns['close_price'][rows, latest] - cases.columns['max_pain'][rows, latest]
+
+
+@dataclass
+class SettlementDistribution:
+    """結算價格分布"""
+    center: float
+    paths: int
+    samples: int                               # 使用的歷史誤差樣本數
+    condition: str                             # 使用的分組條件
+    quantiles: Dict[float, float]
+    mean: float
+    strikes: List[int]
+    prob_above: List[float]                    # 與 strikes 對應的 P(結算價 > 履約價)
+    expected_pin: int                          # 最可能的 Pin 履約價（最接近結算價的履約價）
+    pin_probability: float
+    histogram: List[Tuple[float, float, float]] = field(default_factory=list)  # (下緣, 上緣, 機率)
+
+
+def simulate_settlement(center: float, residuals: 'np.ndarray', strikes: 'Optional[np.ndarray]' = None,
+                        paths: int = DEFAULT_PATHS, seed: Optional[int] = None):
+    """
+    平滑自助抽樣產生結算價格路徑
+
+    Args:
+        center: 結算中心
+        residuals: 歷史誤差比例
+        strikes: 履約價（預設依分布範圍以 50 點間距產生）
+        paths: 路徑數
+        seed: 隨機種子（同一結算日使用固定種子，報告可重現）
+
+    Returns:
+        (排序後的模擬結算價, 履約價)
+    """
+    rng = np.random.default_rng(seed)
+    residuals = np.asarray(residuals, dtype=float)
+    # Silverman 帶寬：樣本越少、離散越大，平滑越多
+    spread = residuals.std(ddof=1) if len(residuals) > 1 else abs(residuals[0])
+    bandwidth = 1.06 * spread * len(residuals) ** -0.2
+
+    drawn = residuals[rng.integers(0, len(residuals), paths)]
+    prices = center * (1 + drawn + rng.standard_normal(paths) * bandwidth)
+    prices.sort()
+
+    if strikes is None:
+        low, high = np.quantile(prices, [0.01, 0.99])
+        strikes = np.arange(low // STRIKE_STEP * STRIKE_STEP, high + STRIKE_STEP, STRIKE_STEP)
+    return prices, np.asarray(strikes, dtype=float)
+
+
+def summarize_paths(center: float, prices: 'np.ndarray', strikes: 'np.ndarray',
+                    samples: int, condition: str) -> SettlementDistribution:
+    """由排序後的模擬結算價計算分位數、各履約價機率與 Pin 履約價"""
+    paths = len(prices)
+    prob_above = 1 - np.searchsorted(prices, strikes, side='right') / paths
+
+    # 每條路徑最接近的履約價：以相鄰履約價的中點切分
+    midpoints = (strikes[1:] + strikes[:-1]) / 2
+    nearest = np.bincount(np.searchsorted(midpoints, prices), minlength=len(strikes))
+    pin = int(np.argmax(nearest))
+
+    low, high = np.quantile(prices, [0.01, 0.99])
+    counts, edges = np.histogram(prices, bins=HISTOGRAM_BINS, range=(low, high))
+
+    return SettlementDistribution(
+        center=float(center),
+        paths=paths,
+        samples=samples,
+        condition=condition,
+        quantiles={q: float(v) for q, v in zip(QUANTILES, np.quantile(prices, QUANTILES))},
+        mean=float(prices.mean()),
+        strikes=[int(s) for s in strikes],
+        prob_above=[float(p) for p in prob_above],
+        expected_pin=int(strikes[pin]),
+        pin_probability=float(nearest[pin] / paths),
+        histogram=[(float(edges[i]), float(edges[i + 1]), float(counts[i] / paths)) for i in range(len(counts))],
+    )
+
+
+def listed_strikes(date: str, reports_dir: Path = Path('reports')) -> 'Optional[np.ndarray]':
+    """
+    讀取分析日報告的履約價清單（chart_data 表格資料，與預測器相同取檔名排序第一份報告）
+
+    Args:
+        date: 分析日 (YYYYMMDD)
+        reports_dir: 報告目錄
+
+    Returns:
+        履約價陣列，沒有表格資料時為 None
+    """
+    reports = sorted(Path(reports_dir).glob(f'report_{date}_*.html'))
+    if not reports:
+        return None
+    contract = reports[0].stem.split('_', 2)[2]
+    path = Path(reports_dir) / CHART_DATA_DIRNAME / f"{reports[0].stem}.{contract}.json"
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not data.get('strikes'):
+        return None
+    # 差分編碼還原
+    return np.cumsum(data['strikes'])
+
+
+def settlement_distribution(prediction: SettlementPrediction, paths: int = DEFAULT_PATHS,
+                            params: Optional[SignalParams] = None) -> Optional[SettlementDistribution]:
+    """
+    結算報告使用的價格分布：只使用結算日之前已結算的歷史誤差（不偷看未來）
+
+    Args:
+        prediction: 結算預測結果（需包含 predicted_center）
+        paths: 模擬路徑數
+        params: 訊號參數（預設讀取 calibration.json，與預測器相同）
+
+    Returns:
+        SettlementDistribution，數據不足時為 None
+    """
+    center = prediction.predicted_center
+    if not center:
+        return None
+
+    settlement_day = np.datetime64(prediction.settlement_date.replace('/', '-'), 'D')
+    cases = load_settlement_cases(load_metrics_table())
+    history = cases.subset(cases.dates < settlement_day)
+    if not len(history):
+        return None
+
+    result = run_backtest(history, params)
+    pool = ResidualPool.from_backtest(result)
+    if len(pool) < MIN_BUCKET_SAMPLES:
+        return None
+
+    metrics = prediction.key_metrics
+    signal_params = result.params
+    pc = pc_bucket(np.array([metrics.get('avg_pc_ratio', np.nan)], dtype=float), signal_params)[0]
+    current_price, max_pain = metrics.get('current_price', 0), metrics.get('max_pain', 0)
+    distance = current_price - max_pain if current_price and max_pain else np.nan
+    distance = distance_bucket(np.array([distance], dtype=float), signal_params)[0]
+
+    residuals, condition = pool.select(prediction.settlement_weekday, int(pc), int(distance))
+    strikes = listed_strikes(prediction.analysis_dates[-1]) if prediction.analysis_dates else None
+    seed = int(prediction.settlement_date.replace('/', ''))
+    prices, strikes = simulate_settlement(center, residuals, strikes, paths, seed)
+    return summarize_paths(center, prices, strikes, len(residuals), condition)
@@ -4,26 +4,115 @@
 著重於趨勢分析和劇本情境
 """
 
-import pandas as pd
-import numpy as np
 from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
-import json
 import re
+from .calibration_store import PARAMS_FILE as CALIBRATION_FILE, load_params
+from .indicator_store import IndicatorStore, IndicatorWindow
 
-CALIBRATION_FILE = Path("data/ai_learning/calibration.json")
 DEFAULT_HALF_RANGE = {"wednesday": 1000, "friday": 150}
 
+# P/C Ratio 卡片的數值（買權 OI 為 0 時為 inf）；只比對卡片本身，不往後抓頁面其他數字
+PC_RATIO_CARD_PATTERN = re.compile(
+    r'P/C Ratio[^<]*</div>\s*<div class="card-value[^"]*">\s*(\d+(?:\.\d+)?|inf)\s*<'
+)
+
 
 def _load_calibration() -> dict:
-    if CALIBRATION_FILE.exists():
-        try:
-            return json.loads(CALIBRATION_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    return {}
+    """精簡的校準參數（不含逐筆明細，大小不隨歷史筆數成長）"""
+    return load_params(CALIBRATION_FILE)
+
+
+@dataclass(frozen=True)
+class SignalParams:
+    """訊號規則的門檻與權重（預設值即原本寫死的數值，回測與參數掃描共用）"""
+    momentum_threshold: int = 200   # 價格動能門檻（點）
+    max_pain_far: int = 400         # 遠離 Max Pain 門檻（點）
+    max_pain_near: int = 150        # 貼近 Max Pain 門檻（點）
+    pc_low: float = 0.8             # P/C Ratio 看多門檻
+    pc_high: float = 1.2            # P/C Ratio 偏高門檻
+    pc_extreme: float = 1.8         # P/C Ratio 極高門檻
+    center_blend: float = 0.6       # 結算中心的加權（順勢一側的權重）
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SignalParams':
+        """從 calibration.json 的參數建立（忽略未知欄位）"""
+        defaults = cls()
+        values = {
+            name: type(getattr(defaults, name))(data[name])
+            for name in cls.__dataclass_fields__ if name in data
+        }
+        return cls(**values)
+
+
+def calibrated_half_range(calibration: Dict, weekday: str) -> int:
+    """結算區間半徑：優先使用參數掃描的建議值，其次為歷史誤差分析的建議值"""
+    swept = calibration.get("settlement_params", {}).get("recommended", {}).get("half_range", {})
+    if weekday in swept:
+        return swept[weekday]
+    weekday_stats = calibration.get("weekday", {}).get(weekday, {})
+    return weekday_stats.get("recommended_half_range", DEFAULT_HALF_RANGE.get(weekday, 300))
+
+
+def parse_report_html(html_path: Path) -> Optional[Dict]:
+    """從報告 HTML 解析關鍵數據（收盤價、P/C Ratio、Max Pain、OI 統計）"""
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        data = {}
+
+        # 解析收盤價 (多種格式嘗試)
+        # 格式1: 📊 收盤價 29,869
+        close_match = re.search(r'📊 收盤價 ([0-9,]+)', html_content)
+        if close_match:
+            data['close_price'] = int(close_match.group(1).replace(',', ''))
+        else:
+            # 格式2: <div class="close-price">29869</div>
+            close_match = re.search(r'<div class="close-price">([0-9,]+)</div>', html_content)
+            if close_match:
+                data['close_price'] = int(close_match.group(1).replace(',', ''))
+            else:
+                # 格式3: 收盤價: 29,869
+                close_match = re.search(r'收盤價[:\s]+([0-9,]+)', html_content)
+                if close_match:
+                    data['close_price'] = int(close_match.group(1).replace(',', ''))
+
+        # 解析 P/C Ratio（inf 或找不到卡片時視為缺值）
+        pc_match = PC_RATIO_CARD_PATTERN.search(html_content)
+        if pc_match and pc_match.group(1) != 'inf':
+            data['pc_ratio'] = float(pc_match.group(1))
+
+        # 解析 Max Pain
+        pain_match = re.search(r'Max Pain.*?([0-9,]+)', html_content, re.DOTALL)
+        if pain_match:
+            data['max_pain'] = int(pain_match.group(1).replace(',', ''))
+
+        # 解析 OI 數據 (從表格或統計區塊)
+        call_oi_match = re.search(r'買權總 OI[:\s]*([0-9,]+)', html_content)
+        if call_oi_match:
+            data['call_oi'] = int(call_oi_match.group(1).replace(',', ''))
+
+        put_oi_match = re.search(r'賣權總 OI[:\s]*([0-9,]+)', html_content)
+        if put_oi_match:
+            data['put_oi'] = int(put_oi_match.group(1).replace(',', ''))
+
+        # OI 變化
+        call_change_match = re.search(r'買權 OI 變化[:\s]*([+-]?[0-9,]+)', html_content)
+        if call_change_match:
+            data['call_oi_change'] = int(call_change_match.group(1).replace(',', ''))
+
+        put_change_match = re.search(r'賣權 OI 變化[:\s]*([+-]?[0-9,]+)', html_content)
+        if put_change_match:
+            data['put_oi_change'] = int(put_change_match.group(1).replace(',', ''))
+
+        return data if data else None
+
+    except Exception as e:
+        print(f"解析報告失敗 {html_path}: {e}")
+        return None
 
 
 @dataclass
@@ -72,13 +161,21 @@ class SettlementPrediction:
     # 風險提示
     risks: List[str]
 
+    # 結算中心（區間取整前），0 表示數據不足
+    predicted_center: int = 0
+
 
 class SettlementPredictor:
     """結算日預測器"""
 
-    def __init__(self):
+    def __init__(self, params: Optional[SignalParams] = None):
         self.reports_dir = Path('reports')
         self._calibration = _load_calibration()
+        self.params = params or SignalParams.from_dict(
+            self._calibration.get("settlement_params", {}).get("recommended", {})
+        )
+        # 已載入報告的滾動指標（跨多次預測累積，回看視窗直接查詢）
+        self.indicators = IndicatorStore()
         
     def predict_settlement(
         self, 
@@ -104,13 +201,15 @@ class SettlementPredictor:
             # 返回預設值
             return self._create_default_prediction(settlement_date, settlement_weekday, dates)
         
+        window = self._indicator_window(reports_data)
+
         # 趨勢分析
-        trend_signals = self._analyze_trends(reports_data)
+        trend_signals = self._analyze_trends(reports_data, window)
         overall_trend, trend_strength = self._calculate_overall_trend(trend_signals)
         overall_trend_text = self._get_trend_text(overall_trend, trend_strength)
         
         # 計算關鍵指標
-        key_metrics = self._calculate_key_metrics(reports_data)
+        key_metrics = self._calculate_key_metrics(reports_data, window)
         
         # 預測結算區間
         predicted_range = self._predict_settlement_range(
@@ -120,6 +219,8 @@ class SettlementPredictor:
             settlement_weekday
         )
         
+        predicted_center = self._predict_settlement_center(trend_signals, key_metrics) or 0
+
         # 生成劇本
         scenarios = self._generate_scenarios(
             reports_data,
@@ -128,6 +229,10 @@ class SettlementPredictor:
             key_metrics
         )
         
+        # 造市商 Gamma 曝險（有當日契約資料時才有；只作為參考指標，不影響區間與中心）
+        self._add_exposure_metrics(key_metrics, dates[-1], settlement_date)
+        self._add_wall_shift_metrics(key_metrics, dates, settlement_date)
+
         # 風險評估
         risks = self._assess_risks(reports_data, trend_signals, key_metrics)
         
@@ -146,16 +251,43 @@ class SettlementPredictor:
             predicted_range=predicted_range,
             scenarios=scenarios,
             key_metrics=key_metrics,
-            risks=risks
+            risks=risks,
+            predicted_center=predicted_center
         )
     
+    def _add_exposure_metrics(self, metrics: Dict, date: str, settlement_date: str):
+        """把最後分析日、同結算日契約的 Gamma 翻轉點與淨 Gamma 加入關鍵指標"""
+        from .gamma_exposure import exposure_for_settlement
+
+        surface = exposure_for_settlement(date, settlement_date)
+        if surface is None:
+            return
+        if surface.zero_gamma is not None:
+            metrics['gamma_flip'] = round(surface.zero_gamma)
+        metrics['net_gamma'] = round(surface.net_gamma / 1e8, 2)  # 億元 / 指數漲 1%
+
+    def _add_wall_shift_metrics(self, metrics: Dict, dates: List[str], settlement_date: str):
+        """分析日期間、同結算日契約的支撐 / 壓力牆位移（由 OI 變化引擎切片取得）"""
+        from .oi_delta import get_oi_engine
+
+        panel = get_oi_engine().panel_for_settlement(settlement_date)
+        if panel is None:
+            return
+        shifts = panel.window(dates=dates).wall_shifts()
+        if shifts:
+            metrics['wall_shifts'] = [
+                {'date': s.date, 'side': s.side, 'from': s.from_strike, 'to': s.to_strike,
+                 'description': s.description}
+                for s in shifts
+            ]
+
     def _load_reports_data(self, dates: List[str]) -> List[Dict]:
         """載入報告數據"""
         reports = []
         
         for date in dates:
             # 查找該日期的報告檔案
-            report_files = list(self.reports_dir.glob(f'report_{date}_*.html'))
+            report_files = sorted(self.reports_dir.glob(f'report_{date}_*.html'))
             
             if report_files:
                 report_data = self._parse_report_html(report_files[0])
@@ -165,65 +297,17 @@ class SettlementPredictor:
         
         return reports
     
+    def _indicator_window(self, reports: List[Dict]) -> IndicatorWindow:
+        """把報告加入滾動指標庫，並取得這些分析日的視窗統計"""
+        for report in reports:
+            self.indicators.ingest(report['date'], report)
+        return self.indicators.window(report['date'] for report in reports)
+
     def _parse_report_html(self, html_path: Path) -> Optional[Dict]:
         """從報告 HTML 解析關鍵數據"""
-        try:
-            with open(html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            data = {}
-            
-            # 解析收盤價 (多種格式嘗試)
-            # 格式1: 📊 收盤價 29,869
-            close_match = re.search(r'📊 收盤價 ([0-9,]+)', html_content)
-            if close_match:
-                data['close_price'] = int(close_match.group(1).replace(',', ''))
-            else:
-                # 格式2: <div class="close-price">29869</div>
-                close_match = re.search(r'<div class="close-price">([0-9,]+)</div>', html_content)
-                if close_match:
-                    data['close_price'] = int(close_match.group(1).replace(',', ''))
-                else:
-                    # 格式3: 收盤價: 29,869
-                    close_match = re.search(r'收盤價[:\s]+([0-9,]+)', html_content)
-                    if close_match:
-                        data['close_price'] = int(close_match.group(1).replace(',', ''))
-            
-            # 解析 P/C Ratio
-            pc_match = re.search(r'P/C Ratio.*?(\d+\.\d+)', html_content, re.DOTALL)
-            if pc_match:
-                data['pc_ratio'] = float(pc_match.group(1))
-            
-            # 解析 Max Pain
-            pain_match = re.search(r'Max Pain.*?([0-9,]+)', html_content, re.DOTALL)
-            if pain_match:
-                data['max_pain'] = int(pain_match.group(1).replace(',', ''))
-            
-            # 解析 OI 數據 (從表格或統計區塊)
-            call_oi_match = re.search(r'買權總 OI[:\s]*([0-9,]+)', html_content)
-            if call_oi_match:
-                data['call_oi'] = int(call_oi_match.group(1).replace(',', ''))
-            
-            put_oi_match = re.search(r'賣權總 OI[:\s]*([0-9,]+)', html_content)
-            if put_oi_match:
-                data['put_oi'] = int(put_oi_match.group(1).replace(',', ''))
-            
-            # OI 變化
-            call_change_match = re.search(r'買權 OI 變化[:\s]*([+-]?[0-9,]+)', html_content)
-            if call_change_match:
-                data['call_oi_change'] = int(call_change_match.group(1).replace(',', ''))
-            
-            put_change_match = re.search(r'賣權 OI 變化[:\s]*([+-]?[0-9,]+)', html_content)
-            if put_change_match:
-                data['put_oi_change'] = int(put_change_match.group(1).replace(',', ''))
-            
-            return data if data else None
-            
-        except Exception as e:
-            print(f"解析報告失敗 {html_path}: {e}")
-            return None
-    
-    def _analyze_trends(self, reports_data: List[Dict]) -> List[TrendSignal]:
+        return parse_report_html(html_path)
+
+    def _analyze_trends(self, reports_data: List[Dict], window: IndicatorWindow) -> List[TrendSignal]:
         """分析趨勢訊號"""
         signals = []
         
@@ -231,17 +315,17 @@ class SettlementPredictor:
             return signals
         
         # 1. OI 變化趨勢
-        oi_signal = self._analyze_oi_trend(reports_data)
+        oi_signal = self._analyze_oi_trend(window)
         if oi_signal:
             signals.append(oi_signal)
         
         # 2. P/C Ratio 趨勢
-        pc_signal = self._analyze_pc_ratio_trend(reports_data)
+        pc_signal = self._analyze_pc_ratio_trend(window)
         if pc_signal:
             signals.append(pc_signal)
         
         # 3. 價格動能
-        price_signal = self._analyze_price_momentum(reports_data)
+        price_signal = self._analyze_price_momentum(reports_data, window)
         if price_signal:
             signals.append(price_signal)
         
@@ -252,17 +336,14 @@ class SettlementPredictor:
         
         return signals
     
-    def _analyze_oi_trend(self, reports: List[Dict]) -> Optional[TrendSignal]:
-        """分析 OI 變化趨勢"""
-        # 取得有 OI 變化數據的報告
-        valid_reports = [r for r in reports if 'call_oi_change' in r and 'put_oi_change' in r]
-        
-        if not valid_reports:
+    def _analyze_oi_trend(self, window: IndicatorWindow) -> Optional[TrendSignal]:
+        """分析 OI 變化趨勢（指標庫只收錄買賣權 OI 變化都有的報告）"""
+        if not window['call_oi_change'].count:
             return None
         
-        # 計算平均變化
-        avg_call_change = np.mean([r['call_oi_change'] for r in valid_reports])
-        avg_put_change = np.mean([r['put_oi_change'] for r in valid_reports])
+        # 平均變化
+        avg_call_change = window['call_oi_change'].mean
+        avg_put_change = window['put_oi_change'].mean
         
         # 判斷方向
         if avg_call_change > abs(avg_put_change) * 1.3:
@@ -285,7 +366,7 @@ class SettlementPredictor:
             description=desc
         )
     
-    def _analyze_pc_ratio_trend(self, reports: List[Dict]) -> Optional[TrendSignal]:
+    def _analyze_pc_ratio_trend(self, window: IndicatorWindow) -> Optional[TrendSignal]:
         """分析 P/C Ratio 趨勢
 
         依歷史結算資料校準（data/ai_learning/calibration.json）：
@@ -295,32 +376,29 @@ class SettlementPredictor:
         - PC > 1.8：極度看空但實際上漲率 57%（7 筆），具逆向性
         結論：台指週選高 PC Ratio 並非可靠的空頭訊號，需降低其看空強度。
         """
-        pc_ratios = [r['pc_ratio'] for r in reports if 'pc_ratio' in r]
+        pc = window['pc_ratio']
 
-        if not pc_ratios:
+        if not pc.count:
             return None
 
-        avg_pc = np.mean(pc_ratios)
-
-        if len(pc_ratios) >= 2:
-            trend = pc_ratios[-1] - pc_ratios[0]
-        else:
-            trend = 0
+        avg_pc = pc.mean
+        trend = pc.change
 
         # 讀取 calibration 的 PC Ratio 方向分析
         pc_cal = self._calibration.get("pc_ratio_direction", {})
 
-        if avg_pc < 0.8:
+        params = self.params
+        if avg_pc < params.pc_low:
             # 歷史：100% 上漲（樣本 2 筆）
             direction = 'bullish'
             strength = 3
             desc = f'P/C Ratio 低 ({avg_pc:.2f})，市場積極看多'
-        elif avg_pc > 1.8:
+        elif avg_pc > params.pc_extreme:
             # 歷史：57% 上漲（樣本 7 筆）→ 高 PC 是逆向指標，降低看空信心
             direction = 'neutral'
             strength = 2
             desc = f'P/C Ratio 極高 ({avg_pc:.2f})，歷史上具逆向性（高 PC 常伴隨反彈），方向不確定'
-        elif avg_pc > 1.2:
+        elif avg_pc > params.pc_high:
             # 歷史：100% 上漲（樣本 2 筆），反向指標
             direction = 'neutral'
             strength = 2
@@ -328,11 +406,11 @@ class SettlementPredictor:
         elif trend < -0.15:
             direction = 'bullish'
             strength = 3
-            desc = f'P/C Ratio 快速下降 ({pc_ratios[0]:.2f} → {pc_ratios[-1]:.2f})，空方平倉、偏多'
+            desc = f'P/C Ratio 快速下降 ({pc.first:.2f} → {pc.last:.2f})，空方平倉、偏多'
         elif trend > 0.15:
             direction = 'neutral'
             strength = 2
-            desc = f'P/C Ratio 上升 ({pc_ratios[0]:.2f} → {pc_ratios[-1]:.2f})，空方增加但逆向性高'
+            desc = f'P/C Ratio 上升 ({pc.first:.2f} → {pc.last:.2f})，空方增加但逆向性高'
         else:
             direction = 'neutral'
             strength = 2
@@ -345,25 +423,25 @@ class SettlementPredictor:
             description=desc
         )
     
-    def _analyze_price_momentum(self, reports: List[Dict]) -> Optional[TrendSignal]:
+    def _analyze_price_momentum(self, reports: List[Dict], window: IndicatorWindow) -> Optional[TrendSignal]:
         """分析價格動能"""
-        prices = [r['close_price'] for r in reports if 'close_price' in r]
+        prices = window['close_price']
         
-        if len(prices) < 2:
+        if prices.count < 2:
             # 單日數據，判斷與 Max Pain 的關係
-            if prices and 'max_pain' in reports[-1]:
-                price = prices[0]
+            if prices.count and 'max_pain' in reports[-1]:
+                price = prices.first
                 max_pain = reports[-1]['max_pain']
                 diff = price - max_pain
                 
-                if diff > 200:
+                if diff > self.params.momentum_threshold:
                     return TrendSignal(
                         direction='bullish',
                         strength=3,
                         indicators=['價格位置'],
                         description=f'價格高於 Max Pain {diff:+d} 點，多方控盤'
                     )
-                elif diff < -200:
+                elif diff < -self.params.momentum_threshold:
                     return TrendSignal(
                         direction='bearish',
                         strength=3,
@@ -372,14 +450,14 @@ class SettlementPredictor:
                     )
             return None
         
-        price_change = prices[-1] - prices[0]
-        price_pct = (price_change / prices[0]) * 100
+        price_change = prices.change
+        price_pct = (price_change / prices.first) * 100
         
-        if price_change > 200:
+        if price_change > self.params.momentum_threshold:
             direction = 'bullish'
             strength = min(5, max(3, int(abs(price_pct) / 0.5) + 2))
             desc = f'價格上漲 {price_change:+d} 點 ({price_pct:+.2f}%)，多方動能強勁'
-        elif price_change < -200:
+        elif price_change < -self.params.momentum_threshold:
             direction = 'bearish'
             strength = min(5, max(3, int(abs(price_pct) / 0.5) + 2))
             desc = f'價格下跌 {price_change:+d} 點 ({price_pct:+.2f}%)，空方動能強勁'
@@ -409,15 +487,15 @@ class SettlementPredictor:
         distance = price - max_pain
         distance_pct = (distance / price) * 100
         
-        if distance > 400:
+        if distance > self.params.max_pain_far:
             direction = 'bearish'
             strength = 4
             desc = f'價格高於 Max Pain {distance:+d} 點 ({abs(distance_pct):.1f}%)，結算前可能回歸'
-        elif distance < -400:
+        elif distance < -self.params.max_pain_far:
             direction = 'bullish'
             strength = 4
             desc = f'價格低於 Max Pain {distance:+d} 點 ({abs(distance_pct):.1f}%)，結算前可能反彈'
-        elif abs(distance) < 150:
+        elif abs(distance) < self.params.max_pain_near:
             direction = 'neutral'
             strength = 3
             desc = f'價格貼近 Max Pain ({distance:+d} 點)，磁吸效應明顯'
@@ -472,7 +550,7 @@ class SettlementPredictor:
         else:
             return f'震盪整理 ({strength_text})'
     
-    def _calculate_key_metrics(self, reports: List[Dict]) -> Dict[str, any]:
+    def _calculate_key_metrics(self, reports: List[Dict], window: IndicatorWindow) -> Dict[str, any]:
         """計算關鍵指標"""
         if not reports:
             return {}
@@ -485,10 +563,10 @@ class SettlementPredictor:
         }
         
         # P/C Ratio
-        pc_ratios = [r['pc_ratio'] for r in reports if 'pc_ratio' in r]
-        if pc_ratios:
-            metrics['avg_pc_ratio'] = np.mean(pc_ratios)
-            metrics['latest_pc_ratio'] = pc_ratios[-1]
+        pc = window['pc_ratio']
+        if pc.count:
+            metrics['avg_pc_ratio'] = pc.mean
+            metrics['latest_pc_ratio'] = pc.last
         
         # OI 數據
         if 'call_oi' in latest:
@@ -497,13 +575,9 @@ class SettlementPredictor:
             metrics['total_put_oi'] = latest['put_oi']
         
         # OI 變化
-        call_changes = [r['call_oi_change'] for r in reports if 'call_oi_change' in r]
-        put_changes = [r['put_oi_change'] for r in reports if 'put_oi_change' in r]
-        
-        if call_changes:
-            metrics['avg_call_oi_change'] = np.mean(call_changes)
-        if put_changes:
-            metrics['avg_put_oi_change'] = np.mean(put_changes)
+        if window['call_oi_change'].count:
+            metrics['avg_call_oi_change'] = window['call_oi_change'].mean
+            metrics['avg_put_oi_change'] = window['put_oi_change'].mean
         
         return metrics
     
@@ -515,13 +589,29 @@ class SettlementPredictor:
         settlement_weekday: str = "friday"
     ) -> Tuple[int, int]:
         """預測結算區間"""
-        current_price = metrics.get('current_price', 0)
-        max_pain = metrics.get('max_pain', 0)
-        
+        center = self._predict_settlement_center(signals, metrics)
+
         # 如果沒有價格數據，使用預設範圍
-        if current_price == 0 and max_pain == 0:
+        if center is None:
             return (23000, 24000)
+
+        # 從校準參數取得對應週別的建議半徑
+        half_range = calibrated_half_range(self._calibration, settlement_weekday)
+
+        # 計算區間 (取整到 50 點)
+        lower = (center - half_range) // 50 * 50
+        upper = (center + half_range) // 50 * 50
         
+        return (lower, upper)
+
+    def _predict_settlement_center(self, signals: List[TrendSignal], metrics: Dict) -> Optional[int]:
+        """預測結算中心（沒有價格也沒有 Max Pain 時為 None）"""
+        current_price = metrics.get('current_price', 0)
+        max_pain = metrics.get('max_pain', 0)
+
+        if current_price == 0 and max_pain == 0:
+            return None
+
         # 如果沒有當前價格，使用 Max Pain 作為基準
         if current_price == 0:
             current_price = max_pain
@@ -534,34 +624,24 @@ class SettlementPredictor:
         overall_trend, trend_strength = self._calculate_overall_trend(signals)
         
         # 計算基準點
+        blend = self.params.center_blend
         if overall_trend == 'bullish':
             # 多頭：偏向當前價與 Max Pain 之間偏上
             if current_price > max_pain:
-                center = int((current_price * 0.6 + max_pain * 0.4))
+                center = int((current_price * blend + max_pain * (1 - blend)))
             else:
-                center = int((current_price * 0.4 + max_pain * 0.6))
+                center = int((current_price * (1 - blend) + max_pain * blend))
         elif overall_trend == 'bearish':
             # 空頭：偏向當前價與 Max Pain 之間偏下
             if current_price < max_pain:
-                center = int((current_price * 0.6 + max_pain * 0.4))
+                center = int((current_price * blend + max_pain * (1 - blend)))
             else:
-                center = int((current_price * 0.4 + max_pain * 0.6))
+                center = int((current_price * (1 - blend) + max_pain * blend))
         else:
             # 中性：Max Pain 附近
             center = max_pain
-        
-        # 從校準參數取得對應週別的建議半徑
-        weekday_stats = self._calibration.get("weekday", {}).get(settlement_weekday, {})
-        half_range = weekday_stats.get(
-            "recommended_half_range",
-            DEFAULT_HALF_RANGE.get(settlement_weekday, 300)
-        )
 
-        # 計算區間 (取整到 50 點)
-        lower = (center - half_range) // 50 * 50
-        upper = (center + half_range) // 50 * 50
-        
-        return (lower, upper)
+        return center
     
     def _generate_scenarios(
         self,
@@ -727,6 +807,20 @@ class SettlementPredictor:
         if abs(avg_call_change) > 10000 or abs(avg_put_change) > 10000:
             risks.append('⚠️ OI 劇烈變動，留意大戶動向與主力意圖')
         
+        # 檢查造市商 Gamma 狀態
+        net_gamma = metrics.get('net_gamma')
+        if net_gamma is not None and net_gamma < 0:
+            flip = metrics.get('gamma_flip')
+            flip_text = f"，翻轉點約 {flip:,}" if flip else ''
+            risks.append(f'⚠️ 造市商處於負 Gamma{flip_text}，避險買賣可能放大結算前波動')
+
+        # 檢查牆位位移：支撐牆下移代表下檔防線鬆動，壓力牆下移代表上檔壓力逼近
+        for shift in metrics.get('wall_shifts', []):
+            if shift['side'] == 'put' and shift['to'] < shift['from']:
+                risks.append(f"⚠️ Put 支撐牆下移 {shift['from']:,} → {shift['to']:,}，下檔防線鬆動")
+            elif shift['side'] == 'call' and shift['to'] < shift['from']:
+                risks.append(f"⚠️ Call 壓力牆下移 {shift['from']:,} → {shift['to']:,}，上檔壓力逼近")
+
         # 檢查趨勢一致性
         if len(signals) >= 3:
             directions = [s.direction for s in signals]
@@ -0,0 +1,180 @@
+"""
+結算價重建
+期交所台指選擇權（含週選）的最後結算價，為結算日證交所收盤前 30 分鐘內所提供加權指數的簡單算術平均；
+收盤指數在視窗之後才公布時，以收盤指數取代視窗內最後一筆。
+
+TWSEDataFetcher 抓取 5 秒加權指數（MI_5MINS_INDEX）時會存成 data/intraday/taiex_YYYYMMDD.json，
+這裡以 numpy 在一天的紀錄上一次算出結算視窗平均與開高低收；檢討報告不必連網，
+也不必在 TWSE 沒有結算價時以收盤價（或寫死的預設值）代替
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .lazy_import import lazy_import
+
+np = lazy_import('numpy')
+
+INTRADAY_DIR = Path("data/intraday")
+
+PRE_OPEN_TIME = "09:00:00"          # 第一筆若為此時間，內容是前一日收盤指數
+SETTLEMENT_WINDOW_END = "13:30:00"  # 證交所收盤時間
+SETTLEMENT_WINDOW_MINUTES = 30
+
+# 檢討記錄的結算價來源（actual_result.settlement_source）；只有非官方的結算價可以用重建值取代
+SOURCE_OFFICIAL = 'official'            # 期交所公布的結算價
+SOURCE_RECONSTRUCTED = 'reconstructed'  # 由 5 秒加權指數重建
+SOURCE_CLOSE = 'close'                  # 以收盤價代替
+SOURCE_DEFAULT = 'default'              # 取不到資料時的預設值
+
+
+def _seconds(times: Iterable[str]) -> 'np.ndarray':
+    """'HH:MM:SS' → 當日秒數"""
+    clock = np.char.replace(np.asarray(list(times), dtype=str), ':', '').astype(np.int64)
+    hours, rest = np.divmod(clock, 10000)
+    minutes, seconds = np.divmod(rest, 100)
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _clock(seconds: 'np.ndarray') -> List[str]:
+    """當日秒數 → 'HH:MM:SS'"""
+    return [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in seconds.tolist()]
+
+
+@dataclass
+class IntradayIndex:
+    """一天的 5 秒加權指數（依時間排序）"""
+    date: str                 # YYYYMMDD
+    seconds: 'np.ndarray'     # 當日秒數
+    values: 'np.ndarray'      # 加權指數
+
+    @classmethod
+    def from_records(cls, date: str, records: List[List]) -> Optional['IntradayIndex']:
+        """
+        從 TWSE MI_5MINS_INDEX 的 data 列建立
+
+        Args:
+            date: 日期 (YYYYMMDD)
+            records: 每列第一欄為時間、第二欄為發行量加權股價指數（無法解析的列略過）
+
+        Returns:
+            IntradayIndex，沒有任何可用資料時回傳 None
+        """
+        times, values = [], []
+        for record in records:
+            try:
+                value = float(str(record[1]).replace(',', ''))
+            except (ValueError, IndexError):
+                continue
+            times.append(record[0])
+            values.append(value)
+        if not values:
+            return None
+        return cls(date=date, seconds=_seconds(times), values=np.asarray(values, dtype=float))
+
+    @property
+    def trading_values(self) -> 'np.ndarray':
+        """盤中數值（略過 09:00:00 的前一日收盤）"""
+        if len(self.seconds) and self.seconds[0] == _seconds([PRE_OPEN_TIME])[0]:
+            return self.values[1:]
+        return self.values
+
+    def ohlc(self) -> Optional[Dict[str, float]]:
+        """開高低收（少於兩筆紀錄時回傳 None）"""
+        values = self.trading_values
+        if len(self.values) < 2 or not len(values):
+            return None
+        return {
+            'open': float(values[0]),
+            'high': float(values.max()),
+            'low': float(values.min()),
+            'close': float(values[-1]),
+        }
+
+    def settlement_window(self, end: str = SETTLEMENT_WINDOW_END,
+                          minutes: int = SETTLEMENT_WINDOW_MINUTES) -> 'np.ndarray':
+        """
+        結算視窗 (end - minutes, end] 內的指數
+
+        收盤指數在 end 之後才公布時取代最後一筆；紀錄還沒到 end（盤中抓取的資料）時回傳空陣列
+        """
+        end_second = _seconds([end])[0]
+        if not len(self.seconds) or self.seconds[-1] < end_second:
+            return np.zeros(0)
+
+        window = self.values[(self.seconds > end_second - minutes * 60) & (self.seconds <= end_second)]
+        if len(window) and self.seconds[-1] > end_second:
+            window = window.copy()
+            window[-1] = self.values[-1]
+        return window
+
+    def settlement_price(self, end: str = SETTLEMENT_WINDOW_END,
+                         minutes: int = SETTLEMENT_WINDOW_MINUTES) -> Optional[float]:
+        """結算視窗的簡單算術平均（四捨五入到小數兩位），資料不完整時回傳 None"""
+        window = self.settlement_window(end, minutes)
+        return round(float(window.mean()), 2) if len(window) else None
+
+
+def intraday_path(date: str, intraday_dir: Path = INTRADAY_DIR) -> Path:
+    return Path(intraday_dir) / f"taiex_{date}.json"
+
+
+def save_intraday(day: IntradayIndex, intraday_dir: Path = INTRADAY_DIR) -> Path:
+    """
+    儲存一天的 5 秒加權指數
+
+    內容不變時不改寫檔案
+    """
+    path = intraday_path(day.date, intraday_dir)
+    content = json.dumps({
+        'date': day.date,
+        'times': _clock(day.seconds),
+        'values': day.values.tolist(),
+    }, separators=(',', ':'))
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+def load_intraday(date: str, intraday_dir: Path = INTRADAY_DIR) -> Optional[IntradayIndex]:
+    """讀取一天的 5 秒加權指數（沒有存檔或格式錯誤時回傳 None）"""
+    try:
+        with open(intraday_path(date, intraday_dir), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return IntradayIndex(
+            date=data['date'],
+            seconds=_seconds(data['times']),
+            values=np.asarray(data['values'], dtype=float),
+        )
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+        return None
+
+
+def reconstruct_settlement(date: str, intraday_dir: Path = INTRADAY_DIR) -> Optional[float]:
+    """以存檔的 5 秒加權指數重建結算價（沒有完整存檔時回傳 None）"""
+    day = load_intraday(date, intraday_dir)
+    return day.settlement_price() if day else None
+
+
+def settlement_source(actual_result: Dict) -> str:
+    """
+    檢討記錄的結算價來源
+
+    沒有記錄來源的舊檢討：結算價等於收盤價時視為以收盤價代替，否則視為官方結算價
+    """
+    source = actual_result.get('settlement_source')
+    if source:
+        return source
+    if actual_result.get('settlement_price') == actual_result.get('tx_close'):
+        return SOURCE_CLOSE
+    return SOURCE_OFFICIAL
+
+
+def stored_dates(intraday_dir: Path = INTRADAY_DIR) -> List[str]:
+    """已存檔的日期（YYYYMMDD，遞增）"""
+    return sorted(path.stem.split('_', 1)[1] for path in Path(intraday_dir).glob('taiex_*.json'))
@@ -5,14 +5,20 @@
 
 from pathlib import Path
 from datetime import datetime
-from jinja2 import Template, Environment
+from functools import cached_property
 from typing import List, Optional
 from .settlement_predictor import SettlementPrediction, TrendSignal, Scenario
+from .settlement_distribution import SettlementDistribution, settlement_distribution
 from .ai_settlement_trader import AISettlementTrader
 from .ai_settlement_prediction import AISettlementPrediction
 from .ai_settlement_review import AISettlementReview
 from .ai_learning_system import AILearningSystem
 from .ai_performance_tracker import AIPerformanceTracker
+from .assets import publish_assets
+from .docs_sync import link_file
+from .report_catalog import record_report
+from .site_build import REPORTS_DIR, record_build, settlement_report_inputs
+from .template_renderer import render_to_file
 
 
 class SettlementReportGenerator:
@@ -26,20 +32,34 @@ class SettlementReportGenerator:
         # 確保輸出目錄存在
         self.output_dir.mkdir(exist_ok=True)
         self.docs_dir.mkdir(exist_ok=True)
-        
-        # 初始化 AI 結算日交易員分析器
-        self.settlement_trader = AISettlementTrader()
-        
-        # 初始化 AI 學習系統
-        self.learning_system = AILearningSystem()
-        
-        # 初始化 AI 結算預測和檢討系統
-        self.settlement_prediction = AISettlementPrediction(self.learning_system)
-        self.settlement_review = AISettlementReview(self.learning_system, self.settlement_prediction)
-        
-        # 初始化績效追蹤器
-        self.performance_tracker = AIPerformanceTracker()
-    
+
+    # AI 元件在第一次使用時才建立（AILearningSystem 會載入全部歷史 JSON）
+
+    @cached_property
+    def settlement_trader(self) -> AISettlementTrader:
+        """AI 結算日交易員分析器"""
+        return AISettlementTrader()
+
+    @cached_property
+    def learning_system(self) -> AILearningSystem:
+        """AI 學習系統"""
+        return AILearningSystem()
+
+    @cached_property
+    def settlement_prediction(self) -> AISettlementPrediction:
+        """AI 結算預測系統"""
+        return AISettlementPrediction(self.learning_system)
+
+    @cached_property
+    def settlement_review(self) -> AISettlementReview:
+        """AI 結算檢討系統"""
+        return AISettlementReview(self.learning_system, self.settlement_prediction)
+
+    @cached_property
+    def performance_tracker(self) -> AIPerformanceTracker:
+        """績效追蹤器"""
+        return AIPerformanceTracker()
+
     def generate_report(
         self,
         prediction: SettlementPrediction,
@@ -57,27 +77,15 @@ class SettlementReportGenerator:
         Returns:
             Path: 報告檔案路徑
         """
-        # 載入模板
+        # 確認模板存在
         template_path = self.template_dir / 'settlement_report.html'
 
         if not template_path.exists():
             raise FileNotFoundError(f"找不到模板: {template_path}")
 
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-
-        # 創建 Jinja2 環境並添加自定義 filter
-        from jinja2 import Environment
-        env = Environment()
-        env.filters['format_number'] = lambda x: f'{int(x):,}' if x else '0'
-        template = env.from_string(template_content)
-
         # 準備模板數據
         template_data = self._prepare_template_data(prediction, premarket_data)
-        
-        # 渲染 HTML
-        html_content = template.render(**template_data)
-        
+
         # 決定輸出檔名
         if not output_filename:
             # 格式: settlement_20260107_wed.html 或 settlement_20260109_fri.html
@@ -85,16 +93,36 @@ class SettlementReportGenerator:
             weekday_abbr = 'wed' if prediction.settlement_weekday == 'wednesday' else 'fri'
             output_filename = f'settlement_{date_str}_{weekday_abbr}.html'
         
-        # 寫入檔案（同時寫入 reports 和 docs）
+        # 串流渲染到 reports（共用的 Jinja2 環境，暫存檔完成後才置換），
+        # docs 以硬連結共用同一份檔案（無法連結時複製）
         reports_path = self.output_dir / output_filename
         docs_path = self.docs_dir / output_filename
-        
-        with open(reports_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        with open(docs_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
+
+        render_to_file('settlement_report.html', reports_path, self.template_dir, **template_data)
+        link_file(reports_path, docs_path)
+
+        # 頁面引用的共用 CSS/JS
+        publish_assets(self.output_dir)
+        publish_assets(self.docs_dir)
+
+        # 寫入建置記錄（供 build_site.py 判斷何時需要重建），並加入首頁的報告目錄
+        if self.output_dir.resolve() == REPORTS_DIR.resolve():
+            settlement_date = prediction.settlement_date.replace('/', '')
+            record_build(
+                reports_path, 'settlement',
+                settlement_report_inputs(settlement_date, prediction.analysis_dates),
+                params={
+                    'settlement_date': prediction.settlement_date,
+                    'weekday': prediction.settlement_weekday,
+                    'analysis_dates': list(prediction.analysis_dates),
+                }
+            )
+            record_report(
+                output_filename,
+                max_pain=prediction.key_metrics.get('max_pain') or None,
+                pc_ratio=prediction.key_metrics.get('latest_pc_ratio'),
+            )
+
         return docs_path
     
     def _prepare_template_data(self, prediction: SettlementPrediction, premarket_data: Optional[dict] = None) -> dict:
@@ -121,6 +149,9 @@ class SettlementReportGenerator:
         
         # 關鍵指標
         key_metrics = self._format_key_metrics(prediction.key_metrics)
+
+        # 結算價格分布（蒙地卡羅模擬）
+        distribution = self._format_distribution(settlement_distribution(prediction), prediction)
         
         # AI 分析數據
         ai_data = self._prepare_ai_analysis_data(prediction)
@@ -175,6 +206,9 @@ class SettlementReportGenerator:
             
             # Scenarios
             'scenarios': scenarios,
+
+            # Settlement Distribution
+            'distribution': distribution,
             
             # Key Metrics
             'key_metrics': key_metrics,
@@ -444,6 +478,52 @@ class SettlementReportGenerator:
         
         return formatted
     
+    def _format_distribution(self, distribution: Optional[SettlementDistribution],
+                             prediction: SettlementPrediction) -> Optional[dict]:
+        """格式化結算價格分布：分位數、直方圖與各履約價機率（只列出 1%～99% 之間的履約價）"""
+        if not distribution:
+            return None
+
+        lower, upper = prediction.predicted_range
+        peak = max(probability for _, _, probability in distribution.histogram) or 1
+        histogram = [
+            {
+                'label': f'{low:,.0f}～{high:,.0f}',
+                'probability': f'{probability * 100:.1f}',
+                'height': f'{probability / peak * 100:.0f}',
+                'in_range': high > lower and low < upper,
+            }
+            for low, high, probability in distribution.histogram
+        ]
+
+        strikes = [
+            {
+                'strike': f'{strike:,}',
+                'above': f'{above * 100:.1f}',
+                'below': f'{(1 - above) * 100:.1f}',
+                'is_pin': strike == distribution.expected_pin,
+            }
+            for strike, above in zip(distribution.strikes, distribution.prob_above)
+            if 0.01 <= above <= 0.99
+        ]
+
+        quantiles = distribution.quantiles
+        return {
+            'paths': f'{distribution.paths:,}',
+            'samples': distribution.samples,
+            'condition': distribution.condition,
+            'center': f'{distribution.center:,.0f}',
+            'mean': f'{distribution.mean:,.0f}',
+            'quantiles': [
+                {'label': f'P{q * 100:.0f}', 'value': f'{value:,.0f}'} for q, value in quantiles.items()
+            ],
+            'interval_80': f'{quantiles[0.10]:,.0f} ～ {quantiles[0.90]:,.0f}',
+            'expected_pin': f'{distribution.expected_pin:,}',
+            'pin_probability': f'{distribution.pin_probability * 100:.1f}',
+            'histogram': histogram,
+            'strikes': strikes,
+        }
+
     def _format_key_metrics(self, metrics: dict) -> List[dict]:
         """格式化關鍵指標"""
         formatted = []
@@ -0,0 +1,281 @@
+"""
+結算預測參數掃描
+以回測引擎（settlement_backtest）評估訊號門檻、中心加權與區間半徑的組合：
+- 格點或隨機搜尋，候選參數分批交給行程池評估，每個候選回傳逐案例的命中與寬度
+- 依結算日排序做前推（walk-forward）切分：每一折只用之前的案例挑選參數，再以下一段案例驗證
+- 以全部歷史計算「區間命中率 vs 區間寬度」的 Pareto 前緣，並依目標命中率挑出建議參數
+"""
+
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .lazy_import import lazy_import
+from .settlement_backtest import BacktestResult, SettlementCases, run_backtest
+from .settlement_predictor import SignalParams
+
+np = lazy_import('numpy')
+
+# 搜尋空間：SignalParams 欄位，加上各週別的區間半徑
+SEARCH_SPACE: Dict[str, List] = {
+    'momentum_threshold': [100, 150, 200, 250, 300, 400],
+    'max_pain_far': [300, 400, 500, 600],
+    'max_pain_near': [100, 150, 200],
+    'pc_low': [0.7, 0.8, 0.9],
+    'pc_high': [1.1, 1.2, 1.4],
+    'pc_extreme': [1.6, 1.8, 2.2],
+    'center_blend': [0.4, 0.5, 0.6, 0.7, 0.8],
+    'half_range_wednesday': [150, 300, 500, 750, 1000],
+    'half_range_friday': [150, 300, 500, 750],
+}  # 區間半徑放在最後：格點搜尋時相鄰候選只差半徑，可共用訊號計算
+
+HALF_RANGE_PREFIX = 'half_range_'
+
+# 前推切分：至少 8 筆案例才開始驗證，每折驗證 4 筆
+MIN_TRAIN = 8
+TEST_SIZE = 4
+
+# 建議參數：區間命中率達標的組合中挑最窄的區間
+DEFAULT_TARGET_COVERAGE = 50.0
+
+_worker_cases: Optional[SettlementCases] = None
+
+
+@dataclass
+class CaseMatrix:
+    """每個候選參數在每個案例的結果（候選數, 案例數）"""
+    in_range: 'np.ndarray'
+    width: 'np.ndarray'
+    direction_hit: 'np.ndarray'
+    has_data: 'np.ndarray'   # (案例數,) 與參數無關
+
+    def metrics(self, columns=None) -> 'Dict[str, np.ndarray]':
+        """各候選在指定案例（預設全部）上的區間命中率、平均寬度與方向命中率"""
+        mask = self.has_data.copy()
+        if columns is not None:
+            selected = np.zeros_like(mask)
+            selected[columns] = True
+            mask &= selected
+        count = max(int(mask.sum()), 1)
+        return {
+            'interval_hit_rate': self.in_range[:, mask].sum(axis=1) / count * 100,
+            'avg_width': self.width[:, mask].sum(axis=1) / count,
+            'direction_hit_rate': self.direction_hit[:, mask].sum(axis=1) / count * 100,
+        }
+
+
+def split_candidate(candidate: Dict) -> Tuple[SignalParams, Dict[str, int]]:
+    """候選參數 -> (訊號參數, 各週別區間半徑)"""
+    half_ranges = {
+        key[len(HALF_RANGE_PREFIX):]: int(value)
+        for key, value in candidate.items() if key.startswith(HALF_RANGE_PREFIX)
+    }
+    return SignalParams.from_dict(candidate), half_ranges
+
+
+def is_valid(candidate: Dict) -> bool:
+    """排除門檻順序矛盾的組合"""
+    return (candidate['pc_low'] < candidate['pc_high'] < candidate['pc_extreme']
+            and candidate['max_pain_near'] < candidate['max_pain_far'])
+
+
+def grid_candidates(space: Dict[str, List] = SEARCH_SPACE) -> List[Dict]:
+    """格點搜尋：搜尋空間的所有有效組合"""
+    keys = list(space)
+    candidates = (dict(zip(keys, values)) for values in itertools.product(*space.values()))
+    return [c for c in candidates if is_valid(c)]
+
+
+def random_candidates(count: int, seed: int = 0, space: Dict[str, List] = SEARCH_SPACE) -> List[Dict]:
+    """隨機搜尋：從搜尋空間抽樣不重複的有效組合"""
+    rng = random.Random(seed)
+    total = int(np.prod([len(values) for values in space.values()]))
+    seen, candidates = set(), []
+    for _ in range(count * 20):
+        if len(candidates) >= count or len(seen) >= total:
+            break
+        values = tuple(rng.choice(options) for options in space.values())
+        if values in seen:
+            continue
+        seen.add(values)
+        candidate = dict(zip(space, values))
+        if is_valid(candidate):
+            candidates.append(candidate)
+    return candidates
+
+
+def baseline_candidate(params: SignalParams, half_ranges: Dict[str, int]) -> Dict:
+    """目前使用的參數 -> 候選參數格式"""
+    candidate = asdict(params)
+    candidate.update({f"{HALF_RANGE_PREFIX}{weekday}": value for weekday, value in half_ranges.items()})
+    return candidate
+
+
+def _init_worker(cases: SettlementCases):
+    global _worker_cases
+    _worker_cases = cases
+
+
+def _evaluate_chunk(candidates: List[Dict]):
+    rows = []
+    signals: Dict[SignalParams, BacktestResult] = {}  # 只有區間半徑不同的候選共用訊號與中心
+    for candidate in candidates:
+        params, half_ranges = split_candidate(candidate)
+        if params in signals:
+            result = signals[params].with_half_ranges(half_ranges)
+        else:
+            result = signals[params] = run_backtest(_worker_cases, params, half_ranges)
+        rows.append((result.in_range, result.width, result.direction_hit))
+    return [np.stack(column) for column in zip(*rows)]
+
+
+def evaluate_candidates(cases: SettlementCases, candidates: List[Dict], workers: int = None) -> CaseMatrix:
+    """
+    以行程池回測所有候選參數
+
+    Args:
+        cases: 歷史結算案例
+        candidates: 候選參數
+        workers: 行程數（預設依 CPU 核心數，1 表示不使用行程池）
+
+    Returns:
+        CaseMatrix: 逐候選、逐案例的結果
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(50, -(-len(candidates) // (workers * 4)))
+    chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(cases)
+        parts = [_evaluate_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cases,)) as executor:
+            parts = list(executor.map(_evaluate_chunk, chunks))
+
+    in_range, width, direction_hit = (np.concatenate(column) for column in zip(*parts))
+    has_data = cases.present.any(axis=1)
+    return CaseMatrix(in_range=in_range, width=width, direction_hit=direction_hit, has_data=has_data)
+
+
+def walk_forward_splits(count: int, min_train: int = MIN_TRAIN, test_size: int = TEST_SIZE):
+    """前推切分（擴張視窗）：[(訓練索引, 驗證索引)]，案例需依結算日排序"""
+    splits = []
+    for start in range(min_train, count, test_size):
+        splits.append((np.arange(start), np.arange(start, min(start + test_size, count))))
+    return splits
+
+
+def pareto_front(metrics: 'Dict[str, np.ndarray]') -> List[int]:
+    """區間命中率越高、寬度越窄越好；回傳前緣上的候選索引（依寬度排序）"""
+    hit, width = metrics['interval_hit_rate'], metrics['avg_width']
+    direction = metrics['direction_hit_rate']
+    order = np.lexsort((-direction, -hit, width))
+    front, best = [], -1.0
+    for index in order:
+        if hit[index] > best:
+            front.append(int(index))
+            best = hit[index]
+    return front
+
+
+def select_candidate(metrics: 'Dict[str, np.ndarray]', target_coverage: float = DEFAULT_TARGET_COVERAGE) -> int:
+    """
+    挑選建議參數：命中率達標的組合中取最窄區間（同寬取方向命中率高者）；
+    沒有組合達標時取命中率最高者
+    """
+    front = pareto_front(metrics)
+    qualified = [i for i in front if metrics['interval_hit_rate'][i] >= target_coverage]
+    return qualified[0] if qualified else front[-1]
+
+
+def _metrics_at(metrics: 'Dict[str, np.ndarray]', index: int) -> Dict:
+    return {name: round(float(values[index]), 1) for name, values in metrics.items()}
+
+
+def _case_span(cases: SettlementCases, index: 'np.ndarray') -> str:
+    dates = [str(cases.dates[i]).replace('-', '') for i in (index[0], index[-1])]
+    return f"{dates[0]}-{dates[1]}"
+
+
+def calibration_entry(candidate: Dict) -> Dict:
+    """候選參數 -> calibration.json 的格式（區間半徑另存為 half_range 字典）"""
+    params, half_ranges = split_candidate(candidate)
+    return {**asdict(params), 'half_range': half_ranges}
+
+
+def run_sweep(cases: SettlementCases, candidates: List[Dict], baseline: Dict,
+              target_coverage: float = DEFAULT_TARGET_COVERAGE, workers: int = None,
+              min_train: int = MIN_TRAIN, test_size: int = TEST_SIZE) -> Dict:
+    """
+    執行參數掃描
+
+    Args:
+        cases: 依結算日排序的歷史結算案例
+        candidates: 候選參數
+        baseline: 目前使用的參數（一併評估以供比較）
+        target_coverage: 建議參數的目標區間命中率（%）
+        workers: 行程數
+        min_train: 前推切分的最少訓練案例數
+        test_size: 每折驗證案例數
+
+    Returns:
+        Dict: 寫入 calibration.json 的 settlement_params 區塊
+    """
+    candidates = [baseline] + [c for c in candidates if c != baseline]
+    matrix = evaluate_candidates(cases, candidates, workers)
+    full = matrix.metrics()
+
+    # 前推驗證：每折只用訓練段挑參數，再記錄該參數在驗證段的表現
+    splits = walk_forward_splits(len(cases), min_train, test_size)
+    folds = []
+    oos_hits = oos_width = oos_direction = oos_count = 0
+    for train, test in splits:
+        chosen = select_candidate(matrix.metrics(train), target_coverage)
+        test_mask = matrix.has_data[test]
+        test_index = test[test_mask]
+        oos_hits += int(matrix.in_range[chosen, test_index].sum())
+        oos_width += float(matrix.width[chosen, test_index].sum())
+        oos_direction += int(matrix.direction_hit[chosen, test_index].sum())
+        oos_count += len(test_index)
+        folds.append({
+            'train': _case_span(cases, train),
+            'test': _case_span(cases, test),
+            'selected': calibration_entry(candidates[chosen]),
+            'test_metrics': _metrics_at(matrix.metrics(test), chosen),
+        })
+
+    recommended = select_candidate(full, target_coverage)
+    front = pareto_front(full)
+    later = matrix.metrics(np.concatenate([test for _, test in splits]) if splits else np.arange(0))
+
+    def summary(index: int) -> Dict:
+        return {'full': _metrics_at(full, index), 'walk_forward_period': _metrics_at(later, index)}
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'cases': int(matrix.has_data.sum()),
+        'evaluated': len(candidates),
+        'target_coverage': target_coverage,
+        'recommended': calibration_entry(candidates[recommended]),
+        'recommended_metrics': summary(recommended),
+        'baseline': calibration_entry(baseline),
+        'baseline_metrics': summary(0),
+        'walk_forward': {
+            'min_train': min_train,
+            'test_size': test_size,
+            'folds': folds,
+            'out_of_sample': {
+                'count': oos_count,
+                'interval_hit_rate': round(oos_hits / oos_count * 100, 1) if oos_count else None,
+                'avg_width': round(oos_width / oos_count, 1) if oos_count else None,
+                'direction_hit_rate': round(oos_direction / oos_count * 100, 1) if oos_count else None,
+            },
+        },
+        'pareto_front': [
+            {**calibration_entry(candidates[i]), **_metrics_at(full, i)} for i in front
+        ],
+    }
@@ -0,0 +1,530 @@
+"""
+增量網站建置
+- 建置清單（data/build_manifest.json）記錄每個輸出 HTML 的輸入檔內容雜湊：
+  模板、共用 CSS/JS、OptionsData 快照、預測/檢討 JSON、校準參數、上游每日報告
+- 報告產生時即寫入 OptionsData 快照與建置記錄；build_site.py 依雜湊比對只重建過期頁面
+- 雜湊於輸出寫入後才計算，產生報告時順便寫出的 JSON（例如 AI 結算預測）不會讓頁面立刻又過期
+- 最後更新 docs/ 的預先壓縮檔（.gz/.br）並寫入頁面大小報告
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .assets import ASSET_SOURCE_DIR
+from .docs_sync import DocsSync
+from .file_lock import file_lock
+from .report_catalog import CATALOG_FILE
+from .site_compress import (
+    COMPRESSIBLE_SUFFIXES, compress_file, compressible_files, orphan_variants,
+    stale_variants, write_size_report
+)
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MANIFEST_FILE = PROJECT_ROOT / "data" / "build_manifest.json"
+MANIFEST_LOCK = PROJECT_ROOT / "data" / "build_manifest.lock"
+SNAPSHOT_DIR = PROJECT_ROOT / "data" / "options_snapshots"
+AI_LEARNING_DIR = PROJECT_ROOT / "data" / "ai_learning"
+TEMPLATE_DIR = PROJECT_ROOT / "templates"
+REPORTS_DIR = PROJECT_ROOT / "reports"
+DOCS_DIR = PROJECT_ROOT / "docs"
+INDEX_FILE = DOCS_DIR / "index.html"
+INDEX_SCRIPT = PROJECT_ROOT / "generate_index_with_weekday.py"
+
+# 首頁另依賴 docs/ 內的報告檔名（報告目錄之外補登的報告）
+INDEX_LISTING_KEY = 'docs/{report,settlement}_*.html (檔名清單)'
+
+NO_RECORD = '沒有建置記錄'
+
+DAILY_REPORT_PATTERN = re.compile(r'^report_(\d{8})_')
+SETTLEMENT_REPORT_PATTERN = re.compile(r'^settlement_(\d{8})_(wed|fri)$')
+
+
+def relative_key(path) -> str:
+    """清單中的鍵：相對於專案根目錄的路徑"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(PROJECT_ROOT.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def file_hash(path) -> Optional[str]:
+    """檔案內容的 SHA-256；檔案不存在回傳 None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def hash_inputs(paths: Iterable[Path]) -> Dict[str, Optional[str]]:
+    """計算輸入檔雜湊（不存在的檔案記為 None，之後出現即視為變更）"""
+    return {relative_key(path): file_hash(path) for path in paths}
+
+
+# ---------------------------------------------------------------------------
+# OptionsData 快照
+# ---------------------------------------------------------------------------
+
+def snapshot_path(report_path) -> Path:
+    """報告對應的 OptionsData 快照檔"""
+    return SNAPSHOT_DIR / f"{Path(report_path).stem}.json"
+
+
+def save_options_snapshot(report_path, options_list: List) -> Path:
+    """
+    儲存產生報告所用的 OptionsData，供日後不經 PDF 重新產生報告
+
+    內容不變時不改寫檔案，雜湊保持穩定
+    """
+    path = snapshot_path(report_path)
+    content = json.dumps(
+        [asdict(options) for options in options_list],
+        ensure_ascii=False, sort_keys=True, indent=1
+    )
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+def load_options_snapshot(path) -> List:
+    """讀取 OptionsData 快照"""
+    from .parser import OptionsData
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return [OptionsData(**item) for item in json.load(f)]
+
+
+# ---------------------------------------------------------------------------
+# 各類頁面的輸入檔
+# ---------------------------------------------------------------------------
+
+def daily_report_inputs(report_path, date: str) -> List[Path]:
+    """每日報告的輸入：模板與共用 CSS/JS、OptionsData 快照、當日預測與檢討 JSON"""
+    return [
+        TEMPLATE_DIR / 'report.html',
+        ASSET_SOURCE_DIR / 'report.css',
+        ASSET_SOURCE_DIR / 'report.js',
+        snapshot_path(report_path),
+        AI_LEARNING_DIR / 'predictions' / f'prediction_{date}.json',
+        AI_LEARNING_DIR / 'reviews' / f'review_{date}.json',
+    ]
+
+
+def settlement_report_inputs(settlement_date: str, analysis_dates: List[str]) -> List[Path]:
+    """
+    結算報告的輸入：模板與共用 CSS/JS、校準參數、分析日的每日報告、之前的結算檢討、AI 結算預測/檢討與盤前預測 JSON
+
+    Args:
+        settlement_date: 結算日 (YYYYMMDD)
+        analysis_dates: 分析日期 (YYYYMMDD)
+    """
+    paths = [
+        TEMPLATE_DIR / 'settlement_report.html',
+        ASSET_SOURCE_DIR / 'settlement_report.css',
+        ASSET_SOURCE_DIR / 'settlement_report.js',
+        AI_LEARNING_DIR / 'calibration.json',
+    ]
+    for date in analysis_dates:
+        paths.extend(sorted(REPORTS_DIR.glob(f'report_{date}_*.html')))
+    # 結算價格分布使用結算日之前的歷史結算誤差
+    paths.extend(
+        path for path in sorted((AI_LEARNING_DIR / 'settlement_reviews').glob('settlement_review_*.json'))
+        if path.stem.rsplit('_', 1)[-1] < settlement_date
+    )
+    paths.extend([
+        AI_LEARNING_DIR / 'settlement_predictions' / f'settlement_prediction_{settlement_date}.json',
+        AI_LEARNING_DIR / 'settlement_reviews' / f'settlement_review_{settlement_date}.json',
+        AI_LEARNING_DIR / f'premarket_prediction_{settlement_date}.json',
+    ])
+    return paths
+
+
+def index_inputs() -> Dict[str, Optional[str]]:
+    """首頁的輸入：產生腳本、模板與 CSS/JS、報告目錄，以及 docs/ 內的報告檔名清單"""
+    names = sorted(
+        path.name for pattern in ('report_*.html', 'settlement_*.html')
+        for path in DOCS_DIR.glob(pattern)
+    )
+    inputs = hash_inputs([
+        INDEX_SCRIPT,
+        CATALOG_FILE,
+        TEMPLATE_DIR / 'index.html',
+        ASSET_SOURCE_DIR / 'index.css',
+        ASSET_SOURCE_DIR / 'index.js',
+    ])
+    inputs[INDEX_LISTING_KEY] = hashlib.sha256('\n'.join(names).encode('utf-8')).hexdigest()
+    return inputs
+
+
+# ---------------------------------------------------------------------------
+# 建置清單
+# ---------------------------------------------------------------------------
+
+def _manifest_lock():
+    """跨行程鎖定建置清單（批次平行產生報告時多個行程會同時寫入）"""
+    return file_lock(MANIFEST_LOCK)
+
+
+class BuildManifest:
+    """建置清單：輸出檔 -> {kind, inputs, params, built_at}"""
+
+    def __init__(self, path: Path = MANIFEST_FILE):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = self._read()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('outputs', {})
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, output) -> Optional[Dict]:
+        return self.entries.get(relative_key(output))
+
+    def stale_reason(self, output, inputs: Dict[str, Optional[str]]) -> Optional[str]:
+        """
+        判斷輸出是否過期
+
+        Returns:
+            str: 過期原因；None 表示仍為最新
+        """
+        if not Path(output).exists():
+            return '輸出不存在'
+
+        entry = self.get(output)
+        if entry is None:
+            return NO_RECORD
+
+        recorded = entry.get('inputs', {})
+        changed = sorted(
+            key for key in set(recorded) | set(inputs)
+            if recorded.get(key) != inputs.get(key)
+        )
+        if changed:
+            return f"輸入變更: {', '.join(changed)}"
+        return None
+
+    def record(self, output, kind: str, inputs: Dict[str, Optional[str]], params: Dict = None):
+        """寫入一筆建置記錄（鎖定後重新讀取再合併，不覆蓋其他行程的記錄）"""
+        entry = {
+            'kind': kind,
+            'inputs': inputs,
+            'params': params or {},
+            'built_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        key = relative_key(output)
+
+        with _manifest_lock():
+            self.entries = self._read()
+            self.entries[key] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'version': 1, 'outputs': dict(sorted(self.entries.items()))},
+                    f, ensure_ascii=False, indent=2
+                )
+            os.replace(tmp_path, self.path)
+
+
+def record_build(output, kind: str, input_paths: Iterable[Path] = (),
+                 params: Dict = None, inputs: Dict[str, Optional[str]] = None):
+    """
+    輸出寫入後記錄其輸入雜湊（記錄失敗不影響報告產生）
+
+    Args:
+        output: 輸出檔路徑
+        kind: 頁面類型（daily / settlement / index）
+        input_paths: 輸入檔路徑
+        params: 重建時需要的參數
+        inputs: 已計算好的輸入雜湊（與 input_paths 合併）
+    """
+    try:
+        hashes = hash_inputs(input_paths)
+        hashes.update(inputs or {})
+        BuildManifest().record(output, kind, hashes, params)
+    except OSError as e:
+        print(f"⚠️  無法寫入建置記錄 {MANIFEST_FILE}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# 增量建置
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BuildTask:
+    """待重建的頁面"""
+    kind: str                        # daily / settlement / docs / index
+    output: Path
+    reason: str
+    params: Dict = field(default_factory=dict)
+    inputs: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+def _settlement_params(report_path: Path, entry: Optional[Dict]) -> Optional[Dict]:
+    """結算報告的重建參數：優先使用建置記錄，否則依檔名與交易日曆推算"""
+    if entry and entry.get('params'):
+        return entry['params']
+
+    match = SETTLEMENT_REPORT_PATTERN.match(report_path.stem)
+    if not match:
+        return None
+
+    from .trading_calendar import get_calendar
+
+    date_str, weekday_abbr = match.groups()
+    settlement_day = datetime.strptime(date_str, '%Y%m%d').date()
+    analysis_dates = get_calendar().previous_trading_days(settlement_day, 2)
+    return {
+        'settlement_date': settlement_day.strftime('%Y/%m/%d'),
+        'weekday': 'wednesday' if weekday_abbr == 'wed' else 'friday',
+        'analysis_dates': [day.strftime('%Y%m%d') for day in analysis_dates],
+    }
+
+
+class SiteBuilder:
+    """依建置清單只重建過期的頁面"""
+
+    def __init__(self, force: bool = False, dry_run: bool = False, adopt: bool = False):
+        """
+        Args:
+            force: 忽略清單，全部重建
+            dry_run: 只列出需要重建的頁面
+            adopt: 沒有建置記錄的既有頁面直接以目前輸入建立記錄，不重建（首次導入時使用）
+        """
+        self.force = force
+        self.dry_run = dry_run
+        self.adopt = adopt
+        self.manifest = BuildManifest()
+        self.unbuildable: List[str] = []
+        self.size_totals: Optional[Dict] = None
+
+    def _reason(self, output: Path, inputs: Dict[str, Optional[str]]) -> Optional[str]:
+        if self.force:
+            return '強制重建'
+        return self.manifest.stale_reason(output, inputs)
+
+    def plan_daily(self) -> List[BuildTask]:
+        """有 OptionsData 快照的每日報告中，輸入已變更者"""
+        tasks = []
+        for snapshot in sorted(SNAPSHOT_DIR.glob('report_*.json')):
+            match = DAILY_REPORT_PATTERN.match(snapshot.stem)
+            if not match:
+                continue
+            date = match.group(1)
+            output = REPORTS_DIR / f"{snapshot.stem}.html"
+            inputs = hash_inputs(daily_report_inputs(output, date))
+            reason = self._reason(output, inputs)
+            if reason:
+                tasks.append(BuildTask('daily', output, reason, {'date': date, 'snapshot': str(snapshot)}, inputs))
+
+        # 沒有快照（此功能之前產生）的報告只能重新解析 PDF
+        snapshots = {path.stem for path in SNAPSHOT_DIR.glob('report_*.json')}
+        self.unbuildable = sorted(
+            path.name for path in REPORTS_DIR.glob('report_*.html')
+            if path.stem not in snapshots and DAILY_REPORT_PATTERN.match(path.stem)
+        )
+        return tasks
+
+    def plan_settlement(self, pending: Iterable[Path] = ()) -> List[BuildTask]:
+        """
+        輸入已變更的結算報告
+
+        Args:
+            pending: 即將重建的每日報告（dry-run 時用來標示連帶重建）
+        """
+        pending_keys = {relative_key(path) for path in pending}
+        outputs = {REPORTS_DIR / Path(key).name for key, entry in self.manifest.entries.items()
+                   if entry.get('kind') == 'settlement'}
+        outputs.update(REPORTS_DIR.glob('settlement_*.html'))
+
+        tasks = []
+        for output in sorted(outputs):
+            params = _settlement_params(output, self.manifest.get(output))
+            if not params:
+                continue
+            settlement_date = params['settlement_date'].replace('/', '')
+            inputs = hash_inputs(settlement_report_inputs(settlement_date, params['analysis_dates']))
+
+            upstream = sorted(key for key in inputs if key in pending_keys)
+            reason = f"上游每日報告將重建: {', '.join(upstream)}" if upstream else self._reason(output, inputs)
+            if reason:
+                tasks.append(BuildTask('settlement', output, reason, params, inputs))
+        return tasks
+
+    def plan_docs(self) -> List[BuildTask]:
+        """reports/ 與 docs/ 內容不一致的報告、表格資料與共用資源（以同步引擎的雜湊快取比對）"""
+        self.docs_sync = DocsSync(REPORTS_DIR, DOCS_DIR)
+        sources = self.docs_sync.sources(('report_*.html', 'settlement_*.html'))
+        return [
+            BuildTask('docs', item.target, item.reason, {'sync_item': item})
+            for item in self.docs_sync.plan(sources, force=self.force)
+        ]
+
+    def plan_index(self, pending: Iterable[BuildTask] = ()) -> List[BuildTask]:
+        """
+        首頁（docs/ 報告檔名清單有變動時重建）
+
+        Args:
+            pending: 即將同步的 docs 任務（dry-run 時用來標示新增的報告）
+        """
+        inputs = index_inputs()
+        added = sorted(
+            task.output.name for task in pending
+            if task.output.suffix == '.html' and not task.output.exists()
+        )
+        reason = f"docs/ 將新增報告: {', '.join(added)}" if added else self._reason(INDEX_FILE, inputs)
+        return [BuildTask('index', INDEX_FILE, reason, inputs=inputs)] if reason else []
+
+    def plan_compress(self, pending: Iterable[BuildTask] = ()) -> List[BuildTask]:
+        """
+        docs/ 內壓縮檔缺少或過期的檔案，以及原始檔已刪除的壓縮檔
+
+        Args:
+            pending: 即將寫入 docs/ 的任務（dry-run 時一併列出）
+        """
+        tasks = []
+        planned = set()
+        for source in compressible_files(DOCS_DIR):
+            stale = stale_variants(source)
+            if stale or self.force:
+                reason = '強制重建' if self.force else f"缺少或過期: {', '.join(stale)}"
+                tasks.append(BuildTask('compress', source, reason, {'suffixes': stale}))
+                planned.add(source)
+        for task in pending:
+            if task.output.suffix in COMPRESSIBLE_SUFFIXES and task.output not in planned:
+                tasks.append(BuildTask('compress', task.output, '內容將更新', {'suffixes': None}))
+        for orphan in orphan_variants(DOCS_DIR):
+            tasks.append(BuildTask('compress', orphan, '原始檔已刪除', {'orphan': True}))
+        return tasks
+
+    def build(self, on_task=None) -> Dict[str, List[BuildTask]]:
+        """
+        依序建置：每日報告 -> 結算報告（依賴每日報告）-> 同步 docs -> 首頁 -> 壓縮檔
+
+        Args:
+            on_task: 每個任務完成（或 dry-run 列出）時的回呼 (task, error)
+
+        Returns:
+            dict: 階段名稱 -> 任務清單
+        """
+        phases = {}
+
+        phases['daily'] = self.plan_daily()
+        self._run(phases['daily'], self._build_daily, on_task)
+
+        pending = [task.output for task in phases['daily']] if self.dry_run else []
+        phases['settlement'] = self.plan_settlement(pending)
+        self._run(phases['settlement'], self._build_settlement, on_task)
+
+        phases['docs'] = self.plan_docs()
+        self._run(phases['docs'], self._sync_doc, on_task)
+        self.docs_sync.save()
+
+        phases['index'] = self.plan_index(phases['docs'] if self.dry_run else ())
+        self._run(phases['index'], self._build_index, on_task)
+
+        pending = phases['docs'] + phases['index'] if self.dry_run else []
+        phases['compress'] = self.plan_compress(pending)
+        self._run(phases['compress'], self._compress, on_task)
+
+        if not self.dry_run:
+            self.size_totals = write_size_report(DOCS_DIR)
+
+        return phases
+
+    def _run(self, tasks: List[BuildTask], builder, on_task):
+        for task in tasks:
+            error = None
+            if self.adopt and task.reason == NO_RECORD:
+                task.reason = '沿用既有輸出，建立記錄'
+                if not self.dry_run:
+                    params = {k: v for k, v in task.params.items() if k != 'snapshot'}
+                    self.manifest.record(task.output, task.kind, task.inputs, params)
+            elif not self.dry_run:
+                try:
+                    builder(task)
+                except Exception as e:
+                    error = str(e)
+            if on_task:
+                on_task(task, error)
+
+    def _daily_reporter(self):
+        """重建用的報告產生器：學習資料唯讀，避免重複寫入分析記錄"""
+        if not hasattr(self, '_reporter'):
+            from .ai_learning_system import AILearningSystem
+            from .reporter import ReportGenerator
+            self._reporter = ReportGenerator(
+                output_dir=REPORTS_DIR,
+                learning_system=AILearningSystem(data_dir=str(AI_LEARNING_DIR), read_only=True)
+            )
+        return self._reporter
+
+    def _build_daily(self, task: BuildTask):
+        from .analyzer import OptionsAnalyzer
+
+        options_list = load_options_snapshot(task.params['snapshot'])
+        reporter = self._daily_reporter()
+        analyzer = OptionsAnalyzer()
+        if len(options_list) > 1:
+            reporter.generate_multi_contract_report(options_list, analyzer)
+        else:
+            options_data = options_list[0]
+            reporter.generate(analyzer.analyze(options_data), options_data, filename=task.output.stem)
+
+    def _build_settlement(self, task: BuildTask):
+        from .settlement_predictor import SettlementPredictor
+        from .settlement_report_generator import SettlementReportGenerator
+
+        params = task.params
+        prediction = SettlementPredictor().predict_settlement(
+            dates=params['analysis_dates'],
+            settlement_date=params['settlement_date'],
+            settlement_weekday=params['weekday']
+        )
+
+        # 盤前預測已產生時，報告的最新版本包含盤前預測區塊
+        settlement_date = params['settlement_date'].replace('/', '')
+        premarket_file = AI_LEARNING_DIR / f'premarket_prediction_{settlement_date}.json'
+        premarket_data = None
+        if premarket_file.exists():
+            with open(premarket_file, 'r', encoding='utf-8') as f:
+                premarket_data = json.load(f)
+
+        SettlementReportGenerator().generate_report(
+            prediction=prediction,
+            output_filename=task.output.name,
+            premarket_data=premarket_data
+        )
+
+    def _sync_doc(self, task: BuildTask):
+        self.docs_sync.apply(task.params['sync_item'])
+
+    def _compress(self, task: BuildTask):
+        if task.params.get('orphan'):
+            task.output.unlink()
+        else:
+            compress_file(task.output, task.params['suffixes'])
+
+    def _build_index(self, task: BuildTask):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location('generate_index_with_weekday', INDEX_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.generate_index_html()  # 產生後自行寫入建置記錄
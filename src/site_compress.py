@@ -0,0 +1,206 @@
+"""
+docs/ 預先壓縮與頁面大小報告
+- 每個 HTML / CSS / JS / JSON 旁產生 .gz（以及安裝 brotli 時的 .br），
+  供支援預先壓縮檔的靜態主機直接回應（nginx gzip_static / brotli_static 等）
+- 壓縮檔的 mtime 與原始檔相同；mtime 不一致時（原始檔更新或剛 checkout）解壓比對 SHA-256，
+  內容相同只補回 mtime，不重新壓縮改寫
+- 原始檔已刪除的壓縮檔一併清除，避免回應舊內容
+- 大小報告記錄每個頁面的原始 / gzip / brotli 位元組數，以及每次建置的總量歷史
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DOCS_DIR = PROJECT_ROOT / "docs"
+SIZE_REPORT_FILE = PROJECT_ROOT / "data" / "site_size_report.json"
+
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.json')
+# 保留最近的建置總量記錄筆數
+SIZE_HISTORY_LIMIT = 365
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0：內容相同時輸出也相同，避免 git 出現無意義的變更
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+DECOMPRESSORS = {'.gz': gzip.decompress, '.br': lambda data: brotli.decompress(data)}
+
+
+def compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """可用的壓縮格式（副檔名 -> 壓縮函式）"""
+    available = {'.gz': _gzip}
+    if brotli is not None:
+        available['.br'] = _brotli
+    return available
+
+
+def variant_path(source: Path, suffix: str) -> Path:
+    """report.html -> report.html.gz"""
+    return source.with_name(source.name + suffix)
+
+
+def compressible_files(root: Path = DOCS_DIR) -> List[Path]:
+    """需要預先壓縮的檔案（略過隱藏檔與暫存檔）"""
+    return sorted(
+        path for path in Path(root).rglob('*')
+        if path.is_file()
+        and path.suffix in COMPRESSIBLE_SUFFIXES
+        and not any(part.startswith('.') for part in path.relative_to(root).parts)
+    )
+
+
+def _same_content(target: Path, suffix: str, source_hash: str) -> bool:
+    """壓縮檔解壓後的 SHA-256 是否與原始檔相同（無法解壓時視為不同）"""
+    try:
+        data = DECOMPRESSORS[suffix](target.read_bytes())
+    except Exception:
+        return False
+    return hashlib.sha256(data).hexdigest() == source_hash
+
+
+def stale_variants(source: Path) -> List[str]:
+    """
+    缺少或過期的壓縮格式
+
+    mtime 與原始檔相同時直接視為最新；不同時比對內容雜湊，內容相同的壓縮檔只補回 mtime
+    """
+    stat = source.stat()
+    source_hash = None
+    stale = []
+    for suffix in compressors():
+        target = variant_path(source, suffix)
+        if not target.exists():
+            stale.append(suffix)
+            continue
+        if target.stat().st_mtime_ns == stat.st_mtime_ns:
+            continue
+        if source_hash is None:
+            source_hash = hashlib.sha256(source.read_bytes()).hexdigest()
+        if _same_content(target, suffix, source_hash):
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        else:
+            stale.append(suffix)
+    return stale
+
+
+def compress_file(source: Path, suffixes: List[str] = None) -> Dict[str, int]:
+    """
+    產生壓縮檔（寫入暫存檔後置換，mtime 設為與原始檔相同）
+
+    Args:
+        source: 原始檔
+        suffixes: 要產生的格式（預設為全部可用格式）
+
+    Returns:
+        dict: 副檔名 -> 壓縮後位元組數
+    """
+    source = Path(source)
+    stat = source.stat()
+    data = source.read_bytes()
+    available = compressors()
+
+    sizes = {}
+    for suffix in suffixes or available:
+        target = variant_path(source, suffix)
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        tmp_path.write_bytes(available[suffix](data))
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, target)
+        sizes[suffix] = target.stat().st_size
+    return sizes
+
+
+def orphan_variants(root: Path = DOCS_DIR) -> List[Path]:
+    """原始檔已不存在的壓縮檔"""
+    orphans = []
+    for suffix in ('.gz', '.br'):
+        for variant in Path(root).rglob(f'*{suffix}'):
+            source = variant.with_name(variant.name[:-len(suffix)])
+            if source.suffix in COMPRESSIBLE_SUFFIXES and not source.exists():
+                orphans.append(variant)
+    return sorted(orphans)
+
+
+def compress_site(root: Path = DOCS_DIR) -> List[Path]:
+    """
+    更新整個目錄的壓縮檔：只壓縮過期的檔案，並清除孤立的壓縮檔
+
+    Returns:
+        list: 本次重新壓縮的原始檔
+    """
+    compressed = []
+    for source in compressible_files(root):
+        stale = stale_variants(source)
+        if stale:
+            compress_file(source, stale)
+            compressed.append(source)
+    for orphan in orphan_variants(root):
+        orphan.unlink()
+    return compressed
+
+
+def collect_sizes(root: Path = DOCS_DIR) -> Dict[str, Dict[str, int]]:
+    """每個檔案的原始與壓縮後大小（尚未壓縮的格式不列出）"""
+    sizes = {}
+    for source in compressible_files(root):
+        entry = {'raw': source.stat().st_size}
+        for suffix, key in (('.gz', 'gzip'), ('.br', 'brotli')):
+            target = variant_path(source, suffix)
+            if target.exists():
+                entry[key] = target.stat().st_size
+        sizes[source.relative_to(root).as_posix()] = entry
+    return sizes
+
+
+def write_size_report(root: Path = DOCS_DIR, report_file: Path = SIZE_REPORT_FILE) -> Dict:
+    """
+    寫入大小報告：各檔案目前大小，以及每次建置的總量歷史（同一天只保留最後一筆）
+
+    Returns:
+        dict: 本次的總量記錄
+    """
+    pages = collect_sizes(root)
+    totals = {
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'files': len(pages),
+        'raw': sum(entry['raw'] for entry in pages.values()),
+        'gzip': sum(entry.get('gzip', 0) for entry in pages.values()),
+        'brotli': sum(entry.get('brotli', 0) for entry in pages.values()),
+    }
+
+    history = []
+    if report_file.exists():
+        with open(report_file, 'r', encoding='utf-8') as f:
+            history = json.load(f).get('history', [])
+    history = [entry for entry in history if entry['date'] != totals['date']]
+    history.append(totals)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'totals': totals,
+        'history': history[-SIZE_HISTORY_LIMIT:],
+        'pages': pages,
+    }
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = report_file.with_name(f".{report_file.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, report_file)
+    return totals
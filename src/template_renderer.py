@@ -0,0 +1,124 @@
+"""
+共用模板渲染服務
+- 每個行程、每個模板目錄只建立一個 Jinja2 環境，模板編譯一次後重複使用
+- 編譯結果以 bytecode cache 存放於 .cache/jinja，模板未變更時跨行程沿用
+- ReportGenerator 與 SettlementReportGenerator 共用自訂 filter（format_number 等）
+- 模板以 asset_url('report.css') 引用指紋命名的共用 CSS/JS
+- 報告模板以 report_migration_version 寫入遷移版本標記（見 report_migrations.py）
+- render_to_file 以 Template.generate() 串流寫入暫存檔再置換，不在記憶體中組出整頁字串，
+  讀取中的網頁伺服器也不會看到寫到一半的檔案
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from .assets import asset_url
+from .report_migrations import latest_version
+from .lazy_import import lazy_import
+
+jinja2 = lazy_import('jinja2')
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_TEMPLATE_DIR = PROJECT_ROOT / "templates"
+BYTECODE_CACHE_DIR = PROJECT_ROOT / ".cache" / "jinja"
+
+# 不做自動跳脫的模板（結算報告模板直接輸出組好的 HTML 片段）
+RAW_TEMPLATES = {'settlement_report.html'}
+
+
+def format_number(value) -> str:
+    """千分位整數，空值顯示 0"""
+    return f'{int(value):,}' if value else '0'
+
+
+FILTERS = {
+    'format_number': format_number,
+}
+
+
+def _autoescape(template_name: str) -> bool:
+    """依模板決定是否自動跳脫（維持各模板原本的設定）"""
+    return template_name not in RAW_TEMPLATES
+
+
+def _bytecode_cache():
+    """磁碟 bytecode cache；目錄無法建立時不使用快取"""
+    try:
+        BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"⚠️  無法建立模板快取目錄 {BYTECODE_CACHE_DIR}: {e}")
+        return None
+    return jinja2.FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR))
+
+
+@lru_cache(maxsize=None)
+def _environment(template_dir: str):
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir),
+        autoescape=_autoescape,
+        bytecode_cache=_bytecode_cache(),
+    )
+    env.filters.update(FILTERS)
+    env.globals['asset_url'] = asset_url
+    # 新產生的報告已包含所有歷史遷移，直接標記為最新版本
+    env.globals['report_migration_version'] = latest_version()
+    return env
+
+
+def get_environment(template_dir=None):
+    """
+    取得模板目錄對應的共用 Jinja2 環境
+
+    Args:
+        template_dir: 模板目錄（預設為專案的 templates/）
+
+    Returns:
+        jinja2.Environment: 同一目錄在行程內共用同一個環境
+    """
+    return _environment(str(Path(template_dir or DEFAULT_TEMPLATE_DIR).resolve()))
+
+
+def render(template_name: str, template_dir=None, **context) -> str:
+    """
+    渲染模板
+
+    Args:
+        template_name: 模板檔名，例如 'report.html'
+        template_dir: 模板目錄（預設為專案的 templates/）
+        **context: 模板變數
+
+    Returns:
+        str: 渲染後的 HTML
+    """
+    return get_environment(template_dir).get_template(template_name).render(**context)
+
+
+def render_to_file(template_name: str, output_path, template_dir=None, **context) -> Path:
+    """
+    串流渲染模板到檔案
+
+    模板片段逐段寫入同目錄的暫存檔，完成後以 os.replace 置換（同一檔案系統內為原子操作）；
+    渲染失敗時刪除暫存檔，原本的檔案保持不變。
+
+    Args:
+        template_name: 模板檔名，例如 'report.html'
+        output_path: 輸出檔案路徑
+        template_dir: 模板目錄（預設為專案的 templates/）
+        **context: 模板變數
+
+    Returns:
+        Path: 輸出檔案路徑
+    """
+    template = get_environment(template_dir).get_template(template_name)
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(template.generate(**context))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return output_path
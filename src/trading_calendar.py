@@ -0,0 +1,265 @@
+"""
+台股交易日曆
+- 從休市日檔案（data/calendar/taiwan_holidays.json）載入多年份假日
+- 預先計算交易日序數陣列與逐日累計索引，next/prev/offset 皆為 O(1)
+- 提供向量化的「N 個交易日之前」查詢
+- 依 TXO 契約代碼（202601、202601W3、202601F3）推算最後結算日
+"""
+
+import json
+import re
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+
+HOLIDAY_FILE = Path(__file__).parent.parent / "data" / "calendar" / "taiwan_holidays.json"
+
+# 契約代碼：YYYYMM（月選）、YYYYMMWn（週三週選）、YYYYMMFn（週五週選）
+CONTRACT_CODE_PATTERN = re.compile(r'^(\d{4})(\d{2})(?:([WF])(\d))?$')
+
+# date.toordinal() 與 numpy datetime64[D]（1970-01-01 為 0）的差
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+DateLike = Union[date, datetime, str]
+
+
+def _to_date(value: DateLike) -> date:
+    """接受 date、datetime 或 'YYYYMMDD' / 'YYYY/MM/DD' / 'YYYY-MM-DD' 字串"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip().replace('/', '').replace('-', '')
+    return datetime.strptime(text, '%Y%m%d').date()
+
+
+def _load_holidays(path: Path) -> Dict[str, Dict[str, str]]:
+    """讀取休市日檔案，格式: 年份 -> {'MMDD': '假日名稱'}"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {year: days for year, days in data.items() if year.isdigit()}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  無法載入休市日檔案 {path}: {e}，僅排除週末")
+        return {}
+
+
+class TradingCalendar:
+    """台股交易日曆"""
+
+    def __init__(self, holidays: Dict[str, Dict[str, str]] = None):
+        """
+        Args:
+            holidays: 年份 -> {'MMDD': '假日名稱'}；未收錄的年份僅排除週末
+        """
+        self.holidays = {
+            str(year): dict(days) for year, days in (holidays or {}).items()
+        }
+        self._holiday_names = {
+            date(int(year), int(mmdd[:2]), int(mmdd[2:])).toordinal(): name
+            for year, days in self.holidays.items()
+            for mmdd, name in days.items()
+        }
+
+        years = sorted(int(year) for year in self.holidays) or [date.today().year]
+        self._build(years[0] - 1, years[-1] + 1)
+
+    @classmethod
+    def from_file(cls, path: Path = HOLIDAY_FILE) -> 'TradingCalendar':
+        """從休市日檔案建立日曆"""
+        return cls(_load_holidays(Path(path)))
+
+    def _build(self, first_year: int, last_year: int):
+        """預先計算 [first_year, last_year] 的交易日序數陣列與逐日累計交易日數"""
+        self.first_year = first_year
+        self.last_year = last_year
+        self._origin = date(first_year, 1, 1).toordinal()
+        end = date(last_year, 12, 31).toordinal()
+
+        # _trading[k]: 第 k 個交易日的序數（遞增）
+        # _count[i]:  序數 origin+i（含）以前的交易日數
+        self._trading = array('q')
+        self._count = array('q')
+        count = 0
+        for ordinal in range(self._origin, end + 1):
+            # date.fromordinal(o).weekday() == (o - 1) % 7
+            if (ordinal - 1) % 7 < 5 and ordinal not in self._holiday_names:
+                self._trading.append(ordinal)
+                count += 1
+            self._count.append(count)
+        self._numpy_cache = None
+
+    def _ensure_year(self, year: int):
+        """查詢超出預先計算範圍時擴充"""
+        if year < self.first_year or year > self.last_year:
+            self._build(min(year, self.first_year), max(year, self.last_year))
+
+    def _slot(self, day: date) -> int:
+        self._ensure_year(day.year)
+        return day.toordinal() - self._origin
+
+    def _count_before(self, slot: int) -> int:
+        """該日（不含）以前的交易日數"""
+        return self._count[slot - 1] if slot > 0 else 0
+
+    def has_holiday_data(self, year: int) -> bool:
+        """該年份是否有休市日資料"""
+        return str(year) in self.holidays
+
+    def is_trading_day(self, value: DateLike) -> Tuple[bool, str]:
+        """
+        判斷是否為台灣股市交易日
+
+        Returns:
+            tuple: (是否為交易日, 原因說明)
+        """
+        day = _to_date(value)
+        if day.weekday() >= 5:  # 5=週六, 6=週日
+            weekday_name = '週六' if day.weekday() == 5 else '週日'
+            return False, f'{weekday_name}休市'
+
+        name = self._holiday_names.get(day.toordinal())
+        if name:
+            return False, f'{name}休市'
+
+        return True, '交易日'
+
+    def is_open(self, value: DateLike) -> bool:
+        """是否為交易日（O(1) 查表）"""
+        slot = self._slot(_to_date(value))
+        return self._count[slot] != self._count_before(slot)
+
+    def offset(self, value: DateLike, n: int) -> date:
+        """
+        交易日位移
+
+        Args:
+            value: 基準日期（可為非交易日）
+            n: >0 為之後第 n 個交易日；<0 為之前第 |n| 個交易日；
+               0 為當天或之前最近的交易日
+
+        Returns:
+            date: 目標交易日
+        """
+        day = _to_date(value)
+        while True:
+            slot = self._slot(day)
+            if n > 0:
+                index = self._count[slot] - 1 + n
+            elif n < 0:
+                index = self._count_before(slot) + n
+            else:
+                index = self._count[slot] - 1
+
+            if index < 0:
+                self._ensure_year(self.first_year - 1)
+            elif index >= len(self._trading):
+                self._ensure_year(self.last_year + 1)
+            else:
+                return date.fromordinal(self._trading[index])
+
+    def next_trading_day(self, value: DateLike) -> date:
+        """下一個交易日"""
+        return self.offset(value, 1)
+
+    def previous_trading_day(self, value: DateLike) -> date:
+        """上一個交易日"""
+        return self.offset(value, -1)
+
+    def previous_trading_days(self, value: DateLike, count: int, include: bool = False) -> List[date]:
+        """
+        取得之前的 N 個交易日（由舊到新）
+
+        Args:
+            value: 基準日期
+            count: 交易日數
+            include: 基準日為交易日時是否包含基準日
+        """
+        if count <= 0:
+            return []
+        day = _to_date(value)
+        # 先位移一次，確保預先計算的範圍涵蓋最早的交易日
+        self.offset(day, -count)
+        slot = self._slot(day)
+        end = self._count[slot] if include else self._count_before(slot)
+        return [date.fromordinal(ordinal) for ordinal in self._trading[end - count:end]]
+
+    def trading_days_before(self, values, n: int):
+        """
+        向量化查詢：每個日期之前第 n 個交易日
+
+        Args:
+            values: 日期序列（date/字串清單或 numpy datetime64 陣列）
+            n: 往前的交易日數（>=1）
+
+        Returns:
+            numpy.ndarray: datetime64[D] 陣列
+        """
+        import numpy as np
+
+        days = np.asarray(values)
+        if not np.issubdtype(days.dtype, np.datetime64):
+            days = np.array([_to_date(v) for v in days.ravel()], dtype='datetime64[D]').reshape(days.shape)
+        ordinals = days.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
+
+        if ordinals.size:
+            self._ensure_year(date.fromordinal(int(ordinals.min())).year)
+            self._ensure_year(date.fromordinal(int(ordinals.max())).year)
+
+        while True:
+            trading, count_before = self._numpy_arrays()
+            index = count_before[ordinals - self._origin] - n
+            if ordinals.size and index.min() < 0:
+                self._ensure_year(self.first_year - 1)
+                continue
+            return (trading[index] - _EPOCH_ORDINAL).astype('datetime64[D]')
+
+    def _numpy_arrays(self):
+        """交易日序數與逐日「之前交易日數」的 numpy 檢視（擴充範圍後重建）"""
+        if self._numpy_cache is None:
+            import numpy as np
+            trading = np.frombuffer(self._trading, dtype=np.int64)
+            counts = np.frombuffer(self._count, dtype=np.int64)
+            count_before = np.concatenate(([0], counts[:-1]))
+            self._numpy_cache = (trading, count_before)
+        return self._numpy_cache
+
+    def settlement_date(self, contract_code: str) -> date:
+        """
+        TXO 契約代碼的最後結算日
+
+        - YYYYMM: 月選，當月第三個週三
+        - YYYYMMWn: 週三週選，當月第 n 個週三
+        - YYYYMMFn: 週五週選，當月第 n 個週五
+        結算日遇休市順延至下一個交易日
+
+        Args:
+            contract_code: 例如 '202601'、'202601W3'、'202601F3'
+
+        Returns:
+            date: 最後結算日
+        """
+        match = CONTRACT_CODE_PATTERN.match(contract_code.strip())
+        if not match:
+            raise ValueError(f"無法解析契約代碼: {contract_code}")
+
+        year, month = int(match.group(1)), int(match.group(2))
+        kind = match.group(3) or 'M'
+        nth = int(match.group(4)) if match.group(4) else 3
+        target_weekday = 4 if kind == 'F' else 2
+
+        first = date(year, month, 1)
+        day = first + timedelta(days=(target_weekday - first.weekday()) % 7 + 7 * (nth - 1))
+        if nth < 1 or day.month != month:
+            raise ValueError(f"契約代碼 {contract_code} 超出當月範圍")
+
+        return day if self.is_open(day) else self.next_trading_day(day)
+
+
+@lru_cache(maxsize=None)
+def get_calendar() -> TradingCalendar:
+    """取得共用的交易日曆（依休市日檔案建立，每個行程只建一次）"""
+    return TradingCalendar.from_file()
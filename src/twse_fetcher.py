@@ -3,10 +3,14 @@
 從證交所官方 API 獲取加權指數的開高低收資料
 """
 
-import requests
 from typing import Optional, Dict
 from datetime import datetime
 
+from src.lazy_import import lazy_import
+from src.settlement_price import IntradayIndex, save_intraday
+
+requests = lazy_import('requests')
+
 
 class TWSEDataFetcher:
     """台灣證券交易所資料獲取器"""
@@ -19,21 +23,15 @@ class TWSEDataFetcher:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
     
-    def fetch_ohlc(self, date: str) -> Optional[Dict[str, float]]:
+    def fetch_intraday(self, date: str) -> Optional[IntradayIndex]:
         """
-        獲取指定日期的加權指數 OHLC 資料
+        獲取指定日期的 5 秒加權指數，並存檔供結算價重建（src/settlement_price.py）
         
         Args:
             date: 日期字串，格式為 YYYYMMDD，例如 "20260112"
         
         Returns:
-            包含 open, high, low, close 的字典，失敗則返回 None
-            
-        Example:
-            >>> fetcher = TWSEDataFetcher()
-            >>> data = fetcher.fetch_ohlc("20260112")
-            >>> print(data)
-            {'open': 30472.70, 'high': 30681.99, 'low': 30472.70, 'close': 30567.29}
+            IntradayIndex，失敗則返回 None
         """
         try:
             # 驗證日期格式
@@ -62,49 +60,18 @@ class TWSEDataFetcher:
                 print(f"⚠️  {date} 無交易資料（可能是假日或尚未交易）")
                 return None
             
-            # 提取發行量加權股價指數（第二欄，index=1）
-            index_values = []
-            times = []
-            
-            for record in records:
-                time_str = record[0]
-                index_str = record[1].replace(',', '')
-                
-                try:
-                    index_val = float(index_str)
-                    index_values.append(index_val)
-                    times.append(time_str)
-                except ValueError:
-                    continue
-            
-            if not index_values:
+            # 提取時間與發行量加權股價指數（第二欄，index=1）
+            intraday = IntradayIndex.from_records(date, records)
+            if intraday is None:
                 print(f"⚠️  無法解析指數資料")
                 return None
             
-            # 計算 OHLC
-            # 注意：第一筆（09:00:00）通常是前一日收盤價，真正開盤從第二筆開始
-            if len(index_values) < 2:
-                print(f"⚠️  資料筆數不足")
-                return None
-            
-            # 找到第一個交易時間（通常是 09:00:05 或附近）
-            trading_start_idx = 1  # 跳過 09:00:00（前日收盤）
+            try:
+                save_intraday(intraday)
+            except OSError as e:
+                print(f"⚠️  無法儲存 {date} 5 秒指數: {e}")
             
-            # 如果第一筆時間確實是 09:00:00，則從第二筆開始
-            if times[0] == "09:00:00":
-                trading_values = index_values[trading_start_idx:]
-            else:
-                # 如果第一筆就不是 09:00:00，表示全部都是交易資料
-                trading_values = index_values
-            
-            ohlc = {
-                'open': trading_values[0],      # 開盤：第一筆交易價格
-                'high': max(trading_values),     # 最高
-                'low': min(trading_values),      # 最低
-                'close': trading_values[-1],     # 收盤：最後一筆
-            }
-            
-            return ohlc
+            return intraday
             
         except requests.RequestException as e:
             print(f"❌ 網路請求失敗: {e}")
@@ -115,6 +82,33 @@ class TWSEDataFetcher:
             traceback.print_exc()
             return None
     
+    def fetch_ohlc(self, date: str) -> Optional[Dict[str, float]]:
+        """
+        獲取指定日期的加權指數 OHLC 資料
+        
+        Args:
+            date: 日期字串，格式為 YYYYMMDD，例如 "20260112"
+        
+        Returns:
+            包含 open, high, low, close 的字典，失敗則返回 None
+            
+        Example:
+            >>> fetcher = TWSEDataFetcher()
+            >>> data = fetcher.fetch_ohlc("20260112")
+            >>> print(data)
+            {'open': 30472.70, 'high': 30681.99, 'low': 30472.70, 'close': 30567.29}
+        """
+        intraday = self.fetch_intraday(date)
+        if intraday is None:
+            return None
+        
+        # 計算 OHLC
+        # 注意：第一筆（09:00:00）通常是前一日收盤價，真正開盤從第二筆開始
+        ohlc = intraday.ohlc()
+        if ohlc is None:
+            print(f"⚠️  資料筆數不足")
+        return ohlc
+    
     def fetch_ohlc_pretty(self, date: str) -> Optional[Dict[str, float]]:
         """
         獲取 OHLC 並顯示友善訊息
@@ -0,0 +1,502 @@
+"""
+預測器前推（walk-forward）評估
+逐日重播歷史，讓 AIPredictionGenerator、AISettlementPrediction、SettlementPredictor 與
+AIPremarketPrediction 以同一套規則產生預測，並用共用指標評分：
+- 每個決策點只能透過 PointInTimeView 取得「截至該交易日收盤」的資料，要求之後的資料會拋出 LookaheadError
+- 校準參數以 calibration_store 的累加器只納入決策點之前的結算檢討重建；學習系統的記錄與結算檢討同樣依日期截斷
+- SettlementPredictor 使用預設訊號參數（參數掃描的建議值是以全部歷史挑選，會偷看未來）
+- 決策點分批交給行程池，預測器不寫入任何預測檔
+- 目標價（次日收盤價或結算價）只在評分階段取得：方向命中率、區間覆蓋率、誤差與相對隨機漫步的 MAE 比
+"""
+
+import copy
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .ai_learning_system import AILearningSystem
+from .ai_prediction_generator import AIPredictionGenerator
+from .ai_premarket_prediction import AIPremarketPrediction
+from .ai_settlement_prediction import AISettlementPrediction
+from .calibration_store import CalibrationState, review_records
+from .lazy_import import lazy_import
+from .parser import OptionsData
+from .settlement_backtest import (
+    ANALYSIS_DAYS,
+    METRIC_FIELDS,
+    METRICS_CACHE_FILE,
+    REPORTS_DIR,
+    REVIEWS_DIR,
+    load_metrics_table,
+)
+from .settlement_predictor import DEFAULT_HALF_RANGE, SettlementPrediction, SettlementPredictor, SignalParams
+from .trading_calendar import get_calendar
+
+np = lazy_import('numpy')
+
+LEARNING_DIR = Path("data/ai_learning")
+
+# 漲跌幅小於 0.5% 視為盤整（與 AISettlementPrediction 的趨勢判斷相同）
+FLAT_BAND_PCT = 0.5
+
+# 報告只保留 P/C Ratio，以單一合計履約價重建相同比例的 OI 給 AIPredictionGenerator
+CALL_OI_UNIT = 100_000
+
+TARGET_LABELS = {'next_close': '次日收盤', 'settlement': '結算價'}
+
+DIRECTION_CODES = {
+    '看漲': 1, '上漲': 1, 'bullish': 1,
+    '看跌': -1, '下跌': -1, 'bearish': -1,
+}
+
+
+class LookaheadError(LookupError):
+    """決策點要求取得之後才會產生的資料"""
+
+
+@dataclass
+class History:
+    """評估使用的全部歷史資料（只在開始時載入一次，預測器只能透過 PointInTimeView 存取）"""
+    reports: Dict[str, Dict]          # 交易日 (YYYYMMDD) -> 報告指標
+    reviews: Dict[str, Dict]          # 結算日 (YYYYMMDD) -> 結算檢討
+    night_sessions: Dict[str, Dict]   # 夜盤日 (YYYYMMDD) -> 夜盤資料（盤前預測當時抓取的記錄）
+    learning_dir: Path = LEARNING_DIR
+
+
+def _compact_date(value) -> str:
+    return str(value or '').replace('/', '').replace('-', '')
+
+
+def _settlement_price(review: Dict) -> Optional[float]:
+    price = (review.get('actual_result') or {}).get('settlement_price')
+    return float(price) if price else None
+
+
+def load_history(reports_dir: Path = REPORTS_DIR, reviews_dir: Path = REVIEWS_DIR,
+                 learning_dir: Path = LEARNING_DIR,
+                 cache_file: Optional[Path] = METRICS_CACHE_FILE) -> History:
+    """
+    載入報告指標、結算檢討與夜盤記錄
+
+    Args:
+        reports_dir: 報告目錄
+        reviews_dir: settlement_reviews 目錄
+        learning_dir: AI 學習資料目錄（分析記錄與盤前預測）
+        cache_file: 報告指標快取，None 表示不使用快取
+
+    Returns:
+        History: 依日期索引的歷史資料
+    """
+    table = load_metrics_table(reports_dir, cache_file)
+    reports = {}
+    for i, day in enumerate(table.dates):
+        values = {name: table.columns[name][i] for name in METRIC_FIELDS}
+        reports[str(day).replace('-', '')] = {
+            name: float(value) if name == 'pc_ratio' else int(value)
+            for name, value in values.items() if not np.isnan(value)
+        }
+
+    reviews = {}
+    for path in sorted(Path(reviews_dir).glob('settlement_review_*.json')):
+        try:
+            review = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"  跳過 {path.name}: {e}")
+            continue
+        date = _compact_date(review.get('settlement_date'))
+        if len(date) == 8:
+            reviews[date] = review
+
+    night_sessions = {}
+    for path in sorted(Path(learning_dir).glob('premarket_prediction_*.json')):
+        try:
+            night = json.loads(path.read_text(encoding='utf-8')).get('night_session') or {}
+        except (OSError, ValueError):
+            continue
+        if night.get('date') and night.get('close'):
+            night_sessions[night['date']] = night
+
+    return History(reports=reports, reviews=reviews, night_sessions=night_sessions, learning_dir=Path(learning_dir))
+
+
+class PointInTimeView:
+    """決策點的資料視圖：只提供 as_of（含）以前的資料"""
+
+    def __init__(self, history: History, as_of: str):
+        self.history = history
+        self.as_of = as_of
+
+    def _check(self, date: str):
+        if date > self.as_of:
+            raise LookaheadError(f"決策點 {self.as_of} 不可取得 {date} 的資料")
+
+    def report(self, date: str) -> Optional[Dict]:
+        """交易日的報告指標"""
+        self._check(date)
+        return self.history.reports.get(date)
+
+    def night_session(self, date: str) -> Optional[Dict]:
+        """夜盤資料（以夜盤開始的交易日為日期）"""
+        self._check(date)
+        return self.history.night_sessions.get(date)
+
+    def reviews(self) -> List[Dict]:
+        """決策點以前已結算的檢討（由舊到新）"""
+        return [review for date, review in sorted(self.history.reviews.items()) if date <= self.as_of]
+
+    def calibration(self) -> Dict:
+        """只以決策點以前的結算檢討累加出的校準參數"""
+        state = CalibrationState()
+        for review in self.reviews():
+            state.add(review_records(review))
+        return state.params()
+
+    def learning_system(self, base: AILearningSystem) -> AILearningSystem:
+        """
+        截斷到決策點的學習系統
+
+        Args:
+            base: 唯讀模式載入的學習系統（不會被修改）
+        """
+        system = copy.copy(base)
+        # 當天記錄的事後驗證要到下一個交易日才產生
+        system.records = [
+            record if record.date < self.as_of
+            else replace(record, next_day_price=None, prediction_accuracy=None, lessons_learned=None)
+            for record in base.records if record.date <= self.as_of
+        ]
+        system.settlement_reviews = self.reviews()
+        system.insights = {}
+        system.pending_records = []
+        system._update_settlement_insights()
+        system._update_insights()
+        return system
+
+
+@dataclass
+class DecisionPoint:
+    """一次預測：在 as_of 收盤後（盤前預測為隔日開盤前）預測 target_date"""
+    predictor: str
+    as_of: str          # 決策時可見的最後一個交易日 (YYYYMMDD)
+    target_date: str    # 預測目標日 (YYYYMMDD)
+    weekday: str = ''   # 結算週別（結算類預測）
+
+
+@dataclass
+class Forecast:
+    """統一格式的預測結果"""
+    predictor: str
+    as_of: str
+    target_date: str
+    base_price: float   # 決策時的最新收盤價
+    center: float
+    lower: float
+    upper: float
+    direction: int      # 1 偏多 / 0 盤整 / -1 偏空
+    actual: Optional[float] = None
+
+
+class _ReplayPredictionGenerator(AIPredictionGenerator):
+    def _save_prediction(self, prediction: Dict):
+        pass
+
+
+class _ReplaySettlementPrediction(AISettlementPrediction):
+    def _save_prediction(self, prediction: Dict):
+        pass
+
+
+class _ReplayPremarketPrediction(AIPremarketPrediction):
+    def _save_prediction(self, settlement_date: str, prediction: Dict):
+        pass
+
+
+class _ReplaySettlementPredictor(SettlementPredictor):
+    """報告數據與校準參數改由 PointInTimeView 提供"""
+
+    def __init__(self, view: PointInTimeView, params: SignalParams):
+        super().__init__(params)
+        self.view = view
+        self._calibration = view.calibration()
+
+    def _load_reports_data(self, dates: List[str]) -> List[Dict]:
+        reports = []
+        for date in dates:
+            data = self.view.report(date)
+            if data:
+                reports.append({**data, 'date': date})
+        return reports
+
+
+_worker_history: Optional[History] = None
+_worker_learning: Optional[AILearningSystem] = None
+
+
+def _analysis_dates(settlement_date: str) -> List[str]:
+    days = get_calendar().previous_trading_days(settlement_date, ANALYSIS_DAYS)
+    return [day.strftime('%Y%m%d') for day in days]
+
+
+def _rule_prediction(view: PointInTimeView, point: DecisionPoint) -> Optional[SettlementPrediction]:
+    date = point.target_date
+    prediction = _ReplaySettlementPredictor(view, SignalParams()).predict_settlement(
+        _analysis_dates(date), f"{date[:4]}/{date[4:6]}/{date[6:]}", point.weekday
+    )
+    return prediction if prediction.current_price else None
+
+
+def _latest_close(view: PointInTimeView) -> Optional[float]:
+    report = view.report(view.as_of) or {}
+    return report.get('close_price')
+
+
+def _forecast(point: DecisionPoint, base_price: float, lower: float, upper: float,
+              direction: int, center: Optional[float] = None) -> Forecast:
+    return Forecast(
+        predictor=point.predictor,
+        as_of=point.as_of,
+        target_date=point.target_date,
+        base_price=float(base_price),
+        center=float(center if center else (lower + upper) / 2),
+        lower=float(lower),
+        upper=float(upper),
+        direction=direction,
+    )
+
+
+def predict_next_day(view: PointInTimeView, point: DecisionPoint) -> Optional[Forecast]:
+    """AIPredictionGenerator：以當日收盤價與 P/C Ratio 預測次日"""
+    report = view.report(point.as_of)
+    if not report or not report.get('close_price') or 'pc_ratio' not in report:
+        return None
+
+    options = OptionsData(
+        date=point.as_of, contract_month='', strike_prices=[],
+        call_volume=[], call_oi=[CALL_OI_UNIT], call_oi_change=[],
+        put_volume=[], put_oi=[round(report['pc_ratio'] * CALL_OI_UNIT)], put_oi_change=[],
+        tx_close=report['close_price'],
+    )
+    generator = _ReplayPredictionGenerator(view.learning_system(_worker_learning))
+    prediction = generator.generate_prediction(options, point.as_of)
+    price_range = prediction['range_prediction']
+    return _forecast(point, report['close_price'], price_range['lower_bound'], price_range['upper_bound'],
+                     DIRECTION_CODES.get(prediction['direction_prediction']['direction'], 0))
+
+
+def predict_ai_settlement(view: PointInTimeView, point: DecisionPoint) -> Optional[Forecast]:
+    """AISettlementPrediction：以結算日前兩個交易日的收盤價與 P/C Ratio 預測結算價"""
+    historical_data = []
+    for date in _analysis_dates(point.target_date):
+        report = view.report(date)
+        if not report or not report.get('close_price') or 'pc_ratio' not in report:
+            return None
+        historical_data.append({
+            'date': date,
+            'tx_close': report['close_price'],
+            'pc_ratio': report['pc_ratio'],
+            'max_pain': report.get('max_pain', 0),
+        })
+
+    system = _ReplaySettlementPrediction(view.learning_system(_worker_learning))
+    system._calibration = view.calibration()
+    prediction = system.generate_settlement_prediction(historical_data, point.target_date, point.weekday)
+    price = prediction['settlement_price_prediction']
+    return _forecast(point, historical_data[-1]['tx_close'], price['lower_bound'], price['upper_bound'],
+                     DIRECTION_CODES.get(prediction['trend_analysis']['trend_direction'], 0),
+                     center=price['predicted_price'])
+
+
+def predict_rule_settlement(view: PointInTimeView, point: DecisionPoint) -> Optional[Forecast]:
+    """SettlementPredictor：報告訊號規則預測結算區間"""
+    prediction = _rule_prediction(view, point)
+    if prediction is None:
+        return None
+    lower, upper = prediction.predicted_range
+    return _forecast(point, prediction.current_price, lower, upper,
+                     DIRECTION_CODES.get(prediction.overall_trend, 0), center=prediction.predicted_center)
+
+
+def predict_premarket(view: PointInTimeView, point: DecisionPoint) -> Optional[Forecast]:
+    """AIPremarketPrediction：以前一晚夜盤調整 SettlementPredictor 的結算區間"""
+    night = view.night_session(point.as_of)
+    base_price = _latest_close(view)
+    if not night or not base_price:
+        return None
+    prediction = _rule_prediction(view, point)
+    if prediction is None:
+        return None
+
+    settlement_prediction = {
+        'overall_trend': prediction.overall_trend,
+        'predicted_range': list(prediction.predicted_range),
+        'current_price': prediction.current_price,
+    }
+    result = _ReplayPremarketPrediction().generate_premarket_prediction(
+        night, None, settlement_prediction, point.target_date
+    )
+    adjusted = result['adjusted_prediction']
+    lower, upper = adjusted['adjusted_range']
+    return _forecast(point, base_price, lower, upper, DIRECTION_CODES.get(adjusted['new_trend'], 0))
+
+
+@dataclass(frozen=True)
+class PredictorSpec:
+    name: str
+    target: str   # 'next_close' 次日收盤 / 'settlement' 結算價
+    predict: Callable[[PointInTimeView, DecisionPoint], Optional[Forecast]]
+
+
+PREDICTORS: Dict[str, PredictorSpec] = {
+    spec.name: spec for spec in (
+        PredictorSpec('AIPredictionGenerator', 'next_close', predict_next_day),
+        PredictorSpec('AISettlementPrediction', 'settlement', predict_ai_settlement),
+        PredictorSpec('SettlementPredictor', 'settlement', predict_rule_settlement),
+        PredictorSpec('AIPremarketPrediction', 'settlement', predict_premarket),
+    )
+}
+
+
+def decision_points(history: History, predictors: Optional[List[str]] = None,
+                    start: Optional[str] = None, end: Optional[str] = None) -> List[DecisionPoint]:
+    """
+    依時間順序列出每個預測器的決策點（只保留之後可取得目標價的決策點）
+
+    Args:
+        history: 歷史資料
+        predictors: 預測器名稱（預設全部）
+        start, end: 目標日範圍 (YYYYMMDD，含)
+
+    Returns:
+        依 as_of 排序的決策點
+    """
+    calendar = get_calendar()
+    points = []
+    for name in predictors or PREDICTORS:
+        if PREDICTORS[name].target == 'next_close':
+            for date in sorted(history.reports):
+                target = calendar.next_trading_day(date).strftime('%Y%m%d')
+                if history.reports.get(target, {}).get('close_price'):
+                    points.append(DecisionPoint(name, date, target))
+        else:
+            for date, review in sorted(history.reviews.items()):
+                weekday = str(review.get('weekday', '')).lower()
+                if weekday not in DEFAULT_HALF_RANGE or _settlement_price(review) is None:
+                    continue
+                as_of = calendar.previous_trading_day(date).strftime('%Y%m%d')
+                points.append(DecisionPoint(name, as_of, date, weekday))
+
+    points = [p for p in points if (not start or p.target_date >= start) and (not end or p.target_date <= end)]
+    return sorted(points, key=lambda p: (p.as_of, p.target_date, p.predictor))
+
+
+def _init_worker(history: History):
+    global _worker_history, _worker_learning
+    _worker_history = history
+    _worker_learning = AILearningSystem(str(history.learning_dir), read_only=True)
+
+
+def _run_chunk(points: List[DecisionPoint]) -> List[Optional[Forecast]]:
+    forecasts = []
+    for point in points:
+        view = PointInTimeView(_worker_history, point.as_of)
+        try:
+            forecasts.append(PREDICTORS[point.predictor].predict(view, point))
+        except LookaheadError:
+            raise
+        except Exception as e:
+            print(f"⚠️  {point.predictor} {point.as_of} → {point.target_date} 預測失敗: {e}")
+            forecasts.append(None)
+    return forecasts
+
+
+def _actual(history: History, forecast: Forecast) -> float:
+    if PREDICTORS[forecast.predictor].target == 'next_close':
+        return float(history.reports[forecast.target_date]['close_price'])
+    return _settlement_price(history.reviews[forecast.target_date])
+
+
+def score(forecasts: List[Forecast]) -> Dict:
+    """
+    共用評分指標
+
+    - 方向命中：預測方向與實際漲跌（相對決策時收盤價，±0.5% 內為盤整）一致
+    - 區間覆蓋：目標價落在預測區間內
+    - MAE / 偏差：目標價與預測中心的絕對誤差 / 平均誤差
+    - MAE/隨機漫步：MAE 除以「目標價 = 決策時收盤價」的 MAE，小於 1 表示勝過不做預測
+    """
+    if not forecasts:
+        return {'count': 0}
+    base = np.array([f.base_price for f in forecasts])
+    actual = np.array([f.actual for f in forecasts])
+    center = np.array([f.center for f in forecasts])
+    lower = np.array([f.lower for f in forecasts])
+    upper = np.array([f.upper for f in forecasts])
+    direction = np.array([f.direction for f in forecasts])
+
+    change_pct = (actual - base) / base * 100
+    actual_direction = np.select([change_pct > FLAT_BAND_PCT, change_pct < -FLAT_BAND_PCT], [1, -1], 0)
+    errors = actual - center
+    naive_mae = float(np.abs(actual - base).mean())
+    mae = float(np.abs(errors).mean())
+
+    return {
+        'count': len(forecasts),
+        'direction_hit_rate': round(float((direction == actual_direction).mean()) * 100, 1),
+        'interval_coverage': round(float(((actual >= lower) & (actual <= upper)).mean()) * 100, 1),
+        'avg_width': round(float((upper - lower).mean()), 1),
+        'mae': round(mae, 1),
+        'bias': round(float(errors.mean()), 1),
+        'p75': round(float(np.percentile(np.abs(errors), 75)), 1),
+        'mae_vs_naive': round(mae / naive_mae, 2) if naive_mae else None,
+    }
+
+
+@dataclass
+class EvaluationResult:
+    """前推評估結果"""
+    forecasts: List[Forecast]
+    summary: Dict[str, Dict]                              # 預測器 -> 共用指標
+    skipped: Dict[str, int] = field(default_factory=dict)  # 預測器 -> 數據不足而未預測的決策點數
+
+
+def run_evaluation(history: History, predictors: Optional[List[str]] = None, workers: Optional[int] = None,
+                   start: Optional[str] = None, end: Optional[str] = None) -> EvaluationResult:
+    """
+    逐決策點重播所有預測器並評分
+
+    Args:
+        history: 歷史資料
+        predictors: 預測器名稱（預設全部）
+        workers: 行程數（預設依 CPU 核心數，1 表示不使用行程池）
+        start, end: 目標日範圍 (YYYYMMDD，含)
+
+    Returns:
+        EvaluationResult: 逐筆預測與各預測器的指標
+    """
+    names = list(predictors or PREDICTORS)
+    points = decision_points(history, names, start, end)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, -(-len(points) // (workers * 4)))
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(history)
+        parts = [_run_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history,)) as executor:
+            parts = list(executor.map(_run_chunk, chunks))
+
+    forecasts, skipped = [], {name: 0 for name in names}
+    for point, forecast in zip(points, (f for part in parts for f in part)):
+        if forecast is None:
+            skipped[point.predictor] += 1
+            continue
+        forecast.actual = _actual(history, forecast)
+        forecasts.append(forecast)
+
+    summary = {name: score([f for f in forecasts if f.predictor == name]) for name in names}
+    return EvaluationResult(forecasts=forecasts, summary=summary, skipped=skipped)
@@ -2,12 +2,15 @@
 從聚財網 (wearn.com) 抓取選擇權數據
 """
 
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
 
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +42,7 @@ class WearnFetcher:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
             
             # 驗證契約是否正確
             selected = soup.find('option', {'selected': True})
@@ -55,7 +58,7 @@ class WearnFetcher:
             logger.error(f"抓取契約 {contract_code} 數據失敗: {e}")
             return None
     
-    def _parse_data(self, soup: BeautifulSoup, contract_code: str) -> Dict:
+    def _parse_data(self, soup: 'bs4.BeautifulSoup', contract_code: str) -> Dict:
         """解析網頁數據"""
         
         # 找到主要數據表格
@@ -131,7 +134,7 @@ class WearnFetcher:
             response = self.session.get(self.BASE_URL, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
             select = soup.find('select', class_='select_location')
             
             if not select:
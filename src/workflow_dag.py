@@ -0,0 +1,213 @@
+"""
+工作流依賴圖排程器
+- 每個步驟宣告輸入/輸出資源，依宣告順序推導依賴關係
+- 互不相依的分支在執行緒池中並行執行（步驟多為子行程呼叫，執行緒即可）
+- 可掛上檢查點：輸入未變且輸出仍在的步驟直接沿用上次結果
+- 執行完成後計算關鍵路徑，供寫入執行歷史
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass
+class WorkflowStep:
+    """工作流步驟"""
+    name: str
+    func: Callable[[], bool]
+    inputs: Tuple[str, ...] = ()     # 讀取的資源名稱
+    outputs: Tuple[str, ...] = ()    # 寫入的資源名稱
+    description: str = ''
+    required: bool = False           # 失敗時略過下游步驟並判定整體失敗
+
+
+@dataclass
+class StepResult:
+    """步驟執行結果（時間為相對於排程開始的秒數）"""
+    name: str
+    status: str                      # success / cached / failed / skipped
+    start: float = 0.0
+    end: float = 0.0
+    error: str = ''
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ok(self) -> bool:
+        """成功執行或沿用檢查點"""
+        return self.status in ('success', 'cached')
+
+
+class WorkflowDAG:
+    """依賴圖排程器"""
+
+    def __init__(self, steps: List[WorkflowStep]):
+        names = [step.name for step in steps]
+        duplicated = {name for name in names if names.count(name) > 1}
+        if duplicated:
+            raise ValueError(f"步驟名稱重複: {', '.join(sorted(duplicated))}")
+
+        self.steps = list(steps)
+        self.step_map = {step.name: step for step in self.steps}
+        self.dependencies = self._build_dependencies()
+
+    def _build_dependencies(self) -> Dict[str, List[str]]:
+        """
+        依宣告順序推導依賴，較早宣告的步驟為上游：
+        - 讀取上游寫入的資源（寫後讀）
+        - 與上游寫入同一資源（寫後寫，例如共用的 data/ai_learning）
+        - 寫入上游讀取的資源（讀後寫）
+        """
+        dependencies = {}
+        for i, step in enumerate(self.steps):
+            reads, writes = set(step.inputs), set(step.outputs)
+            dependencies[step.name] = [
+                prev.name for prev in self.steps[:i]
+                if set(prev.outputs) & (reads | writes) or set(prev.inputs) & writes
+            ]
+        return dependencies
+
+    def run(self, logger, max_workers: int = 3, checkpoints=None) -> Dict[str, StepResult]:
+        """
+        執行所有步驟
+
+        Args:
+            logger: WorkflowLogger（需支援 bind_step 與 span）
+            max_workers: 最大並行數
+            checkpoints: 檢查點物件（需支援 begin(step) -> bool 與 finish(step, result)），
+                begin 回傳 True 表示可沿用上次結果
+
+        Returns:
+            dict: 步驟名稱 -> StepResult
+        """
+        results: Dict[str, StepResult] = {}
+        pending = list(self.steps)
+        running = {}
+        t0 = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='workflow') as pool:
+            while pending or running:
+                # 上游必要步驟失敗或被略過時，下游一併略過
+                for step in list(pending):
+                    blocked = [
+                        dep for dep in self.dependencies[step.name]
+                        if dep in results and (
+                            results[dep].status == 'skipped' or
+                            (results[dep].status == 'failed' and self.step_map[dep].required)
+                        )
+                    ]
+                    if blocked:
+                        pending.remove(step)
+                        now = time.perf_counter() - t0
+                        results[step.name] = StepResult(
+                            step.name, 'skipped', now, now,
+                            error=f"上游步驟未完成: {', '.join(blocked)}"
+                        )
+                        logger.warning(f"略過步驟 {step.name}（上游步驟未完成: {', '.join(blocked)}）")
+
+                ready = [
+                    step for step in pending
+                    if all(dep in results for dep in self.dependencies[step.name])
+                ]
+                for step in ready:
+                    pending.remove(step)
+                    if checkpoints and checkpoints.begin(step):
+                        now = time.perf_counter() - t0
+                        results[step.name] = StepResult(step.name, 'cached', now, now)
+                        checkpoints.finish(step, results[step.name])
+                        logger.info(f"沿用檢查點，略過步驟 {step.name}")
+                        continue
+                    running[pool.submit(self._run_step, step, logger, t0)] = step
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    results[step.name] = future.result()
+                    if checkpoints:
+                        checkpoints.finish(step, results[step.name])
+
+        return results
+
+    @staticmethod
+    def _run_step(step: WorkflowStep, logger, t0: float) -> StepResult:
+        """在工作執行緒中執行單一步驟"""
+        logger.bind_step(step.name)
+        start = time.perf_counter() - t0
+        error = ''
+        try:
+            with logger.span(step.name) as step_span:
+                status = 'success' if step.func() else 'failed'
+                step_span.set(result=status)
+        except Exception as e:
+            status, error = 'failed', str(e)
+            logger.error(f"步驟 {step.name} 發生例外: {e}")
+        finally:
+            logger.bind_step(None)
+
+        if status == 'failed' and not step.required:
+            logger.warning(f"{step.description or step.name} 失敗，繼續執行")
+
+        return StepResult(step.name, status, start, time.perf_counter() - t0, error)
+
+    def critical_path(self, results: Dict[str, StepResult]) -> Tuple[List[str], float]:
+        """
+        計算關鍵路徑（以實際耗時為權重的最長依賴鏈）
+
+        Returns:
+            tuple: (路徑上的步驟名稱, 路徑總耗時秒數)
+        """
+        finish = {}
+        previous = {}
+        # 宣告順序即為拓撲順序
+        for step in self.steps:
+            deps = [dep for dep in self.dependencies[step.name] if dep in finish]
+            best = max(deps, key=lambda dep: finish[dep]) if deps else None
+            duration = results[step.name].duration if step.name in results else 0.0
+            finish[step.name] = duration + (finish[best] if best else 0.0)
+            previous[step.name] = best
+
+        if not finish:
+            return [], 0.0
+
+        current = max(finish, key=finish.get)
+        total = finish[current]
+        path = []
+        while current:
+            path.append(current)
+            current = previous[current]
+        return list(reversed(path)), total
+
+    def summary(self, results: Dict[str, StepResult], max_workers: int, wall_seconds: float) -> dict:
+        """產生寫入執行歷史的排程摘要"""
+        path, path_seconds = self.critical_path(results)
+        steps = []
+        for step in self.steps:
+            result = results.get(step.name, StepResult(step.name, 'skipped'))
+            entry = {
+                'name': step.name,
+                'description': step.description,
+                'status': result.status,
+                'depends_on': self.dependencies[step.name],
+                'start': round(result.start, 3),
+                'end': round(result.end, 3),
+                'duration': round(result.duration, 3),
+            }
+            if result.error:
+                entry['error'] = result.error
+            steps.append(entry)
+
+        return {
+            'max_workers': max_workers,
+            'wall_seconds': round(wall_seconds, 3),
+            'serial_seconds': round(sum(r.duration for r in results.values()), 3),
+            'critical_path': path,
+            'critical_path_seconds': round(path_seconds, 3),
+            'steps': steps,
+        }
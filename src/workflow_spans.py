@@ -0,0 +1,237 @@
+"""
+工作流效能追蹤（span）
+- span(name) 情境管理器 / traced(name) 裝飾器，可巢狀記錄子步驟
+- 每個 span 記錄牆鐘時間、CPU 時間、峰值 RSS 增量與 I/O 位元組
+- 子行程（main.py 等）透過環境變數 WORKFLOW_SPAN_FILE 回報自己的 span，
+  由父行程的 span 結束時併入為子節點
+"""
+
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows 無 resource 模組
+    resource = None
+
+
+SPAN_FILE_ENV = 'WORKFLOW_SPAN_FILE'
+
+_local = threading.local()
+
+
+def _read_proc_io() -> tuple:
+    """讀取本行程累計的讀寫位元組（/proc/self/io 的 rchar/wchar，含網路；非 Linux 回傳 0）"""
+    try:
+        values = {}
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                values[key] = int(value)
+        return values.get('rchar', 0), values.get('wchar', 0)
+    except (OSError, ValueError):
+        return 0, 0
+
+
+def _max_rss_kb(who) -> int:
+    """峰值 RSS（KB；macOS 的 ru_maxrss 單位為 bytes）"""
+    value = resource.getrusage(who).ru_maxrss
+    return value // 1024 if sys.platform == 'darwin' else value
+
+
+def _snapshot() -> Dict:
+    """擷取目前的資源用量"""
+    io_read, io_write = _read_proc_io()
+    snap = {
+        'wall': time.perf_counter(),
+        'cpu': time.thread_time(),
+        'io_read': io_read,
+        'io_write': io_write,
+        'rss_kb': 0,
+        'child_cpu': 0.0,
+        'child_rss_kb': 0,
+        'child_io_read': 0,
+        'child_io_write': 0,
+    }
+    if resource:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        snap['rss_kb'] = _max_rss_kb(resource.RUSAGE_SELF)
+        snap['child_cpu'] = children.ru_utime + children.ru_stime
+        snap['child_rss_kb'] = _max_rss_kb(resource.RUSAGE_CHILDREN)
+        # 子行程只能取得區塊 I/O（512 bytes/區塊）
+        snap['child_io_read'] = children.ru_inblock * 512
+        snap['child_io_write'] = children.ru_oublock * 512
+    return snap
+
+
+class Span:
+    """單一追蹤區段"""
+
+    def __init__(self, name: str, attrs: Optional[Dict] = None):
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.children: List[Dict] = []
+        self.started_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._start = _snapshot()
+        self._child_file: Optional[Path] = None
+        self.record: Optional[Dict] = None
+
+    def set(self, **attrs):
+        """附加屬性（例如下載位元組數）"""
+        self.attrs.update(attrs)
+
+    def child_env(self) -> Dict[str, str]:
+        """供子行程使用的環境變數，子行程的 span 會回報到本 span"""
+        if self._child_file is None:
+            fd, path = tempfile.mkstemp(prefix='workflow_span_', suffix='.jsonl')
+            os.close(fd)
+            self._child_file = Path(path)
+        env = os.environ.copy()
+        env[SPAN_FILE_ENV] = str(self._child_file)
+        return env
+
+    def finish(self, status: str = 'ok') -> Dict:
+        """結束 span 並產生記錄"""
+        end = _snapshot()
+        start = self._start
+        self._collect_child_spans()
+
+        # RUSAGE_CHILDREN 為整個行程的累計值，多個步驟並行時只是近似
+        record = {
+            'name': self.name,
+            'start': self.started_at,
+            'status': status,
+            'pid': os.getpid(),
+            'wall_seconds': round(end['wall'] - start['wall'], 4),
+            'cpu_seconds': round((end['cpu'] - start['cpu']) + (end['child_cpu'] - start['child_cpu']), 4),
+            'peak_rss_kb': max(end['rss_kb'], end['child_rss_kb']),
+            'rss_delta_kb': max(end['rss_kb'] - start['rss_kb'], end['child_rss_kb'] - start['child_rss_kb'], 0),
+            'io_read_bytes': (end['io_read'] - start['io_read']) + (end['child_io_read'] - start['child_io_read']),
+            'io_write_bytes': (end['io_write'] - start['io_write']) + (end['child_io_write'] - start['child_io_write']),
+        }
+        if self.attrs:
+            record['attrs'] = self.attrs
+        if self.children:
+            record['children'] = self.children
+        self.record = record
+        return record
+
+    def _collect_child_spans(self):
+        """讀取子行程回報的 span"""
+        if self._child_file is None:
+            return
+        try:
+            with open(self._child_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        child = json.loads(line)
+                        child['process'] = 'child'
+                        self.children.append(child)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._child_file.unlink(missing_ok=True)
+            self._child_file = None
+
+
+def _stack() -> List[Span]:
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def current_span() -> Optional[Span]:
+    """目前執行緒最內層的 span"""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def span_env() -> Optional[Dict[str, str]]:
+    """呼叫子行程時傳入 env=span_env()，讓子行程的 span 併入目前的 span"""
+    active = current_span()
+    return active.child_env() if active else None
+
+
+def _export_root(record: Dict):
+    """子行程中的最外層 span 寫入父行程指定的檔案"""
+    span_file = os.environ.get(SPAN_FILE_ENV)
+    if not span_file:
+        return
+    try:
+        with open(span_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+
+@contextmanager
+def span(name: str, sink: Callable[[Dict], None] = None, **attrs):
+    """
+    追蹤一段程式的耗時與資源用量
+
+    Args:
+        name: span 名稱
+        sink: 最外層 span 結束時接收記錄的函式（預設寫回父行程）
+        **attrs: 附加屬性
+
+    用法:
+        with span('parse_pdf') as s:
+            ...
+            s.set(pages=3)
+    """
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    active = Span(name, attrs)
+    stack.append(active)
+    status = 'ok'
+    try:
+        yield active
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        stack.pop()
+        record = active.finish(status)
+        if parent is not None:
+            parent.children.append(record)
+        elif sink is not None:
+            sink(record)
+        else:
+            _export_root(record)
+
+
+def traced(name: str = None):
+    """以 span 包裝函式的裝飾器"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def iter_spans(records: List[Dict], prefix: str = ''):
+    """展開巢狀 span，產生 (路徑, 記錄)"""
+    for record in records:
+        path = f"{prefix}/{record['name']}" if prefix else record['name']
+        yield path, record
+        yield from iter_spans(record.get('children', []), path)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩百分位數（q 介於 0~1）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
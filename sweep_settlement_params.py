@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+結算預測參數掃描
+
+以回測引擎在行程池中評估訊號門檻、中心加權與區間半徑的組合（src/settlement_sweep.py），
+前推（walk-forward）驗證挑選方式。建議參數與其指標以精簡區塊寫入
+data/ai_learning/calibration.json 的 settlement_params，預測器下次執行時自動套用；
+完整結果（前推各折、Pareto 前緣）另存 data/ai_learning/settlement_sweep.json
+
+使用方式:
+    python sweep_settlement_params.py                      # 隨機搜尋 2000 組
+    python sweep_settlement_params.py --search grid        # 格點搜尋
+    python sweep_settlement_params.py --dry-run            # 只列出結果，不寫入
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 加入專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.calibration_store import AI_LEARNING_DIR, PARAMS_FILE, _write_json, update_params
+from src.settlement_backtest import load_metrics_table, load_settlement_cases
+from src.settlement_predictor import (
+    DEFAULT_HALF_RANGE,
+    SignalParams,
+    _load_calibration,
+    calibrated_half_range,
+)
+from src.settlement_sweep import (
+    DEFAULT_TARGET_COVERAGE,
+    MIN_TRAIN,
+    TEST_SIZE,
+    baseline_candidate,
+    grid_candidates,
+    random_candidates,
+    run_sweep,
+)
+
+# 完整掃描結果（不放進 calibration.json，避免預測器每次載入都讀到）
+SWEEP_DETAIL_FILE = AI_LEARNING_DIR / "settlement_sweep.json"
+
+COMPACT_KEYS = ('generated_at', 'search', 'evaluated', 'cases', 'target_coverage',
+                'recommended', 'recommended_metrics', 'baseline_metrics')
+
+
+def format_params(entry: dict) -> str:
+    half = entry['half_range']
+    return (f"動能±{entry['momentum_threshold']} | MaxPain {entry['max_pain_far']}/{entry['max_pain_near']} | "
+            f"PC {entry['pc_low']}/{entry['pc_high']}/{entry['pc_extreme']} | 加權 {entry['center_blend']} | "
+            f"半徑 三±{half.get('wednesday')} 五±{half.get('friday')}")
+
+
+def format_metrics(metrics: dict) -> str:
+    return (f"區間命中 {metrics['interval_hit_rate']:.1f}% | 平均寬度 {metrics['avg_width']:.0f} 點 | "
+            f"方向命中 {metrics['direction_hit_rate']:.1f}%")
+
+
+def print_result(result: dict):
+    print("=" * 60)
+    print(f"📊 參數掃描結果（{result['evaluated']} 組，{result['cases']} 筆結算案例）")
+    print("=" * 60)
+
+    print("\n【目前參數】")
+    print(f"  {format_params(result['baseline'])}")
+    print(f"  全部歷史：{format_metrics(result['baseline_metrics']['full'])}")
+    print(f"  驗證期間：{format_metrics(result['baseline_metrics']['walk_forward_period'])}")
+
+    print(f"\n【建議參數】（目標區間命中率 {result['target_coverage']:.0f}%）")
+    print(f"  {format_params(result['recommended'])}")
+    print(f"  全部歷史：{format_metrics(result['recommended_metrics']['full'])}")
+    print(f"  驗證期間：{format_metrics(result['recommended_metrics']['walk_forward_period'])}")
+
+    walk = result['walk_forward']
+    print(f"\n【前推驗證】（至少 {walk['min_train']} 筆訓練，每折驗證 {walk['test_size']} 筆）")
+    for fold in walk['folds']:
+        print(f"  訓練 {fold['train']} → 驗證 {fold['test']}：{format_metrics(fold['test_metrics'])}")
+    oos = walk['out_of_sample']
+    if oos['count']:
+        print(f"  樣本外合計 {oos['count']} 筆：{format_metrics(oos)}")
+
+    print(f"\n【Pareto 前緣】（{len(result['pareto_front'])} 組）")
+    for entry in result['pareto_front']:
+        print(f"  {format_metrics(entry)}")
+        print(f"      {format_params(entry)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='結算預測參數掃描',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+範例:
+  # 隨機搜尋 2000 組並寫入 calibration.json
+  python sweep_settlement_params.py
+
+  # 格點搜尋整個搜尋空間（組合較多，建議搭配多個行程）
+  python sweep_settlement_params.py --search grid --workers 8
+
+  # 提高目標區間命中率，只預覽不寫入
+  python sweep_settlement_params.py --target-coverage 70 --dry-run
+        """
+    )
+    parser.add_argument('--search', choices=['random', 'grid'], default='random', help='搜尋方式（預設 random）')
+    parser.add_argument('--samples', type=int, default=2000, help='隨機搜尋的組合數（預設 2000）')
+    parser.add_argument('--seed', type=int, default=0, help='隨機搜尋的種子')
+    parser.add_argument('--target-coverage', type=float, default=DEFAULT_TARGET_COVERAGE,
+                        help=f'建議參數的目標區間命中率 %%（預設 {DEFAULT_TARGET_COVERAGE:.0f}）')
+    parser.add_argument('--min-train', type=int, default=MIN_TRAIN, help=f'前推驗證的最少訓練案例數（預設 {MIN_TRAIN}）')
+    parser.add_argument('--test-size', type=int, default=TEST_SIZE, help=f'每折驗證案例數（預設 {TEST_SIZE}）')
+    parser.add_argument('--workers', type=int, help='平行處理的行程數（預設依 CPU 核心數）')
+    parser.add_argument('--dry-run', action='store_true', help='只列出結果，不寫入 calibration.json')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cases = load_settlement_cases(load_metrics_table())
+    if not len(cases):
+        print("❌ 沒有可回測的結算案例")
+        sys.exit(1)
+
+    calibration = _load_calibration()
+    current = SignalParams.from_dict(calibration.get("settlement_params", {}).get("recommended", {}))
+    half_ranges = {weekday: calibrated_half_range(calibration, weekday) for weekday in DEFAULT_HALF_RANGE}
+    baseline = baseline_candidate(current, half_ranges)
+
+    if args.search == 'grid':
+        candidates = grid_candidates()
+    else:
+        candidates = random_candidates(args.samples, args.seed)
+    print(f"🔍 {'格點' if args.search == 'grid' else '隨機'}搜尋 {len(candidates)} 組參數，{len(cases)} 筆結算案例")
+
+    result = run_sweep(cases, candidates, baseline, args.target_coverage, args.workers,
+                       args.min_train, args.test_size)
+    result['search'] = args.search
+    elapsed = time.perf_counter() - start
+
+    print_result(result)
+    print(f"\n⏱️  耗時 {elapsed:.2f}s")
+
+    if args.dry_run:
+        print("\n（預覽模式，未寫入 calibration.json）")
+        return
+
+    _write_json(SWEEP_DETAIL_FILE, result)
+    compact = {key: result[key] for key in COMPACT_KEYS if key in result}
+    compact['detail'] = SWEEP_DETAIL_FILE.name
+    update_params({'settlement_params': compact})
+    print(f"\n✅ 建議參數已寫入：{PARAMS_FILE}")
+    print(f"   完整結果：{SWEEP_DETAIL_FILE}")
+
+
+if __name__ == '__main__':
+    main()
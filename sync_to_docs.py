@@ -10,44 +10,23 @@
     python sync_to_docs.py              # 同步所有 HTML 檔案
     python sync_to_docs.py --dry-run    # 預覽要同步的檔案（不實際複製）
     python sync_to_docs.py --force      # 強制覆蓋所有檔案
+    python sync_to_docs.py --pattern 'report_*.html'  # 只同步每日報告
+    python sync_to_docs.py --copy       # 複製檔案而不建立硬連結
 """
 
-import shutil
 import argparse
+import sys
+import time
 from pathlib import Path
 from datetime import datetime
-import hashlib
 
+sys.path.insert(0, str(Path(__file__).parent))
 
-def get_file_hash(file_path):
-    """計算檔案的 MD5 雜湊值"""
-    hash_md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+from src.docs_sync import DocsSync
 
 
-def should_sync(src_file, dst_file, force=False):
-    """判斷檔案是否需要同步"""
-    if force:
-        return True, "強制同步"
-    
-    if not dst_file.exists():
-        return True, "目標檔案不存在"
-    
-    # 比較檔案雜湊值
-    src_hash = get_file_hash(src_file)
-    dst_hash = get_file_hash(dst_file)
-    
-    if src_hash != dst_hash:
-        return True, "檔案內容不同"
-    
-    return False, "檔案相同，跳過"
-
-
-def sync_reports(dry_run=False, force=False, verbose=False):
-    """同步 reports/ 到 docs/"""
+def sync_reports(dry_run=False, force=False, verbose=False, pattern="*.html", link=True):
+    """同步 reports/ 到 docs/（pattern 限定同步的檔名）"""
     
     project_root = Path(__file__).parent
     reports_dir = project_root / "reports"
@@ -61,12 +40,14 @@ def sync_reports(dry_run=False, force=False, verbose=False):
     if not docs_dir.exists():
         print(f"⚠️  警告: docs/ 目錄不存在，正在創建...")
         docs_dir.mkdir(parents=True, exist_ok=True)
-    
-    # 找出所有 HTML 檔案
-    html_files = sorted(reports_dir.glob("*.html"))
-    
-    if not html_files:
-        print("⚠️  reports/ 目錄中沒有 HTML 檔案")
+
+    start = time.perf_counter()
+    engine = DocsSync(reports_dir, docs_dir, link=link)
+
+    # 符合樣式的報告，連同報告的表格資料（chart_data/）與共用 CSS/JS（assets/）
+    sources = engine.sources([pattern])
+    if not any(source.parent == reports_dir for source in sources):
+        print(f"⚠️  reports/ 目錄中沒有符合 {pattern} 的檔案")
         return False
     
     print("=" * 60)
@@ -75,52 +56,54 @@ def sync_reports(dry_run=False, force=False, verbose=False):
     print(f"時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"來源: {reports_dir}")
     print(f"目標: {docs_dir}")
+    print(f"檔名: {pattern}")
     print(f"模式: {'🔍 預覽模式' if dry_run else '✅ 執行模式'}")
+    print(f"方式: {'硬連結（無法連結時複製）' if link else '複製'}")
     if force:
         print("⚡ 強制覆蓋模式")
     print("=" * 60)
     print()
     
+    items = engine.plan(sources, force=force)
     synced_count = 0
-    skipped_count = 0
+    linked_count = 0
     
-    for src_file in html_files:
-        dst_file = docs_dir / src_file.name
-        
-        # 判斷是否需要同步
-        need_sync, reason = should_sync(src_file, dst_file, force)
-        
-        if need_sync:
-            status = "🔄 同步"
-            if dry_run:
-                print(f"{status} [{reason}]: {src_file.name}")
-                if verbose:
-                    print(f"   來源: {src_file.stat().st_size:,} bytes, {datetime.fromtimestamp(src_file.stat().st_mtime):%Y-%m-%d %H:%M:%S}")
-                    if dst_file.exists():
-                        print(f"   目標: {dst_file.stat().st_size:,} bytes, {datetime.fromtimestamp(dst_file.stat().st_mtime):%Y-%m-%d %H:%M:%S}")
-            else:
-                try:
-                    shutil.copy2(src_file, dst_file)
-                    print(f"{status} [{reason}]: {src_file.name}")
-                    if verbose:
-                        print(f"   ✓ 已複製 {src_file.stat().st_size:,} bytes")
-                except Exception as e:
-                    print(f"❌ 錯誤 [{src_file.name}]: {e}")
-                    continue
-            
-            synced_count += 1
-        else:
+    for item in items:
+        status = "🔄 同步"
+        name = item.source.relative_to(reports_dir)
+        if dry_run:
+            print(f"{status} [{item.reason}]: {name}")
             if verbose:
-                print(f"⏭️  跳過 [{reason}]: {src_file.name}")
-            skipped_count += 1
+                src_stat = item.source.stat()
+                print(f"   來源: {src_stat.st_size:,} bytes, {datetime.fromtimestamp(src_stat.st_mtime):%Y-%m-%d %H:%M:%S}")
+                if item.target.exists():
+                    dst_stat = item.target.stat()
+                    print(f"   目標: {dst_stat.st_size:,} bytes, {datetime.fromtimestamp(dst_stat.st_mtime):%Y-%m-%d %H:%M:%S}")
+        else:
+            try:
+                method = engine.apply(item)
+                print(f"{status} [{item.reason}]: {name}")
+                if verbose:
+                    print(f"   ✓ 已{'建立硬連結' if method == 'link' else '複製'} {item.source.stat().st_size:,} bytes")
+                linked_count += method == 'link'
+            except Exception as e:
+                print(f"❌ 錯誤 [{name}]: {e}")
+                continue
+        
+        synced_count += 1
+
+    engine.save()  # 雜湊快取（預覽模式也保存，下次不必重新計算）
+    elapsed = time.perf_counter() - start
     
     print()
     print("=" * 60)
     print("📈 同步統計")
     print("=" * 60)
-    print(f"總檔案數: {len(html_files)}")
-    print(f"已同步: {synced_count}")
-    print(f"跳過: {skipped_count}")
+    print(f"總檔案數: {len(sources)}")
+    print(f"已同步: {synced_count}" + (f"（硬連結 {linked_count}）" if synced_count and not dry_run else ""))
+    print(f"跳過: {len(sources) - len(items)}")
+    print(f"計算雜湊: {engine.hashed} 個檔案（其餘沿用快取或為同一檔案）")
+    print(f"耗時: {elapsed * 1000:.0f} ms")
     
     if dry_run:
         print()
@@ -151,6 +134,12 @@ def main():
   python sync_to_docs.py --dry-run    預覽要同步的檔案（不實際複製）
   python sync_to_docs.py --force      強制覆蓋所有檔案
   python sync_to_docs.py -v           顯示詳細資訊
+  python sync_to_docs.py --pattern 'report_*.html'  只同步每日報告
+  python sync_to_docs.py --copy       複製檔案而不建立硬連結
+
+比對方式:
+  檔案大小與 mtime 皆未變更時沿用 .cache/docs_sync.json 的雜湊，不重新讀檔；
+  docs/ 與 reports/ 已是同一個硬連結時直接跳過
         '''
     )
     
@@ -172,13 +161,27 @@ def main():
         help='顯示詳細資訊'
     )
     
+    parser.add_argument(
+        '--pattern', '-p',
+        default='*.html',
+        help='同步的檔名樣式 (預設: *.html)'
+    )
+    
+    parser.add_argument(
+        '--copy',
+        action='store_true',
+        help='複製檔案而不建立硬連結'
+    )
+    
     args = parser.parse_args()
     
     try:
         success = sync_reports(
             dry_run=args.dry_run,
             force=args.force,
-            verbose=args.verbose
+            verbose=args.verbose,
+            pattern=args.pattern,
+            link=not args.copy
         )
         
         if not success:
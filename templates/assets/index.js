@@ -0,0 +1,88 @@
+// ===== 首頁報告搜尋 =====
+// 報告清單存在 catalog.json（欄位名稱 + 資料列），第一次使用搜尋時才下載，
+// 之後的篩選都在瀏覽器內完成
+
+const SEARCH_RESULT_LIMIT = 200;
+const KIND_LABELS = { d: '每日', s: '結算日' };
+
+const searchInput = document.getElementById('report-search');
+const kindSelect = document.getElementById('report-kind');
+const searchStatus = document.getElementById('search-status');
+const searchTable = document.getElementById('search-results');
+let catalogPromise = null;
+
+function loadCatalog() {
+    if (!catalogPromise) {
+        catalogPromise = fetch(searchInput.dataset.catalog)
+            .then(response => {
+                if (!response.ok) throw new Error(response.status);
+                return response.json();
+            })
+            .then(data => data.rows.map(row => {
+                const report = {};
+                data.fields.forEach((field, i) => { report[field] = row[i]; });
+                report.text = `${report.date} ${report.contract} ${report.href}`.toLowerCase();
+                return report;
+            }))
+            .catch(error => {
+                catalogPromise = null;
+                throw error;
+            });
+    }
+    return catalogPromise;
+}
+
+// 2026/05/08、2026-05 等格式統一成 YYYYMMDD 的前綴
+function normalizeQuery(query) {
+    return query.trim().toLowerCase().replace(/[\/\-.]/g, '');
+}
+
+function formatDate(date) {
+    return `${date.slice(0, 4)}/${date.slice(4, 6)}/${date.slice(6, 8)}`;
+}
+
+function renderResults(reports) {
+    searchTable.tBodies[0].innerHTML = reports.slice(0, SEARCH_RESULT_LIMIT).map(report =>
+        `<tr>` +
+        `<td><a href="${report.href}">${formatDate(report.date)}</a></td>` +
+        `<td>${KIND_LABELS[report.kind]}</td>` +
+        `<td>${report.contract}</td>` +
+        `<td>${report.max_pain != null ? report.max_pain.toLocaleString('en-US') : '-'}</td>` +
+        `<td>${report.pc_ratio != null ? report.pc_ratio.toFixed(2) : '-'}</td>` +
+        `</tr>`
+    ).join('');
+}
+
+function runSearch() {
+    const query = normalizeQuery(searchInput.value);
+    const kind = kindSelect.value;
+    if (!query && !kind) {
+        document.body.classList.remove('searching');
+        searchStatus.hidden = true;
+        searchTable.hidden = true;
+        return;
+    }
+
+    loadCatalog()
+        .then(reports => {
+            const terms = query.split(/\s+/).filter(Boolean);
+            const matches = reports.filter(report =>
+                (!kind || report.kind === kind) && terms.every(term => report.text.includes(term))
+            );
+            document.body.classList.add('searching');
+            searchStatus.hidden = false;
+            searchStatus.textContent = matches.length > SEARCH_RESULT_LIMIT
+                ? `找到 ${matches.length} 份報告，僅顯示前 ${SEARCH_RESULT_LIMIT} 份`
+                : `找到 ${matches.length} 份報告`;
+            searchTable.hidden = matches.length === 0;
+            renderResults(matches);
+        })
+        .catch(() => {
+            searchStatus.hidden = false;
+            searchStatus.textContent = '⚠️ 無法載入報告清單，請透過網站瀏覽或重新整理';
+        });
+}
+
+searchInput.addEventListener('focus', () => { loadCatalog().catch(() => {}); }, { once: true });
+searchInput.addEventListener('input', runSearch);
+kindSelect.addEventListener('change', runSearch);
@@ -0,0 +1,167 @@
+// Tab 切換功能
+function switchTab(event, tabId) {
+    // 隱藏所有 tab 內容
+    const tabContents = document.getElementsByClassName('tab-content');
+    for (let content of tabContents) {
+        content.classList.remove('active');
+    }
+
+    // 移除所有 tab 按鈕的 active 狀態
+    const tabButtons = document.getElementsByClassName('tab-button');
+    for (let button of tabButtons) {
+        button.classList.remove('active');
+    }
+
+    // 顯示選中的 tab
+    const tab = document.getElementById(tabId);
+    tab.classList.add('active');
+    event.currentTarget.classList.add('active');
+
+    // 載入此 tab 內的表格資料
+    loadChartTables(tab);
+}
+
+// ===== 延遲載入的 OI 表格 =====
+// 每個契約的資料存在 chart_data/<頁面>.<契約>.json（差分編碼的整數陣列），
+// 切換到包含表格的 tab 時才下載，同一個檔案只下載一次
+
+const CHART_FIELDS = ['strikes', 'call_oi', 'call_oi_change', 'put_oi', 'put_oi_change'];
+const chartDataCache = {};
+
+function deltaDecode(values) {
+    let total = 0;
+    return values.map(value => (total += value));
+}
+
+function fetchChartData(url) {
+    if (!chartDataCache[url]) {
+        chartDataCache[url] = fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error(response.status);
+                return response.json();
+            })
+            .then(data => {
+                const rows = [];
+                const columns = {};
+                CHART_FIELDS.forEach(field => { columns[field] = deltaDecode(data[field]); });
+                columns.strikes.forEach((strike, i) => {
+                    rows.push({
+                        strike: strike,
+                        callOi: columns.call_oi[i],
+                        callChange: columns.call_oi_change[i],
+                        putOi: columns.put_oi[i],
+                        putChange: columns.put_oi_change[i],
+                    });
+                });
+                return { rows: rows, marks: data.marks };
+            });
+    }
+    return chartDataCache[url];
+}
+
+function formatNumber(value) {
+    return value.toLocaleString('en-US');
+}
+
+function formatSigned(value) {
+    return (value > 0 ? '+' : '') + formatNumber(value);
+}
+
+// OI 分布：Call 增減 | Call OI | 履約價 | Put OI | Put 增減
+function renderOiRows(rows, marks) {
+    const maxCall = Math.max(...rows.map(row => row.callOi));
+    const maxPut = Math.max(...rows.map(row => row.putOi));
+
+    return rows.filter(row => row.callOi + row.putOi > 0).map(row => {
+        let rowClass = '';
+        if (row.strike === marks.closest) rowClass = 'row-closest';
+        else if (row.strike === marks.max_put) rowClass = 'row-max-put';
+        else if (row.strike === marks.max_call) rowClass = 'row-max-call';
+        else if (row.strike === marks.close) rowClass = 'row-close';
+        else if (row.strike === marks.max_pain) rowClass = 'row-max-pain';
+
+        const changeClass = value => (value < 0 ? 'change-down' : (value > 0 ? 'change-up' : ''));
+        const bar = (value, max, color) => value > 0
+            ? `<div class="oi-bar" style="background: rgba(${color}, ${value / max * 0.7}); width: ${value / max * 100}%;"></div>`
+            : '';
+
+        return `<tr class="${rowClass}">` +
+            `<td class="oi-call ${changeClass(row.callChange)}">${row.callChange !== 0 ? row.callChange : ''}</td>` +
+            `<td class="oi-call oi-bar-cell"><div class="oi-value">${row.callOi > 0 ? formatNumber(row.callOi) : ''}</div>${bar(row.callOi, maxCall, '239, 68, 68')}</td>` +
+            `<td class="oi-strike">${formatNumber(row.strike)}` +
+            (row.strike === marks.closest ? '<span class="mark-closest">▼</span>' : '') +
+            (row.strike === marks.max_put ? '<span class="mark-max-put">►</span>' : '') +
+            (row.strike === marks.max_call ? '<span class="mark-max-call">◄</span>' : '') +
+            `</td>` +
+            `<td class="oi-put oi-bar-cell"><div class="oi-value">${row.putOi > 0 ? formatNumber(row.putOi) : ''}</div>${bar(row.putOi, maxPut, '34, 197, 94')}</td>` +
+            `<td class="oi-put ${changeClass(row.putChange)}">${row.putChange !== 0 ? row.putChange : ''}</td>` +
+            `</tr>`;
+    }).join('');
+}
+
+// OI 變化：Call 增加 | Call 減少 | 履約價 | Put 增加 | Put 減少
+function renderChangeRows(rows, marks) {
+    const cell = (side, value, show, kind, color, alpha) => {
+        if (!show) return `<td class="oi-${side} oi-bar-cell"></td>`;
+        const width = Math.abs(value) < 200 ? Math.abs(value) / 200 * 100 : 100;
+        return `<td class="oi-${side} oi-bar-cell">` +
+            `<div class="oi-value change-${kind}">${formatSigned(value)}</div>` +
+            `<div class="oi-bar" style="background: rgba(${color}, ${alpha}); width: ${width}%;"></div></td>`;
+    };
+
+    return rows.filter(row => Math.abs(row.callChange) + Math.abs(row.putChange) > 0).map(row => {
+        let rowClass = '';
+        if (row.strike === marks.close) rowClass = 'row-close';
+        else if (row.strike === marks.max_pain) rowClass = 'row-max-pain';
+
+        return `<tr class="${rowClass}">` +
+            cell('call', row.callChange, row.callChange > 0, 'up', '239, 68, 68', 0.2) +
+            cell('call', row.callChange, row.callChange < 0, 'down', '220, 38, 38', 0.3) +
+            `<td class="oi-strike">${formatNumber(row.strike)}</td>` +
+            cell('put', row.putChange, row.putChange > 0, 'up', '34, 197, 94', 0.2) +
+            cell('put', row.putChange, row.putChange < 0, 'down', '22, 163, 74', 0.3) +
+            `</tr>`;
+    }).join('');
+}
+
+// 詳細資料：履約價 | 買權未平倉 | 買權OI變化 | 賣權未平倉 | 賣權OI變化 | 總OI
+function renderDetailRows(rows, marks) {
+    const changeClass = value => (value > 0 ? 'positive' : (value < 0 ? 'negative' : ''));
+
+    return rows.map(row => {
+        const closest = row.strike === marks.closest;
+        return `<tr class="${closest ? 'row-closest' : ''}">` +
+            `<td><strong>${formatNumber(row.strike)}</strong>${closest ? '<span class="mark-closest">▼</span>' : ''}</td>` +
+            `<td class="detail-call">${formatNumber(row.callOi)}</td>` +
+            `<td class="${changeClass(row.callChange)}">${formatSigned(row.callChange)}</td>` +
+            `<td class="detail-put">${formatNumber(row.putOi)}</td>` +
+            `<td class="${changeClass(row.putChange)}">${formatSigned(row.putChange)}</td>` +
+            `<td>${formatNumber(row.callOi + row.putOi)}</td>` +
+            `</tr>`;
+    }).join('');
+}
+
+const CHART_VIEWS = {
+    oi: renderOiRows,
+    change: renderChangeRows,
+    detail: renderDetailRows,
+};
+
+function loadChartTables(container) {
+    const tables = container.querySelectorAll('tbody[data-chart]:not([data-loaded])');
+    tables.forEach(tbody => {
+        tbody.setAttribute('data-loaded', '');
+        fetchChartData(tbody.dataset.chart)
+            .then(data => {
+                tbody.innerHTML = CHART_VIEWS[tbody.dataset.view](data.rows, data.marks);
+            })
+            .catch(() => {
+                delete chartDataCache[tbody.dataset.chart];
+                tbody.removeAttribute('data-loaded');
+                tbody.querySelector('.chart-loading').textContent = '⚠️ 無法載入表格資料，請透過網站瀏覽或重新整理';
+            });
+    });
+}
+
+// 預設顯示的 tab 若包含表格，頁面載入後立即載入
+document.querySelectorAll('.tab-content.active').forEach(loadChartTables);
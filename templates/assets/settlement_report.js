@@ -0,0 +1,24 @@
+function switchTab(tabName) {
+    // Hide all tab contents
+    document.querySelectorAll('.tab-content').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Remove active class from all buttons
+    document.querySelectorAll('.tab-button').forEach(btn => {
+        btn.classList.remove('active');
+    });
+
+    // Show selected tab content and activate corresponding button
+    const tabElement = document.getElementById(tabName + '-tab');
+    if (tabElement) {
+        tabElement.classList.add('active');
+    }
+
+    // Find and activate the button that calls switchTab with this tabName
+    document.querySelectorAll('.tab-button').forEach(btn => {
+        if (btn.getAttribute('onclick') === `switchTab('${tabName}')`) {
+            btn.classList.add('active');
+        }
+    });
+}